@@ -9,6 +9,7 @@ import json
 import logging
 import os
 import re
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
@@ -64,6 +65,8 @@ try:
 except ImportError:
     OLLAMA_AVAILABLE = False
 
+from rate_limiter import estimate_tokens, get_provider_limiter, make_http_client
+
 
 # Cost calculation tables (per 1K tokens, approximate as of 2024)
 OPENAI_COSTS = {
@@ -123,6 +126,78 @@ def _get_provider_client(provider: str, api_key: Optional[str] = None):
     return None
 
 
+_prompt_cache_lock = threading.Lock()
+_prompt_cache_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _as_int(value) -> Optional[int]:
+    """Return value if it is a real int (SDK usage fields may be missing or mocks)."""
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _record_prompt_cache(
+    provider: str,
+    prompt_tokens: Optional[int],
+    cached_tokens: Optional[int] = None,
+    cache_write_tokens: Optional[int] = None,
+) -> None:
+    """
+    Accumulate prompt-cache usage reported by a provider response.
+
+    Args:
+        provider: Provider name (openai, anthropic, ollama)
+        prompt_tokens: Input tokens processed without the cache
+        cached_tokens: Input tokens read from the provider's prompt cache
+        cache_write_tokens: Input tokens written to the cache (Anthropic only)
+    """
+    with _prompt_cache_lock:
+        entry = _prompt_cache_stats.setdefault(provider, {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "cache_write_tokens": 0,
+            "cache_hits": 0,
+        })
+        entry["requests"] += 1
+        entry["prompt_tokens"] += prompt_tokens or 0
+        entry["cached_tokens"] += cached_tokens or 0
+        entry["cache_write_tokens"] += cache_write_tokens or 0
+        if cached_tokens:
+            entry["cache_hits"] += 1
+
+
+def get_prompt_cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Return per-provider prompt-cache statistics collected from responses.
+
+    Returns:
+        Dict of provider -> requests, prompt_tokens (uncached input), cached_tokens,
+        cache_write_tokens, cache_hits and cached_ratio (cached / all input tokens).
+    """
+    with _prompt_cache_lock:
+        snapshot = {provider: dict(entry) for provider, entry in _prompt_cache_stats.items()}
+    for entry in snapshot.values():
+        total = entry["prompt_tokens"] + entry["cached_tokens"]
+        entry["cached_ratio"] = round(entry["cached_tokens"] / total, 4) if total else 0.0
+    return snapshot
+
+
+def reset_prompt_cache_stats() -> None:
+    """Clear prompt-cache statistics."""
+    with _prompt_cache_lock:
+        _prompt_cache_stats.clear()
+
+
+def _error_headers(error: Exception) -> Optional[Dict[str, str]]:
+    """Return HTTP response headers attached to a provider SDK error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    try:
+        return dict(headers) if headers is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 def _call_openai_api(
     prompt: str,
     model: str,
@@ -131,6 +206,8 @@ def _call_openai_api(
     temperature: float,
     max_retries: int = 3,
     retry_delay: float = 1.0,
+    rate_limit: Optional[Dict] = None,
+    cache_prefix: Optional[str] = None,
 ) -> Tuple[Optional[str], Optional[Dict]]:
     """
     Call OpenAI API with retry logic and error handling.
@@ -142,10 +219,12 @@ def _call_openai_api(
         max_tokens: Maximum tokens in response
         temperature: Sampling temperature
         max_retries: Maximum retry attempts
-        retry_delay: Initial delay between retries (exponential backoff)
+        retry_delay: Initial delay between retries (fallback when no Retry-After header)
+        rate_limit: Optional adaptive concurrency config (see rate_limiter.get_provider_limiter)
+        cache_prefix: Optional stable prefix sent before prompt (OpenAI caches long identical prefixes automatically)
         
     Returns:
-        Tuple of (summary_text, metadata_dict) where metadata includes tokens_used, cost, etc.
+        Tuple of (summary_text, metadata_dict) where metadata includes tokens_used, cost, cached_tokens, etc.
     """
     if not OPENAI_AVAILABLE:
         logger.error("OpenAI library not available")
@@ -173,15 +252,23 @@ def _call_openai_api(
         except ImportError:
             pass
 
-    client = openai.OpenAI(api_key=api_key) if api_key else openai.OpenAI()
+    limiter = get_provider_limiter("openai", rate_limit)
+    client_kwargs = {"api_key": api_key} if api_key else {}
+    http_client = make_http_client(limiter)
+    if http_client is not None:
+        client_kwargs["http_client"] = http_client
+    client = openai.OpenAI(**client_kwargs)
     
+    full_prompt = (cache_prefix or "") + prompt
     for attempt in range(max_retries):
+        slot = limiter.acquire(estimate_tokens(full_prompt, max_tokens))
+        released = False
         try:
             response = client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that creates concise, informative summaries."},
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": full_prompt}
                 ],
                 max_tokens=max_tokens,
                 temperature=temperature,
@@ -189,6 +276,16 @@ def _call_openai_api(
             
             summary = response.choices[0].message.content
             tokens_used = response.usage.total_tokens if response.usage else None
+            limiter.release(slot, tokens_used=tokens_used if isinstance(tokens_used, int) else None)
+            released = True
+            usage = response.usage
+            details = getattr(usage, "prompt_tokens_details", None) if usage else None
+            cached_tokens = _as_int(getattr(details, "cached_tokens", None))
+            prompt_tokens = _as_int(getattr(usage, "prompt_tokens", None)) if usage else None
+            # OpenAI counts cached tokens inside prompt_tokens; store the uncached part like Anthropic does.
+            if prompt_tokens is not None and cached_tokens:
+                prompt_tokens -= cached_tokens
+            _record_prompt_cache("openai", prompt_tokens, cached_tokens)
             
             # Calculate cost (approximate, varies by model)
             cost = _calculate_openai_cost(model, tokens_used) if tokens_used else None
@@ -197,6 +294,7 @@ def _call_openai_api(
                 "provider": "openai",
                 "model": model,
                 "tokens_used": tokens_used,
+                "cached_tokens": cached_tokens,
                 "cost": cost,
                 "timestamp": datetime.now().isoformat(),
             }
@@ -206,9 +304,15 @@ def _call_openai_api(
             return summary, metadata
             
         except openai.RateLimitError as e:
+            wait_time = limiter.release(
+                slot,
+                headers=_error_headers(e),
+                rate_limited=True,
+                fallback_delay=retry_delay * (2 ** attempt),
+            )
+            released = True
             if attempt < max_retries - 1:
-                wait_time = retry_delay * (2 ** attempt)
-                logger.warning(f"OpenAI rate limit hit, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                logger.warning(f"OpenAI rate limit hit, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
                 time.sleep(wait_time)
                 continue
             else:
@@ -220,6 +324,9 @@ def _call_openai_api(
         except Exception as e:
             logger.error(f"Unexpected OpenAI error: {e}")
             return None, None
+        finally:
+            if not released:
+                limiter.release(slot)
     
     return None, None
 
@@ -232,6 +339,8 @@ def _call_anthropic_api(
     temperature: float,
     max_retries: int = 3,
     retry_delay: float = 1.0,
+    rate_limit: Optional[Dict] = None,
+    cache_prefix: Optional[str] = None,
 ) -> Tuple[Optional[str], Optional[Dict]]:
     """
     Call Anthropic (Claude) API with retry logic and error handling.
@@ -243,7 +352,9 @@ def _call_anthropic_api(
         max_tokens: Maximum tokens in response
         temperature: Sampling temperature
         max_retries: Maximum retry attempts
-        retry_delay: Initial delay between retries (exponential backoff)
+        retry_delay: Initial delay between retries (fallback when no Retry-After header)
+        rate_limit: Optional adaptive concurrency config (see rate_limiter.get_provider_limiter)
+        cache_prefix: Optional stable prefix sent as its own block with cache_control (ephemeral)
         
     Returns:
         Tuple of (summary_text, metadata_dict)
@@ -274,9 +385,24 @@ def _call_anthropic_api(
         except ImportError:
             pass
 
-    client = anthropic.Anthropic(api_key=api_key) if api_key else anthropic.Anthropic()
+    limiter = get_provider_limiter("anthropic", rate_limit)
+    client_kwargs = {"api_key": api_key} if api_key else {}
+    http_client = make_http_client(limiter)
+    if http_client is not None:
+        client_kwargs["http_client"] = http_client
+    client = anthropic.Anthropic(**client_kwargs)
     
+    if cache_prefix:
+        # Stable prefix first, marked cacheable; only the short task suffix varies between calls.
+        user_content = [
+            {"type": "text", "text": cache_prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt},
+        ]
+    else:
+        user_content = prompt
     for attempt in range(max_retries):
+        slot = limiter.acquire(estimate_tokens((cache_prefix or "") + prompt, max_tokens))
+        released = False
         try:
             response = client.messages.create(
                 model=model,
@@ -284,12 +410,23 @@ def _call_anthropic_api(
                 temperature=temperature,
                 system="You are a helpful assistant that creates concise, informative summaries.",
                 messages=[
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": user_content}
                 ],
             )
             
             summary = response.content[0].text if response.content else None
             tokens_used = response.usage.input_tokens + response.usage.output_tokens if response.usage else None
+            limiter.release(slot, tokens_used=tokens_used if isinstance(tokens_used, int) else None)
+            released = True
+            usage = response.usage
+            cached_tokens = _as_int(getattr(usage, "cache_read_input_tokens", None)) if usage else None
+            cache_write_tokens = _as_int(getattr(usage, "cache_creation_input_tokens", None)) if usage else None
+            _record_prompt_cache(
+                "anthropic",
+                _as_int(getattr(usage, "input_tokens", None)) if usage else None,
+                cached_tokens,
+                cache_write_tokens,
+            )
             
             # Calculate cost (approximate, varies by model)
             cost = _calculate_anthropic_cost(model, tokens_used) if tokens_used else None
@@ -298,6 +435,8 @@ def _call_anthropic_api(
                 "provider": "anthropic",
                 "model": model,
                 "tokens_used": tokens_used,
+                "cached_tokens": cached_tokens,
+                "cache_write_tokens": cache_write_tokens,
                 "cost": cost,
                 "timestamp": datetime.now().isoformat(),
             }
@@ -307,9 +446,15 @@ def _call_anthropic_api(
             return summary, metadata
             
         except anthropic.RateLimitError as e:
+            wait_time = limiter.release(
+                slot,
+                headers=_error_headers(e),
+                rate_limited=True,
+                fallback_delay=retry_delay * (2 ** attempt),
+            )
+            released = True
             if attempt < max_retries - 1:
-                wait_time = retry_delay * (2 ** attempt)
-                logger.warning(f"Anthropic rate limit hit, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                logger.warning(f"Anthropic rate limit hit, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
                 time.sleep(wait_time)
                 continue
             else:
@@ -321,10 +466,24 @@ def _call_anthropic_api(
         except Exception as e:
             logger.error(f"Unexpected Anthropic error: {e}")
             return None, None
+        finally:
+            if not released:
+                limiter.release(slot)
     
     return None, None
 
 
+def _record_ollama_latency(model: str, response, latency_ms: float) -> None:
+    """Feed cold/warm latency of a real call to the active warm-up manager, if one is running."""
+    try:
+        from ollama_warmup import get_active_manager
+    except ImportError:
+        return
+    manager = get_active_manager()
+    if manager is not None:
+        manager.record_response(model, response, latency_ms)
+
+
 def _call_ollama_api(
     prompt: str,
     model: str,
@@ -333,6 +492,7 @@ def _call_ollama_api(
     max_retries: int = 3,
     retry_delay: float = 1.0,
     endpoint: Optional[str] = None,
+    cache_prefix: Optional[str] = None,
 ) -> Tuple[Optional[str], Optional[Dict]]:
     """
     Call Ollama local API with retry logic and error handling.
@@ -345,6 +505,7 @@ def _call_ollama_api(
         max_retries: Maximum retry attempts
         retry_delay: Initial delay between retries (exponential backoff)
         endpoint: Optional Ollama endpoint URL (default: localhost:11434 or OLLAMA_HOST env var)
+        cache_prefix: Optional stable prefix sent before prompt so Ollama can reuse its KV cache
         
     Returns:
         Tuple of (summary_text, metadata_dict)
@@ -378,17 +539,19 @@ def _call_ollama_api(
     
     for attempt in range(max_retries):
         try:
+            call_start = time.perf_counter()
             response = ollama.chat(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that creates concise, informative summaries."},
-                    {"role": "user", "content": prompt}
+                    {"role": "user", "content": (cache_prefix or "") + prompt}
                 ],
                 options={
                     "num_predict": max_tokens,
                     "temperature": temperature,
                 }
             )
+            _record_ollama_latency(model, response, (time.perf_counter() - call_start) * 1000.0)
             
             summary = response["message"]["content"] if response.get("message") else None
             
@@ -396,6 +559,8 @@ def _call_ollama_api(
             # Ollama provides: prompt_eval_count (input tokens), eval_count (output tokens)
             prompt_tokens = response.get("prompt_eval_count")
             output_tokens = response.get("eval_count")
+            # Ollama does not report cache hits; a reused KV prefix shows up as a smaller prompt_eval_count.
+            _record_prompt_cache("ollama", _as_int(prompt_tokens))
             
             if prompt_tokens is not None and output_tokens is not None:
                 tokens_used = prompt_tokens + output_tokens
@@ -0,0 +1,117 @@
+# PURPOSE: Benchmark blocked fuzzy entity deduplication against the exact pairwise scan.
+# DEPENDENCIES: entity_validator (stdlib only).
+# MODIFICATION NOTES: Synthetic RPG-style names with injected one-character typos; the exact scan is
+#   quadratic, so it only runs on a small sample to measure agreement.
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from entity_validator import blocked_fuzzy_deduplicate, similarity_ratio
+
+_SYLLABLES = ["".join(p) for p in itertools.product("bdgklmnrstvxz", "aeiouy")] + [
+    "ka", "el", "vor", "ian", "tha", "mor", "rin", "sul", "dra", "gon", "lia", "quor", "ith", "mek", "orn",
+]
+_SUFFIXES = ["", "", "", " Chapter", " Legion", " Hive", " Station", " Blade", " Order"]
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    i = rng.randrange(1, len(name))
+    op = rng.random()
+    if op < 0.33:
+        return name[:i] + name[i + 1:]
+    if op < 0.66:
+        return name[:i] + rng.choice("aeiouk") + name[i:]
+    return name[:i] + rng.choice("aeiou") + name[i + 1:]
+
+
+def synthetic_names(count: int, duplicate_rate: float = 0.2, seed: int = 5) -> List[str]:
+    """Unique names; roughly duplicate_rate of them are one-edit variants of another name."""
+    rng = random.Random(seed)
+
+    def word() -> str:
+        return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+    names: List[str] = []
+    while len(names) < count:
+        name = (word() if rng.random() < 0.3 else f"{word()} {word()}") + rng.choice(_SUFFIXES)
+        names.append(name)
+        if rng.random() < duplicate_rate:
+            names.append(_typo(rng, name))
+    return list(dict.fromkeys(names[:count]))
+
+
+def exact_deduplicate(names: List[str], similarity_threshold: float = 0.85) -> List[str]:
+    """The pairwise keep-first scan used for small lists (with a length bound to keep the sample fast)."""
+    kept: List[str] = []
+    kept_lower: List[str] = []
+    for name in names:
+        lower = name.lower()
+        if any(
+            2 * min(len(lower), len(other)) >= similarity_threshold * (len(lower) + len(other))
+            and similarity_ratio(lower, other) >= similarity_threshold
+            for other in kept_lower
+        ):
+            continue
+        kept.append(name)
+        kept_lower.append(lower)
+    return kept
+
+
+def run_benchmark(sizes: List[int], sample: int) -> Dict[str, Any]:
+    rows = []
+    for size in sizes:
+        names = synthetic_names(size)
+        start = time.perf_counter()
+        kept = blocked_fuzzy_deduplicate(names)
+        rows.append({
+            "names": len(names),
+            "kept": len(kept),
+            "seconds": round(time.perf_counter() - start, 2),
+        })
+    result: Dict[str, Any] = {"blocked": rows}
+    if sample:
+        names = synthetic_names(sample)
+        start = time.perf_counter()
+        exact = exact_deduplicate(names)
+        exact_seconds = time.perf_counter() - start
+        blocked = blocked_fuzzy_deduplicate(names)
+        result["agreement"] = {
+            "names": len(names),
+            "exact_kept": len(exact),
+            "blocked_kept": len(blocked),
+            "differing_names": len(set(exact) ^ set(blocked)),
+            "exact_seconds": round(exact_seconds, 2),
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark blocked fuzzy entity deduplication.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Names per run")
+    parser.add_argument("--exact-sample", type=int, default=2000, help="Names compared against the exact scan (0 = skip)")
+    parser.add_argument("--json-output", type=str, default=None, help="Export results to JSON file")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.sizes, args.exact_sample)
+    print(f"{'names':>8} {'kept':>8} {'seconds':>8}")
+    for row in result["blocked"]:
+        print(f"{row['names']:>8} {row['kept']:>8} {row['seconds']:>8}")
+    if "agreement" in result:
+        a = result["agreement"]
+        print(
+            f"\nExact scan on {a['names']} names: kept {a['exact_kept']} vs blocked {a['blocked_kept']}, "
+            f"{a['differing_names']} names differ (exact scan took {a['exact_seconds']} s)"
+        )
+    if args.json_output:
+        Path(args.json_output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
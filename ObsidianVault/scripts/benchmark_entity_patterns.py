@@ -0,0 +1,105 @@
+# PURPOSE: Benchmark RPG pattern entity extraction per MB of text: per-pattern findall vs the single-pass scanner.
+# DEPENDENCIES: entity_extractor (spaCy not needed; only the pattern stage is timed).
+# MODIFICATION NOTES: Synthetic RPG prose with a configurable share of sentences holding an entity;
+#   both paths must return identical entities.
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from entity_extractor import EntityExtractor
+
+_WORDS = (
+    "the warband crossed into a ruined hive where servitors tended shrines of rust and the faithful "
+    "prayed for deliverance while heretics gathered in the lower levels under flickering lumens"
+).split()
+_NAMES = ["Kael", "Voss", "Andrakar", "Thule", "Serana", "Morvain", "Ixion", "Drusus", "Calyx", "Ferro"]
+_TEMPLATES = [
+    "Inquisitor {n}", "Lord {n} {m}", "{n} the Elder", "the {n} {m} Chapter", "{n} Imperium", "{n} Station",
+    "{n} Prime World", "the {n} Realm", "{n} Power Sword", "the {n} Helm", "Tech-Priest {n}",
+]
+
+
+def synthetic_text(chars: int, entity_rate: float = 0.45, seed: int = 3) -> str:
+    """Sentences of filler words; entity_rate of them contain one templated entity."""
+    rng = random.Random(seed)
+    sentences: List[str] = []
+    size = 0
+    while size < chars:
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 20))]
+        if rng.random() < entity_rate:
+            entity = rng.choice(_TEMPLATES).format(n=rng.choice(_NAMES), m=rng.choice(_NAMES))
+            words.insert(rng.randrange(len(words)), entity)
+        sentence = " ".join(words).capitalize() + rng.choice([". ", ". ", "! ", "? ", ".\n\n", ", 42 "])
+        sentences.append(sentence)
+        size += len(sentence)
+    return "".join(sentences)[:chars]
+
+
+def legacy_extract(extractor: EntityExtractor, text: str) -> Dict[str, List[str]]:
+    """The previous implementation: one findall over the whole text per pattern."""
+    entities: Dict[str, List[str]] = {category: [] for category in extractor.rpg_patterns}
+    seen = set()
+    for category, patterns in extractor.rpg_patterns.items():
+        for pattern in patterns:
+            for match in pattern.findall(text):
+                entity = match.strip()
+                if entity and entity not in seen and len(entity) >= 2:
+                    entities[category].append(entity)
+                    seen.add(entity)
+    return {key: sorted(set(values)) for key, values in entities.items()}
+
+
+def run_benchmark(megabytes: List[float], entity_rate: float, repeats: int) -> List[Dict[str, Any]]:
+    extractor = EntityExtractor.__new__(EntityExtractor)
+    extractor.rpg_patterns = extractor._init_rpg_patterns()
+    rows = []
+    for mb in megabytes:
+        text = synthetic_text(int(mb * 1_000_000), entity_rate)
+        timings = {}
+        results = {}
+        for label, fn in (("before", lambda: legacy_extract(extractor, text)),
+                          ("after", lambda: extractor._extract_with_patterns(text))):
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                results[label] = fn()
+                best = min(best, time.perf_counter() - start)
+            timings[label] = best
+        rows.append({
+            "megabytes": mb,
+            "entities": sum(len(v) for v in results["after"].values()),
+            "before_s_per_mb": round(timings["before"] / mb, 3),
+            "after_s_per_mb": round(timings["after"] / mb, 3),
+            "speedup": round(timings["before"] / timings["after"], 1) if timings["after"] else None,
+            "identical": results["before"] == results["after"],
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark RPG pattern extraction time per MB (before/after).")
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[0.1, 1.0], help="Text sizes in MB")
+    parser.add_argument("--entity-rate", type=float, default=0.45, help="Share of sentences holding an entity")
+    parser.add_argument("--repeats", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--json-output", type=str, default=None, help="Export results to JSON file")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.megabytes, args.entity_rate, args.repeats)
+    print(f"{'MB':>6} {'entities':>9} {'before s/MB':>12} {'after s/MB':>11} {'speedup':>8} {'identical':>10}")
+    for row in rows:
+        print(
+            f"{row['megabytes']:>6} {row['entities']:>9} {row['before_s_per_mb']:>12} {row['after_s_per_mb']:>11} "
+            f"{row['speedup']:>8} {str(row['identical']):>10}"
+        )
+    if args.json_output:
+        Path(args.json_output).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
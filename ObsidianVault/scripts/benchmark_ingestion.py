@@ -174,7 +174,7 @@ def run_benchmark(
     
     # Run ingestion
     print(f"Running ingestion for {len(pdfs)} PDFs...", file=sys.stderr)
-    ingest_pdfs(config, overwrite=True)
+    ingest_pdfs(config, overwrite=True, force=True)
     
     # Get results
     collector = get_collector()
@@ -0,0 +1,146 @@
+# PURPOSE: Benchmark the flat memmap vector backend against ChromaDB (build time, query latency, recall).
+# DEPENDENCIES: numpy, vector_store; chromadb optional (compared when installed).
+# MODIFICATION NOTES: Uses random unit vectors with tag metadata; recall@k of each backend is measured against
+#   exact brute-force results, with and without a Strict Canon style tag prefilter.
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from vector_store import FlatVectorStore
+
+_SYSTEMS = ("W&G", "D&D", "")
+_FACTIONS = ("Inquisition", "Orks", "Mechanicus", "")
+
+
+def _dataset(n: int, dim: int, seed: int):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"doc_{i}" for i in range(n)]
+    metadatas = [
+        {"doc_key": ids[i], "system": _SYSTEMS[i % len(_SYSTEMS)], "faction": _FACTIONS[i % len(_FACTIONS)]}
+        for i in range(n)
+    ]
+    return ids, vectors, metadatas
+
+
+def _exact_top_k(vectors, metadatas, query, k: int, where: Optional[Dict[str, str]]) -> List[int]:
+    mask = np.ones(len(metadatas), dtype=bool)
+    if where:
+        mask = np.array([all(m.get(key) == v for key, v in where.items()) for m in metadatas])
+    candidates = np.flatnonzero(mask)
+    sims = vectors[candidates] @ query
+    return candidates[np.argsort(-sims)[:k]].tolist()
+
+
+def _open_chroma(path: Path):
+    try:
+        import chromadb
+        from chromadb.config import Settings
+    except ImportError:
+        return None
+    client = chromadb.PersistentClient(path=str(path), settings=Settings(anonymized_telemetry=False))
+    return client.get_or_create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+
+
+def bench_backend(
+    name: str,
+    collection: Any,
+    ids: List[str],
+    vectors,
+    metadatas: List[Dict[str, Any]],
+    queries,
+    top_k: int,
+    batch_size: int,
+) -> Dict[str, Any]:
+    """Load the dataset into collection, then time filtered and unfiltered queries and measure recall@k."""
+    start = time.perf_counter()
+    for i in range(0, len(ids), batch_size):
+        collection.upsert(
+            ids=ids[i:i + batch_size],
+            embeddings=vectors[i:i + batch_size].tolist(),
+            documents=ids[i:i + batch_size],
+            metadatas=metadatas[i:i + batch_size],
+        )
+    build_seconds = time.perf_counter() - start
+    index_of = {doc_id: i for i, doc_id in enumerate(ids)}
+
+    result: Dict[str, Any] = {"backend": name, "build_seconds": round(build_seconds, 3)}
+    for label, where in (("unfiltered", None), ("filtered", {"system": "W&G"})):
+        latencies: List[float] = []
+        recalls: List[float] = []
+        for q in queries:
+            t0 = time.perf_counter()
+            res = collection.query(query_embeddings=[q.tolist()], n_results=top_k, where=where,
+                                   include=["metadatas", "distances"])
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            got = {index_of[i] for i in res["ids"][0]}
+            expected = set(_exact_top_k(vectors, metadatas, q, top_k, where))
+            recalls.append(len(got & expected) / max(1, len(expected)))
+        latencies.sort()
+        result[label] = {
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+            "recall_at_k": round(statistics.mean(recalls), 4),
+        }
+    return result
+
+
+def run_benchmark(n: int, dim: int, n_queries: int, top_k: int, batch_size: int, seed: int = 7) -> List[Dict[str, Any]]:
+    ids, vectors, metadatas = _dataset(n, dim, seed)
+    queries = _dataset(n_queries, dim, seed + 1)[1]
+    work_dir = Path(tempfile.mkdtemp(prefix="vector_bench_"))
+    results: List[Dict[str, Any]] = []
+    try:
+        flat = FlatVectorStore(work_dir / "flat")
+        results.append(bench_backend("flat", flat, ids, vectors, metadatas, queries, top_k, batch_size))
+        flat.close()
+        chroma = _open_chroma(work_dir / "chroma")
+        if chroma is None:
+            print("chromadb not installed; skipping Chroma backend")
+        else:
+            results.append(bench_backend("chroma", chroma, ids, vectors, metadatas, queries, top_k, batch_size))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def print_report(results: List[Dict[str, Any]], n: int, dim: int, top_k: int) -> None:
+    print(f"\nVector backend benchmark: {n} vectors x {dim} dims, top_k={top_k}")
+    print(f"{'backend':<8} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7} {'f.p50 ms':>9} {'f.p95 ms':>9} {'f.recall':>8}")
+    for r in results:
+        u, f = r["unfiltered"], r["filtered"]
+        print(
+            f"{r['backend']:<8} {r['build_seconds']:>8} {u['p50_ms']:>8} {u['p95_ms']:>8} {u['recall_at_k']:>7} "
+            f"{f['p50_ms']:>9} {f['p95_ms']:>9} {f['recall_at_k']:>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark flat memmap vector backend vs ChromaDB.")
+    parser.add_argument("--n", type=int, default=20000, help="Number of vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension (all-MiniLM-L6-v2: 384)")
+    parser.add_argument("--queries", type=int, default=100, help="Number of queries")
+    parser.add_argument("--top-k", type=int, default=8, help="Results per query")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Upsert batch size")
+    parser.add_argument("--json-output", type=str, default=None, help="Export results to JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.n, args.dim, args.queries, args.top_k, args.batch_size)
+    print_report(results, args.n, args.dim, args.top_k)
+    if args.json_output:
+        Path(args.json_output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,318 @@
 # PURPOSE: Cache index system for PDF++ text files to replace rglob() lookups.
-# DEPENDENCIES: pathlib, json.
-# MODIFICATION NOTES: Builds O(1) stem-to-path mapping stored in JSON.
+# DEPENDENCIES: pathlib, json, utils (path validation).
+# MODIFICATION NOTES: Builds O(1) stem-to-path mapping stored in JSON. Updates are incremental: each cache
+#   directory's mtime is recorded and only directories whose mtime changed are listed again (a directory's
+#   mtime changes when entries are added, removed or renamed). Watcher events can be applied directly.
+#   find_pdfplus_text() is the single PDF++ lookup used by ingest_pdfs and PDFPlusExtractor.
 
 from __future__ import annotations
 
 import json
+import logging
+import os
+import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils import sanitize_cache_dir, validate_vault_path
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 2
+DEFAULT_INDEX_PATH = "Sources/_pdfplus_index.json"
+# Lookups reuse an index refreshed within this many seconds (a refresh stats every cache directory)
+DEFAULT_REFRESH_SECONDS = 5.0
+# A directory modified this recently may still be changing within the same mtime tick; list it again next time
+_MTIME_SETTLE_NS = 2 * 10**9
 
 
 class CacheIndex:
     """Manages cache index for PDF++ extracted text files."""
-    
-    def __init__(self, index_path: Path):
-        self.index_path = index_path
+
+    def __init__(self, index_path: Optional[Path] = None):
+        self.index_path = Path(index_path) if index_path else None
         self.index: Dict[str, str] = {}  # stem -> path mapping
+        self.roots: List[str] = []
+        self.extensions: List[str] = []
+        # directory -> {"mtime_ns": int, "files": [names with a cache extension], "subdirs": [names]}
+        self._dirs: Dict[str, Dict[str, Any]] = {}
         self._loaded = False
-    
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.last_refresh = 0.0
+
     def load(self) -> None:
         """Load index from disk."""
-        if self._loaded:
-            return
-        
-        if self.index_path.exists():
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if self.index_path is None or not self.index_path.exists():
+                return
             try:
                 with self.index_path.open("r", encoding="utf-8") as f:
-                    self.index = json.load(f)
-            except Exception:
-                self.index = {}
-        else:
-            self.index = {}
-        
-        self._loaded = True
-    
+                    data = json.load(f)
+            except Exception as e:
+                logger.debug(f"Ignoring unreadable cache index {self.index_path}: {e}")
+                return
+            if not isinstance(data, dict) or data.get("format") != INDEX_FORMAT:
+                return  # flat stem map from older versions: rebuilt on the next update
+            self.roots = list(data.get("roots") or [])
+            self.extensions = list(data.get("extensions") or [])
+            self._dirs = dict(data.get("dirs") or {})
+            self._rebuild_index()
+
     def save(self) -> None:
-        """Save index to disk."""
+        """Save index to disk (atomic replace)."""
+        if self.index_path is None:
+            return
+        with self._lock:
+            payload = json.dumps(
+                {"format": INDEX_FORMAT, "roots": self.roots, "extensions": self.extensions, "dirs": self._dirs}
+            )
+            self._dirty = False
         self.index_path.parent.mkdir(parents=True, exist_ok=True)
-        with self.index_path.open("w", encoding="utf-8") as f:
-            json.dump(self.index, f, indent=2)
-    
+        fd, tmp_name = tempfile.mkstemp(prefix=self.index_path.name, suffix=".tmp", dir=str(self.index_path.parent))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_name, self.index_path)
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
     def build(self, cache_dirs: list[Path], extensions: list[str]) -> None:
         """Build index by scanning cache directories."""
-        self.index = {}
-        
-        for cache_dir in cache_dirs:
-            if not cache_dir.exists():
-                continue
-            
-            for ext in extensions:
-                # Search for files with matching extensions
-                for cache_file in cache_dir.rglob(f"*{ext}"):
-                    stem = cache_file.stem
-                    # Store absolute path as string
-                    if stem not in self.index:
-                        self.index[stem] = str(cache_file.resolve())
-    
+        with self._lock:
+            self._loaded = True
+            self._dirs = {}
+            self.update_incremental(cache_dirs, extensions)
+
     def find(self, stem: str) -> Optional[Path]:
         """Find cache file by stem (O(1) lookup)."""
         if not self._loaded:
             self.load()
-        
+
         path_str = self.index.get(stem)
         if path_str:
             return Path(path_str)
         return None
-    
-    def update_incremental(self, cache_dirs: list[Path], extensions: list[str]) -> None:
-        """Update index incrementally (only scan new/changed files)."""
-        if not self._loaded:
-            self.load()
-        
-        # For now, do full rebuild. In future, could track mtimes.
-        self.build(cache_dirs, extensions)
+
+    def update_incremental(self, cache_dirs: list[Path], extensions: list[str]) -> Dict[str, int]:
+        """
+        Update index incrementally (only list new/changed directories).
+
+        Args:
+            cache_dirs: Cache root directories, in lookup priority order.
+            extensions: Cache file extensions, in lookup priority order.
+
+        Returns:
+            {"listed": directories read, "reused": unchanged directories, "removed": vanished directories}
+        """
+        roots = [os.path.abspath(str(cache_dir)) for cache_dir in cache_dirs]
+        extensions = list(extensions)
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            if roots != self.roots or extensions != self.extensions:
+                self._dirs = {}
+                self.roots, self.extensions = roots, extensions
+                self._dirty = True
+            stats = {"listed": 0, "reused": 0, "removed": 0}
+            seen: set = set()
+            changed = False
+            for root in roots:
+                changed |= self._visit(root, seen, stats)
+            for directory in [d for d in self._dirs if d not in seen]:
+                del self._dirs[directory]
+                stats["removed"] += 1
+                changed = True
+            if changed:
+                self._rebuild_index()
+                self._dirty = True
+            self.last_refresh = time.monotonic()
+            dirty = self._dirty
+        if dirty and self.index_path is not None:
+            try:
+                self.save()
+            except OSError as e:
+                logger.warning(f"Failed to save cache index {self.index_path}: {e}")
+        return stats
+
+    def _visit(self, directory: str, seen: set, stats: Dict[str, int]) -> bool:
+        """Refresh one directory record (listing it only if its mtime changed), then its subdirectories."""
+        if directory in seen:
+            return False
+        try:
+            st = os.stat(directory)
+        except OSError:
+            return False
+        seen.add(directory)
+        record = self._dirs.get(directory)
+        changed = False
+        if record is not None and record["mtime_ns"] == st.st_mtime_ns:
+            stats["reused"] += 1
+        else:
+            files, subdirs = [], []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.name)
+                            elif entry.is_file() and entry.name.endswith(tuple(self.extensions)):
+                                files.append(entry.name)
+                        except OSError:
+                            continue
+            except OSError:
+                return False
+            stats["listed"] += 1
+            mtime_ns = st.st_mtime_ns
+            if time.time_ns() - mtime_ns < _MTIME_SETTLE_NS:
+                mtime_ns = -1
+            new_record = {"mtime_ns": mtime_ns, "files": sorted(files), "subdirs": sorted(subdirs)}
+            changed = record is None or record["files"] != new_record["files"] or record["subdirs"] != new_record["subdirs"]
+            self._dirs[directory] = new_record
+            self._dirty = True
+        for name in self._dirs[directory]["subdirs"]:
+            changed |= self._visit(os.path.join(directory, name), seen, stats)
+        return changed
+
+    def _rebuild_index(self) -> None:
+        """Recompute stem -> path from the directory records (no filesystem access)."""
+        best: Dict[str, Tuple[Tuple[int, int, str, str], str]] = {}
+        for root_rank, root in enumerate(self.roots):
+            prefix = root.rstrip(os.sep) + os.sep
+            for directory, record in self._dirs.items():
+                if directory != root and not directory.startswith(prefix):
+                    continue
+                for name in record["files"]:
+                    for ext_rank, ext in enumerate(self.extensions):
+                        if name.endswith(ext):
+                            stem = name[: len(name) - len(ext)]
+                            rank = (root_rank, ext_rank, directory, name)
+                            if stem not in best or rank < best[stem][0]:
+                                best[stem] = (rank, os.path.join(directory, name))
+                            break
+        self.index = {stem: path for stem, (_, path) in best.items()}
+
+    def apply_event(self, path: Path, deleted: bool = False) -> bool:
+        """
+        Apply a watcher event (file created/modified/moved-in, or deleted) without rescanning.
+
+        Returns:
+            True if the index changed; False if the path is not in an indexed directory.
+        """
+        path_str = os.path.abspath(str(path))
+        directory, name = os.path.split(path_str)
+        with self._lock:
+            record = self._dirs.get(directory)
+            if record is None or not name.endswith(tuple(self.extensions)):
+                return False
+            files = set(record["files"])
+            if deleted:
+                files.discard(name)
+            else:
+                files.add(name)
+            if sorted(files) == record["files"]:
+                return False
+            record["files"] = sorted(files)
+            self._rebuild_index()
+            self._dirty = True
+        return True
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+_shared_indexes: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...], str], CacheIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def index_path_from_config(vault_root: Path, config: Optional[Dict[str, Any]]) -> Optional[Path]:
+    """Persisted index location from config["pdf_text_cache_index"] (relative to the vault; "" or no config = in memory)."""
+    if not config:
+        return None
+    value = config.get("pdf_text_cache_index", DEFAULT_INDEX_PATH)
+    if not value:
+        return None
+    path = Path(str(value))
+    return path if path.is_absolute() else Path(vault_root) / path
+
+
+def resolve_cache_roots(vault_root: Path, cache_dirs: Iterable[str]) -> List[Path]:
+    """Validated absolute cache roots for configured relative cache directories (invalid ones are skipped)."""
+    roots = []
+    for rel_dir in cache_dirs:
+        try:
+            sanitized_dir = sanitize_cache_dir(rel_dir)
+            roots.append(validate_vault_path(vault_root, (vault_root / sanitized_dir).resolve()))
+        except ValueError as e:
+            logger.warning(f"Invalid cache directory '{rel_dir}': {e}")
+    return roots
+
+
+def get_cache_index(
+    vault_root: Path,
+    cache_dirs: Iterable[str],
+    extensions: Iterable[str],
+    index_path: Optional[Path] = None,
+    max_age: float = DEFAULT_REFRESH_SECONDS,
+) -> CacheIndex:
+    """
+    Shared CacheIndex for a vault and cache configuration, refreshed incrementally when older than max_age.
+    """
+    vault_root = Path(vault_root).resolve()
+    cache_dirs = tuple(cache_dirs)
+    valid_extensions = []
+    for ext in extensions:
+        # Validate extension doesn't contain path separators
+        if "/" in ext or "\\" in ext:
+            logger.warning(f"Invalid extension contains path separator: {ext}")
+            continue
+        valid_extensions.append(ext)
+    key = (str(vault_root), cache_dirs, tuple(valid_extensions), str(index_path or ""))
+    with _shared_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = CacheIndex(index_path)
+            _shared_indexes[key] = index
+    if index.last_refresh == 0.0 or time.monotonic() - index.last_refresh > max_age:
+        index.update_incremental(resolve_cache_roots(vault_root, cache_dirs), valid_extensions)
+    return index
+
+
+def find_pdfplus_text(
+    pdf_path: Path,
+    vault_root: Path,
+    cache_dirs: Iterable[str],
+    extensions: Iterable[str],
+    index_path: Optional[Path] = None,
+) -> Optional[Path]:
+    """
+    Find the PDF++ extracted text file for a PDF via the shared cache index.
+
+    Same precedence as a per-PDF rglob: cache directory order, then extension order.
+
+    Returns:
+        Path to the text file (validated to lie inside the vault), or None.
+    """
+    cache_dirs, extensions = list(cache_dirs), list(extensions)
+    index = get_cache_index(vault_root, cache_dirs, extensions, index_path)
+    found = index.find(pdf_path.stem)
+    if found is not None and not found.exists():
+        # Deleted since the last refresh: refresh now rather than returning a dead path
+        index.update_incremental(resolve_cache_roots(Path(vault_root).resolve(), cache_dirs), index.extensions)
+        found = index.find(pdf_path.stem)
+    if found is None:
+        return None
+    try:
+        return validate_vault_path(Path(vault_root), found)
+    except ValueError as e:
+        logger.warning(f"Ignoring PDF++ text outside the vault for {pdf_path.name}: {e}")
+        return None
@@ -1,12 +1,23 @@
 # PURPOSE: ChromaDB-based semantic retriever for Arc Forge RAG pipeline.
-# DEPENDENCIES: chromadb, sentence_transformers; rag_pipeline.extract_chunk_tags, ai_summarizer.chunk_text.
+# DEPENDENCIES: chromadb, sentence_transformers; rag_pipeline.extract_chunk_tags, ai_summarizer.chunk_text,
+#   embedding_cache.EmbeddingCache.
 # MODIFICATION NOTES: Option B (ChromaDB-only) per DEVELOPMENT_PLAN_REMAINING.md.
+#   build_index / add_or_update_docs sync by per-chunk content_hash; unchanged chunks are not re-embedded.
+#   Sync streams docs and embeds length-sorted batches with a resumable checkpoint (bounded memory).
+#   get_retriever shares one retriever (and its embedding cache connection) per store across queries.
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from embedding_cache import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +35,17 @@ CHUNK_TAG_KEYS = (
 DEFAULT_CHUNK_SIZE = 8000
 DEFAULT_CHUNK_OVERLAP = 200
 
+# Page size for collection.get / delete during hash-aware sync
+SYNC_PAGE_SIZE = 5000
+# Chunks per model.encode / collection.upsert call during sync
+DEFAULT_EMBED_BATCH_SIZE = 64
+# chroma.backend values: "chroma" (HNSW, chromadb) or "flat" (exact search, vector_store.FlatVectorStore)
+VECTOR_BACKENDS = ("chroma", "flat")
+
+# Shared retrievers keyed by store (see get_retriever)
+_retrievers: Dict[Tuple[str, ...], "ChromaRetriever"] = {}
+_retrievers_lock = threading.Lock()
+
 
 def _safe_metadata(value: str) -> str:
     """ChromaDB metadata values must be str, int, float, or bool. Empty str is valid."""
@@ -32,9 +54,19 @@ def _safe_metadata(value: str) -> str:
     return str(value) if value else ""
 
 
+def _content_hash(text: str, embedding_model: str) -> str:
+    """Hash of the embedded text and model; a changed model invalidates every stored embedding."""
+    return hashlib.sha256(f"{embedding_model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _as_list(embeddings: Any) -> List[List[float]]:
+    """SentenceTransformer.encode returns a numpy array; ChromaDB wants plain lists."""
+    return embeddings.tolist() if hasattr(embeddings, "tolist") else [list(e) for e in embeddings]
+
+
 class ChromaRetriever:
     """
-    Semantic retriever using ChromaDB and sentence-transformers.
+    Semantic retriever using ChromaDB (or the flat memmap backend) and sentence-transformers.
     Supports Strict/Loose/Inspired By canon modes via metadata filtering.
     AI namespace: collection_name isolates AI embeddings from sync data (see AI_DATA_NAMESPACES.md).
     """
@@ -44,6 +76,9 @@ class ChromaRetriever:
         persist_dir: Path,
         embedding_model: str = "all-MiniLM-L6-v2",
         collection_name: str = "arc_forge_rag",
+        embedding_cache: Union["EmbeddingCache", Dict[str, Any], None] = None,
+        backend: str = "chroma",
+        encode_workers: int = 1,
     ):
         self.persist_dir = Path(persist_dir)
         self.persist_dir.mkdir(parents=True, exist_ok=True)
@@ -52,6 +87,16 @@ class ChromaRetriever:
         self._client = None
         self._collection = None
         self._model = None
+        if isinstance(embedding_cache, dict):
+            embedding_cache = EmbeddingCache.from_config(embedding_cache, self.persist_dir)
+        self.embedding_cache: Optional[EmbeddingCache] = embedding_cache
+        if backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend {backend!r}; expected one of {VECTOR_BACKENDS}")
+        self.backend = backend
+        self.encode_workers = max(1, int(encode_workers or 1))
+        self._encode_pool = None
+        self._embed_seconds_per_char: Optional[float] = None
+        self.last_sync_stats: Dict[str, Any] = {}
 
     def _get_client(self):
         if self._client is None:
@@ -64,6 +109,9 @@ class ChromaRetriever:
         return self._client
 
     def _get_collection(self):
+        if self._collection is None and self.backend == "flat":
+            from vector_store import FlatVectorStore
+            self._collection = FlatVectorStore(self.persist_dir / f"{self.collection_name}_flat")
         if self._collection is None:
             self._collection = self._get_client().get_or_create_collection(
                 name=self.collection_name,
@@ -77,6 +125,54 @@ class ChromaRetriever:
             self._model = SentenceTransformer(self.embedding_model_name)
         return self._model
 
+    def _encode(self, texts: List[str]) -> Tuple[List[List[float]], int, float]:
+        """
+        Embed texts, using the embedding cache when configured.
+        Returns (vectors, characters actually encoded, seconds spent in model.encode).
+        """
+        def encode_fn(batch: List[str]) -> Any:
+            if self.encode_workers > 1:
+                return self._get_encode_pool().encode(batch)
+            return self._get_model().encode(batch, show_progress_bar=False)
+
+        if self.embedding_cache is not None:
+            return self.embedding_cache.encode(self.embedding_model_name, encode_fn, texts)
+        start_time = time.perf_counter()
+        vectors = _as_list(encode_fn(texts))
+        return vectors, sum(len(t) for t in texts), time.perf_counter() - start_time
+
+    def _get_encode_pool(self):
+        """Worker pool for multi-process encoding; lives for one sync so each worker loads the model once."""
+        if self._encode_pool is None:
+            from embedding_pool import EmbeddingWorkerPool
+            self._encode_pool = EmbeddingWorkerPool(self.embedding_model_name, self.encode_workers)
+            logger.info(
+                f"Embedding pool started: {self.encode_workers} workers x "
+                f"{self._encode_pool.threads_per_worker} threads ({self._encode_pool.startup_seconds:.1f}s)"
+            )
+        return self._encode_pool
+
+    def _close_encode_pool(self) -> None:
+        if self._encode_pool is not None:
+            self._encode_pool.close()
+            self._encode_pool = None
+
+    def close(self) -> None:
+        """Release the encode pool, the flat store and the embedding cache connection."""
+        self._close_encode_pool()
+        if self._collection is not None and hasattr(self._collection, "close"):
+            self._collection.close()
+        self._collection = None
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+            self.embedding_cache = None
+
+    def warm_embedding_cache(self) -> int:
+        """Import stored documents/embeddings from the collection into the embedding cache."""
+        if self.embedding_cache is None:
+            return 0
+        return self.embedding_cache.import_from_collection(self._get_collection(), self.embedding_model_name)
+
     def count(self) -> int:
         """Return number of documents in the collection."""
         try:
@@ -84,15 +180,15 @@ class ChromaRetriever:
         except Exception:
             return 0
 
-    def build_index(
+    def _iter_chunks(
         self,
-        text_map: Dict[str, str],
+        docs: Iterable[Tuple[str, str]],
         rag_config: Dict[str, Any],
         chunk_tags_config: Optional[Dict[str, Any]] = None,
-    ) -> int:
+    ) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
         """
-        Build ChromaDB index from text_map. For each doc: extract tags, chunk if large,
-        embed, add to ChromaDB with metadata.
+        Chunk and tag docs one at a time.
+        Yields (doc_key, chunk_id, document, metadata); metadata carries doc_key, tag keys and content_hash.
         """
         from rag_pipeline import extract_chunk_tags
         try:
@@ -103,20 +199,10 @@ class ChromaRetriever:
             chunk_text = None
 
         chunk_tags_config = chunk_tags_config or {}
-        collection = self._get_collection()
-        if collection.count() > 0:
-            self._client.delete_collection(self.collection_name)
-            self._collection = None
-            collection = self._get_collection()
-        model = self._get_model()
-
-        ids: List[str] = []
-        documents: List[str] = []
-        metadatas: List[Dict[str, Any]] = []
         max_chunk_size = rag_config.get("chroma", {}).get("chunk_size", DEFAULT_CHUNK_SIZE)
         chunk_overlap = rag_config.get("chroma", {}).get("chunk_overlap", DEFAULT_CHUNK_OVERLAP)
 
-        for doc_key, text in text_map.items():
+        for doc_key, text in docs:
             doc_type = "campaign" if not doc_key.startswith("[PDF]") else "pdf"
             tags = extract_chunk_tags(doc_key, text, doc_type, chunk_tags_config)
             for k in CHUNK_TAG_KEYS:
@@ -133,22 +219,241 @@ class ChromaRetriever:
                     continue
                 chunk_id = f"{doc_key}__chunk_{i}" if len(chunks) > 1 else doc_key
                 chunk_id = chunk_id.replace("/", "_").replace("\\", "_")[:200]
-                ids.append(chunk_id)
-                documents.append(chunk[:100000])
-                meta = {
+                document = chunk[:100000]
+                yield doc_key, chunk_id, document, {
                     "doc_key": doc_key,
                     **{k: _safe_metadata(tags.get(k, "")) for k in CHUNK_TAG_KEYS},
+                    "content_hash": _content_hash(document, self.embedding_model_name),
                 }
-                metadatas.append(meta)
 
-        if not ids:
-            logger.warning("No documents to add to ChromaDB index")
-            return 0
+    def _existing_metadata(self, doc_keys: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Return {chunk_id: metadata} for chunks already in the collection.
+        doc_keys limits the lookup to those docs; None reads the whole collection (paged).
+        """
+        collection = self._get_collection()
+        existing: Dict[str, Dict[str, Any]] = {}
+        where = {"doc_key": {"$in": list(doc_keys)}} if doc_keys is not None else None
+        if doc_keys is not None and not doc_keys:
+            return existing
+        offset = 0
+        while True:
+            page = collection.get(where=where, include=["metadatas"], limit=SYNC_PAGE_SIZE, offset=offset)
+            page_ids = page.get("ids") or []
+            page_metas = page.get("metadatas") or [{}] * len(page_ids)
+            for chunk_id, meta in zip(page_ids, page_metas):
+                existing[chunk_id] = meta or {}
+            if len(page_ids) < SYNC_PAGE_SIZE:
+                break
+            offset += SYNC_PAGE_SIZE
+        return existing
+
+    def _checkpoint_path(self) -> Path:
+        return self.persist_dir / f"{self.collection_name}_build_state.json"
+
+    def _read_checkpoint(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self._checkpoint_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write_checkpoint(self, state: Dict[str, Any]) -> None:
+        path = self._checkpoint_path()
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.debug(f"ChromaDB checkpoint write failed: {exc}")
+
+    def sync_docs(
+        self,
+        text_map: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+        rag_config: Dict[str, Any],
+        chunk_tags_config: Optional[Dict[str, Any]] = None,
+        remove_missing: bool = False,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Hash-aware, streaming sync of docs into the collection.
+        Chunks whose content_hash matches the stored metadata are not re-embedded; tag-only changes
+        update metadata in place; chunks that disappeared are batch-deleted. Chunks that need embedding
+        are buffered in a window of chroma.sort_window chunks, sorted by length (less padding per batch),
+        embedded in chroma.batch_size batches and upserted batch by batch, so memory stays bounded.
+        Every upserted batch is durable: an interrupted run resumes by skipping chunks whose hash
+        already matches. The last upserted batch (index, chunk ids, doc keys) is checkpointed to
+        <persist_dir>/<collection>_build_state.json; a sync that embeds nothing leaves the file alone.
+
+        Args:
+            text_map: doc_key -> full text, or an iterable of (doc_key, text) pairs (read lazily)
+            rag_config: RAG config (reads chroma.chunk_size / chunk_overlap / batch_size / sort_window)
+            chunk_tags_config: chunk_tags section (defaults / overrides)
+            remove_missing: If True, text_map is the whole corpus and chunks of other docs are deleted too
+            progress: Optional callback called with the running stats after each embedded batch
+
+        Returns:
+            Dict with docs, total, added, updated, unchanged, metadata_updated, deleted, batches,
+            cache_hit_chars (served by the embedding cache), embed_seconds, estimated_seconds_saved (None until an embedding rate has been measured), resumed.
+        """
+        chroma_cfg = rag_config.get("chroma", {})
+        batch_size = max(1, int(chroma_cfg.get("batch_size", DEFAULT_EMBED_BATCH_SIZE)))
+        if self.encode_workers > 1:
+            # Give every encode worker a full batch per upsert.
+            batch_size *= self.encode_workers
+        window = max(batch_size, int(chroma_cfg.get("sort_window", batch_size * 8)))
+        collection = self._get_collection()
 
-        embeddings = model.encode(documents, show_progress_bar=False)
-        collection.add(ids=ids, embeddings=embeddings.tolist(), documents=documents, metadatas=metadatas)
-        logger.info(f"ChromaDB index built: {len(ids)} chunks from {len(text_map)} docs")
-        return len(ids)
+        is_mapping = isinstance(text_map, Mapping)
+        docs = text_map.items() if is_mapping else text_map
+        if remove_missing:
+            existing = self._existing_metadata(None)
+        elif is_mapping:
+            existing = self._existing_metadata(list(text_map.keys()))
+        else:
+            existing = {}
+
+        previous = self._read_checkpoint()
+        resumed = previous.get("status") == "running"
+        if resumed:
+            last_batch = previous.get("last_batch") or {}
+            logger.info(
+                f"ChromaDB resuming interrupted build ({previous.get('embedded', 0)} chunks were embedded, "
+                f"last upserted batch {last_batch.get('index')} covered {last_batch.get('doc_keys', [])}); "
+                "chunks with matching content_hash are skipped"
+            )
+        stats: Dict[str, Any] = {
+            "docs": 0,
+            "total": 0,
+            "added": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "metadata_updated": 0,
+            "deleted": 0,
+            "batches": 0,
+            "cache_hit_chars": 0,
+            "embed_seconds": 0.0,
+            "estimated_seconds_saved": None,
+            "resumed": resumed,
+        }
+
+        pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        meta_updates: List[Tuple[str, Dict[str, Any]]] = []
+        seen_ids: set = set()
+        current_doc: Optional[str] = None
+        skipped_chars = 0
+
+        def _flush_embeddings() -> None:
+            pending.sort(key=lambda item: len(item[1]), reverse=True)
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                batch_docs = [doc for _, doc, _ in batch]
+                embeddings, encoded_chars, elapsed = self._encode(batch_docs)
+                collection.upsert(
+                    ids=[chunk_id for chunk_id, _, _ in batch],
+                    embeddings=embeddings,
+                    documents=batch_docs,
+                    metadatas=[meta for _, _, meta in batch],
+                )
+                stats["embed_seconds"] += elapsed
+                stats["batches"] += 1
+                cached_chars = sum(len(d) for d in batch_docs) - encoded_chars
+                if cached_chars:
+                    stats["cache_hit_chars"] += cached_chars
+                if encoded_chars:
+                    self._embed_seconds_per_char = elapsed / encoded_chars
+                self._write_checkpoint({
+                    "status": "running",
+                    "embedded": stats["added"] + stats["updated"],
+                    "batches": stats["batches"],
+                    "last_batch": {
+                        "index": stats["batches"],
+                        "ids": [chunk_id for chunk_id, _, _ in batch],
+                        "doc_keys": sorted({meta.get("doc_key", "") for _, _, meta in batch}),
+                    },
+                    "updated": time.time(),
+                })
+                if progress:
+                    progress(dict(stats))
+            pending.clear()
+
+        def _flush_metadata() -> None:
+            if meta_updates:
+                collection.update(ids=[i for i, _ in meta_updates], metadatas=[m for _, m in meta_updates])
+                meta_updates.clear()
+
+        try:
+            for doc_key, chunk_id, document, meta in self._iter_chunks(docs, rag_config, chunk_tags_config):
+                if doc_key != current_doc:
+                    current_doc = doc_key
+                    stats["docs"] += 1
+                    if not remove_missing and not is_mapping:
+                        # Streaming input: look up stored chunks one doc at a time.
+                        existing.update(self._existing_metadata([doc_key]))
+                seen_ids.add(chunk_id)
+                stats["total"] += 1
+                old = existing.get(chunk_id)
+                if old is None:
+                    stats["added"] += 1
+                    pending.append((chunk_id, document, meta))
+                elif old.get("content_hash") != meta["content_hash"]:
+                    stats["updated"] += 1
+                    pending.append((chunk_id, document, meta))
+                else:
+                    stats["unchanged"] += 1
+                    skipped_chars += len(document)
+                    if any(old.get(k) != v for k, v in meta.items()):
+                        meta_updates.append((chunk_id, meta))
+                        stats["metadata_updated"] += 1
+                        if len(meta_updates) >= SYNC_PAGE_SIZE:
+                            _flush_metadata()
+                if len(pending) >= window:
+                    _flush_embeddings()
+            _flush_embeddings()
+            _flush_metadata()
+        finally:
+            self._close_encode_pool()
+
+        to_delete = [chunk_id for chunk_id in existing if chunk_id not in seen_ids]
+        for start in range(0, len(to_delete), SYNC_PAGE_SIZE):
+            collection.delete(ids=to_delete[start:start + SYNC_PAGE_SIZE])
+        stats["deleted"] = len(to_delete)
+
+        stats["embed_seconds"] = round(stats["embed_seconds"], 3)
+        if self._embed_seconds_per_char is not None:
+            saved_chars = skipped_chars + stats["cache_hit_chars"]
+            stats["estimated_seconds_saved"] = round(saved_chars * self._embed_seconds_per_char, 3)
+        if stats["batches"] or resumed:
+            self._write_checkpoint({
+                "status": "complete",
+                "embedded": stats["added"] + stats["updated"],
+                "batches": stats["batches"],
+                "finished": time.time(),
+            })
+        self.last_sync_stats = stats
+        logger.info(
+            f"ChromaDB sync: {stats['added']} added, {stats['updated']} updated, {stats['unchanged']} unchanged, "
+            f"{stats['deleted']} deleted in {stats['batches']} batches; embed {stats['embed_seconds']}s, "
+            f"saved ~{stats['estimated_seconds_saved']}s"
+        )
+        return stats
+
+    def build_index(
+        self,
+        text_map: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+        rag_config: Dict[str, Any],
+        chunk_tags_config: Optional[Dict[str, Any]] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> int:
+        """
+        Sync ChromaDB index to text_map (the whole corpus). For each doc: extract tags, chunk if large,
+        embed only new or changed chunks in length-sorted batches, and delete chunks of docs no longer present.
+        text_map may be a generator of (doc_key, text) pairs so the corpus is never held in memory at once.
+        Returns number of chunks in the index for text_map; details in last_sync_stats.
+        """
+        stats = self.sync_docs(text_map, rag_config, chunk_tags_config, remove_missing=True, progress=progress)
+        if not stats["total"]:
+            logger.warning("No documents to add to ChromaDB index")
+        return stats["total"]
 
     def remove_docs(self, doc_keys: List[str]) -> int:
         """
@@ -168,65 +473,16 @@ class ChromaRetriever:
 
     def add_or_update_docs(
         self,
-        text_map: Dict[str, str],
+        text_map: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
         rag_config: Dict[str, Any],
         chunk_tags_config: Optional[Dict[str, Any]] = None,
     ) -> int:
         """
-        For each doc in text_map: remove existing chunks for that doc_key, then add new chunks.
-        Enables incremental updates without full rebuild.
+        Incrementally sync the docs in text_map: embed new/changed chunks, drop chunks a doc no longer has.
+        Other docs in the collection are left alone. Returns number of chunks embedded.
         """
-        from rag_pipeline import extract_chunk_tags
-        try:
-            from ai_summarizer import chunk_text
-            CHUNKING_AVAILABLE = True
-        except ImportError:
-            CHUNKING_AVAILABLE = False
-            chunk_text = None
-
-        chunk_tags_config = chunk_tags_config or {}
-        collection = self._get_collection()
-        model = self._get_model()
-        max_chunk_size = rag_config.get("chroma", {}).get("chunk_size", DEFAULT_CHUNK_SIZE)
-        chunk_overlap = rag_config.get("chroma", {}).get("chunk_overlap", DEFAULT_CHUNK_OVERLAP)
-        total_added = 0
-
-        for doc_key, text in text_map.items():
-            self.remove_docs([doc_key])
-            doc_type = "campaign" if not doc_key.startswith("[PDF]") else "pdf"
-            tags = extract_chunk_tags(doc_key, text, doc_type, chunk_tags_config)
-            for k in CHUNK_TAG_KEYS:
-                if k not in tags:
-                    tags[k] = ""
-
-            if CHUNKING_AVAILABLE and len(text) > max_chunk_size:
-                chunks = chunk_text(text, max_chunk_size=max_chunk_size, overlap=chunk_overlap)
-            else:
-                chunks = [text]
-
-            ids: List[str] = []
-            documents: List[str] = []
-            metadatas: List[Dict[str, Any]] = []
-            for i, chunk in enumerate(chunks):
-                if not chunk.strip():
-                    continue
-                chunk_id = f"{doc_key}__chunk_{i}" if len(chunks) > 1 else doc_key
-                chunk_id = chunk_id.replace("/", "_").replace("\\", "_")[:200]
-                ids.append(chunk_id)
-                documents.append(chunk[:100000])
-                meta = {
-                    "doc_key": doc_key,
-                    **{k: _safe_metadata(tags.get(k, "")) for k in CHUNK_TAG_KEYS},
-                }
-                metadatas.append(meta)
-
-            if ids:
-                embeddings = model.encode(documents, show_progress_bar=False)
-                collection.add(ids=ids, embeddings=embeddings.tolist(), documents=documents, metadatas=metadatas)
-                total_added += len(ids)
-
-        logger.info(f"ChromaDB add_or_update_docs: {total_added} chunks from {len(text_map)} docs")
-        return total_added
+        stats = self.sync_docs(text_map, rag_config, chunk_tags_config, remove_missing=False)
+        return stats["added"] + stats["updated"]
 
     def retrieve(
         self,
@@ -244,7 +500,7 @@ class ChromaRetriever:
 
         collection = self._get_collection()
         model = self._get_model()
-        query_embedding = model.encode([query], show_progress_bar=False).tolist()
+        query_embedding = _as_list(model.encode([query], show_progress_bar=False))
 
         where_filter = None
         n_results = top_k
@@ -293,3 +549,48 @@ class ChromaRetriever:
 
         out.sort(key=lambda x: x["score"], reverse=True)
         return out[:top_k]
+
+
+# PURPOSE: One shared ChromaRetriever per store so per-query retrieval does not reopen clients and caches.
+# DEPENDENCIES: ChromaRetriever; called from rag_pipeline.retrieve_context.
+# MODIFICATION NOTES: Keyed by persist_dir, collection, model, backend, workers and embedding_cache config.
+def get_retriever(persist_dir: Path, chroma_cfg: Dict[str, Any]) -> ChromaRetriever:
+    """
+    Shared retriever for the store described by chroma_cfg under persist_dir.
+
+    Args:
+        persist_dir: Resolved persist directory.
+        chroma_cfg: chroma config section (embedding_model, collection_name, embedding_cache, backend, encode_workers).
+
+    Returns:
+        ChromaRetriever, created on first use and reused by later calls with the same settings.
+    """
+    key = (
+        str(Path(persist_dir).resolve()),
+        chroma_cfg.get("collection_name", "arc_forge_rag"),
+        chroma_cfg.get("embedding_model", "all-MiniLM-L6-v2"),
+        chroma_cfg.get("backend", "chroma"),
+        str(chroma_cfg.get("encode_workers", 1)),
+        json.dumps(chroma_cfg.get("embedding_cache"), sort_keys=True, default=str),
+    )
+    with _retrievers_lock:
+        retriever = _retrievers.get(key)
+        if retriever is None:
+            retriever = _retrievers[key] = ChromaRetriever(
+                persist_dir,
+                embedding_model=key[2],
+                collection_name=key[1],
+                embedding_cache=chroma_cfg.get("embedding_cache"),
+                backend=key[3],
+                encode_workers=chroma_cfg.get("encode_workers", 1),
+            )
+    return retriever
+
+
+def close_retrievers() -> None:
+    """Close and forget all shared retrievers (tests, shutdown)."""
+    with _retrievers_lock:
+        retrievers = list(_retrievers.values())
+        _retrievers.clear()
+    for retriever in retrievers:
+        retriever.close()
@@ -0,0 +1,489 @@
+# PURPOSE: Cached, batched Crossref DOI resolution for ingest metadata enrichment.
+# DEPENDENCIES: stdlib only (sqlite3, asyncio, urllib); utils.load_config / ingest_manifest for the CLI.
+# MODIFICATION NOTES: DOI -> metadata results (including "not found") persist in SQLite, so re-ingest never
+#   repeats a lookup. Misses are fetched with Crossref's filter=doi:... query, several DOIs per request,
+#   with a concurrency limit and a per-request timeout. Ingest reads the cache only and queues misses
+#   (defer), so no PDF waits on the network; failed lookups are queued too. backfill() resolves the queue
+#   run-wide in batched requests (ingest's run thread, the watcher, or the CLI) and reports which PDFs
+#   gained metadata.
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.crossref.org"
+DEFAULT_CACHE_PATH = "Sources/_crossref_cache.sqlite"
+DEFAULT_TIMEOUT_SECONDS = 5.0
+DEFAULT_CONCURRENCY = 4
+DEFAULT_BATCH_SIZE = 20
+# Online ingest resolves the queued DOIs of the run this often (the watcher uses the longer interval)
+DEFAULT_RUN_BACKFILL_SECONDS = 5.0
+DEFAULT_BACKFILL_INTERVAL_SECONDS = 300.0
+# "Not found" answers are retried after this long (a DOI may be registered later)
+DEFAULT_NEGATIVE_TTL_DAYS = 30
+
+
+def normalize_doi(doi: str) -> str:
+    """Cache key for a DOI: without doi:/resolver prefixes, stripped, lower-case (DOIs are case-insensitive)."""
+    value = doi.strip()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/", "doi:"):
+        if value.lower().startswith(prefix):
+            value = value[len(prefix):]
+    return value.strip().lower()
+
+
+def parse_crossref_work(message: Dict[str, Any]) -> Dict[str, str]:
+    """Metadata fields (title, authors, publication_year, journal) from a Crossref work message."""
+    metadata = {}
+    if message.get("title"):
+        title = message["title"][0] if isinstance(message["title"], list) else message["title"]
+        metadata["title"] = title
+    if message.get("author"):
+        author_names = []
+        for author in message["author"]:
+            given = author.get("given", "")
+            family = author.get("family", "")
+            if given or family:
+                author_names.append(f"{given} {family}".strip())
+        if author_names:
+            metadata["authors"] = ", ".join(author_names)
+    pub_date = message.get("published-print") or message.get("published-online")
+    if pub_date and pub_date.get("date-parts"):
+        date_parts = pub_date["date-parts"][0]
+        if len(date_parts) >= 1:
+            metadata["publication_year"] = str(date_parts[0])
+    if message.get("container-title"):
+        container = message["container-title"]
+        metadata["journal"] = container[0] if isinstance(container, list) else container
+    return metadata
+
+
+class DOICache:
+    """
+    SQLite DOI -> Crossref metadata cache plus the queue of DOIs waiting for a lookup.
+
+    A row with metadata NULL records a "not found" answer; it expires after negative_ttl seconds.
+    The database is created on first use, so a run that finds no DOIs leaves nothing behind.
+    """
+
+    def __init__(self, path: Path, negative_ttl: float = DEFAULT_NEGATIVE_TTL_DAYS * 86400):
+        self.path = Path(path)
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database (caller holds self._lock)."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS dois (doi TEXT PRIMARY KEY, metadata TEXT, fetched REAL NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                " doi TEXT NOT NULL, source TEXT NOT NULL, queued REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (doi, source))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @classmethod
+    def from_config(cls, crossref_cfg: Optional[Dict[str, Any]], vault_root: Path) -> Optional["DOICache"]:
+        """
+        Open the cache from a crossref config section.
+
+        Args:
+            crossref_cfg: {"cache_path": str | None, "negative_ttl_days": float}
+            vault_root: Base directory for a relative or missing path
+
+        Returns:
+            DOICache
+        """
+        crossref_cfg = crossref_cfg or {}
+        path = Path(crossref_cfg.get("cache_path") or DEFAULT_CACHE_PATH)
+        if not path.is_absolute():
+            path = Path(vault_root) / path
+        ttl_days = float(crossref_cfg.get("negative_ttl_days", DEFAULT_NEGATIVE_TTL_DAYS))
+        return cls(path, negative_ttl=ttl_days * 86400)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM dois").fetchone()[0]
+
+    def get_many(self, dois: Iterable[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        """Cached answers for normalized DOIs (metadata, or None for a fresh "not found"); misses are absent."""
+        dois = list(dict.fromkeys(dois))
+        found: Dict[str, Optional[Dict[str, str]]] = {}
+        expired_before = time.time() - self.negative_ttl
+        with self._lock:
+            for start in range(0, len(dois), 500):
+                part = dois[start:start + 500]
+                rows = self._db().execute(
+                    f"SELECT doi, metadata, fetched FROM dois WHERE doi IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for doi, metadata, fetched in rows:
+                    if metadata is not None:
+                        found[doi] = json.loads(metadata)
+                    elif fetched >= expired_before:
+                        found[doi] = None
+        return found
+
+    def put_many(self, results: Dict[str, Optional[Dict[str, str]]]) -> None:
+        """Store answers (None = not found) and drop them from the pending queue."""
+        if not results:
+            return
+        now = time.time()
+        with self._lock:
+            self._db().executemany(
+                "INSERT OR REPLACE INTO dois (doi, metadata, fetched) VALUES (?, ?, ?)",
+                [(doi, None if meta is None else json.dumps(meta), now) for doi, meta in results.items()],
+            )
+            self._db().executemany("DELETE FROM pending WHERE doi = ?", [(doi,) for doi in results])
+            self._db().commit()
+
+    def queue(self, dois: Iterable[str], source: Optional[str] = None) -> None:
+        """Queue DOIs for backfill; source names the PDF that needs them."""
+        now = time.time()
+        with self._lock:
+            self._db().executemany(
+                "INSERT OR IGNORE INTO pending (doi, source, queued, attempts) VALUES (?, ?, ?, 0)",
+                [(doi, source or "", now) for doi in dois],
+            )
+            self._db().commit()
+
+    def mark_attempted(self, dois: Iterable[str]) -> None:
+        """Count a failed lookup so repeatedly failing DOIs go to the back of the queue."""
+        with self._lock:
+            self._db().executemany("UPDATE pending SET attempts = attempts + 1 WHERE doi = ?", [(d,) for d in dois])
+            self._db().commit()
+
+    def pending(self, limit: Optional[int] = None) -> List[Tuple[str, List[str]]]:
+        """Queued DOIs (fewest attempts, oldest first) with the sources waiting on each."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT doi, GROUP_CONCAT(source, char(31)) FROM pending GROUP BY doi"
+                " ORDER BY MAX(attempts), MIN(queued)" + (" LIMIT ?" if limit else ""),
+                (limit,) if limit else (),
+            ).fetchall()
+        return [(doi, [s for s in (sources or "").split("\x1f") if s]) for doi, sources in rows]
+
+
+class CrossrefResolver:
+    """
+    Resolve DOIs to Crossref metadata through a DOICache.
+
+    Online: cache first, then misses are fetched in batches (batch_size DOIs per request, at most
+    concurrency requests at once, each bounded by timeout). Deferred (online ingest): cache only; misses
+    are queued and a run-wide backfill() fetches them together. Offline: cache only; misses are queued
+    and only the backfill CLI touches the network.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[DOICache] = None,
+        offline: bool = False,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        mailto: Optional[str] = None,
+        defer: bool = False,
+    ):
+        self.cache = cache
+        self.offline = offline
+        self.defer = defer
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.mailto = mailto
+        self._stats_lock = threading.Lock()
+        self.stats = {"hits": 0, "fetched": 0, "not_found": 0, "failed": 0, "queued": 0, "requests": 0}
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], vault_root: Path, defer: bool = False
+    ) -> Optional["CrossrefResolver"]:
+        """
+        Build a resolver from config["crossref"].
+
+        Keys: enabled (true), mode ("online" | "offline"), cache_path, negative_ttl_days, base_url,
+        timeout_seconds, concurrency, batch_size, mailto (sent in the User-Agent for Crossref's polite pool).
+        With defer, resolve() queues misses instead of fetching them.
+
+        Returns:
+            CrossrefResolver, or None if disabled
+        """
+        crossref_cfg = config.get("crossref") or {}
+        if not crossref_cfg.get("enabled", True):
+            return None
+        return cls(
+            cache=DOICache.from_config(crossref_cfg, vault_root),
+            offline=crossref_cfg.get("mode", "online") == "offline",
+            base_url=crossref_cfg.get("base_url", DEFAULT_BASE_URL),
+            timeout=float(crossref_cfg.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS)),
+            concurrency=int(crossref_cfg.get("concurrency", DEFAULT_CONCURRENCY)),
+            batch_size=int(crossref_cfg.get("batch_size", DEFAULT_BATCH_SIZE)),
+            mailto=crossref_cfg.get("mailto"),
+            defer=defer,
+        )
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def resolve(self, doi: str, source: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """Metadata for one DOI, or None (not found, offline miss, or lookup failed)."""
+        return self.resolve_many([doi], source=source).get(normalize_doi(doi))
+
+    def resolve_many(self, dois: Iterable[str], source: Optional[str] = None) -> Dict[str, Optional[Dict[str, str]]]:
+        """
+        Metadata for each DOI, keyed by normalize_doi(doi); None where unavailable.
+
+        Args:
+            dois: DOIs to resolve.
+            source: PDF the DOIs came from; recorded with queued misses so backfill can report it.
+        """
+        keys = list(dict.fromkeys(normalize_doi(doi) for doi in dois if doi and doi.strip()))
+        results: Dict[str, Optional[Dict[str, str]]] = dict.fromkeys(keys)
+        cached = self.cache.get_many(keys) if self.cache is not None else {}
+        results.update(cached)
+        self._count("hits", len(cached))
+        misses = [doi for doi in keys if doi not in cached]
+        if not misses:
+            return results
+        if self.offline or self.defer:
+            if self.cache is not None:
+                self.cache.queue(misses, source)
+            self._count("queued", len(misses))
+            return results
+        fetched, failed = self.fetch(misses)
+        results.update(fetched)
+        if self.cache is not None:
+            self.cache.put_many(fetched)
+            if failed:
+                self.cache.queue(failed, source)
+                self.cache.mark_attempted(failed)
+                self._count("queued", len(failed))
+        return results
+
+    def fetch(self, dois: List[str]) -> Tuple[Dict[str, Optional[Dict[str, str]]], List[str]]:
+        """
+        Look DOIs up on Crossref (no cache).
+
+        Returns:
+            (answers: {doi: metadata or None for not found}, failed: DOIs whose request errored or timed out)
+        """
+        batches = [dois[i:i + self.batch_size] for i in range(0, len(dois), self.batch_size)]
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="crossref")
+        try:
+            outcomes = _run_coroutine(self._fetch_batches(batches, executor))
+        finally:
+            # Do not wait for requests that already timed out; urllib's own timeout ends them
+            executor.shutdown(wait=False)
+        answers: Dict[str, Optional[Dict[str, str]]] = {}
+        failed: List[str] = []
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"Crossref lookup failed for {len(batch)} DOI(s): {outcome!r}")
+                failed.extend(batch)
+            else:
+                answers.update(outcome)
+        self._count("fetched", sum(1 for meta in answers.values() if meta is not None))
+        self._count("not_found", sum(1 for meta in answers.values() if meta is None))
+        self._count("failed", len(failed))
+        return answers, failed
+
+    async def _fetch_batches(self, batches: List[List[str]], executor: ThreadPoolExecutor) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(batch: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+            async with semaphore:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, self._fetch_batch, batch), timeout=self.timeout
+                )
+
+        return await asyncio.gather(*(one(batch) for batch in batches), return_exceptions=True)
+
+    def _fetch_batch(self, dois: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        """One filter=doi:... request for the batch (DOIs containing commas are fetched singly)."""
+        answers: Dict[str, Optional[Dict[str, str]]] = {}
+        single = [doi for doi in dois if "," in doi]
+        grouped = [doi for doi in dois if "," not in doi]
+        if grouped:
+            query = urllib.parse.urlencode(
+                {"filter": ",".join(f"doi:{doi}" for doi in grouped), "rows": len(grouped)}
+            )
+            data = self._get_json(f"{self.base_url}/works?{query}")
+            for item in (data or {}).get("message", {}).get("items", []):
+                doi = normalize_doi(item.get("DOI", ""))
+                if doi in grouped:
+                    answers[doi] = parse_crossref_work(item)
+            for doi in grouped:
+                answers.setdefault(doi, None)
+        for doi in single:
+            data = self._get_json(f"{self.base_url}/works/{urllib.parse.quote(doi, safe='/')}")
+            answers[doi] = parse_crossref_work(data.get("message", {})) if data else None
+        return answers
+
+    def _get_json(self, url: str) -> Optional[Dict[str, Any]]:
+        """GET url as JSON; None on 404 (other HTTP and network errors raise)."""
+        agent = "ArcForge-ingest/1.0" + (f" (mailto:{self.mailto})" if self.mailto else "")
+        request = urllib.request.Request(url, headers={"User-Agent": agent, "Accept": "application/json"})
+        self._count("requests")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    def backfill(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Resolve queued DOIs over the network (also in offline mode).
+
+        Returns:
+            {"resolved": n, "not_found": n, "failed": n, "sources": [PDFs whose DOIs now have metadata]}
+        """
+        if self.cache is None:
+            return {"resolved": 0, "not_found": 0, "failed": 0, "sources": []}
+        queued = self.cache.pending(limit)
+        if not queued:
+            return {"resolved": 0, "not_found": 0, "failed": 0, "sources": []}
+        answers, failed = self.fetch([doi for doi, _sources in queued])
+        self.cache.put_many(answers)
+        self.cache.mark_attempted(failed)
+        sources = sorted({s for doi, srcs in queued if answers.get(doi) for s in srcs})
+        summary = {
+            "resolved": sum(1 for meta in answers.values() if meta is not None),
+            "not_found": sum(1 for meta in answers.values() if meta is None),
+            "failed": len(failed),
+            "sources": sources,
+        }
+        logger.info(
+            f"Crossref backfill: {summary['resolved']} resolved, {summary['not_found']} not found, "
+            f"{summary['failed']} failed"
+        )
+        return summary
+
+
+def _run_coroutine(coroutine: Any) -> Any:
+    """asyncio.run, also from a thread that already has a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, coroutine).result()
+
+
+_shared_resolvers: Dict[str, Optional[CrossrefResolver]] = {}
+_shared_lock = threading.Lock()
+
+
+def get_resolver(
+    config: Optional[Dict[str, Any]], vault_root: Path, defer: bool = False
+) -> Optional[CrossrefResolver]:
+    """Shared resolver (one cache connection) per vault, crossref config and defer flag."""
+    if not config:
+        return None
+    crossref_key = json.dumps(config.get("crossref") or {}, sort_keys=True, default=str)
+    key = f"{Path(vault_root).resolve()}|{crossref_key}|{defer}"
+    with _shared_lock:
+        if key not in _shared_resolvers:
+            _shared_resolvers[key] = CrossrefResolver.from_config(config, vault_root, defer=defer)
+        return _shared_resolvers[key]
+
+
+def start_backfill_thread(
+    resolver: CrossrefResolver,
+    interval_seconds: float = 300.0,
+    stop_event: Optional[threading.Event] = None,
+    batch_limit: int = 200,
+    on_backfill: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> threading.Thread:
+    """
+    Run resolver.backfill() every interval_seconds on a daemon thread until stop_event is set.
+
+    on_backfill receives each backfill summary that resolved something (e.g. to re-ingest its sources).
+    """
+    stop_event = stop_event or threading.Event()
+
+    def loop() -> None:
+        while not stop_event.wait(interval_seconds):
+            try:
+                summary = resolver.backfill(batch_limit)
+                if on_backfill is not None and summary["sources"]:
+                    on_backfill(summary)
+            except Exception as e:
+                logger.warning(f"Crossref backfill failed: {e}")
+
+    thread = threading.Thread(target=loop, name="crossref-backfill", daemon=True)
+    thread.stop_event = stop_event  # type: ignore[attr-defined]
+    thread.start()
+    return thread
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve queued Crossref DOIs into the DOI cache.")
+    parser.add_argument("--config", default="ingest_config.json", help="Path to ingestion config JSON.")
+    parser.add_argument("--limit", type=int, default=None, help="Resolve at most this many queued DOIs")
+    parser.add_argument(
+        "--invalidate-manifest",
+        action="store_true",
+        help="Drop ingest manifest entries for PDFs that gained metadata so the next ingest rewrites their notes",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    from utils import load_config
+
+    config_path = Path(args.config)
+    if not config_path.is_absolute():
+        config_path = Path(__file__).parent / config_path
+    config = load_config(config_path)
+    vault_root = Path(str(config["vault_root"])).resolve()
+    # Backfill goes online even when ingest runs with mode "offline"
+    crossref_cfg = {**(config.get("crossref") or {}), "enabled": True, "mode": "online"}
+    resolver = CrossrefResolver.from_config({**config, "crossref": crossref_cfg}, vault_root)
+    summary = resolver.backfill(args.limit)
+    print(
+        f"Resolved {summary['resolved']}, not found {summary['not_found']}, failed {summary['failed']}; "
+        f"{len(summary['sources'])} PDF(s) gained metadata"
+    )
+    if args.invalidate_manifest and summary["sources"]:
+        from ingest_manifest import IngestManifest
+        from ingest_pdfs import PIPELINE_VERSION
+
+        manifest = IngestManifest.from_config(config.get("ingest_manifest"), vault_root, PIPELINE_VERSION, config)
+        if manifest is not None:
+            removed = manifest.invalidate(summary["sources"])
+            manifest.save()
+            print(f"Invalidated {len(removed)} manifest entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# PURPOSE: Persistent embedding cache keyed by (embedding model, normalized text hash).
+# DEPENDENCIES: stdlib only (sqlite3, array).
+# MODIFICATION NOTES: Consulted by ChromaRetriever before SentenceTransformer.encode; LRU size cap;
+#   can be warmed from an existing ChromaDB collection (documents + embeddings).
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 200000
+# Rows per SELECT ... IN (...) lookup (SQLite default variable limit is 999)
+_LOOKUP_BATCH = 500
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: NFC, collapsed whitespace, stripped."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _to_blob(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _from_blob(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache. Vectors are stored as float32 blobs; least recently used
+    rows are evicted once the cache grows past max_entries.
+    """
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_config(cls, cache_cfg: Optional[Dict[str, Any]], default_dir: Path) -> Optional["EmbeddingCache"]:
+        """
+        Build a cache from a chroma.embedding_cache config section.
+
+        Args:
+            cache_cfg: {"enabled": bool, "path": str | None, "max_entries": int}
+            default_dir: Base directory for a relative or missing path (the Chroma persist_dir)
+
+        Returns:
+            EmbeddingCache, or None if disabled or the database cannot be opened
+        """
+        cache_cfg = cache_cfg or {}
+        if not cache_cfg.get("enabled", True):
+            return None
+        path = Path(cache_cfg.get("path") or "embedding_cache.sqlite")
+        if not path.is_absolute():
+            path = Path(default_dir) / path
+        try:
+            return cls(path, max_entries=int(cache_cfg.get("max_entries", DEFAULT_MAX_ENTRIES)))
+        except sqlite3.Error as exc:
+            logger.warning(f"Embedding cache disabled ({path}): {exc}")
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Return cached vectors aligned with texts (None for misses) and mark hits as recently used."""
+        hashes = [text_hash(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), _LOOKUP_BATCH):
+                part = unique[start:start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = _from_blob(blob)
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                self._conn.commit()
+        result = [found.get(h) for h in hashes]
+        hit_count = sum(1 for v in result if v is not None)
+        self.hits += hit_count
+        self.misses += len(result) - hit_count
+        return result
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for texts, then evict least recently used rows above max_entries."""
+        now = time.time()
+        rows = [(model, text_hash(t), len(v), _to_blob(v), now) for t, v in zip(texts, vectors)]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        self.enforce_cap()
+
+    def enforce_cap(self) -> int:
+        """Evict least recently used rows until at most max_entries remain. Returns rows evicted."""
+        if not self.max_entries or self.max_entries <= 0:
+            return 0
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            excess = count - self.max_entries
+            if excess <= 0:
+                return 0
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self._conn.commit()
+        self.evicted += excess
+        logger.debug(f"Embedding cache evicted {excess} entries (cap {self.max_entries})")
+        return excess
+
+    def encode(
+        self,
+        model_name: str,
+        encode_fn: Callable[[List[str]], Any],
+        texts: Sequence[str],
+    ) -> Tuple[List[List[float]], int, float]:
+        """
+        Return embeddings for texts, calling encode_fn only for cache misses.
+
+        Args:
+            model_name: Embedding model name (part of the cache key)
+            encode_fn: Callable taking a list of texts and returning vectors (array or list of lists)
+            texts: Texts to embed
+
+        Returns:
+            Tuple of (vectors aligned with texts, characters actually encoded, seconds spent encoding)
+        """
+        vectors = self.get_many(model_name, texts)
+        miss_idx = [i for i, v in enumerate(vectors) if v is None]
+        encoded_chars = 0
+        seconds = 0.0
+        if miss_idx:
+            miss_texts = [texts[i] for i in miss_idx]
+            start = time.perf_counter()
+            fresh = encode_fn(miss_texts)
+            seconds = time.perf_counter() - start
+            fresh = fresh.tolist() if hasattr(fresh, "tolist") else [list(v) for v in fresh]
+            for i, vector in zip(miss_idx, fresh):
+                vectors[i] = vector
+            self.put_many(model_name, miss_texts, fresh)
+            encoded_chars = sum(len(t) for t in miss_texts)
+        return vectors, encoded_chars, seconds
+
+    def import_from_collection(self, collection: Any, model: str, page_size: int = 1000) -> int:
+        """
+        Warm the cache from a ChromaDB collection's stored documents and embeddings.
+        The collection must have been embedded with `model`. Returns number of vectors imported.
+        """
+        imported = 0
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "embeddings"], limit=page_size, offset=offset)
+            ids = page.get("ids") or []
+            documents = page.get("documents")
+            embeddings = page.get("embeddings")
+            if documents is not None and embeddings is not None:
+                pairs = [(d, e) for d, e in zip(documents, embeddings) if d and e is not None]
+                if pairs:
+                    vectors = [e.tolist() if hasattr(e, "tolist") else list(e) for _, e in pairs]
+                    self.put_many(model, [d for d, _ in pairs], vectors)
+                    imported += len(pairs)
+            if len(ids) < page_size:
+                break
+            offset += page_size
+        logger.info(f"Embedding cache warmed with {imported} vectors for {model}")
+        return imported
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "evicted": self.evicted,
+        }
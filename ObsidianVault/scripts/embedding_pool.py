@@ -0,0 +1,173 @@
+# PURPOSE: Multi-process CPU embedding pool for large ChromaDB rebuilds.
+# DEPENDENCIES: sentence_transformers (default loader), stdlib multiprocessing; torch thread cap when installed.
+# MODIFICATION NOTES: Each worker loads the model once (pool initializer); texts are split into fixed-size
+#   sub-batches that do not depend on the worker count, and results are merged in input order, so output is
+#   identical for any number of workers. main() benchmarks docs/sec at several worker counts.
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Texts per worker task; fixed so batch composition (and padding) is the same for every worker count
+DEFAULT_SUB_BATCH = 32
+
+_worker_model: Any = None
+
+
+def load_sentence_transformer(model_name: str) -> Any:
+    """Default model loader: a CPU SentenceTransformer."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _worker_init(model_name: str, loader: Callable[[str], Any], threads_per_worker: int) -> None:
+    """Pool initializer: cap intra-op threads, then load the model once for this worker process."""
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+    _worker_model = loader(model_name)
+
+
+def _worker_encode(task: Tuple[int, List[str]]) -> Tuple[int, List[List[float]]]:
+    index, texts = task
+    vectors = _worker_model.encode(texts, batch_size=len(texts), show_progress_bar=False)
+    vectors = vectors.tolist() if hasattr(vectors, "tolist") else [list(v) for v in vectors]
+    return index, vectors
+
+
+class EmbeddingWorkerPool:
+    """
+    Process pool where every worker holds its own copy of the embedding model.
+    Use as a context manager or call close(); encode() keeps input order.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int,
+        sub_batch: int = DEFAULT_SUB_BATCH,
+        loader: Callable[[str], Any] = load_sentence_transformer,
+        threads_per_worker: Optional[int] = None,
+    ):
+        self.model_name = model_name
+        self.workers = max(1, int(workers))
+        self.sub_batch = max(1, int(sub_batch))
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        self.threads_per_worker = threads_per_worker
+        start = time.perf_counter()
+        # spawn: forked children would inherit torch/OpenMP state from the parent and can deadlock
+        ctx = multiprocessing.get_context("spawn")
+        self._pool = ctx.Pool(
+            processes=self.workers,
+            initializer=_worker_init,
+            initargs=(model_name, loader, threads_per_worker),
+        )
+        self.startup_seconds = time.perf_counter() - start
+        self.texts_encoded = 0
+
+    def encode(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts across the workers; returned vectors are aligned with texts."""
+        tasks = [(i, list(texts[start:start + self.sub_batch]))
+                 for i, start in enumerate(range(0, len(texts), self.sub_batch))]
+        results: Dict[int, List[List[float]]] = {}
+        for index, vectors in self._pool.imap_unordered(_worker_encode, tasks):
+            results[index] = vectors
+        merged: List[List[float]] = []
+        for index in range(len(tasks)):
+            merged.extend(results[index])
+        self.texts_encoded += len(texts)
+        return merged
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "EmbeddingWorkerPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _synthetic_docs(count: int, words: int, seed: int = 13) -> List[str]:
+    import random
+    vocab = ("wrath", "glory", "hive", "inquisitor", "ork", "servitor", "promethium", "relic", "warp",
+             "faith", "forge", "machine", "spirit", "void", "heresy", "sector", "cult", "shrine")
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(vocab) for _ in range(rng.randint(words // 2, words))) for _ in range(count)]
+
+
+def benchmark(
+    model_name: str,
+    worker_counts: Sequence[int],
+    docs: int,
+    words: int,
+    sub_batch: int = DEFAULT_SUB_BATCH,
+    loader: Callable[[str], Any] = load_sentence_transformer,
+) -> List[Dict[str, Any]]:
+    """
+    Encode the same synthetic corpus at each worker count and report docs/sec.
+    Model load time is measured separately (startup_seconds) and excluded from docs/sec.
+    """
+    texts = _synthetic_docs(docs, words)
+    baseline: Optional[List[List[float]]] = None
+    rows: List[Dict[str, Any]] = []
+    for workers in worker_counts:
+        with EmbeddingWorkerPool(model_name, workers, sub_batch=sub_batch, loader=loader) as pool:
+            pool.encode(texts[:workers])  # wait for every worker to finish loading
+            start = time.perf_counter()
+            vectors = pool.encode(texts)
+            elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = vectors
+        max_diff = max(
+            (abs(a - b) for va, vb in zip(vectors, baseline) for a, b in zip(va, vb)),
+            default=0.0,
+        )
+        rows.append({
+            "workers": workers,
+            "seconds": round(elapsed, 3),
+            "docs_per_sec": round(len(texts) / elapsed, 1) if elapsed else None,
+            "max_abs_diff_vs_first": max_diff,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark multi-process CPU embedding (docs/sec per worker count).")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="SentenceTransformer model name")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to compare")
+    parser.add_argument("--docs", type=int, default=2000, help="Number of synthetic documents")
+    parser.add_argument("--words", type=int, default=200, help="Max words per document")
+    parser.add_argument("--sub-batch", type=int, default=DEFAULT_SUB_BATCH, help="Texts per worker task")
+    parser.add_argument("--json-output", type=str, default=None, help="Export results to JSON file")
+    args = parser.parse_args()
+
+    rows = benchmark(args.model, args.workers, args.docs, args.words, args.sub_batch)
+    print(f"\nEmbedding benchmark: {args.docs} docs, model {args.model}, cpu_count={os.cpu_count()}")
+    print(f"{'workers':>7} {'seconds':>9} {'docs/sec':>9} {'max diff':>10}")
+    for row in rows:
+        print(f"{row['workers']:>7} {row['seconds']:>9} {row['docs_per_sec']:>9} {row['max_abs_diff_vs_first']:>10.2e}")
+    if args.json_output:
+        Path(args.json_output).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# PURPOSE: Persistent corpus-level entity aggregate (entity -> documents, mention counts).
+# DEPENDENCIES: stdlib only (sqlite3).
+# MODIFICATION NOTES: Updated by per-document deltas (add/remove/replace): only the changed
+#   (category, name) totals of that document are touched, so adding a PDF costs time proportional
+#   to its own entities, not to the corpus. Used by rag_pipeline pattern reports and ingest_pdfs
+#   (keyed by vault-relative PDF path; entity notes list every source the aggregate has for them).
+#   Mentions are whole-word occurrences in the document text (count_mentions).
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILENAME = "entity_aggregate.sqlite"
+
+
+def document_hash(text: str) -> str:
+    """Content hash stored with each document so unchanged documents can be skipped."""
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def count_mentions(text: str, entities: Mapping[str, Iterable[str]]) -> Dict[str, List[str]]:
+    """
+    Repeat each entity name once per mention in text, in the shape replace_document counts.
+
+    Mentions are case-insensitive whole-word matches, found in one pass (longer names win
+    where names overlap). A name that does not occur verbatim still counts once.
+    """
+    names = {name.strip() for values in entities.values() for name in values or [] if name and name.strip()}
+    if not names:
+        return {category: [] for category in entities}
+    pattern = re.compile(
+        r"(?<!\w)(?:" + "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True)) + r")(?!\w)",
+        re.IGNORECASE,
+    )
+    found = Counter(match.group(0).lower() for match in pattern.finditer(text or ""))
+    return {
+        category: [
+            name.strip()
+            for name in dict.fromkeys(values or [])
+            if name and name.strip()
+            for _ in range(max(1, found[name.strip().lower()]))
+        ]
+        for category, values in entities.items()
+    }
+
+
+class EntityAggregateStore:
+    """
+    SQLite store of per-document entities plus running corpus totals.
+
+    doc_entities holds each document's (category, name, mentions); entity_totals holds
+    the sum of mentions and the number of documents per (category, name).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " doc_key TEXT PRIMARY KEY, text_hash TEXT, updated REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS doc_entities ("
+            " doc_key TEXT NOT NULL, category TEXT NOT NULL, name TEXT NOT NULL, mentions INTEGER NOT NULL,"
+            " PRIMARY KEY (doc_key, category, name));"
+            "CREATE TABLE IF NOT EXISTS entity_totals ("
+            " category TEXT NOT NULL, name TEXT NOT NULL, mentions INTEGER NOT NULL, documents INTEGER NOT NULL,"
+            " PRIMARY KEY (category, name));"
+            "CREATE INDEX IF NOT EXISTS idx_doc_entities_entity ON doc_entities(category, name);"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, aggregate_cfg: Optional[Dict[str, Any]], default_dir: Path) -> Optional["EntityAggregateStore"]:
+        """
+        Open a store from an entity_aggregate config section.
+
+        Args:
+            aggregate_cfg: {"enabled": bool, "path": str | None}
+            default_dir: Base directory for a relative or missing path
+
+        Returns:
+            EntityAggregateStore, or None if disabled or the database cannot be opened
+        """
+        aggregate_cfg = aggregate_cfg or {}
+        if not aggregate_cfg.get("enabled", True):
+            return None
+        path = Path(aggregate_cfg.get("path") or DEFAULT_FILENAME)
+        if not path.is_absolute():
+            path = Path(default_dir) / path
+        try:
+            return cls(path)
+        except sqlite3.Error as exc:
+            logger.warning(f"Entity aggregate disabled ({path}): {exc}")
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        """Number of documents in the aggregate."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def document_hash(self, doc_key: str) -> Optional[str]:
+        """Stored text hash of a document, or None if it is not in the aggregate."""
+        with self._lock:
+            row = self._conn.execute("SELECT text_hash FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()
+        return row[0] if row else None
+
+    def document_keys(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT doc_key FROM documents ORDER BY doc_key")]
+
+    def _apply(self, doc_key: str, new: Counter, text_hash: Optional[str], keep_document: bool) -> Dict[str, int]:
+        """Replace one document's entities and adjust only the affected totals (caller holds the lock)."""
+        old = Counter({
+            (category, name): mentions
+            for category, name, mentions in self._conn.execute(
+                "SELECT category, name, mentions FROM doc_entities WHERE doc_key = ?", (doc_key,)
+            )
+        })
+        deltas = []
+        for key in old.keys() | new.keys():
+            before, after = old.get(key, 0), new.get(key, 0)
+            if before != after:
+                deltas.append((key[0], key[1], after - before, int(after > 0) - int(before > 0)))
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO entity_totals (category, name, mentions, documents) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(category, name) DO UPDATE SET"
+                " mentions = mentions + excluded.mentions, documents = documents + excluded.documents",
+                deltas,
+            )
+            self._conn.executemany(
+                "DELETE FROM entity_totals WHERE category = ? AND name = ? AND documents <= 0",
+                [(category, name) for category, name, _, documents in deltas if documents < 0],
+            )
+            self._conn.execute("DELETE FROM doc_entities WHERE doc_key = ?", (doc_key,))
+            self._conn.executemany(
+                "INSERT INTO doc_entities (doc_key, category, name, mentions) VALUES (?, ?, ?, ?)",
+                [(doc_key, category, name, mentions) for (category, name), mentions in new.items()],
+            )
+            if keep_document:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents (doc_key, text_hash, updated) VALUES (?, ?, ?)",
+                    (doc_key, text_hash, time.time()),
+                )
+            else:
+                self._conn.execute("DELETE FROM documents WHERE doc_key = ?", (doc_key,))
+        return {
+            "added": sum(1 for key in new if key not in old),
+            "removed": sum(1 for key in old if key not in new),
+            "changed": sum(1 for key in new if key in old and new[key] != old[key]),
+        }
+
+    def replace_document(
+        self,
+        doc_key: str,
+        entities: Mapping[str, Iterable[str]],
+        text_hash: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        Set a document's entities (adds the document if new), updating corpus totals by the delta.
+
+        Args:
+            doc_key: Document identifier.
+            entities: Category -> entity names; a name listed n times counts as n mentions.
+            text_hash: Optional content hash (see document_hash) used to skip unchanged documents.
+
+        Returns:
+            Counts of (category, name) pairs added, removed and changed for this document.
+        """
+        new = Counter(
+            (category, name.strip())
+            for category, names in entities.items()
+            for name in names or []
+            if name and name.strip()
+        )
+        with self._lock:
+            return self._apply(doc_key, new, text_hash, keep_document=True)
+
+    add_document = replace_document
+
+    def remove_document(self, doc_key: str) -> Dict[str, int]:
+        """Drop a document and subtract its entities from the corpus totals."""
+        with self._lock:
+            return self._apply(doc_key, Counter(), None, keep_document=False)
+
+    def sync_documents(self, doc_keys: Iterable[str]) -> List[str]:
+        """Remove every stored document not in doc_keys (e.g. deleted sources). Returns removed keys."""
+        keep = set(doc_keys)
+        stale = [key for key in self.document_keys() if key not in keep]
+        for key in stale:
+            self.remove_document(key)
+        return stale
+
+    def entities(self, categories: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """Category -> sorted entity names across the corpus."""
+        result: Dict[str, List[str]] = {category: [] for category in categories or []}
+        with self._lock:
+            rows = self._conn.execute("SELECT category, name FROM entity_totals ORDER BY category, name").fetchall()
+        for category, name in rows:
+            if categories is None or category in result:
+                result.setdefault(category, []).append(name)
+        return result
+
+    def counts(self, field: str = "documents") -> Dict[str, Dict[str, int]]:
+        """Category -> {name: documents} (or mentions with field="mentions")."""
+        if field not in ("documents", "mentions"):
+            raise ValueError(f"Unknown count field: {field}")
+        result: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            rows = self._conn.execute(f"SELECT category, name, {field} FROM entity_totals").fetchall()
+        for category, name, value in rows:
+            result.setdefault(category, {})[name] = value
+        return result
+
+    def documents_for(self, category: str, name: str) -> List[str]:
+        """Documents mentioning an entity."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_key FROM doc_entities WHERE category = ? AND name = ? ORDER BY doc_key", (category, name)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def counts_for_documents(self, doc_keys: Iterable[str], field: str = "documents") -> Dict[str, Dict[str, int]]:
+        """
+        Category -> {name: documents} over a subset of documents, read from the per-document rows.
+
+        Args:
+            doc_keys: Documents to include (keys not in the aggregate contribute nothing)
+            field: "documents" (how many of doc_keys mention each entity) or "mentions" (their sum)
+        """
+        if field not in ("documents", "mentions"):
+            raise ValueError(f"Unknown count field: {field}")
+        value = "COUNT(*)" if field == "documents" else "SUM(mentions)"
+        keys = list(dict.fromkeys(doc_keys))
+        result: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            # Batched to stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT category, name, {value} FROM doc_entities"
+                    f" WHERE doc_key IN ({', '.join('?' * len(batch))}) GROUP BY category, name",
+                    batch,
+                ).fetchall()
+                for category, name, count in rows:
+                    names = result.setdefault(category, {})
+                    names[name] = names.get(name, 0) + count
+        return result
+
+    def rebuild_totals(self) -> int:
+        """Recompute entity_totals from doc_entities (repair/verification; normal updates are deltas)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entity_totals")
+            self._conn.execute(
+                "INSERT INTO entity_totals (category, name, mentions, documents)"
+                " SELECT category, name, SUM(mentions), COUNT(*) FROM doc_entities GROUP BY category, name"
+            )
+            return self._conn.execute("SELECT COUNT(*) FROM entity_totals").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            entities = self._conn.execute("SELECT COUNT(*) FROM entity_totals").fetchone()[0]
+        return {"documents": documents, "entities": entities}
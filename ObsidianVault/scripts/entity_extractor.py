@@ -1,16 +1,72 @@
 # PURPOSE: Automatic entity extraction using spaCy NER and LLM (Phase 2).
 # DEPENDENCIES: spaCy library, language model, optional LLM APIs.
 # MODIFICATION NOTES: Phase 2 - Enhanced with LLM extraction, RPG patterns, and validation.
+#   Documents are split into sentence-safe segments and run through nlp.pipe with non-NER
+#   components disabled; entity offsets are mapped back to each source document.
+#   ExtractorRegistry replaces the old global singleton: thread-safe, keyed by configuration,
+#   each spaCy model loaded once and shared, with eviction and load time / memory stats.
+#   Optional gazetteer (entity_gazetteer.EntityGazetteer): known vault entities are matched first
+#   and masked before NER/LLM.
 
 from __future__ import annotations
 
+import bisect
 import json
 import logging
 import re
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Max characters per spaCy segment; keeps every nlp() call far below spaCy's max_length cost curve
+DEFAULT_SEGMENT_CHARS = 10000
+DEFAULT_PIPE_BATCH_SIZE = 32
+# Pipeline components NER depends on; everything else (tagger, parser, lemmatizer, ...) is disabled
+_NER_COMPONENTS = frozenset({"tok2vec", "transformer", "ner", "entity_ruler", "span_ruler"})
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n\s*")
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# RPG pattern keywords; every pattern match contains one of them
+_NPC_TITLES = ("Lord", "Lady", "Captain", "Commander", "Inquisitor", "Magos", "Tech-Priest", "Adept")
+_NPC_EPITHETS = ("Elder", "Ancient", "Wise", "Great")
+_FACTION_ORDERS = ("Chapter", "Legion", "Order", "Brotherhood", "Cult", "Covenant")
+_FACTION_STATES = ("Empire", "Imperium", "Alliance", "Confederation")
+_LOCATION_PLACES = ("Planet", "World", "System", "Sector", "Station", "Base", "Fortress", "Citadel")
+_LOCATION_REALMS = ("Realm", "Domain", "Territory")
+_ITEM_WEAPONS = ("Blade", "Sword", "Axe", "Hammer", "Staff", "Rod", "Relic", "Artifact")
+_ITEM_ARMOR = ("Armor", "Armour", "Shield", "Helm", "Gauntlet")
+_RPG_PATTERN_KEYWORDS = {
+    "NPCs": [_NPC_TITLES, _NPC_EPITHETS],
+    "Factions": [_FACTION_ORDERS, _FACTION_STATES],
+    "Locations": [_LOCATION_PLACES, _LOCATION_REALMS],
+    "Items": [_ITEM_WEAPONS, _ITEM_ARMOR],
+}
+# {kw} is the pattern's keyword alternation, {name} a run of capitalized words
+_RPG_PATTERN_TEMPLATES = {
+    "NPCs": [
+        r"\b(?:{kw})\s+({name})",
+        r"\b([A-Z][a-z]+\s+(?:the\s+)?(?:{kw}))\b",
+    ],
+    "Factions": [
+        r"\b(?:the\s+)?({name}\s+(?:{kw}))\b",
+        r"\b(?:the\s+)?({name}\s+(?:{kw}))\b",
+    ],
+    "Locations": [
+        r"\b({name}\s+(?:{kw}))\b",
+        r"\b(?:the\s+)?({name}\s+(?:{kw}))\b",
+    ],
+    "Items": [
+        r"\b({name}\s+(?:{kw}))\b",
+        r"\b(?:the\s+)?({name}\s+(?:{kw}))\b",
+    ],
+}
+# Characters an RPG pattern can match: letters (IGNORECASE [a-z] also matches U+0130, U+0131,
+# U+017F and U+212A), whitespace and the hyphen in "Tech-Priest". No match crosses any other character.
+_PATTERN_RUN_CHARS = r"A-Za-z\s\-\u0130\u0131\u017f\u212a"
+
 # Try to import LLM dependencies for enhanced extraction
 try:
     from ai_summarizer import _call_openai_api, _call_anthropic_api, _call_ollama_api
@@ -35,6 +91,166 @@ except ImportError:
     SPACY_AVAILABLE = False
     logger.warning("spaCy not available. Install with: pip install spacy && python -m spacy download en_core_web_sm")
 
+# Optional: process RSS for model memory reporting
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def _load_spacy_model(model_name: str) -> Optional[Any]:
+    """Load a spaCy model, or return None if spaCy or the model is unavailable."""
+    if not SPACY_AVAILABLE:
+        logger.warning("spaCy not available, entity extraction disabled")
+        return None
+    
+    try:
+        nlp = spacy.load(model_name)
+        logger.info(f"Loaded spaCy model: {model_name}")
+        return nlp
+    except OSError:
+        logger.error(
+            f"spaCy model '{model_name}' not found. "
+            f"Install with: python -m spacy download {model_name}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to load spaCy model: {e}")
+    return None
+
+
+def _rss_mb() -> Optional[float]:
+    """Current process RSS in MB, or None without psutil."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except Exception:
+        return None
+
+
+class EntitySpan(NamedTuple):
+    """spaCy entity with character offsets into the source document."""
+    text: str
+    label: str
+    start: int
+    end: int
+
+
+def _last_break(pattern: re.Pattern, window: str, min_pos: int) -> int:
+    """End offset of the last pattern match in window at or after min_pos, or 0."""
+    pos = 0
+    for match in pattern.finditer(window):
+        if match.end() >= min_pos and match.end() < len(window):
+            pos = match.end()
+    return pos
+
+
+# PURPOSE: Split long text into spaCy-sized segments without cutting sentences.
+# DEPENDENCIES: None.
+# MODIFICATION NOTES: Prefers paragraph, then sentence, then whitespace boundaries; offsets are exact.
+def segment_text(text: str, max_chars: int = DEFAULT_SEGMENT_CHARS) -> List[Tuple[int, str]]:
+    """
+    Split text into (offset, segment) pairs of at most max_chars characters.
+
+    Cuts fall on a paragraph break when one exists in the last three quarters of the window,
+    otherwise on a sentence end, otherwise on whitespace (a hard cut only for unbroken text).
+    text[offset:offset + len(segment)] == segment for every pair; whitespace-only segments are dropped.
+
+    Args:
+        text: Document text.
+        max_chars: Maximum segment length.
+
+    Returns:
+        List of (character offset, segment text) tuples in document order.
+    """
+    max_chars = max(1, int(max_chars))
+    segments: List[Tuple[int, str]] = []
+    start = 0
+    while len(text) - start > max_chars:
+        window = text[start:start + max_chars]
+        min_pos = max_chars // 4
+        cut = (
+            _last_break(_PARAGRAPH_BREAK_RE, window, min_pos)
+            or _last_break(_SENTENCE_BREAK_RE, window, 1)
+            or _last_break(_WHITESPACE_RE, window, 1)
+            or max_chars
+        )
+        segments.append((start, window[:cut]))
+        start += cut
+    segments.append((start, text[start:]))
+    return [(offset, segment) for offset, segment in segments if segment.strip()]
+
+
+# PURPOSE: Single-pass scanner for the RPG entity patterns.
+# DEPENDENCIES: re only.
+# MODIFICATION NOTES: Replaces one findall() over the whole text per pattern; output is identical.
+class RPGPatternScanner:
+    """
+    Every RPG pattern match contains one of its keywords as a whole word ("Inquisitor", "Chapter", ...)
+    and lies inside a run of letters, whitespace and hyphens. One pass of a combined regex with a named
+    group per pattern finds the keywords; each pattern then only runs on the runs holding its keywords.
+    """
+
+    def __init__(
+        self,
+        patterns: Dict[str, List[re.Pattern]],
+        keywords: Optional[Dict[str, List[Sequence[str]]]] = None,
+    ):
+        """
+        Args:
+            patterns: Category -> compiled patterns (as EntityExtractor.rpg_patterns)
+            keywords: Category -> one keyword list per pattern; without it every pattern scans the whole text
+        """
+        self.patterns = patterns
+        self._keyword_re: Optional[re.Pattern] = None
+        # Named group -> (category, pattern index)
+        self._slots: Dict[str, Tuple[str, int]] = {}
+        if not keywords:
+            return
+        groups = []
+        initials = set()
+        for category, plist in patterns.items():
+            for index, words in enumerate(keywords.get(category, [])[:len(plist)]):
+                name = f"p{len(self._slots)}"
+                self._slots[name] = (category, index)
+                groups.append(f"(?P<{name}>{'|'.join(re.escape(w) for w in words)})")
+                initials.update(w[0].lower() for w in words)
+        if len(self._slots) == sum(len(plist) for plist in patterns.values()):
+            # The lookahead on first letters lets the engine skip most word starts cheaply
+            self._keyword_re = re.compile(
+                rf"\b(?=[{''.join(sorted(initials))}])(?:{'|'.join(groups)})\b", re.IGNORECASE
+            )
+            self._separator_re = re.compile(f"[^{_PATTERN_RUN_CHARS}]", re.IGNORECASE)
+
+    def scan(self, text: str) -> Dict[str, List[List[str]]]:
+        """
+        Match every pattern against text.
+
+        Returns:
+            Category -> one list per pattern of its capture group values, equal to pattern.findall(text)
+        """
+        if self._keyword_re is None:
+            return {category: [p.findall(text) for p in plist] for category, plist in self.patterns.items()}
+        found = {category: [[] for _ in plist] for category, plist in self.patterns.items()}
+        # Keyword hits -> the runs they sit in, each with the patterns that can match there
+        separators: Optional[List[int]] = None
+        runs: Dict[Tuple[int, int], set] = {}
+        for m in self._keyword_re.finditer(text):
+            if separators is None:
+                separators = [sep.start() for sep in self._separator_re.finditer(text)]
+            i = bisect.bisect_right(separators, m.start())
+            start = separators[i - 1] + 1 if i else 0
+            end = separators[i] if i < len(separators) else len(text)
+            runs.setdefault((start, end), set()).add(m.lastgroup)
+        for (start, end), names in runs.items():
+            # endpos includes the separator so \b at the run end sees the real neighbour
+            endpos = min(end + 1, len(text))
+            for name in sorted(names):
+                category, index = self._slots[name]
+                found[category][index].extend(self.patterns[category][index].findall(text, start, endpos))
+        return found
+
 
 # PURPOSE: Extract entities from text using spaCy NER.
 # DEPENDENCIES: spaCy model loaded.
@@ -47,6 +263,10 @@ class EntityExtractor:
         llm_provider: str = "openai",
         llm_model: str = "gpt-4",
         llm_api_key: Optional[str] = None,
+        batch_size: int = DEFAULT_PIPE_BATCH_SIZE,
+        n_process: int = 1,
+        segment_chars: int = DEFAULT_SEGMENT_CHARS,
+        registry: Optional["ExtractorRegistry"] = None,
     ):
         """
         Initialize entity extractor with spaCy model and optional LLM.
@@ -57,6 +277,10 @@ class EntityExtractor:
             llm_provider: LLM provider if use_llm is True (default: "openai").
             llm_model: LLM model name (default: "gpt-4").
             llm_api_key: Optional API key for LLM.
+            batch_size: Segments per nlp.pipe batch (default: 32).
+            n_process: spaCy worker processes for nlp.pipe (default: 1).
+            segment_chars: Maximum characters per spaCy segment (default: 10000).
+            registry: Registry that owns the shared spaCy model (default: module registry).
         """
         self.model_name = model_name
         self.nlp: Optional[object] = None
@@ -64,58 +288,43 @@ class EntityExtractor:
         self.llm_provider = llm_provider
         self.llm_model = llm_model
         self.llm_api_key = llm_api_key
+        self.batch_size = max(1, int(batch_size))
+        self.n_process = max(1, int(n_process))
+        self.segment_chars = max(1, int(segment_chars))
+        self._registry = registry
         self._load_model()
         
         # RPG-specific patterns
         self.rpg_patterns = self._init_rpg_patterns()
     
     def _load_model(self) -> None:
-        """Load spaCy model."""
-        if not SPACY_AVAILABLE:
-            logger.warning("spaCy not available, entity extraction disabled")
-            return
-        
-        try:
-            self.nlp = spacy.load(self.model_name)
-            logger.info(f"Loaded spaCy model: {self.model_name}")
-        except OSError:
-            logger.error(
-                f"spaCy model '{self.model_name}' not found. "
-                f"Install with: python -m spacy download {self.model_name}"
-            )
-            self.nlp = None
-        except Exception as e:
-            logger.error(f"Failed to load spaCy model: {e}")
-            self.nlp = None
+        """Fetch the spaCy model from the registry (loaded at most once per process)."""
+        registry = self._registry or get_registry()
+        self.nlp = registry.get_model(self.model_name)
     
     def _init_rpg_patterns(self) -> Dict[str, List[re.Pattern]]:
         """Initialize RPG-specific regex patterns for entity detection."""
         patterns = {
-            "NPCs": [
-                re.compile(r'\b(?:Lord|Lady|Captain|Commander|Inquisitor|Magos|Tech-Priest|Adept)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', re.IGNORECASE),
-                re.compile(r'\b([A-Z][a-z]+\s+(?:the\s+)?(?:Elder|Ancient|Wise|Great))\b', re.IGNORECASE),
-            ],
-            "Factions": [
-                re.compile(r'\b(?:the\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:Chapter|Legion|Order|Brotherhood|Cult|Covenant))\b', re.IGNORECASE),
-                re.compile(r'\b(?:the\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:Empire|Imperium|Alliance|Confederation))\b', re.IGNORECASE),
-            ],
-            "Locations": [
-                re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:Planet|World|System|Sector|Station|Base|Fortress|Citadel))\b', re.IGNORECASE),
-                re.compile(r'\b(?:the\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:Realm|Domain|Territory))\b', re.IGNORECASE),
-            ],
-            "Items": [
-                re.compile(r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:Blade|Sword|Axe|Hammer|Staff|Rod|Relic|Artifact))\b', re.IGNORECASE),
-                re.compile(r'\b(?:the\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:Armor|Armour|Shield|Helm|Gauntlet))\b', re.IGNORECASE),
-            ],
+            category: [
+                re.compile(
+                    template.format(kw="|".join(keywords), name=r"[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*"),
+                    re.IGNORECASE,
+                )
+                for template, keywords in zip(templates, _RPG_PATTERN_KEYWORDS[category])
+            ]
+            for category, templates in _RPG_PATTERN_TEMPLATES.items()
         }
+        self._rpg_scanner = RPGPatternScanner(patterns, _RPG_PATTERN_KEYWORDS)
         return patterns
     
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+    def extract_entities(self, text: str, gazetteer: Optional[Any] = None) -> Dict[str, List[str]]:
         """
         Extract entities from text using spaCy and optionally LLM.
         
         Args:
             text: Text to extract entities from.
+            gazetteer: Optional EntityGazetteer; known entities are matched first and
+                masked, so NER and the LLM only see the remaining text.
             
         Returns:
             Dictionary mapping entity types to lists of entity names.
@@ -128,10 +337,84 @@ class EntityExtractor:
                 "Items": [],
             }
         
-        results = []
+        text, known = self._match_known(text, gazetteer)
+        return self._combine(text, self._extract_with_spacy(text), known)
+    
+    def extract_entity_spans(
+        self,
+        texts: Sequence[str],
+        batch_size: Optional[int] = None,
+        n_process: Optional[int] = None,
+    ) -> List[List[EntitySpan]]:
+        """
+        Run spaCy NER over sentence-safe segments of every text via nlp.pipe.
+        
+        Args:
+            texts: Documents to process.
+            batch_size: Segments per nlp.pipe batch (default: instance batch_size).
+            n_process: spaCy worker processes (default: instance n_process).
+            
+        Returns:
+            Per-document lists of EntitySpan with offsets into that document.
+        """
+        spans: List[List[EntitySpan]] = [[] for _ in texts]
+        if not self.nlp or not texts:
+            return spans
+        
+        def _segments() -> Iterator[Tuple[str, Tuple[int, int]]]:
+            for doc_index, text in enumerate(texts):
+                for offset, segment in segment_text(text or "", self.segment_chars):
+                    yield segment, (doc_index, offset)
         
-        # Extract using spaCy
-        spacy_entities = self._extract_with_spacy(text)
+        try:
+            docs = self.nlp.pipe(
+                _segments(),
+                as_tuples=True,
+                batch_size=batch_size or self.batch_size,
+                n_process=n_process or self.n_process,
+                disable=self._disabled_components(),
+            )
+            for doc, (doc_index, offset) in docs:
+                for ent in doc.ents:
+                    spans[doc_index].append(
+                        EntitySpan(ent.text, ent.label_, offset + ent.start_char, offset + ent.end_char)
+                    )
+        except Exception as e:
+            logger.warning(f"Error in spaCy batch extraction: {e}")
+            return [[] for _ in texts]
+        return spans
+    
+    def _disabled_components(self) -> List[str]:
+        """Pipeline components not needed for NER (tagger, parser, lemmatizer, ...)."""
+        return [name for name in getattr(self.nlp, "pipe_names", []) if name not in _NER_COMPONENTS]
+    
+    @staticmethod
+    def _empty_entities() -> Dict[str, List[str]]:
+        return {
+            "NPCs": [],
+            "Factions": [],
+            "Locations": [],
+            "Items": [],
+        }
+    
+    @staticmethod
+    def _match_known(text: str, gazetteer: Optional[Any]) -> Tuple[str, Optional[Dict[str, List[str]]]]:
+        """Match gazetteer entities; returns (text with matches blanked, known entities or None)."""
+        if gazetteer is None:
+            return text, None
+        matches = gazetteer.match(text)
+        if not matches:
+            return text, None
+        return gazetteer.mask(text, matches), gazetteer.to_entities(matches)
+    
+    def _combine(
+        self,
+        text: str,
+        spacy_entities: Dict[str, List[str]],
+        known: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict[str, List[str]]:
+        """Merge spaCy, RPG pattern and optional LLM results for one document, then validate."""
+        results = []
         if spacy_entities:
             results.append(spacy_entities)
         
@@ -150,18 +433,20 @@ class EntityExtractor:
         if results:
             merged = merge_entity_results(results) if VALIDATION_AVAILABLE else self._merge_results(results)
         else:
-            merged = {
-                "NPCs": [],
-                "Factions": [],
-                "Locations": [],
-                "Items": [],
-            }
+            merged = self._empty_entities()
         
         # Validate and deduplicate if validator available
         if VALIDATION_AVAILABLE:
             merged = deduplicate_entities(merged)
             merged = filter_common_false_positives(merged)
         
+        # Gazetteer hits are note titles: kept verbatim, not re-normalized or fuzzy-merged
+        if known:
+            for category, titles in known.items():
+                known_lower = {title.lower() for title in titles}
+                others = [e for e in merged.get(category, []) if e.lower() not in known_lower]
+                merged[category] = sorted(set(titles) | set(others))
+        
         logger.debug(
             f"Extracted entities: {sum(len(v) for v in merged.values())} total "
             f"({len(merged['NPCs'])} NPCs, {len(merged['Factions'])} Factions, "
@@ -171,61 +456,47 @@ class EntityExtractor:
         return merged
     
     def _extract_with_spacy(self, text: str) -> Dict[str, List[str]]:
-        """Extract entities using spaCy NER."""
+        """Extract entities using spaCy NER (segmented, so long texts stay cheap)."""
         if not self.nlp:
-            return {
-                "NPCs": [],
-                "Factions": [],
-                "Locations": [],
-                "Items": [],
-            }
+            return self._empty_entities()
+        return self._spans_to_entities(self.extract_entity_spans([text])[0])
+    
+    @staticmethod
+    def _spans_to_entities(spans: Sequence[EntitySpan]) -> Dict[str, List[str]]:
+        """Map spaCy entity labels to RPG categories, deduplicated and sorted."""
+        entities: Dict[str, List[str]] = {
+            "NPCs": [],
+            "Factions": [],
+            "Locations": [],
+            "Items": [],
+        }
+        seen_entities = set()
         
-        try:
-            doc = self.nlp(text)
+        for span in spans:
+            entity_text = span.text.strip()
             
-            entities = {
-                "NPCs": [],
-                "Factions": [],
-                "Locations": [],
-                "Items": [],
-            }
+            if not entity_text or entity_text in seen_entities or len(entity_text) < 2:
+                continue
             
-            seen_entities = set()
+            seen_entities.add(entity_text)
             
-            for ent in doc.ents:
-                entity_text = ent.text.strip()
-                
-                if not entity_text or entity_text in seen_entities or len(entity_text) < 2:
-                    continue
-                
-                seen_entities.add(entity_text)
-                
-                # Map entity types with improved heuristics
-                if ent.label_ == "PERSON":
-                    entities["NPCs"].append(entity_text)
-                elif ent.label_ == "ORG":
-                    # Organizations are usually factions
-                    entities["Factions"].append(entity_text)
-                elif ent.label_ == "GPE":
-                    # Geopolitical entities are usually locations
-                    entities["Locations"].append(entity_text)
-                elif ent.label_ in ["PRODUCT", "EVENT"]:
-                    entities["Items"].append(entity_text)
-            
-            # Remove duplicates and sort
-            for key in entities:
-                entities[key] = sorted(list(set(entities[key])))
-            
-            return entities
-            
-        except Exception as e:
-            logger.warning(f"Error in spaCy extraction: {e}")
-            return {
-                "NPCs": [],
-                "Factions": [],
-                "Locations": [],
-                "Items": [],
-            }
+            # Map entity types with improved heuristics
+            if span.label == "PERSON":
+                entities["NPCs"].append(entity_text)
+            elif span.label == "ORG":
+                # Organizations are usually factions
+                entities["Factions"].append(entity_text)
+            elif span.label == "GPE":
+                # Geopolitical entities are usually locations
+                entities["Locations"].append(entity_text)
+            elif span.label in ["PRODUCT", "EVENT"]:
+                entities["Items"].append(entity_text)
+        
+        # Remove duplicates and sort
+        for key in entities:
+            entities[key] = sorted(list(set(entities[key])))
+        
+        return entities
     
     def _extract_with_patterns(self, text: str) -> Dict[str, List[str]]:
         """Extract entities using RPG-specific patterns."""
@@ -238,12 +509,14 @@ class EntityExtractor:
         
         seen = set()
         
-        for category, patterns in self.rpg_patterns.items():
-            for pattern in patterns:
-                matches = pattern.findall(text)
+        # One scan of the text; matches come back per (category, pattern) in findall order
+        scanner = getattr(self, "_rpg_scanner", None)
+        if scanner is None or scanner.patterns is not self.rpg_patterns:
+            scanner = self._rpg_scanner = RPGPatternScanner(self.rpg_patterns)
+        for category, per_pattern in scanner.scan(text).items():
+            for matches in per_pattern:
                 for match in matches:
-                    entity = match if isinstance(match, str) else " ".join(match) if isinstance(match, tuple) else str(match)
-                    entity = entity.strip()
+                    entity = match.strip()
                     if entity and entity not in seen and len(entity) >= 2:
                         entities[category].append(entity)
                         seen.add(entity)
@@ -365,8 +638,153 @@ Return only valid JSON in this format:
         return self.nlp is not None
 
 
-# Global extractor instance (lazy-loaded)
-_extractor_instance: Optional[EntityExtractor] = None
+class _ModelEntry:
+    """A loaded (or failed) spaCy model with its load cost."""
+    
+    def __init__(self, nlp: Optional[Any], load_seconds: float, memory_mb: Optional[float]):
+        self.nlp = nlp
+        self.load_seconds = load_seconds
+        self.memory_mb = memory_mb
+        self.loaded_at = time.time()
+        self.requests = 0
+
+
+# PURPOSE: Share spaCy models and extractors across threads without duplicate loads.
+# DEPENDENCIES: threading; spaCy via the loader callable.
+# MODIFICATION NOTES: Per-key load locks so different models can load concurrently while
+#   concurrent requests for the same model wait for a single load.
+class ExtractorRegistry:
+    """
+    Thread-safe registry of spaCy models and EntityExtractor instances.
+    
+    Extractors are keyed by their full configuration; spaCy models are keyed by name and
+    shared by every extractor configuration that uses them. A failed load is remembered
+    (as None) until the model is evicted.
+    """
+    
+    def __init__(self, loader: Callable[[str], Optional[Any]] = _load_spacy_model):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Any, threading.Lock] = {}
+        self._models: Dict[str, _ModelEntry] = {}
+        self._extractors: Dict[Tuple, EntityExtractor] = {}
+    
+    def _key_lock(self, key: Any) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+    
+    def get_model(self, model_name: str) -> Optional[Any]:
+        """
+        Return the shared spaCy model, loading it on first use.
+        
+        Args:
+            model_name: spaCy model name.
+            
+        Returns:
+            Loaded spaCy Language, or None if it could not be loaded.
+        """
+        with self._lock:
+            entry = self._models.get(model_name)
+            if entry is not None:
+                entry.requests += 1
+                return entry.nlp
+        with self._key_lock(("model", model_name)):
+            with self._lock:
+                entry = self._models.get(model_name)
+                if entry is not None:
+                    entry.requests += 1
+                    return entry.nlp
+            rss_before = _rss_mb()
+            start = time.perf_counter()
+            nlp = self._loader(model_name)
+            load_seconds = time.perf_counter() - start
+            rss_after = _rss_mb()
+            memory_mb = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            entry = _ModelEntry(nlp, load_seconds, memory_mb)
+            entry.requests = 1
+            with self._lock:
+                self._models[model_name] = entry
+        if nlp is not None:
+            memory = f", ~{memory_mb:.0f} MB" if memory_mb is not None else ""
+            logger.info(f"spaCy model {model_name} loaded in {load_seconds:.2f}s{memory}")
+        return nlp
+    
+    def get_extractor(
+        self,
+        model_name: str = "en_core_web_sm",
+        use_llm: bool = False,
+        llm_provider: str = "openai",
+        llm_model: str = "gpt-4",
+        llm_api_key: Optional[str] = None,
+        batch_size: int = DEFAULT_PIPE_BATCH_SIZE,
+        n_process: int = 1,
+        segment_chars: int = DEFAULT_SEGMENT_CHARS,
+    ) -> EntityExtractor:
+        """Return the extractor for this exact configuration, creating it once."""
+        key = (model_name, use_llm, llm_provider, llm_model, llm_api_key, batch_size, n_process, segment_chars)
+        with self._lock:
+            extractor = self._extractors.get(key)
+        if extractor is not None:
+            return extractor
+        with self._key_lock(("extractor", key)):
+            with self._lock:
+                extractor = self._extractors.get(key)
+            if extractor is None:
+                extractor = EntityExtractor(
+                    model_name=model_name,
+                    use_llm=use_llm,
+                    llm_provider=llm_provider,
+                    llm_model=llm_model,
+                    llm_api_key=llm_api_key,
+                    batch_size=batch_size,
+                    n_process=n_process,
+                    segment_chars=segment_chars,
+                    registry=self,
+                )
+                with self._lock:
+                    self._extractors[key] = extractor
+        return extractor
+    
+    def evict(self, model_name: Optional[str] = None) -> int:
+        """
+        Drop a model and every extractor built on it (all models when model_name is None).
+        Extractors already handed out keep working; the next get_* call reloads.
+        
+        Returns:
+            Number of models evicted.
+        """
+        with self._lock:
+            names = list(self._models) if model_name is None else [model_name]
+            evicted = sum(1 for name in names if self._models.pop(name, None) is not None)
+            for key in [k for k in self._extractors if model_name is None or k[0] == model_name]:
+                del self._extractors[key]
+        if evicted:
+            logger.info(f"Evicted {evicted} spaCy model(s) from extractor registry")
+        return evicted
+    
+    def stats(self) -> Dict[str, Any]:
+        """Loaded models with load time, approximate memory and request counts."""
+        with self._lock:
+            models = {
+                name: {
+                    "available": entry.nlp is not None,
+                    "load_seconds": round(entry.load_seconds, 3),
+                    "memory_mb": round(entry.memory_mb, 1) if entry.memory_mb is not None else None,
+                    "requests": entry.requests,
+                    "loaded_at": entry.loaded_at,
+                }
+                for name, entry in self._models.items()
+            }
+            extractors = len(self._extractors)
+        return {"models": models, "extractors": extractors}
+
+
+_registry = ExtractorRegistry()
+
+
+def get_registry() -> ExtractorRegistry:
+    """Return the process-wide extractor registry."""
+    return _registry
 
 
 def get_extractor(
@@ -375,9 +793,12 @@ def get_extractor(
     llm_provider: str = "openai",
     llm_model: str = "gpt-4",
     llm_api_key: Optional[str] = None,
+    batch_size: int = DEFAULT_PIPE_BATCH_SIZE,
+    n_process: int = 1,
+    segment_chars: int = DEFAULT_SEGMENT_CHARS,
 ) -> EntityExtractor:
     """
-    Get or create global entity extractor instance.
+    Get or create the shared entity extractor for this configuration.
     
     Args:
         model_name: Name of spaCy model to use.
@@ -385,20 +806,23 @@ def get_extractor(
         llm_provider: LLM provider if use_llm is True.
         llm_model: LLM model name.
         llm_api_key: Optional API key for LLM.
+        batch_size: Segments per nlp.pipe batch.
+        n_process: spaCy worker processes for nlp.pipe.
+        segment_chars: Maximum characters per spaCy segment.
         
     Returns:
-        EntityExtractor instance.
+        EntityExtractor instance (same instance for the same arguments).
     """
-    global _extractor_instance
-    if _extractor_instance is None:
-        _extractor_instance = EntityExtractor(
-            model_name=model_name,
-            use_llm=use_llm,
-            llm_provider=llm_provider,
-            llm_model=llm_model,
-            llm_api_key=llm_api_key,
-        )
-    return _extractor_instance
+    return _registry.get_extractor(
+        model_name=model_name,
+        use_llm=use_llm,
+        llm_provider=llm_provider,
+        llm_model=llm_model,
+        llm_api_key=llm_api_key,
+        batch_size=batch_size,
+        n_process=n_process,
+        segment_chars=segment_chars,
+    )
 
 
 def extract_entities_from_text(
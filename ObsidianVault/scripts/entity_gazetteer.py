@@ -0,0 +1,333 @@
+# PURPOSE: Gazetteer of known entities built from vault entity notes (titles + frontmatter aliases).
+# DEPENDENCIES: stdlib; PyYAML optional (frontmatter fallback parser otherwise).
+# MODIFICATION NOTES: Terms compile into one character-trie regex, so matching is a single C-level scan.
+#   refresh() re-stats the note folders and only re-reads notes whose size/mtime changed; the matcher is
+#   recompiled only when the term set changes. EntityExtractor matches known entities first and masks them
+#   so spaCy NER and the LLM only see the unknown remainder.
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+# Shorter titles/aliases ("Ork", "GM") match too much ordinary text
+DEFAULT_MIN_TERM_LENGTH = 4
+# Extra folders scanned for entity notes; their category comes from entity_type or a type/* tag
+DEFAULT_GAZETTEER_DIRS = ("LLM-Wiki/Entities",)
+_ENTITY_TYPES = {"npc": "NPCs", "faction": "Factions", "location": "Locations", "item": "Items"}
+# Optional leading HTML comment (the entity template's PURPOSE block), then the --- frontmatter block
+_FRONTMATTER_RE = re.compile(r"\A\s*(?:<!--.*?-->\s*)?---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)", re.DOTALL)
+_FIELD_RE = re.compile(r"^([A-Za-z_][\w-]*):[ \t]*(.*)$")
+_LIST_ITEM_RE = re.compile(r"^\s+-\s+(.*)$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class GazetteerMatch(NamedTuple):
+    """A known entity found in text; title is the note title the surface form maps to."""
+    title: str
+    category: str
+    start: int
+    end: int
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _parse_inline_list(value: str) -> List[str]:
+    try:
+        parsed = json.loads(value)
+        if isinstance(parsed, list):
+            return [str(item) for item in parsed]
+    except ValueError:
+        pass
+    return [_unquote(item) for item in value[1:-1].split(",") if item.strip()]
+
+
+def read_frontmatter(content: str) -> Dict[str, Any]:
+    """
+    Parse the YAML frontmatter of a note (an HTML comment block before it is allowed).
+
+    Args:
+        content: Note text.
+
+    Returns:
+        Frontmatter fields, or an empty dict when the note has none.
+    """
+    match = _FRONTMATTER_RE.match(content)
+    if not match:
+        return {}
+    block = match.group(1)
+    if yaml:
+        try:
+            data = yaml.safe_load(block)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.debug(f"YAML parsing failed, using fallback: {e}")
+
+    # Fallback: "key: value", inline [a, b] lists and block "- item" lists
+    data: Dict[str, Any] = {}
+    current: Optional[str] = None
+    for line in block.splitlines():
+        item = _LIST_ITEM_RE.match(line)
+        if item and current is not None:
+            if not isinstance(data.get(current), list):
+                data[current] = []
+            data[current].append(_unquote(item.group(1)))
+            continue
+        field = _FIELD_RE.match(line)
+        if not field:
+            continue
+        current, value = field.group(1), field.group(2).strip()
+        if value.startswith("[") and value.endswith("]"):
+            data[current] = _parse_inline_list(value)
+        else:
+            data[current] = _unquote(value) if value else None
+    return data
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v is not None]
+    return [str(value)]
+
+
+def _note_category(fields: Dict[str, Any]) -> Optional[str]:
+    """Category from entity_type, else from a type/npc-style tag."""
+    entity_type = str(fields.get("entity_type") or "").strip().lower()
+    if entity_type in _ENTITY_TYPES:
+        return _ENTITY_TYPES[entity_type]
+    for tag in _as_list(fields.get("tags")):
+        tag = tag.strip().lstrip("#").lower()
+        if tag.startswith("type/") and tag[5:] in _ENTITY_TYPES:
+            return _ENTITY_TYPES[tag[5:]]
+    return None
+
+
+def _normalize_term(term: str) -> str:
+    return _WHITESPACE_RE.sub(" ", term).strip()
+
+
+def _trie_pattern(terms: Sequence[str]) -> str:
+    """Regex alternation of sorted terms, factored into a character trie (space matches any whitespace)."""
+    if not terms:
+        return ""
+    optional = terms[0] == ""
+    rest = terms[1:] if optional else terms
+    branches = []
+    for char, group in groupby(rest, key=lambda t: t[0]):
+        head = r"\s+" if char == " " else re.escape(char)
+        branches.append(head + _trie_pattern([t[1:] for t in group]))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if optional else body
+
+
+class EntityGazetteer:
+    """
+    Known entity names from vault notes, matched as whole phrases (case-sensitive, any whitespace).
+
+    Each source is (folder, category); a category of None means "read it from the note's entity_type
+    or type/* tag" and notes without one are ignored. Call refresh() to pick up note changes.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[Tuple[Path, Optional[str]]],
+        min_term_length: int = DEFAULT_MIN_TERM_LENGTH,
+    ):
+        self.sources = [(Path(folder), category) for folder, category in sources]
+        self.min_term_length = min_term_length
+        self._lock = threading.Lock()
+        # Note path -> ((size, mtime_ns), [(term, category, title), ...])
+        self._notes: Dict[Path, Tuple[Tuple[int, int], List[Tuple[str, str, str]]]] = {}
+        # Normalized term -> (category, title)
+        self._terms: Dict[str, Tuple[str, str]] = {}
+        self._matcher: Optional[re.Pattern] = None
+        self.rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _scan_sources(self) -> Dict[Path, Tuple[Tuple[int, int], Optional[str]]]:
+        found: Dict[Path, Tuple[Tuple[int, int], Optional[str]]] = {}
+        for folder, category in self.sources:
+            if not folder.is_dir():
+                continue
+            for root, _dirs, files in os.walk(folder):
+                for name in files:
+                    if not name.endswith(".md") or name.lower() == "readme.md":
+                        continue
+                    path = Path(root) / name
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    found.setdefault(path, ((st.st_size, st.st_mtime_ns), category))
+        return found
+
+    def _read_note(self, path: Path, category: Optional[str]) -> List[Tuple[str, str, str]]:
+        try:
+            fields = read_frontmatter(path.read_text(encoding="utf-8", errors="replace"))
+        except OSError as e:
+            logger.debug(f"Gazetteer skipped {path}: {e}")
+            return []
+        category = category or _note_category(fields)
+        if not category:
+            return []
+        title = _normalize_term(str(fields.get("title") or path.stem))
+        terms = [title] + [_normalize_term(alias) for alias in _as_list(fields.get("aliases"))]
+        return [
+            (term, category, title)
+            for term in dict.fromkeys(terms)
+            if len(term) >= self.min_term_length
+        ]
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Re-read new or changed notes, drop deleted ones, and recompile the matcher if any term changed.
+
+        Returns:
+            Counts: notes, read (new or changed), removed, terms, rebuilt (0/1)
+        """
+        with self._lock:
+            found = self._scan_sources()
+            removed = [path for path in self._notes if path not in found]
+            for path in removed:
+                del self._notes[path]
+            read = 0
+            for path, (signature, category) in found.items():
+                cached = self._notes.get(path)
+                if cached is not None and cached[0] == signature:
+                    continue
+                self._notes[path] = (signature, self._read_note(path, category))
+                read += 1
+            rebuilt = 0
+            if read or removed or self._matcher is None:
+                terms: Dict[str, Tuple[str, str]] = {}
+                # Sorted paths: when two notes claim the same alias, the result does not depend on walk order
+                for path in sorted(self._notes):
+                    for term, category, title in self._notes[path][1]:
+                        if term in terms and terms[term] != (category, title):
+                            logger.debug(f"Gazetteer term '{term}' claimed by {terms[term][1]} and {title}")
+                            continue
+                        terms[term] = (category, title)
+                if terms != self._terms or self._matcher is None:
+                    self._terms = terms
+                    self._matcher = self._compile(terms)
+                    self.rebuilds += 1
+                    rebuilt = 1
+            return {
+                "notes": len(self._notes),
+                "read": read,
+                "removed": len(removed),
+                "terms": len(self._terms),
+                "rebuilt": rebuilt,
+            }
+
+    @staticmethod
+    def _compile(terms: Dict[str, Tuple[str, str]]) -> Optional[re.Pattern]:
+        if not terms:
+            return None
+        return re.compile(rf"(?<!\w)(?:{_trie_pattern(sorted(terms))})(?!\w)")
+
+    def match(self, text: str) -> List[GazetteerMatch]:
+        """Find known entities in text (leftmost, longest, non-overlapping)."""
+        if self._matcher is None:
+            self.refresh()
+        matcher, terms = self._matcher, self._terms
+        if matcher is None or not text:
+            return []
+        matches = []
+        for m in matcher.finditer(text):
+            category, title = terms[_normalize_term(m.group())]
+            matches.append(GazetteerMatch(title, category, m.start(), m.end()))
+        return matches
+
+    @staticmethod
+    def to_entities(matches: Iterable[GazetteerMatch]) -> Dict[str, List[str]]:
+        """Distinct matched titles per category, sorted."""
+        entities: Dict[str, List[str]] = {"NPCs": [], "Factions": [], "Locations": [], "Items": []}
+        for title, category in sorted({(m.title, m.category) for m in matches}):
+            entities.setdefault(category, []).append(title)
+        return entities
+
+    @staticmethod
+    def mask(text: str, matches: Sequence[GazetteerMatch]) -> str:
+        """Blank out matched spans (same length, so offsets into the text stay valid)."""
+        if not matches:
+            return text
+        parts = []
+        last = 0
+        for m in matches:
+            parts.append(text[last:m.start])
+            parts.append(" " * (m.end - m.start))
+            last = m.end
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """Known entities in text by category."""
+        return self.to_entities(self.match(text))
+
+
+_gazetteers: Dict[Tuple, EntityGazetteer] = {}
+_gazetteers_lock = threading.Lock()
+
+
+# PURPOSE: Shared gazetteer for a vault's entity folders.
+# DEPENDENCIES: ingest_config paths (npcs_dir, factions_dir, locations_dir, items_dir).
+# MODIFICATION NOTES: Cached per vault and folder set, so repeated ingest runs in one process only re-read changed notes.
+def get_vault_gazetteer(vault_root: Path, config: Dict[str, Any]) -> Optional[EntityGazetteer]:
+    """
+    Gazetteer over the configured entity note folders, refreshed before it is returned.
+
+    Args:
+        vault_root: Vault root directory.
+        config: Ingest config (entity_extraction.gazetteer_enabled, gazetteer_dirs, gazetteer_min_term_length).
+
+    Returns:
+        EntityGazetteer, or None if disabled in config.
+    """
+    entity_cfg = config.get("entity_extraction", {}) or {}
+    if not entity_cfg.get("gazetteer_enabled", True):
+        return None
+    vault_root = Path(vault_root)
+    sources: List[Tuple[Path, Optional[str]]] = []
+    for key, category in (("npcs_dir", "NPCs"), ("factions_dir", "Factions"),
+                          ("locations_dir", "Locations"), ("items_dir", "Items")):
+        if config.get(key):
+            sources.append((vault_root / str(config[key]), category))
+    for folder in entity_cfg.get("gazetteer_dirs", DEFAULT_GAZETTEER_DIRS):
+        sources.append((vault_root / folder, None))
+    min_length = int(entity_cfg.get("gazetteer_min_term_length", DEFAULT_MIN_TERM_LENGTH))
+    key = (tuple((str(folder), category) for folder, category in sources), min_length)
+    with _gazetteers_lock:
+        gazetteer = _gazetteers.get(key)
+        if gazetteer is None:
+            gazetteer = _gazetteers[key] = EntityGazetteer(sources, min_term_length=min_length)
+    stats = gazetteer.refresh()
+    logger.info(
+        f"Entity gazetteer: {stats['terms']} terms from {stats['notes']} notes "
+        f"({stats['read']} read, {stats['removed']} removed, rebuilt={bool(stats['rebuilt'])})"
+    )
+    return gazetteer
@@ -1,16 +1,57 @@
 # PURPOSE: Entity validation and deduplication (Phase 2).
 # DEPENDENCIES: None (pure Python).
 # MODIFICATION NOTES: Phase 2 - Entity validation, normalization, and deduplication.
+#   Large lists are deduplicated with blocking (normalized prefix, phonetic key, rarest character
+#   n-grams) so only candidate pairs are scored; small lists keep the exact pairwise scan.
+#   Stopword and false-positive lists are module-level frozensets built once, not per call.
 
 from __future__ import annotations
 
 import logging
+import math
 import re
-from typing import Dict, List, Set
+from collections import Counter, defaultdict
+from itertools import combinations, groupby
+from typing import Dict, List, Set, Tuple
 from difflib import SequenceMatcher
 
 logger = logging.getLogger(__name__)
 
+# Up to this many entities per category, every pair is compared (exact); above it, blocking is used
+EXACT_FUZZY_LIMIT = 500
+# Blocking parameters
+_PREFIX_LEN = 4
+_SOUNDEX_LEN = 6
+_NGRAM = 3
+# A name's rarest n-grams; every pair of them is a blocking key
+_RARE_NGRAMS = 5
+# A ratio >= 0.85 needs the longer name to be at most ~1.35x the shorter, so both names of a
+# matching pair land in the same or a neighbouring length bucket
+_LENGTH_BUCKET_BASE = 1.4
+# Stop growing a block past this size so one very common key cannot make the scan quadratic
+_MAX_BLOCK_SIZE = 2000
+_COUNT_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 -'"
+_COUNT_INDEX = {char: i for i, char in enumerate(_COUNT_ALPHABET)}
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+_SOUNDEX_CODES = str.maketrans("bfpvcgjkqsxzdtlmnraeiouyhw", "11112222222233455600000000")
+_INVALID_NAME_CHARS_RE = re.compile(r"[^a-zA-Z0-9\s\-']")
+
+# Stoplists are built once at import; lookups are lowercase
+_STOPWORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "from", "as", "is", "was", "are", "were", "be",
+    "been", "being", "have", "has", "had", "do", "does", "did", "will",
+    "would", "could", "should", "may", "might", "must", "can", "this",
+    "that", "these", "those", "it", "its", "they", "them", "their",
+})
+# Common false positives for RPG documents, per category
+_FALSE_POSITIVES = {
+    "NPCs": frozenset({"player", "character", "pc", "npc", "gm", "dm"}),
+    "Factions": frozenset({"faction", "group", "organization", "alliance"}),
+    "Locations": frozenset({"location", "place", "area", "region", "zone"}),
+    "Items": frozenset({"item", "object", "thing", "equipment", "gear"}),
+}
+
 
 def normalize_entity_name(name: str) -> str:
     """
@@ -59,22 +100,14 @@ def validate_entity_name(name: str) -> bool:
         return False
     
     # Remove invalid characters (keep alphanumeric, spaces, hyphens, apostrophes)
-    cleaned = re.sub(r'[^a-zA-Z0-9\s\-\']', '', name)
+    cleaned = _INVALID_NAME_CHARS_RE.sub('', name)
     
     # Check if name is too short after cleaning
     if len(cleaned.strip()) < 2:
         return False
     
     # Check for common false positives
-    false_positives = {
-        "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
-        "of", "with", "by", "from", "as", "is", "was", "are", "were", "be",
-        "been", "being", "have", "has", "had", "do", "does", "did", "will",
-        "would", "could", "should", "may", "might", "must", "can", "this",
-        "that", "these", "those", "it", "its", "they", "them", "their",
-    }
-    
-    if name.lower().strip() in false_positives:
+    if name.lower().strip() in _STOPWORDS:
         return False
     
     return True
@@ -94,6 +127,152 @@ def similarity_ratio(name1: str, name2: str) -> float:
     return SequenceMatcher(None, name1.lower(), name2.lower()).ratio()
 
 
+def phonetic_key(name: str, length: int = _SOUNDEX_LEN) -> str:
+    """
+    Extended Soundex key of a name (letters and digits only, case-insensitive).
+    
+    Args:
+        name: Entity name.
+        length: Number of code digits after the first letter (default: 6).
+        
+    Returns:
+        Phonetic key, e.g. "k400000" for "Kael".
+    """
+    compact = _NON_ALNUM_RE.sub("", name.lower())
+    if not compact:
+        return ""
+    # Collapse runs of the same code (including the first letter's), then drop vowel separators
+    codes = [code for code, _ in groupby(compact.translate(_SOUNDEX_CODES))]
+    digits = "".join(codes[1:]).replace("0", "")
+    return (compact[0] + digits + "0" * length)[:length + 1]
+
+
+def _length_bucket(length: int) -> int:
+    return int(math.log(max(length, 1), _LENGTH_BUCKET_BASE))
+
+
+def _char_profile(name: str) -> Tuple[int, Tuple[int, ...]]:
+    """
+    (character bitmask, character histogram) of a lowercased name. Characters outside
+    _COUNT_ALPHABET share one slot, which can only overestimate shared characters.
+    """
+    counts = [0] * (len(_COUNT_ALPHABET) + 1)
+    mask = 0
+    for char in name:
+        index = _COUNT_INDEX.get(char, len(_COUNT_ALPHABET))
+        counts[index] += 1
+        mask |= 1 << index
+    return mask, tuple(counts)
+
+
+def _is_similar(
+    name1: str,
+    profile1: Tuple[int, Tuple[int, ...]],
+    name2: str,
+    profile2: Tuple[int, Tuple[int, ...]],
+    threshold: float,
+) -> bool:
+    """
+    similarity_ratio(name1, name2) >= threshold for lowercased names.
+    
+    Cheap upper bounds on the matched character count reject most candidates first: length,
+    characters present in only one name (each leaves at least one character unmatched), and the
+    histogram overlap (SequenceMatcher.quick_ratio). Only survivors get the full ratio.
+    """
+    mask1, counts1 = profile1
+    mask2, counts2 = profile2
+    len1, len2 = len(name1), len(name2)
+    needed = threshold * (len1 + len2)
+    if 2 * min(len1 - (mask1 & ~mask2).bit_count(), len2 - (mask2 & ~mask1).bit_count()) < needed:
+        return False
+    if 2 * sum(map(min, counts1, counts2)) < needed:
+        return False
+    return SequenceMatcher(None, name1, name2).ratio() >= threshold
+
+
+def _ngrams(name: str) -> Set[str]:
+    padded = f" {name} "
+    return {padded[i:i + _NGRAM] for i in range(max(1, len(padded) - _NGRAM + 1))}
+
+
+def _block_keys(name: str, grams: Set[str], gram_rank: Dict[str, int]) -> Tuple[List[tuple], List[tuple]]:
+    """
+    (keys to index a kept name under, keys to probe for candidates) for a lowercased name.
+    
+    N-gram keys are pairs drawn from the name's rarest n-grams. Near-duplicates share most of
+    their rare n-grams, so they share at least one pair even after a couple of edits, while
+    unrelated names almost never share two rare n-grams; common n-grams ("ter", " of") are never used.
+    """
+    compact = _NON_ALNUM_RE.sub("", name)
+    bucket = _length_bucket(len(compact))
+    prefix = compact[:_PREFIX_LEN]
+    phonetic = phonetic_key(compact)
+    rare = sorted(grams, key=gram_rank.__getitem__)[:_RARE_NGRAMS]
+    gram_keys = [("g",) + pair for pair in combinations(sorted(rare), 2)] or [("g",) + tuple(rare)]
+    index_keys = [("p", prefix, bucket), ("s", phonetic, bucket)] + gram_keys
+    probe_keys = [
+        ("p", prefix, bucket - 1), ("p", prefix, bucket), ("p", prefix, bucket + 1),
+        ("s", phonetic, bucket - 1), ("s", phonetic, bucket), ("s", phonetic, bucket + 1),
+    ] + gram_keys
+    return index_keys, probe_keys
+
+
+# PURPOSE: Fuzzy deduplication that scales to 100k+ names.
+# DEPENDENCIES: difflib (scoring).
+# MODIFICATION NOTES: Same greedy keep-first rule and threshold as the pairwise scan; only kept names
+#   sharing a block with the current name are scored. Approximate: a similar pair sharing no block is
+#   not merged (4 of ~2k synthetic names differ from the exact scan; see PERFORMANCE_REPORT.md §10.7).
+def blocked_fuzzy_deduplicate(names: List[str], similarity_threshold: float = 0.85) -> List[str]:
+    """
+    Drop names similar to an earlier kept name, scoring only blocked candidate pairs.
+    
+    Candidates share a normalized prefix, a phonetic key (both within neighbouring length
+    buckets) or a pair of the current name's rarest character trigrams. Scoring uses the same
+    SequenceMatcher ratio as similarity_ratio, so every merge is one the exact scan would make.
+    The result is approximate in the other direction: a similar pair that shares no block (for
+    example "Visa" / "Via") is never scored, so both names are kept.
+    
+    Args:
+        names: Unique entity names, in priority order.
+        similarity_threshold: Minimum similarity to consider duplicates (default: 0.85).
+        
+    Returns:
+        Kept names in input order.
+    """
+    lowered = [entity.lower() for entity in names]
+    gram_sets = [_ngrams(name) for name in lowered]
+    # Rarest n-grams first (ties broken alphabetically so results do not depend on hash seeds)
+    frequency: Counter = Counter(gram for grams in gram_sets for gram in grams)
+    gram_rank = {gram: rank for rank, gram in enumerate(sorted(frequency, key=lambda g: (frequency[g], g)))}
+    blocks: Dict[tuple, List[int]] = defaultdict(list)
+    kept: List[str] = []
+    kept_lower: List[str] = []
+    kept_profiles: List[Tuple[int, Tuple[int, ...]]] = []
+    
+    for entity, entity_lower, grams in zip(names, lowered, gram_sets):
+        profile = _char_profile(entity_lower)
+        index_keys, probe_keys = _block_keys(entity_lower, grams, gram_rank)
+        candidates = set().union(*(blocks.get(key, ()) for key in probe_keys))
+        duplicate_of = next(
+            (i for i in sorted(candidates)
+             if _is_similar(entity_lower, profile, kept_lower[i], kept_profiles[i], similarity_threshold)),
+            None,
+        )
+        if duplicate_of is not None:
+            logger.debug(f"Merging similar entities: '{entity}' -> '{kept[duplicate_of]}'")
+            continue
+        position = len(kept)
+        kept.append(entity)
+        kept_lower.append(entity_lower)
+        kept_profiles.append(profile)
+        for key in index_keys:
+            block = blocks[key]
+            if len(block) < _MAX_BLOCK_SIZE:
+                block.append(position)
+    
+    return kept
+
+
 def deduplicate_entities(entities: Dict[str, List[str]], similarity_threshold: float = 0.85) -> Dict[str, List[str]]:
     """
     Deduplicate entities by removing similar/duplicate names.
@@ -123,18 +302,12 @@ def deduplicate_entities(entities: Dict[str, List[str]], similarity_threshold: f
         # Remove exact duplicates
         unique_entities = list(dict.fromkeys(normalized_entities))  # Preserves order
         
-        # For very large entity lists, skip expensive fuzzy matching
-        # Fuzzy matching is O(n²) and becomes prohibitively slow with thousands of entities
-        MAX_ENTITIES_FOR_FUZZY = 500
-        if len(unique_entities) > MAX_ENTITIES_FOR_FUZZY:
-            logger.warning(
-                f"Skipping fuzzy deduplication for {category} ({len(unique_entities)} entities). "
-                f"Using exact deduplication only. Consider filtering entities before extraction."
-            )
-            deduplicated[category] = sorted(unique_entities)
+        # Large lists: blocked candidate generation instead of the O(n²) pairwise scan
+        if len(unique_entities) > EXACT_FUZZY_LIMIT:
+            deduplicated[category] = sorted(blocked_fuzzy_deduplicate(unique_entities, similarity_threshold))
             continue
         
-        # Remove similar entities (fuzzy matching) - only for smaller lists
+        # Remove similar entities (fuzzy matching) - exact pairwise scan for smaller lists
         final_entities = []
         seen = set()
         
@@ -168,21 +341,10 @@ def filter_common_false_positives(entities: Dict[str, List[str]]) -> Dict[str, L
     Returns:
         Filtered entities dictionary.
     """
-    # Common false positives for RPG documents
-    false_positives = {
-        "NPCs": {"Player", "Character", "PC", "NPC", "GM", "DM"},
-        "Factions": {"Faction", "Group", "Organization", "Alliance"},
-        "Locations": {"Location", "Place", "Area", "Region", "Zone"},
-        "Items": {"Item", "Object", "Thing", "Equipment", "Gear"},
-    }
-    
     filtered = {}
     for category, entity_list in entities.items():
-        fp_set = false_positives.get(category, set())
-        filtered[category] = [
-            entity for entity in entity_list
-            if entity not in fp_set and entity.lower() not in {fp.lower() for fp in fp_set}
-        ]
+        fp_set = _FALSE_POSITIVES.get(category, frozenset())
+        filtered[category] = [entity for entity in entity_list if entity.lower() not in fp_set]
     
     return filtered
 
@@ -11,6 +11,7 @@ from extractors.pdfplus_extractor import PDFPlusExtractor
 from extractors.pypdf_extractor import PyPDFExtractor
 from extractors.pdfplumber_extractor import PDFPlumberExtractor
 from extractors.ocr_extractor import OCRExtractor
+from ocr_processor import DEFAULT_WINDOW_PAGES, default_ocr_workers
 
 logger = logging.getLogger(__name__)
 
@@ -35,20 +36,28 @@ class ExtractorChain:
         # Add OCR if enabled
         ocr_config = config.get("ocr", {})
         if ocr_config.get("enabled", False):
+            cache_dir = ocr_config.get("output_dir")
+            if cache_dir and config.get("vault_root") and not Path(cache_dir).is_absolute():
+                cache_dir = Path(config["vault_root"]) / cache_dir
             self.extractors.append(OCRExtractor(
                 tesseract_path=ocr_config.get("tesseract_path"),
                 language=ocr_config.get("language", "eng"),
-                dpi=ocr_config.get("dpi", 300)
+                dpi=ocr_config.get("dpi", 300),
+                workers=ocr_config.get("workers") or default_ocr_workers(),
+                window_pages=ocr_config.get("window_pages", DEFAULT_WINDOW_PAGES),
+                max_in_flight=ocr_config.get("max_in_flight"),
+                cache_dir=cache_dir,
             ))
             logger.info("OCR extractor enabled in chain")
     
-    def extract(self, pdf_path: Path, vault_root: Path) -> Tuple[str, Optional[Path], dict]:
+    def extract(self, pdf_path: Path, vault_root: Path, document=None) -> Tuple[str, Optional[Path], dict]:
         """
         Try extractors in order until one succeeds.
         
         Args:
             pdf_path: Path to PDF file
             vault_root: Root directory of the vault
+            document: Optional pdf_document.PDFDocument shared with metadata/table extraction
             
         Returns:
             Tuple of (text, source_path, metadata)
@@ -56,7 +65,7 @@ class ExtractorChain:
         for extractor in self.extractors:
             if extractor.can_extract(pdf_path):
                 try:
-                    text, source_path, metadata = extractor.extract(pdf_path, vault_root=vault_root)
+                    text, source_path, metadata = extractor.extract(pdf_path, vault_root=vault_root, document=document)
                     if text.strip():  # Success if we got text
                         logger.debug(f"Extraction succeeded with {metadata.get('method', 'unknown')} for {pdf_path.name}")
                         return text, source_path, metadata
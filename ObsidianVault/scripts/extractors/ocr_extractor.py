@@ -1,12 +1,14 @@
 # PURPOSE: OCR-based text extraction using Tesseract.
 # DEPENDENCIES: pytesseract, pdf2image, Tesseract OCR installed.
-# MODIFICATION NOTES: Phase 1 - OCR integration for scanned PDFs.
+# MODIFICATION NOTES: Phase 1 - OCR integration for scanned PDFs. Pages are rasterized and recognized in
+#   bounded windows by ocr_processor.ocr_pdf_pages, with optional per-page resume cache.
 
 import logging
 from pathlib import Path
 from typing import Optional, Tuple
 
 from extractors.base_extractor import TextExtractor
+from ocr_processor import DEFAULT_WINDOW_PAGES, OCRPageCache, ocr_pdf_pages
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +16,16 @@ logger = logging.getLogger(__name__)
 class OCRExtractor(TextExtractor):
     """OCR-based text extractor using Tesseract."""
     
-    def __init__(self, tesseract_path: Optional[str] = None, language: str = "eng", dpi: int = 300):
+    def __init__(
+        self,
+        tesseract_path: Optional[str] = None,
+        language: str = "eng",
+        dpi: int = 300,
+        workers: int = 1,
+        window_pages: int = DEFAULT_WINDOW_PAGES,
+        max_in_flight: Optional[int] = None,
+        cache_dir: Optional[Path] = None,
+    ):
         """
         Initialize OCR extractor.
         
@@ -22,10 +33,18 @@ class OCRExtractor(TextExtractor):
             tesseract_path: Path to tesseract executable (None for auto-detect)
             language: OCR language code (default: "eng")
             dpi: DPI for PDF-to-image conversion (default: 300)
+            workers: Parallel tesseract workers (default: 1)
+            window_pages: Pages rasterized per window (default: 4)
+            max_in_flight: Most page images held in memory at once (default: workers + window_pages)
+            cache_dir: Directory for per-page resume caches (None disables caching)
         """
         self.tesseract_path = tesseract_path
         self.language = language
         self.dpi = dpi
+        self.workers = workers
+        self.window_pages = window_pages
+        self.max_in_flight = max_in_flight
+        self.cache_dir = Path(cache_dir) if cache_dir else None
         self._available = self._check_dependencies()
     
     def _check_dependencies(self) -> bool:
@@ -67,31 +86,38 @@ class OCRExtractor(TextExtractor):
             import pytesseract
             from pdf2image import convert_from_path
             
-            # Convert PDF to images
-            images = convert_from_path(str(pdf_path), dpi=self.dpi)
+            def recognize(image, page_num: int) -> dict:
+                # Get text and confidence
+                data = pytesseract.image_to_data(
+                    image, 
+                    lang=self.language, 
+                    output_type=pytesseract.Output.DICT
+                )
+                page_text = pytesseract.image_to_string(image, lang=self.language)
+                # Calculate average confidence for page
+                confs = [int(conf) for conf in data['conf'] if conf != '-1']
+                avg_conf = sum(confs) / len(confs) if confs else 0
+                return {"text": page_text, "confidence": avg_conf}
             
-            # Extract text from each page
-            texts = []
-            confidences = []
-            for i, image in enumerate(images):
-                try:
-                    # Get text and confidence
-                    data = pytesseract.image_to_data(
-                        image, 
-                        lang=self.language, 
-                        output_type=pytesseract.Output.DICT
-                    )
-                    page_text = pytesseract.image_to_string(image, lang=self.language)
-                    texts.append(page_text)
-                    
-                    # Calculate average confidence for page
-                    confs = [int(conf) for conf in data['conf'] if conf != '-1']
-                    avg_conf = sum(confs) / len(confs) if confs else 0
-                    confidences.append(avg_conf)
-                except Exception as e:
-                    logger.warning(f"OCR failed for page {i+1} of {pdf_path.name}: {e}")
-                    texts.append("")
-                    confidences.append(0)
+            page_cache = None
+            if self.cache_dir:
+                page_cache = OCRPageCache.for_pdf(
+                    pdf_path, self.cache_dir, {"extractor": "ocr", "language": self.language, "dpi": self.dpi}
+                )
+            
+            # Rasterize and recognize page windows (failed pages come back as None)
+            pages = ocr_pdf_pages(
+                pdf_path,
+                recognize,
+                dpi=self.dpi,
+                workers=self.workers,
+                window_pages=self.window_pages,
+                max_in_flight=self.max_in_flight,
+                page_cache=page_cache,
+                convert=convert_from_path,
+            )
+            texts = [(result or {}).get("text", "") for result in pages.values()]
+            confidences = [(result or {}).get("confidence", 0) for result in pages.values()]
             
             full_text = "\n\n".join(texts)
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0
@@ -99,7 +125,7 @@ class OCRExtractor(TextExtractor):
             metadata = {
                 "method": "ocr",
                 "confidence": avg_confidence,
-                "pages": len(images),
+                "pages": len(pages),
                 "language": self.language,
                 "dpi": self.dpi,
                 "success": True
@@ -1,6 +1,6 @@
 # PURPOSE: pdfplumber-based text extractor.
 # DEPENDENCIES: pdfplumber library.
-# MODIFICATION NOTES: Phase 1 - Extracted from ingest_pdfs.py for modularity.
+# MODIFICATION NOTES: Phase 1 - Extracted from ingest_pdfs.py for modularity. Uses a shared PDFDocument when given.
 
 import logging
 from pathlib import Path
@@ -36,7 +36,7 @@ class PDFPlumberExtractor(TextExtractor):
         
         Args:
             pdf_path: Path to PDF file
-            **kwargs: Unused
+            **kwargs: document - optional shared PDFDocument (parsed once per PDF)
             
         Returns:
             Tuple of (text, source_path, metadata)
@@ -45,14 +45,20 @@ class PDFPlumberExtractor(TextExtractor):
             return "", None, {"method": "pdfplumber", "error": "pdfplumber not available"}
         
         try:
-            import pdfplumber  # type: ignore
-            
-            with pdfplumber.open(str(pdf_path)) as pdf:
-                text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+            document = kwargs.get("document")
+            if document is not None:
+                text = document.text("pdfplumber")
+                page_count = document.page_count("pdfplumber")
+            else:
+                import pdfplumber  # type: ignore
+
+                with pdfplumber.open(str(pdf_path)) as pdf:
+                    text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+                    page_count = len(pdf.pages)
             
             metadata = {
                 "method": "pdfplumber",
-                "pages": len(pdf.pages),
+                "pages": page_count,
                 "success": True
             }
             
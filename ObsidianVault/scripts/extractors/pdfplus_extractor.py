@@ -1,13 +1,14 @@
 # PURPOSE: PDF++ cache text extractor.
 # DEPENDENCIES: PDF++ plugin cache directories.
-# MODIFICATION NOTES: Phase 1 - Extracted from ingest_pdfs.py for modularity.
+# MODIFICATION NOTES: Phase 1 - Extracted from ingest_pdfs.py for modularity. Lookups go through the shared
+#   cache_index.CacheIndex (no rglob per PDF).
 
 import logging
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
+from typing import Optional, Tuple
 
+from cache_index import find_pdfplus_text, index_path_from_config
 from extractors.base_extractor import TextExtractor
-from utils import sanitize_cache_dir, validate_vault_path
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ class PDFPlusExtractor(TextExtractor):
         """
         self.cache_dirs = config.get("pdf_text_cache_dirs", [])
         self.extensions = config.get("pdf_text_cache_extensions", [".txt", ".md"])
+        self.config = config
     
     def can_extract(self, pdf_path: Path) -> bool:
         """PDF++ can extract if cache is available."""
@@ -69,7 +71,7 @@ class PDFPlusExtractor(TextExtractor):
         vault_root: Path,
     ) -> Optional[Path]:
         """
-        Find extracted text file for a PDF in PDF++ cache directories.
+        Find extracted text file for a PDF in PDF++ cache directories (shared cache index).
         
         Args:
             pdf_path: Path to the PDF file.
@@ -78,32 +80,5 @@ class PDFPlusExtractor(TextExtractor):
         Returns:
             Path to extracted text file if found, None otherwise.
         """
-        stem = pdf_path.stem
-        for rel_dir in self.cache_dirs:
-            try:
-                # Sanitize directory name to prevent path traversal
-                sanitized_dir = sanitize_cache_dir(rel_dir)
-                cache_root = vault_root / sanitized_dir
-                cache_root = validate_vault_path(vault_root, cache_root.resolve())
-                
-                if not cache_root.exists():
-                    continue
-                
-                for ext in self.extensions:
-                    # Validate extension doesn't contain path separators
-                    if "/" in ext or "\\" in ext:
-                        logger.warning(f"Invalid extension contains path separator: {ext}")
-                        continue
-                    
-                    candidates = list(cache_root.rglob(f"{stem}{ext}"))
-                    if candidates:
-                        # Validate the found file is within vault
-                        found_path = validate_vault_path(vault_root, candidates[0])
-                        return found_path
-            except ValueError as e:
-                logger.warning(f"Invalid cache directory '{rel_dir}': {e}")
-                continue
-            except Exception as e:
-                logger.warning(f"Error searching cache directory '{rel_dir}': {e}")
-                continue
-        return None
+        index_path = index_path_from_config(vault_root, self.config)
+        return find_pdfplus_text(pdf_path, vault_root, self.cache_dirs, self.extensions, index_path=index_path)
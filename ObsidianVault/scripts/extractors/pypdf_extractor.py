@@ -1,6 +1,6 @@
 # PURPOSE: pypdf-based text extractor.
 # DEPENDENCIES: pypdf library.
-# MODIFICATION NOTES: Phase 1 - Extracted from ingest_pdfs.py for modularity.
+# MODIFICATION NOTES: Phase 1 - Extracted from ingest_pdfs.py for modularity. Uses a shared PDFDocument when given.
 
 import logging
 from pathlib import Path
@@ -36,7 +36,7 @@ class PyPDFExtractor(TextExtractor):
         
         Args:
             pdf_path: Path to PDF file
-            **kwargs: Unused
+            **kwargs: document - optional shared PDFDocument (parsed once per PDF)
             
         Returns:
             Tuple of (text, source_path, metadata)
@@ -45,14 +45,20 @@ class PyPDFExtractor(TextExtractor):
             return "", None, {"method": "pypdf", "error": "pypdf not available"}
         
         try:
-            from pypdf import PdfReader  # type: ignore
-            
-            reader = PdfReader(str(pdf_path))
-            text = "\n".join(page.extract_text() or "" for page in reader.pages)
+            document = kwargs.get("document")
+            if document is not None:
+                text = document.text("pypdf")
+                page_count = document.page_count("pypdf")
+            else:
+                from pypdf import PdfReader  # type: ignore
+
+                reader = PdfReader(str(pdf_path))
+                text = "\n".join(page.extract_text() or "" for page in reader.pages)
+                page_count = len(reader.pages)
             
             metadata = {
                 "method": "pypdf",
-                "pages": len(reader.pages),
+                "pages": page_count,
                 "success": True
             }
             
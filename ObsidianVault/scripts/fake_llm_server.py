@@ -0,0 +1,395 @@
+# PURPOSE: Local fake LLM server speaking the Ollama, OpenAI and Anthropic HTTP APIs for benchmarks and tests.
+# DEPENDENCIES: stdlib only (http.server, threading).
+# MODIFICATION NOTES: Configurable base latency, tokens/sec, response length and failure rate; records
+#   per-request intervals so callers can separate LLM wait time from pipeline overhead.
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORDS = (
+    "the", "servitor", "hive", "warp", "promethium", "inquisitor", "faith", "void", "cold", "machine",
+    "spirit", "relic", "heresy", "forge", "sector", "cult", "astartes", "entropy", "shrine", "decay",
+)
+
+
+class FakeLLMSettings:
+    """Behaviour knobs for the fake server (mutable while the server runs)."""
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        tokens_per_sec: float = 200.0,
+        response_tokens: int = 120,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        retry_after: float = 0.1,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            latency_ms: Fixed time-to-first-token added to every generation request.
+            tokens_per_sec: Simulated decode speed; output tokens / tokens_per_sec is added to latency.
+            response_tokens: Output tokens per response (capped by the request's max_tokens / num_predict).
+            failure_rate: Probability (0..1) that a generation request fails.
+            failure_status: HTTP status for injected failures (429 adds Retry-After).
+            retry_after: Retry-After seconds sent with injected 429s.
+            seed: RNG seed so failure injection is reproducible.
+        """
+        self.latency_ms = latency_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.response_tokens = response_tokens
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def should_fail(self) -> bool:
+        if self.failure_rate <= 0:
+            return False
+        with self.rng_lock:
+            return self.rng.random() < self.failure_rate
+
+
+class _FakeLLMHandler(BaseHTTPRequestHandler):
+    server: "_FakeHTTPServer"
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"{}")
+        except ValueError:
+            return {}
+
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        fake = self.server.fake
+        if self.path.startswith("/api/tags"):
+            models = [{"name": f"{m}:latest", "model": f"{m}:latest", "size": 0} for m in fake.models]
+            self._send_json(200, {"models": models})
+        elif self.path.startswith("/api/version"):
+            self._send_json(200, {"version": "0.0.0-fake"})
+        elif self.path.startswith("/v1/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": m, "object": "model"} for m in fake.models]})
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        fake = self.server.fake
+        payload = self._read_json()
+        routes = {
+            "/api/generate": fake._ollama_generate,
+            "/api/chat": fake._ollama_chat,
+            "/v1/chat/completions": fake._openai_chat,
+            "/v1/messages": fake._anthropic_messages,
+        }
+        handler = routes.get(self.path.split("?", 1)[0])
+        if handler is None:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        status, body, headers = handler(payload)
+        self._send_json(status, body, headers)
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: "FakeLLMServer"
+
+
+class FakeLLMServer:
+    """In-process fake LLM endpoint; use as a context manager or start()/stop()."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        settings: Optional[FakeLLMSettings] = None,
+        models: Optional[List[str]] = None,
+    ):
+        self.settings = settings or FakeLLMSettings()
+        self.models = models or ["llama2", "gpt-4", "claude-3-sonnet"]
+        self._httpd = _FakeHTTPServer((host, port), _FakeLLMHandler)
+        self._httpd.fake = self
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._intervals: List[Tuple[float, float]] = []
+        self._counts = {"requests": 0, "failures": 0, "prompt_tokens": 0, "output_tokens": 0}
+        self._cached_prefixes: set = set()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # ---- simulation -------------------------------------------------------
+
+    def _simulate(self, prompt: str, max_tokens: Optional[int]) -> Optional[Tuple[str, int, int, float]]:
+        """Sleep like a model would; returns (text, prompt_tokens, output_tokens, seconds) or None on injected failure."""
+        start = time.perf_counter()
+        failed = self.settings.should_fail()
+        prompt_tokens = max(1, len(prompt) // 4)
+        output_tokens = 0 if failed else min(self.settings.response_tokens, max_tokens or self.settings.response_tokens)
+        delay = self.settings.latency_ms / 1000.0
+        if output_tokens and self.settings.tokens_per_sec > 0:
+            delay += output_tokens / self.settings.tokens_per_sec
+        if failed:
+            delay = min(delay, self.settings.latency_ms / 1000.0)
+        time.sleep(delay)
+        end = time.perf_counter()
+        with self._lock:
+            self._intervals.append((start, end))
+            self._counts["requests"] += 1
+            if failed:
+                self._counts["failures"] += 1
+            else:
+                self._counts["prompt_tokens"] += prompt_tokens
+                self._counts["output_tokens"] += output_tokens
+        if failed:
+            return None
+        with self.settings.rng_lock:
+            words = [self.settings.rng.choice(_WORDS) for _ in range(output_tokens)]
+        return " ".join(words), prompt_tokens, output_tokens, end - start
+
+    def _failure(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        status = self.settings.failure_status
+        headers = {"Retry-After": str(self.settings.retry_after)} if status == 429 else {}
+        return status, body, headers
+
+    @staticmethod
+    def _messages_text(messages: List[Dict[str, Any]]) -> str:
+        parts = []
+        for message in messages or []:
+            content = message.get("content", "")
+            if isinstance(content, list):
+                content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+            parts.append(str(content))
+        return "\n".join(parts)
+
+    def _ollama_generate(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        model = payload.get("model", "llama2")
+        prompt = payload.get("prompt") or ""
+        if not prompt:
+            # Empty prompt = load / keep_alive refresh.
+            return 200, {"model": model, "response": "", "done": True, "done_reason": "load", "load_duration": 0}, {}
+        result = self._simulate(prompt, (payload.get("options") or {}).get("num_predict"))
+        if result is None:
+            return self._failure({"error": "fake failure"})
+        text, prompt_tokens, output_tokens, seconds = result
+        return 200, {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "response": text,
+            "done": True,
+            "total_duration": int(seconds * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": output_tokens,
+        }, {}
+
+    def _ollama_chat(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        model = payload.get("model", "llama2")
+        prompt = self._messages_text(payload.get("messages", []))
+        result = self._simulate(prompt, (payload.get("options") or {}).get("num_predict"))
+        if result is None:
+            return self._failure({"error": "fake failure"})
+        text, prompt_tokens, output_tokens, seconds = result
+        return 200, {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": text},
+            "done": True,
+            "total_duration": int(seconds * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "eval_count": output_tokens,
+        }, {}
+
+    def _openai_chat(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        model = payload.get("model", "gpt-4")
+        prompt = self._messages_text(payload.get("messages", []))
+        result = self._simulate(prompt, payload.get("max_tokens") or payload.get("max_completion_tokens"))
+        if result is None:
+            return self._failure({"error": {"message": "fake failure", "type": "server_error"}})
+        text, prompt_tokens, output_tokens, _ = result
+        return 200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+            },
+        }, {"x-ratelimit-limit-requests": "10000", "x-ratelimit-remaining-requests": "9999"}
+
+    def _anthropic_messages(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        model = payload.get("model", "claude-3-sonnet")
+        prompt = self._messages_text(payload.get("messages", []))
+        result = self._simulate(prompt, payload.get("max_tokens"))
+        if result is None:
+            return self._failure({"type": "error", "error": {"type": "overloaded_error", "message": "fake failure"}})
+        text, prompt_tokens, output_tokens, _ = result
+        cache_read, cache_write = self._anthropic_cache(payload.get("messages", []))
+        return 200, {
+            "id": f"msg_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {
+                "input_tokens": max(prompt_tokens - cache_read - cache_write, 0),
+                "output_tokens": output_tokens,
+                "cache_read_input_tokens": cache_read,
+                "cache_creation_input_tokens": cache_write,
+            },
+        }, {}
+
+    def _anthropic_cache(self, messages: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Emulate prompt caching: blocks with cache_control are read from cache once seen."""
+        read = write = 0
+        for message in messages:
+            content = message.get("content")
+            if not isinstance(content, list):
+                continue
+            for block in content:
+                if not isinstance(block, dict) or not block.get("cache_control"):
+                    continue
+                block_text = block.get("text", "")
+                tokens = max(1, len(block_text) // 4)
+                with self._lock:
+                    if block_text in self._cached_prefixes:
+                        read += tokens
+                    else:
+                        self._cached_prefixes.add(block_text)
+                        write += tokens
+        return read, write
+
+    # ---- stats ------------------------------------------------------------
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._intervals.clear()
+            for key in self._counts:
+                self._counts[key] = 0
+
+    def busy_seconds(self, start: Optional[float] = None, end: Optional[float] = None) -> float:
+        """
+        Wall time during which at least one request was being served (overlapping calls counted once).
+
+        Args:
+            start: Optional perf_counter window start.
+            end: Optional perf_counter window end.
+        """
+        with self._lock:
+            intervals = sorted(self._intervals)
+        lo = float("-inf") if start is None else start
+        hi = float("inf") if end is None else end
+        total = 0.0
+        cur_start: Optional[float] = None
+        cur_end = 0.0
+        for s, e in intervals:
+            s, e = max(s, lo), min(e, hi)
+            if e <= s:
+                continue
+            if cur_start is None or s > cur_end:
+                if cur_start is not None:
+                    total += cur_end - cur_start
+                cur_start, cur_end = s, e
+            else:
+                cur_end = max(cur_end, e)
+        if cur_start is not None:
+            total += cur_end - cur_start
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            result: Dict[str, Any] = dict(self._counts)
+        result["busy_seconds"] = round(self.busy_seconds(), 4)
+        return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a fake Ollama/OpenAI/Anthropic-compatible LLM server.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=11435, help="Port to bind (default: 11435)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Base latency per request (default: 50)")
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0, help="Simulated decode speed (default: 200)")
+    parser.add_argument("--response-tokens", type=int, default=120, help="Output tokens per response (default: 120)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests that fail (default: 0)")
+    parser.add_argument("--failure-status", type=int, default=503, help="HTTP status for failures (default: 503)")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed (default: 0)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    settings = FakeLLMSettings(
+        latency_ms=args.latency_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        response_tokens=args.response_tokens,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        seed=args.seed,
+    )
+    server = FakeLLMServer(args.host, args.port, settings=settings).start()
+    print(f"Fake LLM server listening on {server.url} (Ollama: /api/*, OpenAI: /v1/chat/completions)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# PURPOSE: Python ingest manifest so ingest_pdfs skips PDFs that are unchanged since their last successful run.
+# DEPENDENCIES: utils.sampled_file_hash / full_file_hash; stdlib json.
+# MODIFICATION NOTES: Entries are keyed by vault-relative PDF path and hold size, mtime, a sampled content hash,
+#   the pipeline version, an options fingerprint and the notes written. A PDF whose size and mtime
+#   match is skipped with one stat (no read); an mtime-only change is skipped only if the sampled hash and then
+#   the full-file hash recorded at ingest both match (as the OCR cache does). Independent of
+#   the PowerShell ingest_pdf_cache.json / ingest_state.json files.
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils import full_file_hash, sampled_file_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "Sources/_ingest_manifest.json"
+MANIFEST_FORMAT = 1
+
+# Config sections whose values change ingest output; a change re-processes every PDF
+OPTION_KEYS = (
+    "features",
+    "ocr",
+    "table_extraction",
+    "entity_extraction",
+    "ai_summarization",
+    "max_excerpt_chars",
+    "templates",
+)
+
+
+def vault_key(path: Path, vault_root: Path) -> str:
+    """Path relative to the vault (POSIX), or absolute if outside it; the key for per-PDF state."""
+    path = Path(path)
+    try:
+        return path.resolve().relative_to(Path(vault_root).resolve()).as_posix()
+    except ValueError:
+        return path.resolve().as_posix()
+
+
+def options_fingerprint(config: Dict[str, Any], keys: Iterable[str] = OPTION_KEYS) -> str:
+    """Stable hash of the output-affecting config sections."""
+    selected = {key: config.get(key) for key in keys}
+    payload = json.dumps(selected, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class IngestManifest:
+    """
+    JSON manifest of successfully ingested PDFs.
+
+    Call needs_processing() for each PDF, record() after it was ingested, and save() at the end of the run.
+    Thread-safe; record() may be called from worker threads.
+    """
+
+    def __init__(self, path: Path, vault_root: Path, pipeline_version: str, options: str):
+        self.path = Path(path)
+        self.vault_root = Path(vault_root)
+        self.pipeline_version = str(pipeline_version)
+        self.options = options
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._observed: Dict[str, Tuple[int, int, Optional[str], Optional[str]]] = {}
+        self._dirty = False
+        self.stats: Dict[str, int] = {"skipped": 0, "new": 0, "changed": 0, "stale": 0, "hashed": 0}
+        self._load()
+
+    @classmethod
+    def from_config(
+        cls,
+        manifest_cfg: Optional[Dict[str, Any]],
+        vault_root: Path,
+        pipeline_version: str,
+        config: Dict[str, Any],
+    ) -> Optional["IngestManifest"]:
+        """
+        Open the manifest from an ingest_manifest config section.
+
+        Args:
+            manifest_cfg: {"enabled": bool, "path": str | None}
+            vault_root: Base directory for a relative path and for entry keys
+            pipeline_version: Ingest pipeline version; a change re-processes every PDF
+            config: Full ingest config, fingerprinted with options_fingerprint
+
+        Returns:
+            IngestManifest, or None if disabled
+        """
+        manifest_cfg = manifest_cfg or {}
+        if not manifest_cfg.get("enabled", True):
+            return None
+        path = Path(manifest_cfg.get("path") or DEFAULT_PATH)
+        if not path.is_absolute():
+            path = Path(vault_root) / path
+        return cls(path, vault_root, pipeline_version, options_fingerprint(config))
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ingest manifest {self.path}: {e}")
+            return
+        if data.get("format") == MANIFEST_FORMAT:
+            self._entries = dict(data.get("entries") or {})
+
+    def key(self, pdf_path: Path) -> str:
+        """Entry key: PDF path relative to the vault (POSIX), or absolute if outside it."""
+        return vault_key(pdf_path, self.vault_root)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, pdf_path: Path) -> bool:
+        return self.key(pdf_path) in self._entries
+
+    def needs_processing(self, pdf_path: Path) -> bool:
+        """
+        True unless the PDF was ingested before with the same content, pipeline version and options.
+
+        Unchanged size and mtime skip without reading the file. After an mtime-only change the sampled
+        hash is compared first and a match is confirmed with the full-file hash (an entry without one is
+        re-processed). A missing note (any recorded for the PDF) also forces re-processing.
+        """
+        key = self.key(pdf_path)
+        stat = Path(pdf_path).stat()
+        observed = (stat.st_size, stat.st_mtime_ns, None, None)
+        with self._lock:
+            entry = self._entries.get(key)
+        reason = None
+        if entry is None:
+            reason = "new"
+        elif entry.get("pipeline") != self.pipeline_version or entry.get("options") != self.options:
+            reason = "stale"
+        elif any(not (self.vault_root / note).exists() for note in entry.get("notes") or [entry.get("note")] if note):
+            reason = "stale"
+        elif entry.get("size") != stat.st_size:
+            reason = "changed"
+        elif entry.get("mtime_ns") != stat.st_mtime_ns:
+            # Touched or copied: compare content before deciding (sampled blocks, then the whole file)
+            digest = sampled_file_hash(Path(pdf_path), size=stat.st_size)
+            self.stats["hashed"] += 1
+            full = None
+            if digest == entry.get("hash") and entry.get("full"):
+                full = full_file_hash(Path(pdf_path))
+            observed = (stat.st_size, stat.st_mtime_ns, digest, full)
+            if full is not None and full == entry["full"]:
+                with self._lock:
+                    entry["mtime_ns"] = stat.st_mtime_ns
+                    self._dirty = True
+            else:
+                reason = "changed"
+        with self._lock:
+            self._observed[key] = observed
+            if reason is None:
+                self.stats["skipped"] += 1
+                return False
+            self.stats[reason] += 1
+        return True
+
+    def _relative(self, path: Path) -> Optional[str]:
+        try:
+            return Path(path).resolve().relative_to(self.vault_root.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    def record(self, pdf_path: Path, note_path: Optional[Path] = None, notes: Iterable[Path] = ()) -> None:
+        """
+        Mark a PDF as successfully ingested with the current pipeline version and options.
+
+        Args:
+            pdf_path: The PDF.
+            note_path: Its source note.
+            notes: Every other note written for it (extracted text, rule and entity notes).
+        """
+        key = self.key(pdf_path)
+        with self._lock:
+            observed = self._observed.pop(key, None)
+        if observed is None:
+            stat = Path(pdf_path).stat()
+            observed = (stat.st_size, stat.st_mtime_ns, None, None)
+        size, mtime_ns, digest, full = observed
+        if digest is None:
+            digest = sampled_file_hash(Path(pdf_path), size=size)
+        if full is None:
+            full = full_file_hash(Path(pdf_path))
+        note = self._relative(note_path) if note_path is not None else None
+        written = {self._relative(path) for path in notes}
+        written.add(note)
+        written.discard(None)
+        with self._lock:
+            self._entries[key] = {
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "hash": digest,
+                "full": full,
+                "pipeline": self.pipeline_version,
+                "options": self.options,
+                "note": note,
+                "notes": sorted(written),
+                "ingested": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            self._dirty = True
+
+    def invalidate(self, patterns: Iterable[str]) -> List[str]:
+        """
+        Drop entries so the matching PDFs are processed again.
+
+        Each pattern is first compared exactly with the entry key, the file name and the absolute path, so
+        names with brackets ("Core Rulebook [v1.2].pdf") match literally. Only a pattern with wildcards and
+        no exact match is then matched as a glob (fnmatch). Returns the removed keys.
+        """
+        patterns = [str(pattern).replace("\\", "/") for pattern in patterns]
+        removed = []
+        with self._lock:
+            targets = set()
+            for pattern in patterns:
+                exact = {pattern, self.key(Path(pattern)) if Path(pattern).is_absolute() else pattern}
+                matched = [
+                    key for key in self._entries
+                    if key in exact or key.rsplit("/", 1)[-1] == pattern
+                    or (self.vault_root / key).as_posix() == pattern
+                ]
+                if not matched and any(char in pattern for char in "*?["):
+                    matched = [
+                        key for key in self._entries
+                        if fnmatch.fnmatch(key, pattern) or fnmatch.fnmatch(key.rsplit("/", 1)[-1], pattern)
+                        or fnmatch.fnmatch((self.vault_root / key).as_posix(), pattern)
+                    ]
+                targets.update(matched)
+            for key in self._entries:
+                if key in targets:
+                    removed.append(key)
+            for key in removed:
+                del self._entries[key]
+            self._dirty = self._dirty or bool(removed)
+        return removed
+
+    def prune(self, pdf_paths: Iterable[Path]) -> List[str]:
+        """Drop entries for PDFs no longer present. Returns the removed keys."""
+        keep = {self.key(pdf_path) for pdf_path in pdf_paths}
+        with self._lock:
+            removed = [key for key in self._entries if key not in keep]
+            for key in removed:
+                del self._entries[key]
+            self._dirty = self._dirty or bool(removed)
+        return removed
+
+    def save(self) -> bool:
+        """Write the manifest atomically (temp file + rename). Returns False if nothing changed."""
+        with self._lock:
+            if not self._dirty:
+                return False
+            payload = json.dumps(
+                {"format": MANIFEST_FORMAT, "entries": self._entries}, indent=1, sort_keys=True
+            )
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=self.path.name, suffix=".tmp", dir=str(self.path.parent))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(payload)
+            os.replace(tmp_name, self.path)
+        except OSError:
+            with self._lock:
+                self._dirty = True
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        return True
@@ -17,10 +17,20 @@ from threading import Lock
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import quote as url_quote
 
+from cache_index import find_pdfplus_text as lookup_pdfplus_text, index_path_from_config
+from crossref_resolver import (
+    DEFAULT_RUN_BACKFILL_SECONDS,
+    get_resolver as get_crossref_resolver,
+    start_backfill_thread,
+)
+from entity_aggregate import EntityAggregateStore, count_mentions, document_hash
+from ingest_manifest import IngestManifest, vault_key
+from note_writer import DEFAULT_MAX_PENDING as DEFAULT_NOTE_BATCH_SIZE, NoteWriter
+from pdf_document import PDFDocument
+from process_pool import RecyclingProcessPool
 from utils import (
     get_config_path,
     load_config,
-    sanitize_cache_dir,
     truncate_text,
     validate_file_size,
     validate_vault_path,
@@ -34,6 +44,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Ingest output version recorded in the ingest manifest; bump it to re-process every PDF after a change
+PIPELINE_VERSION = "1"
+
 try:
     from extractors.extractor_chain import ExtractorChain
     EXTRACTOR_CHAIN_AVAILABLE = True
@@ -42,12 +55,18 @@ except ImportError:
     logger.warning("Extractor chain not available. Using legacy extraction.")
 
 try:
-    from entity_extractor import extract_entities_from_text, get_extractor
+    from entity_extractor import get_extractor
     ENTITY_EXTRACTION_AVAILABLE = True
 except ImportError:
     ENTITY_EXTRACTION_AVAILABLE = False
     logger.warning("Entity extraction not available. Install spaCy for automatic entity extraction.")
 
+try:
+    from entity_gazetteer import get_vault_gazetteer
+    GAZETTEER_AVAILABLE = True
+except ImportError:
+    GAZETTEER_AVAILABLE = False
+
 try:
     from error_handling import ErrorCollector, retry_with_backoff, with_fallback
     ERROR_HANDLING_AVAILABLE = True
@@ -204,12 +223,14 @@ def to_file_url(path: Path, vault_root: Optional[Path] = None) -> str:
 
 # PURPOSE: Find extracted text produced by PDF++ if present.
 # DEPENDENCIES: PDF++ cache directories (configurable).
-# MODIFICATION NOTES: Searches by PDF stem in configured cache paths. Validates paths.
+# MODIFICATION NOTES: Searches by PDF stem in configured cache paths. Validates paths. Looks up the shared
+#   incremental cache_index.CacheIndex instead of an rglob per PDF.
 def find_pdfplus_text(
     pdf_path: Path,
     vault_root: Path,
     cache_dirs: Iterable[str],
     extensions: Iterable[str],
+    index_path: Optional[Path] = None,
 ) -> Optional[Path]:
     """
     Find extracted text file for a PDF in PDF++ cache directories.
@@ -219,40 +240,17 @@ def find_pdfplus_text(
         vault_root: Root directory of the vault.
         cache_dirs: List of relative cache directory names.
         extensions: List of file extensions to search for.
+        index_path: Optional persisted cache index location (see cache_index.index_path_from_config).
         
     Returns:
         Path to extracted text file if found, None otherwise.
     """
     with profile_operation(f"find_pdfplus_text({pdf_path.name})", enable_memory=False):
-        stem = pdf_path.stem
-        for rel_dir in cache_dirs:
-            try:
-                # Sanitize directory name to prevent path traversal
-                sanitized_dir = sanitize_cache_dir(rel_dir)
-                cache_root = vault_root / sanitized_dir
-                cache_root = validate_vault_path(vault_root, cache_root.resolve())
-                
-                if not cache_root.exists():
-                    continue
-                
-                for ext in extensions:
-                    # Validate extension doesn't contain path separators
-                    if "/" in ext or "\\" in ext:
-                        logger.warning(f"Invalid extension contains path separator: {ext}")
-                        continue
-                    
-                    candidates = list(cache_root.rglob(f"{stem}{ext}"))
-                    if candidates:
-                        # Validate the found file is within vault
-                        found_path = validate_vault_path(vault_root, candidates[0])
-                        return found_path
-            except ValueError as e:
-                logger.warning(f"Invalid cache directory '{rel_dir}': {e}")
-                continue
-            except Exception as e:
-                logger.warning(f"Error searching cache directory '{rel_dir}': {e}")
-                continue
-        return None
+        try:
+            return lookup_pdfplus_text(pdf_path, vault_root, cache_dirs, extensions, index_path=index_path)
+        except Exception as e:
+            logger.warning(f"Error searching PDF++ cache for {pdf_path.name}: {e}")
+            return None
 
 
 # PURPOSE: Extract text for a PDF using extractor chain (PDF++ → pypdf → pdfplumber → OCR).
@@ -265,6 +263,7 @@ def extract_text(
     cache_dirs: Optional[Iterable[str]] = None,
     extensions: Optional[Iterable[str]] = None,
     config: Optional[Dict[str, object]] = None,
+    document=None,
 ) -> Tuple[str, Optional[Path], dict]:
     """
     Extract text from a PDF file using extractor chain.
@@ -279,6 +278,7 @@ def extract_text(
         cache_dirs: List of relative cache directory names (legacy fallback).
         extensions: List of file extensions to search for (legacy fallback).
         config: Optional configuration dictionary (legacy fallback).
+        document: Optional pdf_document.PDFDocument shared with metadata and table extraction.
         
     Returns:
         Tuple of (extracted_text, source_path, metadata).
@@ -289,7 +289,7 @@ def extract_text(
     with profile_operation(f"extract_text({pdf_path.name})", enable_memory=True):
         # Use extractor chain if available
         if extractor_chain and EXTRACTOR_CHAIN_AVAILABLE:
-            text, source_path, metadata = extractor_chain.extract(pdf_path, vault_root)
+            text, source_path, metadata = extractor_chain.extract(pdf_path, vault_root, document=document)
             
             # Record I/O if we read from a file
             if source_path:
@@ -313,7 +313,9 @@ def extract_text(
             logger.warning("Legacy extraction requires cache_dirs and extensions")
             return "", None, {"method": "none", "error": "Missing parameters"}
         
-        pdfplus_text = find_pdfplus_text(pdf_path, vault_root, cache_dirs, extensions)
+        pdfplus_text = find_pdfplus_text(
+            pdf_path, vault_root, cache_dirs, extensions, index_path=index_path_from_config(vault_root, config)
+        )
         if pdfplus_text and pdfplus_text.exists():
             try:
                 text = pdfplus_text.read_text(encoding="utf-8", errors="replace")
@@ -324,12 +326,15 @@ def extract_text(
 
         # Fallback to pypdf
         try:
-            from pypdf import PdfReader  # type: ignore
-
             pdf_size = pdf_path.stat().st_size
             record_io_read(str(pdf_path), pdf_size)
-            reader = PdfReader(str(pdf_path))
-            text = "\n".join(page.extract_text() or "" for page in reader.pages)
+            if document is not None:
+                text = document.text("pypdf")
+            else:
+                from pypdf import PdfReader  # type: ignore
+
+                reader = PdfReader(str(pdf_path))
+                text = "\n".join(page.extract_text() or "" for page in reader.pages)
             if text.strip():
                 logger.info(f"Extracted text using pypdf for {pdf_path.name}")
                 return text, None, {"method": "pypdf", "success": True}
@@ -340,12 +345,15 @@ def extract_text(
 
         # Fallback to pdfplumber
         try:
-            import pdfplumber  # type: ignore
-
             pdf_size = pdf_path.stat().st_size
             record_io_read(str(pdf_path), pdf_size)
-            with pdfplumber.open(str(pdf_path)) as pdf:
-                text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+            if document is not None:
+                text = document.text("pdfplumber")
+            else:
+                import pdfplumber  # type: ignore
+
+                with pdfplumber.open(str(pdf_path)) as pdf:
+                    text = "\n".join(page.extract_text() or "" for page in pdf.pages)
             if text.strip():
                 logger.info(f"Extracted text using pdfplumber for {pdf_path.name}")
                 return text, None, {"method": "pdfplumber", "success": True}
@@ -360,13 +368,19 @@ def extract_text(
 
 # PURPOSE: Write extracted text to a dedicated text file in the vault.
 # DEPENDENCIES: Vault write access.
-# MODIFICATION NOTES: Returns the path to the written file or None.
-def write_extracted_text(text: str, out_dir: Path, stem: str) -> Optional[Path]:
+# MODIFICATION NOTES: Returns the path to the written file or None. With a note_writer the write is staged
+#   (owner tags it with the PDF it came from).
+def write_extracted_text(
+    text: str, out_dir: Path, stem: str, note_writer: Optional[NoteWriter] = None, owner: Optional[str] = None
+) -> Optional[Path]:
     if not text.strip():
         return None
+    out_path = out_dir / f"{stem}.txt"
+    if note_writer is not None:
+        note_writer.write(out_path, text, overwrite=True, owner=owner)
+        return out_path
     with profile_operation(f"write_extracted_text({stem})", enable_memory=False):
         out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / f"{stem}.txt"
         out_path.write_text(text, encoding="utf-8")
         bytes_written = len(text.encode('utf-8'))
         record_io_write(str(out_path), bytes_written)
@@ -422,13 +436,17 @@ def inject_source_fields(content: str, source_path: str, source_link: str) -> st
 # PURPOSE: Extract PDF metadata (title, author, creation date).
 # DEPENDENCIES: pypdf library.
 # MODIFICATION NOTES: Returns dict with metadata or empty dict on failure.
-def extract_pdf_metadata(pdf_path: Path, text: Optional[str] = None) -> Dict[str, str]:
+def extract_pdf_metadata(
+    pdf_path: Path, text: Optional[str] = None, document=None, crossref_resolver=None
+) -> Dict[str, str]:
     """
     Extract metadata from PDF file with optional citation enrichment (Phase 2).
     
     Args:
         pdf_path: Path to PDF file.
         text: Optional document text for citation extraction.
+        document: Optional pdf_document.PDFDocument (reuses its parsed pypdf reader).
+        crossref_resolver: Optional crossref_resolver.CrossrefResolver for cached DOI lookups.
         
     Returns:
         Dictionary with metadata keys: title, author, subject, creator, creation_date, doi, isbn, etc.
@@ -436,27 +454,32 @@ def extract_pdf_metadata(pdf_path: Path, text: Optional[str] = None) -> Dict[str
     try:
         from metadata_extractor import extract_pdf_metadata as extract_metadata, enrich_metadata_with_citations
         
-        metadata = extract_metadata(pdf_path)
+        metadata = extract_metadata(pdf_path, document=document)
         
         # Enrich with citations if text provided
         if text:
-            metadata = enrich_metadata_with_citations(metadata, text)
+            metadata = enrich_metadata_with_citations(
+                metadata, text, resolver=crossref_resolver, source=pdf_path.resolve().as_posix()
+            )
         
         return metadata
     except ImportError:
         # Fallback to basic extraction
         logger.debug("metadata_extractor not available, using basic extraction")
-        return _extract_pdf_metadata_basic(pdf_path)
+        return _extract_pdf_metadata_basic(pdf_path, document=document)
 
 
-def _extract_pdf_metadata_basic(pdf_path: Path) -> Dict[str, str]:
+def _extract_pdf_metadata_basic(pdf_path: Path, document=None) -> Dict[str, str]:
     """Basic PDF metadata extraction (fallback)."""
     metadata = {}
     
     try:
-        from pypdf import PdfReader  # type: ignore
-        
-        reader = PdfReader(str(pdf_path))
+        if document is not None:
+            reader = document.reader
+        else:
+            from pypdf import PdfReader  # type: ignore
+
+            reader = PdfReader(str(pdf_path))
         pdf_metadata = reader.metadata
         
         if pdf_metadata:
@@ -724,6 +747,7 @@ def build_entity_note(
     entity_type: str,
     source_ref: str,
     created: str,
+    source_refs: Optional[Iterable[str]] = None,
 ) -> str:
     values = {
         "title": title,
@@ -731,17 +755,36 @@ def build_entity_note(
         "date": created,
     }
     content = render_template(template_path, values)
+    refs = sorted(set(source_refs or []) | {source_ref})
     content = content.replace(
         "source_refs: []",
-        f"source_refs: [\"{source_ref}\"]",
+        "source_refs: [" + ", ".join(f"\"{ref}\"" for ref in refs) + "]",
     )
     return content
 
 
+def aggregate_source_refs(entity_aggregate: Optional[EntityAggregateStore], category: str, name: str) -> List[str]:
+    """Source note links ([[title]]) of every ingested PDF the corpus aggregate lists for an entity."""
+    if entity_aggregate is None:
+        return []
+    try:
+        doc_keys = entity_aggregate.documents_for(category, name)
+    except Exception as e:
+        logger.debug(f"Entity aggregate lookup failed for {name}: {e}")
+        return []
+    return [f"[[{safe_note_name(Path(doc_key).stem)}]]" for doc_key in doc_keys]
+
+
 # PURPOSE: Write a note if it does not already exist.
 # DEPENDENCIES: Filesystem write access.
-# MODIFICATION NOTES: Optional overwrite behavior.
-def write_note(path: Path, content: str, overwrite: bool) -> None:
+# MODIFICATION NOTES: Optional overwrite behavior. With a note_writer the write is staged (skipped if unchanged;
+#   owner tags it with the PDF it came from).
+def write_note(
+    path: Path, content: str, overwrite: bool, note_writer: Optional[NoteWriter] = None, owner: Optional[str] = None
+) -> None:
+    if note_writer is not None:
+        note_writer.write(path, content, overwrite=overwrite, owner=owner)
+        return
     if path.exists() and not overwrite:
         return
     with profile_operation(f"write_note({path.name})", enable_memory=False):
@@ -750,44 +793,36 @@ def write_note(path: Path, content: str, overwrite: bool) -> None:
         record_io_write(str(path), bytes_written)
 
 
-# PURPOSE: Process a single PDF and create its notes.
-# DEPENDENCIES: Config paths, templates, and PDF text extraction.
-# MODIFICATION NOTES: Extracted from ingest_pdfs for parallel processing.
-def process_single_pdf(
+# PURPOSE: Parse one PDF: text, PDF metadata, tables and entities (no note writes).
+# DEPENDENCIES: Extractor chain or legacy extraction, metadata/table/entity extractors per config.
+# MODIFICATION NOTES: Split out of process_single_pdf so the CPU-heavy half can run in a worker
+#   process; the returned dict is picklable and consumed by write_pdf_notes in the parent.
+def analyze_pdf(
     pdf_path: Path,
     vault_root: Path,
-    source_notes_dir: Path,
-    rules_dir: Path,
-    npcs_dir: Path,
-    factions_dir: Path,
-    locations_dir: Path,
-    items_dir: Path,
-    extracted_text_dir: Path,
-    template_source: Path,
-    template_entity: Path,
     extractor_chain=None,
     cache_dirs: Optional[Iterable[str]] = None,
     extensions: Optional[Iterable[str]] = None,
-    max_excerpt_chars: int = 2000,
-    created: str = "",
-    overwrite: bool = False,
     config: Optional[Dict[str, object]] = None,
-) -> Tuple[bool, Optional[str]]:
-    """Process a single PDF and return (success, error_message)."""
-    try:
-        title = safe_note_name(pdf_path.stem)
-        source_note_path = source_notes_dir / f"{title}.md"
-        source_link = to_file_url(pdf_path, vault_root)
-        source_file = pdf_path.as_posix()
+    gazetteer=None,
+) -> Dict[str, Any]:
+    """
+    Return {"text", "metadata", "pdf_metadata", "tables", "extracted_entities", "parse_stats"} for one PDF.
 
+    The PDF is parsed at most once per engine: text extraction, metadata and tables share one
+    PDFDocument; parse_stats holds its open/reuse counts and the parse time saved.
+    """
+    # One parsed handle per engine for every consumer below
+    with PDFDocument.from_config(pdf_path, config) as document:
         try:
-            text, source_path, metadata = extract_text(
+            text, _source_path, metadata = extract_text(
                 pdf_path,
                 vault_root,
                 extractor_chain=extractor_chain,
                 cache_dirs=cache_dirs,
                 extensions=extensions,
                 config=config,  # Pass config for OCR support
+                document=document,
             )
             # Log extraction method if available
             if metadata and metadata.get("method"):
@@ -795,23 +830,16 @@ def process_single_pdf(
         except Exception as e:
             logger.warning(f"Failed to extract text from {pdf_path.name}: {e}")
             text = ""
-            source_path = None
-            metadata = {}
-            source_path = None
             metadata = {}
 
-        excerpt = truncate_text(text.strip().replace("\n", " "), max_excerpt_chars) if text else ""
-        
-        try:
-            extracted_text_path = write_extracted_text(text, extracted_text_dir, title)
-        except Exception as e:
-            logger.warning(f"Failed to write extracted text for {pdf_path.name}: {e}")
-            extracted_text_path = None
-
-        # Extract PDF metadata (with citation enrichment if text available)
+        # Extract PDF metadata (with citation enrichment if text available); Crossref misses are only
+        # queued here and resolved run-wide by the ingest's backfill thread
         pdf_metadata = None
         try:
-            pdf_metadata = extract_pdf_metadata(pdf_path, text=text)
+            crossref_resolver = get_crossref_resolver(config, vault_root, defer=True)
+            pdf_metadata = extract_pdf_metadata(
+                pdf_path, text=text, document=document, crossref_resolver=crossref_resolver
+            )
             if pdf_metadata:
                 logger.debug(f"Extracted metadata from {pdf_path.name}: {list(pdf_metadata.keys())}")
         except Exception as e:
@@ -827,25 +855,101 @@ def process_single_pdf(
                     pdf_path,
                     method=table_config.get("method", "pdfplumber"),
                     fallback_method=table_config.get("fallback_method", "camelot"),
+                    document=document,
+                    prefilter=table_config.get("prefilter"),
                 )
                 if tables:
                     logger.info(f"Extracted {len(tables)} tables from {pdf_path.name}")
             except Exception as e:
                 logger.warning(f"Failed to extract tables from {pdf_path.name}: {e}")
 
-        # Extract entities automatically if available
-        extracted_entities = None
-        if ENTITY_EXTRACTION_AVAILABLE and text:
-            try:
-                extractor = get_extractor()
-                if extractor.is_available():
-                    extracted_entities = extract_entities_from_text(text)
-                    logger.info(
-                        f"Auto-extracted entities from {pdf_path.name}: "
-                        f"{sum(len(v) for v in extracted_entities.values())} total"
-                    )
-            except Exception as e:
-                logger.warning(f"Failed to extract entities from {pdf_path.name}: {e}")
+    # Extract entities automatically if available
+    extracted_entities = None
+    if ENTITY_EXTRACTION_AVAILABLE and text:
+        try:
+            entity_cfg = (config or {}).get("entity_extraction", {})
+            extractor = get_extractor(
+                model_name=entity_cfg.get("spacy_model", "en_core_web_sm"),
+                batch_size=entity_cfg.get("spacy_batch_size", 32),
+                n_process=entity_cfg.get("spacy_n_process", 1),
+            )
+            if extractor.is_available():
+                # Known vault entities first; NER/LLM only see the rest of the text
+                extracted_entities = extractor.extract_entities(text, gazetteer=gazetteer)
+            elif gazetteer is not None:
+                extracted_entities = gazetteer.extract(text)
+            if extracted_entities is not None:
+                logger.info(
+                    f"Auto-extracted entities from {pdf_path.name}: "
+                    f"{sum(len(v) for v in extracted_entities.values())} total"
+                )
+        except Exception as e:
+            logger.warning(f"Failed to extract entities from {pdf_path.name}: {e}")
+    return {
+        "text": text,
+        "metadata": metadata,
+        "pdf_metadata": pdf_metadata,
+        "tables": tables,
+        "extracted_entities": extracted_entities,
+        "parse_stats": dict(document.stats),
+    }
+
+
+# PURPOSE: Write the notes for one analyzed PDF (source, extracted text, rules, entities).
+# DEPENDENCIES: analyze_pdf output, templates, note folders.
+# MODIFICATION NOTES: Runs in the parent process in process-pool mode so only one process writes notes.
+#   Notes go through a NoteWriter: the run's shared one (flushed by ingest_pdfs), or a local one flushed here.
+def write_pdf_notes(
+    pdf_path: Path,
+    analysis: Dict[str, Any],
+    vault_root: Path,
+    source_notes_dir: Path,
+    rules_dir: Path,
+    npcs_dir: Path,
+    factions_dir: Path,
+    locations_dir: Path,
+    items_dir: Path,
+    extracted_text_dir: Path,
+    template_source: Path,
+    template_entity: Path,
+    max_excerpt_chars: int = 2000,
+    created: str = "",
+    overwrite: bool = False,
+    config: Optional[Dict[str, object]] = None,
+    entity_aggregate: Optional[EntityAggregateStore] = None,
+    note_writer: Optional[NoteWriter] = None,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Write notes from analyze_pdf output and return (success, error_message).
+
+    On success error_message is None, or the reason text extraction failed (see extraction_incomplete):
+    the notes are written, but the caller must not record the PDF as ingested. With a shared note_writer
+    the notes are only staged, tagged with owner pdf_path.as_posix(); the caller checks take_owner()
+    after flushing before recording the PDF.
+    """
+    local_writer = note_writer is None
+    if local_writer:
+        note_writer = NoteWriter(max_pending=0, on_write=_record_note_write)
+    try:
+        owner = pdf_path.as_posix()
+        title = safe_note_name(pdf_path.stem)
+        source_note_path = source_notes_dir / f"{title}.md"
+        source_link = to_file_url(pdf_path, vault_root)
+        source_file = pdf_path.as_posix()
+        text = analysis.get("text") or ""
+        pdf_metadata = analysis.get("pdf_metadata")
+        tables = analysis.get("tables") or []
+        extracted_entities = analysis.get("extracted_entities")
+
+        excerpt = truncate_text(text.strip().replace("\n", " "), max_excerpt_chars) if text else ""
+        
+        try:
+            extracted_text_path = write_extracted_text(
+                text, extracted_text_dir, title, note_writer=note_writer, owner=owner
+            )
+        except Exception as e:
+            logger.warning(f"Failed to write extracted text for {pdf_path.name}: {e}")
+            extracted_text_path = None
 
         try:
             source_content = build_source_note(
@@ -867,7 +971,7 @@ def process_single_pdf(
             return False, str(e)
 
         try:
-            write_note(source_note_path, source_content, overwrite)
+            write_note(source_note_path, source_content, overwrite, note_writer=note_writer, owner=owner)
         except Exception as e:
             logger.error(f"Failed to write source note for {pdf_path.name}: {e}")
             return False, str(e)
@@ -886,6 +990,15 @@ def process_single_pdf(
         
         source_ref = f"[[{title}]]"
 
+        # Corpus-wide entity view (keyed like the ingest manifest): apply this PDF's delta only
+        if entity_aggregate is not None:
+            try:
+                entity_aggregate.replace_document(
+                    vault_key(pdf_path, vault_root), count_mentions(text, entities), document_hash(text or ""),
+                )
+            except Exception as e:
+                logger.warning(f"Failed to update entity aggregate for {pdf_path.name}: {e}")
+
         # Process rules
         for rule_name in entities.get("Rules/Mechanics", []):
             if not rule_name:
@@ -894,7 +1007,7 @@ def process_single_pdf(
                 rule_title = safe_note_name(rule_name)
                 rule_path = rules_dir / f"{rule_title}.md"
                 rule_content = build_rule_note(rule_title, "rule", source_ref, created)
-                write_note(rule_path, rule_content, overwrite)
+                write_note(rule_path, rule_content, overwrite, note_writer=note_writer, owner=owner)
             except Exception as e:
                 logger.warning(f"Failed to create rule note for {rule_name}: {e}")
 
@@ -913,28 +1026,186 @@ def process_single_pdf(
                     entity_title = safe_note_name(entity_name)
                     entity_path = target_dir / f"{entity_title}.md"
                     entity_content = build_entity_note(
-                        template_entity, entity_title, entity_type, source_ref, created
+                        template_entity, entity_title, entity_type, source_ref, created,
+                        source_refs=aggregate_source_refs(entity_aggregate, label, entity_name.strip()),
                     )
-                    write_note(entity_path, entity_content, overwrite)
+                    write_note(entity_path, entity_content, overwrite, note_writer=note_writer, owner=owner)
                 except Exception as e:
                     logger.warning(f"Failed to create entity note for {entity_name}: {e}")
-        
-        return True, None
+
+        if local_writer:
+            failed = note_writer.flush()
+            if failed:
+                return False, f"{len(failed)} note write(s) failed"
+        return True, extraction_incomplete(analysis)
+    except Exception as e:
+        logger.error(f"Unexpected error processing {pdf_path.name}: {e}", exc_info=True)
+        return False, str(e)
+
+
+# PURPOSE: Process a single PDF and create its notes.
+# DEPENDENCIES: Config paths, templates, and PDF text extraction.
+# MODIFICATION NOTES: Extracted from ingest_pdfs for parallel processing; analyze_pdf + write_pdf_notes.
+def process_single_pdf(
+    pdf_path: Path,
+    vault_root: Path,
+    source_notes_dir: Path,
+    rules_dir: Path,
+    npcs_dir: Path,
+    factions_dir: Path,
+    locations_dir: Path,
+    items_dir: Path,
+    extracted_text_dir: Path,
+    template_source: Path,
+    template_entity: Path,
+    extractor_chain=None,
+    cache_dirs: Optional[Iterable[str]] = None,
+    extensions: Optional[Iterable[str]] = None,
+    max_excerpt_chars: int = 2000,
+    created: str = "",
+    overwrite: bool = False,
+    config: Optional[Dict[str, object]] = None,
+    gazetteer=None,
+    entity_aggregate: Optional[EntityAggregateStore] = None,
+    note_writer: Optional[NoteWriter] = None,
+) -> Tuple[bool, Optional[str]]:
+    """Process a single PDF and return (success, error_message) as write_pdf_notes does."""
+    try:
+        analysis = analyze_pdf(
+            pdf_path,
+            vault_root,
+            extractor_chain=extractor_chain,
+            cache_dirs=cache_dirs,
+            extensions=extensions,
+            config=config,
+            gazetteer=gazetteer,
+        )
     except Exception as e:
         logger.error(f"Unexpected error processing {pdf_path.name}: {e}", exc_info=True)
         return False, str(e)
+    _record_parse_stats(analysis.get("parse_stats"))
+    return write_pdf_notes(
+        pdf_path,
+        analysis,
+        vault_root,
+        source_notes_dir,
+        rules_dir,
+        npcs_dir,
+        factions_dir,
+        locations_dir,
+        items_dir,
+        extracted_text_dir,
+        template_source,
+        template_entity,
+        max_excerpt_chars=max_excerpt_chars,
+        created=created,
+        overwrite=overwrite,
+        config=config,
+        entity_aggregate=entity_aggregate,
+        note_writer=note_writer,
+    )
+
+
+def extraction_incomplete(analysis: Dict[str, Any]) -> Optional[str]:
+    """Why a PDF's text extraction failed (no text, or an extractor error), or None if it produced text."""
+    metadata = analysis.get("metadata") or {}
+    if metadata.get("error"):
+        return f"text extraction failed ({metadata.get('method', 'unknown')}: {metadata['error']})"
+    if not (analysis.get("text") or "").strip():
+        return "no text extracted"
+    return None
+
+
+def _record_note_write(path: Path, bytes_written: int) -> None:
+    """NoteWriter on_write hook: count real note writes in the I/O profile."""
+    record_io_write(str(path), bytes_written)
+
+
+# Shared-handle parse savings summed over one ingest run (from analyze_pdf parse_stats)
+_parse_totals: Dict[str, float] = {}
+_parse_totals_lock = Lock()
+
+
+def _record_parse_stats(stats: Optional[Dict[str, Any]]) -> None:
+    """Add one PDF's PDFDocument stats to the run totals (thread-safe)."""
+    if not stats:
+        return
+    with _parse_totals_lock:
+        _parse_totals["pdfs"] = _parse_totals.get("pdfs", 0) + 1
+        for key in ("opens", "reuses", "page_text_hits", "open_seconds", "saved_seconds", "parallel_pages"):
+            _parse_totals[key] = _parse_totals.get(key, 0) + stats.get(key, 0)
+
+
+# Per-process state of process-pool workers, set once per worker by _init_analysis_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def split_page_parallel(config: Dict[str, object], pool_workers: int) -> Dict[str, object]:
+    """
+    Copy of config whose page_parallel.workers shares the CPUs with pool_workers ingest processes.
+
+    Each process-mode worker opens its own page-parallel pool, so the per-worker pool gets
+    CPU count // pool_workers processes (at least 1, at most the configured or default size).
+    """
+    settings = dict(config.get("page_parallel") or {})
+    cpu_count = os.cpu_count() or 1
+    configured = int(settings.get("workers") or min(4, cpu_count))
+    settings["workers"] = max(1, min(configured, cpu_count // max(1, pool_workers)))
+    return {**config, "page_parallel": settings}
+
+
+# PURPOSE: Initialize a process-pool worker (extractor chain, gazetteer) once per process.
+# DEPENDENCIES: ExtractorChain, entity gazetteer (optional).
+# MODIFICATION NOTES: Runs in the spawned child; objects are rebuilt there rather than pickled from the parent.
+def _init_analysis_worker(vault_root: str, config: Dict[str, object]) -> None:
+    extractor_chain = None
+    if EXTRACTOR_CHAIN_AVAILABLE:
+        try:
+            extractor_chain = ExtractorChain(config)
+        except Exception as e:
+            logger.warning(f"Failed to initialize extractor chain in worker: {e}. Using legacy extraction.")
+    gazetteer = None
+    if ENTITY_EXTRACTION_AVAILABLE and GAZETTEER_AVAILABLE:
+        try:
+            gazetteer = get_vault_gazetteer(Path(vault_root), config)
+        except Exception as e:
+            logger.warning(f"Entity gazetteer unavailable in worker: {e}")
+    _worker_state.update(
+        vault_root=Path(vault_root), config=config, extractor_chain=extractor_chain, gazetteer=gazetteer
+    )
+
+
+def _analyze_pdf_job(pdf_path: str, cache_dirs: Optional[List[str]], extensions: Optional[List[str]]) -> Dict[str, Any]:
+    """Process-pool job: analyze one PDF with the worker's shared extractor chain and gazetteer."""
+    return analyze_pdf(
+        Path(pdf_path),
+        _worker_state["vault_root"],
+        extractor_chain=_worker_state.get("extractor_chain"),
+        cache_dirs=cache_dirs,
+        extensions=extensions,
+        config=_worker_state["config"],
+        gazetteer=_worker_state.get("gazetteer"),
+    )
 
 
 # PURPOSE: Create source notes and derived atomic notes from PDFs.
 # DEPENDENCIES: Config, templates, and PDF text extraction.
-# MODIFICATION NOTES: Orchestrates ingestion pipeline.
-def ingest_pdfs(config: Dict[str, object], overwrite: bool) -> None:
+# MODIFICATION NOTES: Orchestrates ingestion pipeline. worker_mode "process" parses PDFs in worker processes
+#   (hard per-PDF timeout, worker recycling); results stream back and notes are written in the parent.
+def ingest_pdfs(
+    config: Dict[str, object],
+    overwrite: bool,
+    force: bool = False,
+    invalidate: Optional[List[str]] = None,
+) -> None:
     """
     Create source notes and derived atomic notes from PDFs.
     
     Args:
         config: Configuration dictionary.
         overwrite: Whether to overwrite existing notes.
+        force: Process every PDF even if the ingest manifest says it is unchanged.
+        invalidate: PDF paths/names/glob patterns to drop from the manifest before the run.
     """
     vault_root = Path(str(config["vault_root"]))
     vault_root = vault_root.resolve()
@@ -999,6 +1270,15 @@ def ingest_pdfs(config: Dict[str, object], overwrite: bool) -> None:
         sys.exit(1)
 
     created = dt.date.today().isoformat()
+
+    # Gazetteer of known entities from existing notes (only new or changed notes are re-read)
+    gazetteer = None
+    if ENTITY_EXTRACTION_AVAILABLE and GAZETTEER_AVAILABLE:
+        try:
+            gazetteer = get_vault_gazetteer(vault_root, config)
+        except Exception as e:
+            logger.warning(f"Entity gazetteer unavailable: {e}")
+
     
     # Get max file size from config (default 100MB)
     max_pdf_size_mb = int(config.get("max_pdf_size_mb", 100))
@@ -1013,12 +1293,76 @@ def ingest_pdfs(config: Dict[str, object], overwrite: bool) -> None:
         logger.info("No PDFs found in configured directory.")
         return
     
-    logger.info(f"Found {len(pdfs)} PDFs to process")
+    logger.info(f"Found {len(pdfs)} PDFs")
+
+    # Corpus entity aggregate (entity -> PDFs, keyed by vault-relative path), updated per PDF;
+    # PDFs no longer in the source folder are subtracted first
+    aggregate_cfg = dict(config.get("entity_aggregate") or {})
+    aggregate_cfg.setdefault("path", "Sources/_entity_aggregate.sqlite")
+    entity_aggregate = EntityAggregateStore.from_config(aggregate_cfg, vault_root)
+    if entity_aggregate is not None:
+        try:
+            removed = entity_aggregate.sync_documents(vault_key(pdf_path, vault_root) for pdf_path in pdfs)
+            if removed:
+                logger.info(f"Entity aggregate: removed {len(removed)} PDFs no longer in the source folder")
+        except Exception as e:
+            logger.warning(f"Failed to prune entity aggregate: {e}")
+
+    # Skip PDFs unchanged since their last successful ingest (same content, pipeline version and options)
+    manifest = IngestManifest.from_config(config.get("ingest_manifest"), vault_root, PIPELINE_VERSION, config)
+    if manifest is not None:
+        manifest.prune(pdfs)
+        if invalidate:
+            removed = manifest.invalidate(invalidate)
+            logger.info(f"Invalidated {len(removed)} manifest entries")
+        if not force:
+            pdfs = [pdf_path for pdf_path in pdfs if manifest.needs_processing(pdf_path)]
+            logger.info(
+                f"Ingest manifest: {manifest.stats['skipped']} unchanged PDFs skipped, "
+                f"{manifest.stats['new']} new, {manifest.stats['changed']} changed, "
+                f"{manifest.stats['stale']} stale (pipeline/options/note)"
+            )
+        if not pdfs:
+            manifest.save()
+            if entity_aggregate is not None:
+                entity_aggregate.close()
+            logger.info("All PDFs are up to date.")
+            return
+
+    # PDFs whose notes were staged; recorded in the manifest once the notes are flushed (see the run's end)
+    staged_pdfs: List[Tuple[Path, Optional[str]]] = []
+
+    def mark_ingested(pdf_path: Path, incomplete: Optional[str] = None) -> None:
+        if incomplete:
+            # Notes were written, but without text: leave it out of the manifest so the next run retries it
+            logger.warning(f"{pdf_path.name}: {incomplete}; not recorded as ingested, will be retried")
+        staged_pdfs.append((pdf_path, incomplete))
+
+    logger.info(f"Processing {len(pdfs)} PDFs")
+
+    # DOIs queued by the PDFs of this run are resolved together in batched requests while they parse
+    crossref_resolver = get_crossref_resolver(config, vault_root, defer=True)
+    crossref_gained: set = set()
+    backfill_thread = None
+    if crossref_resolver is not None and not crossref_resolver.offline:
+        crossref_cfg = config.get("crossref") or {}
+        backfill_thread = start_backfill_thread(
+            crossref_resolver,
+            interval_seconds=float(crossref_cfg.get("run_backfill_seconds", DEFAULT_RUN_BACKFILL_SECONDS)),
+            on_backfill=lambda summary: crossref_gained.update(summary["sources"]),
+        )
+
+    # Notes are staged and written in batches; byte-identical notes are not rewritten
+    note_writer = NoteWriter(
+        max_pending=int(config.get("note_batch_size", DEFAULT_NOTE_BATCH_SIZE)),
+        on_write=_record_note_write,
+    )
     
     # Initialize error collector for summary reporting
     error_collector = ErrorCollector() if ERROR_HANDLING_AVAILABLE else None
     
     # Thread-safe counters for parallel processing
+    _parse_totals.clear()
     processed_count = 0
     error_count = 0
     progress_lock = Lock()
@@ -1034,7 +1378,80 @@ def ingest_pdfs(config: Dict[str, object], overwrite: bool) -> None:
         max_workers = min(max_workers, 8, cpu_count)
         logger.info(f"Worker pool limited to {max_workers} workers (CPU count: {cpu_count})")
     
-    if max_workers > 1 and len(pdfs) > 1:
+    worker_mode = str(config.get("worker_mode", "thread")).lower()
+
+    if worker_mode == "process":
+        # Parsing runs in child processes: a stuck PDF is killed at pdf_timeout_seconds, and each
+        # worker is replaced after worker_max_jobs PDFs. Notes are written here as results arrive.
+        pdf_timeout = float(config.get("pdf_timeout_seconds", 300))
+        max_jobs = int(config.get("worker_max_jobs", 25))
+        pool_workers = min(max(1, max_workers), len(pdfs))
+        logger.info(
+            f"Processing {len(pdfs)} PDFs with {pool_workers} worker processes "
+            f"(timeout {pdf_timeout:.0f}s per PDF, recycle after {max_jobs} PDFs)"
+        )
+        start_time = dt.datetime.now()
+        by_path = {str(pdf_path): pdf_path for pdf_path in pdfs}
+        with RecyclingProcessPool(
+            _analyze_pdf_job,
+            workers=pool_workers,
+            timeout=pdf_timeout,
+            max_jobs_per_worker=max_jobs,
+            initializer=_init_analysis_worker,
+            initargs=(str(vault_root), split_page_parallel(config, pool_workers)),
+        ) as pool:
+            jobs = ((key, (key, list(cache_dirs), list(extensions))) for key in by_path)
+            for result in pool.map(jobs):
+                pdf_path = by_path[result.key]
+                if result.ok:
+                    _record_parse_stats(result.value.get("parse_stats"))
+                    success, error_msg = write_pdf_notes(
+                        pdf_path,
+                        result.value,
+                        vault_root,
+                        source_notes_dir,
+                        rules_dir,
+                        npcs_dir,
+                        factions_dir,
+                        locations_dir,
+                        items_dir,
+                        extracted_text_dir,
+                        template_source,
+                        template_entity,
+                        max_excerpt_chars=max_excerpt_chars,
+                        created=created,
+                        overwrite=overwrite,
+                        config=config,
+                        entity_aggregate=entity_aggregate,
+                        note_writer=note_writer,
+                    )
+                else:
+                    success, error_msg = False, result.error
+                if success:
+                    processed_count += 1
+                    mark_ingested(pdf_path, error_msg)
+                else:
+                    error_count += 1
+                    logger.error(f"Failed to process {pdf_path.name}: {error_msg}")
+                    if error_collector:
+                        error_collector.add_error(
+                            f"Process PDF: {pdf_path.name}",
+                            Exception(error_msg),
+                            {"pdf_path": str(pdf_path)}
+                        )
+                total_processed = processed_count + error_count
+                if total_processed % 10 == 0 or total_processed == len(pdfs):
+                    elapsed = (dt.datetime.now() - start_time).total_seconds()
+                    rate = total_processed / elapsed if elapsed > 0 else 0
+                    logger.info(
+                        f"Progress: {total_processed}/{len(pdfs)} PDFs processed "
+                        f"({processed_count} succeeded, {error_count} failed) - Rate: {rate:.2f} PDFs/sec"
+                    )
+            logger.info(
+                f"Worker processes: {pool.stats['started']} started, {pool.stats['recycled']} recycled, "
+                f"{pool.stats['killed']} killed on timeout, {pool.stats['crashed']} crashed"
+            )
+    elif max_workers > 1 and len(pdfs) > 1:
         logger.info(f"Processing {len(pdfs)} PDFs with {max_workers} workers")
         start_time = dt.datetime.now()
         
@@ -1060,6 +1477,9 @@ def ingest_pdfs(config: Dict[str, object], overwrite: bool) -> None:
                     created,
                     overwrite,
                     config,  # Pass config for OCR and AI summarization
+                    gazetteer,
+                    entity_aggregate,
+                    note_writer,
                 ): pdf_path
                 for pdf_path in pdfs
             }
@@ -1071,6 +1491,7 @@ def ingest_pdfs(config: Dict[str, object], overwrite: bool) -> None:
                     with progress_lock:
                         if success:
                             processed_count += 1
+                            mark_ingested(pdf_path, error_msg)
                         else:
                             error_count += 1
                             if error_msg:
@@ -1127,9 +1548,13 @@ def ingest_pdfs(config: Dict[str, object], overwrite: bool) -> None:
                     created,
                     overwrite,
                     config,  # Pass config for OCR and AI summarization
+                    gazetteer,
+                    entity_aggregate,
+                    note_writer,
                 )
                 if success:
                     processed_count += 1
+                    mark_ingested(pdf_path, error_msg)
                 else:
                     error_count += 1
                     if error_msg:
@@ -1152,7 +1577,53 @@ def ingest_pdfs(config: Dict[str, object], overwrite: bool) -> None:
                         {"pdf_path": str(pdf_path)}
                     )
     
+    # Notes land before the manifest records their PDFs as ingested; a PDF with a failed note write
+    # counts as an error and stays out of the manifest, so the next run retries it
+    note_writer.flush()
+    logger.info(note_writer.summary())
+    for pdf_path, incomplete in staged_pdfs:
+        notes, failed = note_writer.take_owner(pdf_path.as_posix())
+        if failed:
+            processed_count -= 1
+            error_count += 1
+            error_msg = f"{len(failed)} note write(s) failed: {', '.join(path.name for path in failed[:5])}"
+            logger.error(f"Failed to process {pdf_path.name}: {error_msg}")
+            if error_collector:
+                error_collector.add_error(f"Write notes: {pdf_path.name}", Exception(error_msg), {"pdf_path": str(pdf_path)})
+        elif manifest is not None and not incomplete:
+            try:
+                manifest.record(pdf_path, source_notes_dir / f"{safe_note_name(pdf_path.stem)}.md", notes=notes)
+            except OSError as e:
+                logger.debug(f"Ingest manifest not updated for {pdf_path.name}: {e}")
+    if entity_aggregate is not None:
+        entity_aggregate.close()
+    if backfill_thread is not None:
+        backfill_thread.stop_event.set()
+        backfill_thread.join()
+        try:
+            crossref_gained.update(crossref_resolver.backfill()["sources"])
+        except Exception as e:
+            logger.warning(f"Crossref backfill failed: {e}")
+        if crossref_gained:
+            # Their notes were written before the lookup finished; the next ingest rewrites them from the cache
+            logger.info(f"Crossref: {len(crossref_gained)} PDFs gained metadata, their notes are refreshed next run")
+            if manifest is not None:
+                manifest.invalidate(sorted(crossref_gained))
+    if manifest is not None:
+        try:
+            manifest.save()
+        except OSError as e:
+            logger.warning(f"Failed to save ingest manifest {manifest.path}: {e}")
     logger.info(f"Processed {processed_count} PDFs successfully.")
+    if _parse_totals.get("opens"):
+        logger.info(
+            f"PDF parsing: {int(_parse_totals['opens'])} opens for {int(_parse_totals['pdfs'])} PDFs "
+            f"({_parse_totals['open_seconds']:.2f}s); shared handles reused {int(_parse_totals['reuses'])} times "
+            f"and page text {int(_parse_totals['page_text_hits'])} times, "
+            f"saving ~{_parse_totals['saved_seconds']:.2f}s of re-parsing"
+        )
+        if _parse_totals.get("parallel_pages"):
+            logger.info(f"Page-parallel extraction: {int(_parse_totals['parallel_pages'])} pages")
     if error_count > 0:
         logger.warning(f"Encountered {error_count} errors during processing.")
     
@@ -1193,6 +1664,24 @@ def parse_args() -> argparse.Namespace:
         default=1,
         help="Number of parallel workers for PDF processing (default: 1, sequential).",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Process every PDF, ignoring the ingest manifest (the manifest is still updated).",
+    )
+    parser.add_argument(
+        "--invalidate",
+        action="append",
+        default=[],
+        metavar="PDF",
+        help="Drop a PDF (vault-relative path, file name or glob) from the ingest manifest; repeatable.",
+    )
+    parser.add_argument(
+        "--worker-mode",
+        choices=["thread", "process"],
+        default=None,
+        help="Run workers as threads (default) or as processes with a hard per-PDF timeout.",
+    )
     return parser.parse_args()
 
 
@@ -1223,7 +1712,9 @@ def main() -> None:
     
     # Pass max_workers to config for ingest_pdfs to use
     config["max_workers"] = max_workers
-    ingest_pdfs(config, overwrite=args.overwrite)
+    if args.worker_mode:
+        config["worker_mode"] = args.worker_mode
+    ingest_pdfs(config, overwrite=args.overwrite, force=args.force, invalidate=args.invalidate)
     
     if args.profile and PROFILING_AVAILABLE:
         if args.profile_output:
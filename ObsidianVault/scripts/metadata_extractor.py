@@ -1,6 +1,7 @@
 # PURPOSE: Enhanced metadata and citation extraction (Phase 2).
 # DEPENDENCIES: pypdf, requests (for API calls), python-dateutil.
 # MODIFICATION NOTES: Phase 2 - Enhanced metadata extraction with citation parsing and API integration.
+#   Ingest enriches through crossref_resolver (persistent DOI cache, batched lookups, offline mode).
 
 from __future__ import annotations
 
@@ -11,6 +12,8 @@ from pathlib import Path
 from typing import Dict, Optional, List
 from urllib.parse import urlparse
 
+from crossref_resolver import parse_crossref_work
+
 logger = logging.getLogger(__name__)
 
 # Try to import dependencies
@@ -33,24 +36,25 @@ except ImportError:
     DATEUTIL_AVAILABLE = False
 
 
-def extract_pdf_metadata(pdf_path: Path) -> Dict[str, str]:
+def extract_pdf_metadata(pdf_path: Path, document=None) -> Dict[str, str]:
     """
     Extract comprehensive PDF metadata.
     
     Args:
         pdf_path: Path to PDF file.
+        document: Optional pdf_document.PDFDocument; its shared pypdf reader is used instead of re-parsing.
         
     Returns:
         Dictionary with metadata keys: title, author, subject, creator, creation_date, modification_date.
     """
     metadata = {}
     
-    if not PYPDF_AVAILABLE:
+    if not PYPDF_AVAILABLE and document is None:
         logger.warning("pypdf not available for metadata extraction")
         return metadata
     
     try:
-        reader = PdfReader(str(pdf_path))
+        reader = document.reader if document is not None else PdfReader(str(pdf_path))
         pdf_metadata = reader.metadata
         
         if pdf_metadata:
@@ -199,29 +203,7 @@ def query_crossref_api(doi: str) -> Optional[Dict[str, str]]:
             data = response.json()
             message = data.get("message", {})
             
-            metadata = {}
-            if message.get("title"):
-                title = message["title"][0] if isinstance(message["title"], list) else message["title"]
-                metadata["title"] = title
-            if message.get("author"):
-                authors = message["author"]
-                author_names = []
-                for author in authors:
-                    given = author.get("given", "")
-                    family = author.get("family", "")
-                    if given or family:
-                        author_names.append(f"{given} {family}".strip())
-                if author_names:
-                    metadata["authors"] = ", ".join(author_names)
-            if message.get("published-print") or message.get("published-online"):
-                pub_date = message.get("published-print") or message.get("published-online")
-                if pub_date and pub_date.get("date-parts"):
-                    date_parts = pub_date["date-parts"][0]
-                    if len(date_parts) >= 1:
-                        metadata["publication_year"] = str(date_parts[0])
-            if message.get("container-title"):
-                container = message["container-title"][0] if isinstance(message["container-title"], list) else message["container-title"]
-                metadata["journal"] = container
+            metadata = parse_crossref_work(message)
             
             logger.debug(f"Retrieved metadata from CrossRef for DOI: {clean_doi}")
             return metadata
@@ -234,13 +216,21 @@ def query_crossref_api(doi: str) -> Optional[Dict[str, str]]:
         return None
 
 
-def enrich_metadata_with_citations(pdf_metadata: Dict[str, str], text: str) -> Dict[str, str]:
+def enrich_metadata_with_citations(
+    pdf_metadata: Dict[str, str],
+    text: str,
+    resolver=None,
+    source: Optional[str] = None,
+) -> Dict[str, str]:
     """
     Enrich PDF metadata with citation information.
     
     Args:
         pdf_metadata: Existing PDF metadata.
         text: Document text to search for citations.
+        resolver: Optional crossref_resolver.CrossrefResolver (cached, bounded, offline-capable);
+            without one the DOI is looked up directly with query_crossref_api.
+        source: PDF the text came from (recorded with DOIs queued for backfill).
         
     Returns:
         Enriched metadata dictionary.
@@ -255,13 +245,16 @@ def enrich_metadata_with_citations(pdf_metadata: Dict[str, str], text: str) -> D
         enriched["doi"] = citations["doi"][0]  # Use first DOI
         
         # Try to enrich with CrossRef API
-        if REQUESTS_AVAILABLE:
+        crossref_metadata = None
+        if resolver is not None:
+            crossref_metadata = resolver.resolve(citations["doi"][0], source=source)
+        elif REQUESTS_AVAILABLE:
             crossref_metadata = query_crossref_api(citations["doi"][0])
-            if crossref_metadata:
-                # Merge CrossRef metadata (don't overwrite existing)
-                for key, value in crossref_metadata.items():
-                    if key not in enriched or not enriched[key]:
-                        enriched[key] = value
+        if crossref_metadata:
+            # Merge CrossRef metadata (don't overwrite existing)
+            for key, value in crossref_metadata.items():
+                if key not in enriched or not enriched[key]:
+                    enriched[key] = value
     
     # Add ISBN if found
     if citations["isbn"]:
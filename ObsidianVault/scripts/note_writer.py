@@ -0,0 +1,164 @@
+# PURPOSE: Batched, dirty-checking note writes for ingest (source, extracted text, rule and entity notes).
+# DEPENDENCIES: stdlib only (hashlib, tempfile, os.replace).
+# MODIFICATION NOTES: Notes are staged per ingest run and written on flush(). A note whose bytes on disk
+#   already match (size, then blake2b digest) is left alone, so re-ingest fires no watcher events, Obsidian
+#   reindexing or sync traffic for unchanged notes. Writes go through a temp file in the same folder and
+#   os.replace, so readers never see a half-written note. Notes staged with an owner (the PDF they came
+#   from) are tracked for the run, so the caller can tell which owners had a note fail to write.
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Staged notes are flushed once this many are pending (bounds memory and work lost to a crash)
+DEFAULT_MAX_PENDING = 500
+
+
+def content_digest(data: bytes) -> str:
+    """Digest used to compare a staged note with the file on disk."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write data to path via a hidden temp file in the same folder and os.replace (keeps the file mode)."""
+    path = Path(path)
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class NoteWriter:
+    """
+    Stage note writes for one ingest run and apply them in a batch.
+
+    write() only records the note; flush() compares each staged note with the file on disk, skips
+    byte-identical ones and writes the rest atomically, returning the paths that failed. stats counts
+    written, unchanged (identical content) and kept (existing note, overwrite off) notes, plus failed
+    writes. take_owner() reports an owner's notes and failures once they are flushed. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        on_write: Optional[Callable[[Path, int], None]] = None,
+    ):
+        """
+        Args:
+            max_pending: Flush automatically once this many notes are staged (0 = only on flush()).
+            on_write: Called with (path, bytes written) after each real write (I/O profiling hook).
+        """
+        self.max_pending = max_pending
+        self.on_write = on_write
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Path, Tuple[bytes, bool]] = {}
+        self._owned: Dict[str, Set[Path]] = {}
+        self._failed: Set[Path] = set()
+        self.stats = {"written": 0, "unchanged": 0, "kept": 0, "failed": 0}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def write(self, path: Path, content: str, overwrite: bool = True, owner: Optional[str] = None) -> None:
+        """
+        Stage a note.
+
+        Args:
+            path: Note path.
+            content: Full note text.
+            overwrite: Replace an existing note. Without it an existing note is kept, and the first
+                staged content for a path wins over later ones in the same run.
+            owner: Tag for take_owner() (e.g. the PDF the note came from); a shared note can have several.
+        """
+        path = Path(path)
+        data = content.encode("utf-8")
+        with self._lock:
+            if owner is not None:
+                self._owned.setdefault(owner, set()).add(path)
+            staged = self._pending.get(path)
+            if staged is not None and not overwrite:
+                return
+            self._pending[path] = (data, overwrite or (staged is not None and staged[1]))
+            full = self.max_pending and len(self._pending) >= self.max_pending
+        if full:
+            self.flush()
+
+    def flush(self) -> List[Path]:
+        """Apply staged notes. Returns the paths whose write failed in this flush (counts go to stats)."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            counts = {"written": 0, "unchanged": 0, "kept": 0, "failed": 0}
+            failed: List[Path] = []
+            for path, (data, overwrite) in sorted(pending.items()):
+                try:
+                    outcome = self._apply(path, data, overwrite)
+                except OSError as e:
+                    logger.warning(f"Failed to write note {path}: {e}")
+                    outcome = "failed"
+                    failed.append(path)
+                counts[outcome] += 1
+            with self._lock:
+                for key, value in counts.items():
+                    self.stats[key] += value
+                self._failed.difference_update(pending)
+                self._failed.update(failed)
+        return failed
+
+    def take_owner(self, owner: str) -> Tuple[List[Path], List[Path]]:
+        """
+        Notes staged for owner this run and those whose write failed; stops tracking the owner.
+
+        Call after flush(), or notes still pending are reported as neither written nor failed.
+        """
+        with self._lock:
+            paths = sorted(self._owned.pop(owner, ()))
+            return paths, [path for path in paths if path in self._failed]
+
+    def _apply(self, path: Path, data: bytes, overwrite: bool) -> str:
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = None
+        if size is not None:
+            if not overwrite:
+                return "kept"
+            if size == len(data) and content_digest(path.read_bytes()) == content_digest(data):
+                return "unchanged"
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, data)
+        if self.on_write is not None:
+            self.on_write(path, len(data))
+        return "written"
+
+    def summary(self) -> str:
+        """One-line report of the run's counts."""
+        stats = self.stats
+        return (
+            f"Notes: {stats['written']} written, {stats['unchanged']} unchanged (skipped), "
+            f"{stats['kept']} existing kept, {stats['failed']} failed"
+        )
@@ -1,14 +1,20 @@
 # PURPOSE: OCR processing for scanned PDFs (Long-Term Enhancement LTE1).
-# DEPENDENCIES: pytesseract, Pillow, pdf2image, Tesseract OCR.
+# DEPENDENCIES: pytesseract, Pillow, pdf2image, Tesseract OCR; utils (file fingerprints).
 # MODIFICATION NOTES: Complete implementation with preprocessing, caching, and error handling.
+#   OCR streams page windows (rasterize a few pages, recognize them on worker threads, release the images)
+#   with a bounded number of page images in flight; completed pages are appended to a per-PDF page cache
+#   so an interrupted run resumes at the first missing page.
 
 from __future__ import annotations
 
-import hashlib
 import json
 import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils import full_file_hash, sampled_file_hash
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +28,277 @@ except ImportError:
     OCR_AVAILABLE = False
     logger.warning("OCR dependencies not available. Install with: pip install pytesseract pdf2image Pillow")
 
+DEFAULT_WINDOW_PAGES = 4
+PAGE_CACHE_FORMAT = 1
+
+
+def default_ocr_workers() -> int:
+    """Default tesseract worker count: one per core, at most 4."""
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+class OCRPageCache:
+    """
+    Append-only JSONL record of the pages OCR has completed for one PDF.
+
+    The first line holds the OCR settings; each later line is one page ({"page": n, ...result}) and a final
+    {"complete": n} line marks a finished document. Lines are flushed as pages complete, so an interrupted
+    run loses at most the pages still in flight. A settings mismatch or unreadable file starts over.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        settings: Dict[str, Any],
+        pdf_path: Optional[Path] = None,
+        cache_path: Optional[Path] = None,
+    ):
+        self.path = Path(path)
+        self.settings = settings
+        # With both set, starting the file also records the PDF fingerprint for cache_path
+        self.pdf_path = pdf_path
+        self.cache_path = cache_path
+        self.complete: Optional[int] = None
+        self._resume = False
+        self._handle = None
+
+    @classmethod
+    def for_pdf(cls, pdf_path: Path, output_dir: Path, settings: Dict[str, Any]) -> Optional["OCRPageCache"]:
+        """Page cache stored next to the PDF's whole-document OCR cache in output_dir (None on error)."""
+        cache_path = _get_ocr_cache_path(pdf_path, Path(output_dir))
+        if not cache_path:
+            return None
+        return cls(_get_ocr_page_cache_path(cache_path), settings, pdf_path=pdf_path, cache_path=cache_path)
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Pages already completed with the same settings.
+
+        A torn last line (run interrupted mid-write) is ignored and cut off the file, so later pages are
+        appended after the last complete line instead of onto the partial one.
+        """
+        pages: Dict[int, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return pages
+        try:
+            lines = self.path.read_bytes().splitlines(keepends=True)
+        except OSError as e:
+            logger.warning(f"Ignoring unreadable OCR page cache {self.path}: {e}")
+            return pages
+        try:
+            header = json.loads(lines[0]) if lines and lines[0].endswith(b"\n") else {}
+        except ValueError:
+            header = {}
+        if header.get("format") != PAGE_CACHE_FORMAT or header.get("settings") != self.settings:
+            return pages
+        self._resume = True
+        good_end = len(lines[0])
+        for line in lines[1:]:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("unterminated line")
+                record = json.loads(line)
+            except ValueError:
+                self._truncate(good_end)  # interrupted mid-write
+                break
+            good_end += len(line)
+            if "complete" in record:
+                self.complete = int(record["complete"])
+            elif "page" in record:
+                pages[int(record.pop("page"))] = record
+        return pages
+
+    def _truncate(self, size: int) -> None:
+        try:
+            with self.path.open("r+b") as handle:
+                handle.truncate(size)
+        except OSError as e:
+            logger.warning(f"Starting OCR page cache {self.path} over; cannot drop its torn tail: {e}")
+            self._resume = False
+
+    def add(self, page_num: int, result: Dict[str, Any]) -> None:
+        """Append one completed page."""
+        self._write({"page": page_num, **result})
+
+    def mark_complete(self, page_count: int) -> None:
+        """Record that every page up to page_count has been processed."""
+        self._write({"complete": page_count})
+        self.complete = page_count
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        try:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # Append to a loaded file with matching settings; otherwise start a fresh one
+                self._handle = self.path.open("a" if self._resume else "w", encoding="utf-8")
+                if not self._resume:
+                    self._resume = True
+                    if self.pdf_path is not None and self.cache_path is not None:
+                        _record_ocr_fingerprint(self.pdf_path, self.cache_path)
+                    self._handle.write(json.dumps({"format": PAGE_CACHE_FORMAT, "settings": self.settings}) + "\n")
+            self._handle.write(json.dumps(record) + "\n")
+            self._handle.flush()
+        except OSError as e:
+            logger.warning(f"Failed to write OCR page cache {self.path}: {e}")
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def discard(self) -> None:
+        """Delete the page cache (e.g. once the whole-document cache has been written)."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.debug(f"Failed to remove OCR page cache {self.path}: {e}")
+
+
+def _pdf_page_count(pdf_path: Path) -> Optional[int]:
+    """Page count via poppler's pdfinfo (None if unavailable)."""
+    try:
+        from pdf2image import pdfinfo_from_path
+
+        return int(pdfinfo_from_path(str(pdf_path))["Pages"])
+    except Exception as e:
+        logger.debug(f"Could not read page count for {pdf_path.name}: {e}")
+        return None
+
+
+# PURPOSE: Rasterize and recognize a PDF in page windows with bounded memory and parallel recognition.
+# DEPENDENCIES: pdf2image.convert_from_path (or an equivalent convert callable); recognize does the OCR.
+# MODIFICATION NOTES: At most max_in_flight page images exist at once; cached pages are never rasterized.
+def ocr_pdf_pages(
+    pdf_path: Path,
+    recognize: Callable[[Any, int], Dict[str, Any]],
+    dpi: int = 300,
+    workers: Optional[int] = None,
+    window_pages: int = DEFAULT_WINDOW_PAGES,
+    max_in_flight: Optional[int] = None,
+    page_cache: Optional[OCRPageCache] = None,
+    convert: Optional[Callable[..., List[Any]]] = None,
+    page_count: Optional[int] = None,
+) -> Dict[int, Optional[Dict[str, Any]]]:
+    """
+    Run OCR over a PDF as a pipeline of page windows.
+
+    The main thread rasterizes window_pages pages at a time (first_page/last_page) while worker threads run
+    recognize(image, page_num) on the previous window; a new window is rasterized only when it fits within
+    max_in_flight. Pages are recorded in page_cache as they complete.
+
+    Args:
+        pdf_path: Path to PDF file.
+        recognize: Called with (page image, 1-based page number); returns a JSON-serializable dict.
+        dpi: Rasterization DPI.
+        workers: Recognition threads (None = default_ocr_workers()). Tesseract runs as a subprocess, so
+            threads recognize pages in parallel.
+        window_pages: Pages rasterized per convert call.
+        max_in_flight: Most page images held at once (default: workers + window_pages).
+        page_cache: Optional OCRPageCache; cached pages are reused and new ones appended.
+        convert: convert_from_path-compatible callable (default: pdf2image.convert_from_path).
+        page_count: Page count if known; otherwise pdfinfo is asked, and failing that windows are
+            rasterized until one comes back short.
+
+    Returns:
+        {page_num: recognize result, or None if recognition failed for that page}, in page order.
+
+    Raises:
+        Exception: Whatever convert raises for the first window (later windows stop the run with a warning).
+    """
+    if convert is None:
+        from pdf2image import convert_from_path as convert
+    workers = max(1, workers or default_ocr_workers())
+    window_pages = max(1, window_pages)
+    max_in_flight = max(window_pages, max_in_flight or workers + window_pages)
+
+    results: Dict[int, Optional[Dict[str, Any]]] = {}
+    cached = page_cache.load() if page_cache else {}
+    results.update(cached)
+    if page_cache and page_cache.complete is not None:
+        logger.info(f"Using cached OCR pages for {pdf_path.name}")
+        return dict(sorted(results.items()))
+    if cached:
+        logger.info(f"Resuming OCR for {pdf_path.name}: {len(cached)} page(s) already cached")
+    if page_count is None:
+        page_count = _pdf_page_count(pdf_path)
+    if workers > 1:
+        # One OpenMP thread per tesseract process; parallelism comes from the workers
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    def finish(page_num: int, result: Optional[Dict[str, Any]], error: Optional[Exception]) -> None:
+        if error is not None:
+            logger.warning(f"OCR failed for page {page_num} of {pdf_path.name}: {error}")
+            results[page_num] = None
+            return
+        results[page_num] = result
+        if page_cache:
+            page_cache.add(page_num, result)
+
+    pending: Dict[Any, int] = {}
+
+    def drain(limit: int) -> None:
+        while len(pending) > limit:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                page_num = pending.pop(future)
+                error = future.exception()
+                finish(page_num, None if error else future.result(), error)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") if workers > 1 else None
+    page = 1
+    reached_end = False
+    try:
+        while True:
+            while page in cached:
+                page += 1
+            if page_count is not None and page > page_count:
+                reached_end = True
+                break
+            # Window of consecutive uncached pages
+            last = page
+            while (
+                last - page + 1 < window_pages
+                and (page_count is None or last < page_count)
+                and last + 1 not in cached
+            ):
+                last += 1
+            requested = last - page + 1
+            drain(max_in_flight - requested)
+            try:
+                images = convert(str(pdf_path), dpi=dpi, first_page=page, last_page=last)
+            except Exception:
+                if not results:
+                    raise
+                logger.warning(f"Rasterizing pages {page}-{last} of {pdf_path.name} failed; stopping")
+                break
+            returned = len(images)
+            for offset, image in enumerate(images):
+                if executor is not None:
+                    pending[executor.submit(recognize, image, page + offset)] = page + offset
+                    continue
+                try:
+                    finish(page + offset, recognize(image, page + offset), None)
+                except Exception as e:
+                    finish(page + offset, None, e)
+            images = image = None  # release the window; workers hold only their own page
+            if page_count is None and returned < requested:
+                reached_end = True
+                break
+            page = last + 1
+        drain(0)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    if page_cache:
+        if reached_end and results and all(result is not None for result in results.values()):
+            page_cache.mark_complete(max(results))
+        page_cache.close()
+    return dict(sorted(results.items()))
+
+
 def extract_text_with_ocr(
     pdf_path: Path,
     language: str = "eng",
@@ -29,10 +306,17 @@ def extract_text_with_ocr(
     deskew: bool = True,
     denoise: bool = True,
     contrast_enhancement: bool = True,
+    dpi: int = 300,
+    workers: Optional[int] = None,
+    window_pages: int = DEFAULT_WINDOW_PAGES,
+    max_in_flight: Optional[int] = None,
 ) -> Tuple[str, Optional[Path]]:
     """
     Extract text from scanned PDF using OCR.
     
+    Pages are rasterized and recognized in windows (see ocr_pdf_pages). With output_dir, completed pages
+    are cached as they finish so an interrupted run resumes, and the combined text is cached at the end.
+    
     Args:
         pdf_path: Path to PDF file.
         language: OCR language code (default: "eng").
@@ -40,6 +324,10 @@ def extract_text_with_ocr(
         deskew: Whether to deskew images (default: True).
         denoise: Whether to denoise images (default: True).
         contrast_enhancement: Whether to enhance contrast (default: True).
+        dpi: Rasterization DPI (default: 300).
+        workers: Parallel tesseract workers (None = default_ocr_workers()).
+        window_pages: Pages rasterized per window (default: 4).
+        max_in_flight: Most page images held in memory at once (default: workers + window_pages).
         
     Returns:
         Tuple of (extracted_text, output_path). output_path is None if OCR fails.
@@ -50,47 +338,63 @@ def extract_text_with_ocr(
     
     try:
         # Check cache first
+        cache_path = None
+        page_cache = None
         if output_dir:
             cache_path = _get_ocr_cache_path(pdf_path, output_dir)
             if cache_path and cache_path.exists():
                 logger.info(f"Using cached OCR results for {pdf_path.name}")
                 text = cache_path.read_text(encoding="utf-8", errors="replace")
                 return text, cache_path
+            if cache_path:
+                page_cache = OCRPageCache(
+                    _get_ocr_page_cache_path(cache_path),
+                    {
+                        "language": language,
+                        "dpi": dpi,
+                        "deskew": deskew,
+                        "denoise": denoise,
+                        "contrast_enhancement": contrast_enhancement,
+                    },
+                    pdf_path=pdf_path,
+                    cache_path=cache_path,
+                )
         
         logger.info(f"Starting OCR processing for {pdf_path.name}")
         
-        # Convert PDF pages to images
+        def recognize(image: Any, page_num: int) -> Dict[str, Any]:
+            processed_image = preprocess_image(
+                image,
+                deskew=deskew,
+                denoise=denoise,
+                contrast_enhancement=contrast_enhancement,
+            )
+            return {"text": pytesseract.image_to_string(processed_image, lang=language)}
+        
         try:
-            images = convert_from_path(str(pdf_path), dpi=300)
-            logger.info(f"Converted {len(images)} pages to images")
+            pages = ocr_pdf_pages(
+                pdf_path,
+                recognize,
+                dpi=dpi,
+                workers=workers,
+                window_pages=window_pages,
+                max_in_flight=max_in_flight,
+                page_cache=page_cache,
+                convert=convert_from_path,
+            )
         except Exception as e:
             logger.error(f"Failed to convert PDF to images: {e}")
             return "", None
-        
-        # Process each page
-        all_text = []
-        for page_num, image in enumerate(images, start=1):
-            try:
-                # Preprocess image
-                processed_image = preprocess_image(
-                    image,
-                    deskew=deskew,
-                    denoise=denoise,
-                    contrast_enhancement=contrast_enhancement,
-                )
-                
-                # Run OCR
-                page_text = pytesseract.image_to_string(processed_image, lang=language)
-                if page_text.strip():
-                    all_text.append(f"--- Page {page_num} ---\n{page_text}")
-                    logger.debug(f"OCR extracted {len(page_text)} characters from page {page_num}")
-                else:
-                    logger.warning(f"No text extracted from page {page_num}")
-            except Exception as e:
-                logger.warning(f"OCR failed for page {page_num}: {e}")
-                continue
+        logger.info(f"OCR processed {len(pages)} pages of {pdf_path.name}")
         
         # Combine text from all pages
+        all_text = []
+        for page_num, result in pages.items():
+            page_text = (result or {}).get("text", "")
+            if page_text.strip():
+                all_text.append(f"--- Page {page_num} ---\n{page_text}")
+            elif result is not None:
+                logger.warning(f"No text extracted from page {page_num}")
         extracted_text = "\n\n".join(all_text)
         
         if not extracted_text.strip():
@@ -100,9 +404,10 @@ def extract_text_with_ocr(
         logger.info(f"OCR extracted {len(extracted_text)} characters from {pdf_path.name}")
         
         # Save to cache if output directory provided
-        cache_path = None
         if output_dir and extracted_text:
-            cache_path = _save_ocr_cache(pdf_path, extracted_text, output_dir)
+            cache_path = _save_ocr_cache(pdf_path, extracted_text, output_dir, cache_path)
+            if cache_path and page_cache:
+                page_cache.discard()  # superseded by the whole-document cache
         
         return extracted_text, cache_path
         
@@ -111,25 +416,72 @@ def extract_text_with_ocr(
         return "", None
 
 
+# PURPOSE: Locate the OCR cache for a PDF without reading the whole file.
+# DEPENDENCIES: utils.sampled_file_hash / full_file_hash.
+# MODIFICATION NOTES: Keyed by the sampled hash (size + head/tail/middle blocks). A sidecar .meta.json records
+#   the size, mtimes seen and full hash of the file the cache was made from; only when the mtime differs
+#   (possible sampled-hash collision) is the full hash read to confirm, and a real collision gets its own key.
 def _get_ocr_cache_path(pdf_path: Path, output_dir: Path) -> Optional[Path]:
     """Get the cache path for OCR results."""
     try:
         output_dir.mkdir(parents=True, exist_ok=True)
-        # Use PDF hash to create unique cache filename
-        pdf_hash = hashlib.md5(pdf_path.read_bytes()).hexdigest()[:16]
-        cache_filename = f"{pdf_path.stem}_{pdf_hash}_ocr.txt"
-        return output_dir / cache_filename
+        stat = pdf_path.stat()
+        sampled = sampled_file_hash(pdf_path, size=stat.st_size)
+        cache_path = output_dir / f"{pdf_path.stem}_{sampled[:16]}_ocr.txt"
+        meta = _read_ocr_fingerprint(cache_path)
+        if meta is None or [stat.st_size, stat.st_mtime_ns] in meta.get("seen", []):
+            return cache_path
+        # Same sampled hash from a different file version: confirm with the full hash
+        full = full_file_hash(pdf_path)
+        if meta.get("full") == full:
+            _record_ocr_fingerprint(pdf_path, cache_path, full=full)
+            return cache_path
+        logger.info(f"OCR cache fingerprint collision for {pdf_path.name}; using full-hash key")
+        return output_dir / f"{pdf_path.stem}_{full}_ocr.txt"
     except Exception as e:
         logger.warning(f"Failed to create OCR cache path: {e}")
         return None
 
 
-def _save_ocr_cache(pdf_path: Path, text: str, output_dir: Path) -> Optional[Path]:
+def _get_ocr_fingerprint_path(cache_path: Path) -> Path:
+    """Sidecar recording which file version an OCR cache was made from."""
+    return cache_path.with_suffix(".meta.json")
+
+
+def _read_ocr_fingerprint(cache_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(_get_ocr_fingerprint_path(cache_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _record_ocr_fingerprint(pdf_path: Path, cache_path: Path, full: Optional[str] = None) -> None:
+    """Write or extend the sidecar for cache_path (reads the whole PDF once if full is not given)."""
+    try:
+        stat = pdf_path.stat()
+        meta = _read_ocr_fingerprint(cache_path) or {}
+        full = full or meta.get("full") or full_file_hash(pdf_path)
+        seen = [entry for entry in meta.get("seen", []) if entry != [stat.st_size, stat.st_mtime_ns]]
+        meta = {"size": stat.st_size, "full": full, "seen": ([[stat.st_size, stat.st_mtime_ns]] + seen)[:8]}
+        _get_ocr_fingerprint_path(cache_path).write_text(json.dumps(meta), encoding="utf-8")
+    except OSError as e:
+        logger.debug(f"Failed to record OCR cache fingerprint for {pdf_path.name}: {e}")
+
+
+def _get_ocr_page_cache_path(cache_path: Path) -> Path:
+    """Per-page (resume) cache next to the whole-document OCR cache file."""
+    return cache_path.with_suffix(".pages.jsonl")
+
+
+def _save_ocr_cache(
+    pdf_path: Path, text: str, output_dir: Path, cache_path: Optional[Path] = None
+) -> Optional[Path]:
     """Save OCR results to cache."""
     try:
-        cache_path = _get_ocr_cache_path(pdf_path, output_dir)
+        cache_path = cache_path or _get_ocr_cache_path(pdf_path, output_dir)
         if cache_path:
             cache_path.write_text(text, encoding="utf-8")
+            _record_ocr_fingerprint(pdf_path, cache_path)
             logger.info(f"Saved OCR cache to {cache_path}")
             return cache_path
     except Exception as e:
@@ -137,16 +489,39 @@ def _save_ocr_cache(pdf_path: Path, text: str, output_dir: Path) -> Optional[Pat
     return None
 
 
-def is_scanned_pdf(pdf_path: Path, threshold: float = 0.05) -> bool:
+def _sample_page_indexes(page_count: int, sample_pages: int) -> List[int]:
+    """Evenly spaced page indexes including the first and last page (all pages if few)."""
+    if page_count <= sample_pages:
+        return list(range(page_count))
+    if sample_pages <= 1:
+        return [0]
+    return sorted({round(i * (page_count - 1) / (sample_pages - 1)) for i in range(sample_pages)})
+
+
+def _page_text_length(page: Any) -> int:
+    try:
+        return len((page.extract_text() or "").strip())
+    except Exception:
+        return 0
+
+
+# PURPOSE: Decide whether a PDF needs OCR from a page sample.
+# DEPENDENCIES: pypdf.
+# MODIFICATION NOTES: Stops as soon as enough text has been seen to rule out "scanned" for the whole document.
+#   A sample where every page agrees is extrapolated; a mixed sample (some text pages, some image pages)
+#   falls back to checking every page, which gives the same answer as the original full walk.
+def is_scanned_pdf(pdf_path: Path, threshold: float = 0.05, sample_pages: int = 8) -> bool:
     """
     Detect if PDF is scanned/image-based (requires OCR).
     
     Checks if PDF has extractable text. If text extraction yields less than
-    threshold percentage of expected content, considers it scanned.
+    threshold percentage of expected content, considers it scanned. Only a sample of pages is read
+    unless the sample is mixed.
     
     Args:
         pdf_path: Path to PDF file.
         threshold: Minimum ratio of text to page count (default: 0.05 = 5%).
+        sample_pages: Pages examined before deciding (default: 8).
         
     Returns:
         True if PDF appears to be scanned, False otherwise.
@@ -155,35 +530,44 @@ def is_scanned_pdf(pdf_path: Path, threshold: float = 0.05) -> bool:
         from pypdf import PdfReader
         
         reader = PdfReader(str(pdf_path))
-        page_count = len(reader.pages)
+        pages = reader.pages
+        page_count = len(pages)
         
         if page_count == 0:
             return True
         
-        # Extract text from all pages
-        total_text_length = 0
-        for page in reader.pages:
-            try:
-                page_text = page.extract_text() or ""
-                total_text_length += len(page_text.strip())
-            except Exception:
-                continue
+        # A document is scanned when its average text per page is below 50 characters or below
+        # threshold of expected content (assuming ~2000 chars per page for text-based PDFs)
+        expected_text_per_page = 2000
+        min_avg_chars = max(50.0, threshold * expected_text_per_page)
         
-        # Calculate average text per page
-        avg_text_per_page = total_text_length / page_count if page_count > 0 else 0
+        lengths: Dict[int, int] = {}
+        decided_text = False
+        for index in _sample_page_indexes(page_count, sample_pages):
+            lengths[index] = _page_text_length(pages[index])
+            if sum(lengths.values()) >= min_avg_chars * page_count:
+                decided_text = True  # even if every other page were empty
+                break
         
-        # If average text per page is less than 50 characters, likely scanned
-        # Also check if total text is less than threshold of expected content
-        # (assuming ~2000 chars per page for text-based PDFs)
-        expected_text_per_page = 2000
-        text_ratio = avg_text_per_page / expected_text_per_page if expected_text_per_page > 0 else 0
+        if not decided_text and len(lengths) < page_count:
+            has_text = {length >= min_avg_chars for length in lengths.values()}
+            if len(has_text) > 1:
+                # Mixed sample: check the remaining pages individually
+                logger.debug(f"PDF {pdf_path.name} has mixed text/image pages; checking every page")
+                for index in range(page_count):
+                    if index not in lengths:
+                        lengths[index] = _page_text_length(pages[index])
+        
+        # Average over the pages read (all pages unless the sample was uniform); a lower bound on early exit
+        avg_text_per_page = sum(lengths.values()) / (page_count if decided_text else len(lengths))
+        text_ratio = avg_text_per_page / expected_text_per_page
         
-        is_scanned = text_ratio < threshold or avg_text_per_page < 50
+        is_scanned = avg_text_per_page < min_avg_chars
         
         if is_scanned:
-            logger.info(f"PDF {pdf_path.name} appears to be scanned (text ratio: {text_ratio:.2%}, avg chars/page: {avg_text_per_page:.0f})")
+            logger.info(f"PDF {pdf_path.name} appears to be scanned (text ratio: {text_ratio:.2%}, avg chars/page: {avg_text_per_page:.0f}, pages read: {len(lengths)}/{page_count})")
         else:
-            logger.debug(f"PDF {pdf_path.name} appears to be text-based (text ratio: {text_ratio:.2%}, avg chars/page: {avg_text_per_page:.0f})")
+            logger.debug(f"PDF {pdf_path.name} appears to be text-based (text ratio: {text_ratio:.2%}, avg chars/page: {avg_text_per_page:.0f}, pages read: {len(lengths)}/{page_count})")
         
         return is_scanned
         
@@ -0,0 +1,341 @@
+# PURPOSE: Preload Ollama models and keep them resident while work is queued.
+# DEPENDENCIES: Ollama HTTP API (urllib, stdlib only); ingest_config.json "ollama_warmup" section.
+# MODIFICATION NOTES: Cold vs warm latency is recorded per model so model-swap thrash shows up in stats.
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENDPOINT = "http://localhost:11434"
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_REFRESH_SECONDS = 240.0
+# Ollama reports load_duration in nanoseconds; anything above this means the model was (re)loaded.
+DEFAULT_COLD_THRESHOLD_MS = 500.0
+
+
+def _normalize_endpoint(endpoint: Optional[str]) -> str:
+    """Return an http(s) base URL without trailing slash."""
+    endpoint = (endpoint or os.getenv("OLLAMA_HOST") or DEFAULT_ENDPOINT).strip().rstrip("/")
+    if not endpoint.startswith(("http://", "https://")):
+        endpoint = f"http://{endpoint}"
+    return endpoint
+
+
+# PURPOSE: Collect the Ollama models referenced by a config dict.
+# DEPENDENCIES: ingest_config.json layout (ai_summarization, entity_extraction, rag_pipeline).
+# MODIFICATION NOTES: Explicit ollama_warmup.models wins; otherwise every section with provider=ollama.
+def models_from_config(config: Dict[str, Any]) -> List[str]:
+    """
+    Return the ordered, de-duplicated list of Ollama models a config will use.
+
+    Args:
+        config: Ingestion config dictionary.
+
+    Returns:
+        List of model names.
+    """
+    warm_cfg = config.get("ollama_warmup") or {}
+    explicit = warm_cfg.get("models") or []
+    if explicit:
+        return list(dict.fromkeys(str(m) for m in explicit if m))
+
+    rag_cfg = config.get("rag_pipeline") or {}
+    sections = [
+        config.get("ai_summarization") or {},
+        rag_cfg.get("summarization") or {},
+        rag_cfg.get("generation") or {},
+    ]
+    models: List[str] = []
+    for section in sections:
+        if section.get("provider") == "ollama" and section.get("model"):
+            models.append(str(section["model"]))
+    entity_cfg = config.get("entity_extraction") or {}
+    if entity_cfg.get("use_llm") and entity_cfg.get("llm_provider") == "ollama" and entity_cfg.get("llm_model"):
+        models.append(str(entity_cfg["llm_model"]))
+    return list(dict.fromkeys(models))
+
+
+class OllamaWarmupManager:
+    """Preloads Ollama models, refreshes keep_alive while busy, and tracks cold/warm latency."""
+
+    def __init__(
+        self,
+        models: List[str],
+        endpoint: Optional[str] = None,
+        keep_alive: str = DEFAULT_KEEP_ALIVE,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+        cold_threshold_ms: float = DEFAULT_COLD_THRESHOLD_MS,
+        timeout: float = 120.0,
+        has_pending: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            models: Ollama model names to keep resident.
+            endpoint: Ollama base URL (default: OLLAMA_HOST env var or localhost:11434).
+            keep_alive: Ollama keep_alive duration sent with each preload (e.g. "30m").
+            refresh_seconds: Seconds between keep_alive refreshes while work is queued.
+            cold_threshold_ms: load_duration above which a call counts as a cold load.
+            timeout: HTTP timeout for a preload request in seconds.
+            has_pending: Optional callable reporting whether the caller has queued work.
+        """
+        self.models = list(dict.fromkeys(models))
+        self.endpoint = _normalize_endpoint(endpoint)
+        self.keep_alive = keep_alive
+        self.refresh_seconds = max(1.0, float(refresh_seconds))
+        self.cold_threshold_ms = float(cold_threshold_ms)
+        self.timeout = timeout
+        self.has_pending = has_pending
+        self._lock = threading.Lock()
+        self._active_work = 0
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        has_pending: Optional[Callable[[], bool]] = None,
+    ) -> Optional["OllamaWarmupManager"]:
+        """
+        Build a manager from the "ollama_warmup" config section.
+
+        Returns:
+            Manager instance, or None if warm-up is disabled or no Ollama models are configured.
+        """
+        warm_cfg = config.get("ollama_warmup") or {}
+        if not warm_cfg.get("enabled", True):
+            return None
+        models = models_from_config(config)
+        if not models:
+            return None
+        rag_gen = (config.get("rag_pipeline") or {}).get("generation") or {}
+        endpoint = (
+            warm_cfg.get("endpoint")
+            or rag_gen.get("ollama_endpoint")
+            or (config.get("ai_summarization") or {}).get("ollama_endpoint")
+        )
+        return cls(
+            models,
+            endpoint=endpoint,
+            keep_alive=str(warm_cfg.get("keep_alive", DEFAULT_KEEP_ALIVE)),
+            refresh_seconds=float(warm_cfg.get("refresh_seconds", DEFAULT_REFRESH_SECONDS)),
+            cold_threshold_ms=float(warm_cfg.get("cold_threshold_ms", DEFAULT_COLD_THRESHOLD_MS)),
+            timeout=float(warm_cfg.get("timeout_seconds", 120.0)),
+            has_pending=has_pending,
+        )
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        req = urllib.request.Request(
+            self.endpoint + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            body = resp.read().decode("utf-8")
+        return json.loads(body) if body.strip() else {}
+
+    def record_call(self, model: str, latency_ms: float, load_duration_ns: Optional[int] = None) -> bool:
+        """
+        Record the latency of one call against a model.
+
+        Args:
+            model: Model name.
+            latency_ms: Wall-clock latency of the call.
+            load_duration_ns: Ollama's reported load_duration, if available.
+
+        Returns:
+            True if the call was classified as a cold load.
+        """
+        load_ms = (load_duration_ns or 0) / 1_000_000.0
+        cold = load_ms >= self.cold_threshold_ms
+        with self._lock:
+            entry = self._stats.setdefault(model, {
+                "cold_count": 0,
+                "warm_count": 0,
+                "cold_latency_ms": 0.0,
+                "warm_latency_ms": 0.0,
+                "load_ms_total": 0.0,
+                "reloads_after_warm": 0,
+                "_seen_warm": False,
+            })
+            if cold:
+                entry["cold_count"] += 1
+                entry["cold_latency_ms"] += latency_ms
+                entry["load_ms_total"] += load_ms
+                # A cold load after the model was already warm means it was evicted (swap thrash).
+                if entry["_seen_warm"]:
+                    entry["reloads_after_warm"] += 1
+            else:
+                entry["warm_count"] += 1
+                entry["warm_latency_ms"] += latency_ms
+            entry["_seen_warm"] = True
+        if cold and load_ms:
+            logger.info(f"Ollama model '{model}' cold load: {load_ms:.0f}ms load, {latency_ms:.0f}ms total")
+        return cold
+
+    def record_response(self, model: str, response: Dict[str, Any], latency_ms: float) -> bool:
+        """Record a call from an Ollama response dict (uses its load_duration field)."""
+        load_duration = None
+        try:
+            load_duration = response.get("load_duration")
+        except AttributeError:
+            pass
+        return self.record_call(model, latency_ms, load_duration)
+
+    def warm_model(self, model: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a model (or refresh its keep_alive) with an empty generate request.
+
+        Returns:
+            Dict with latency_ms and cold flag, or None if Ollama could not be reached.
+        """
+        start = time.perf_counter()
+        try:
+            response = self._post("/api/generate", {"model": model, "keep_alive": self.keep_alive})
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            logger.warning(f"Ollama warm-up failed for '{model}' at {self.endpoint}: {e}")
+            return None
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        cold = self.record_response(model, response, latency_ms)
+        return {"model": model, "latency_ms": latency_ms, "cold": cold}
+
+    def warm_all(self) -> List[Dict[str, Any]]:
+        """Preload every configured model in order; returns the successful results."""
+        results = []
+        for model in self.models:
+            result = self.warm_model(model)
+            if result:
+                results.append(result)
+        return results
+
+    @contextmanager
+    def work(self) -> Iterator[None]:
+        """Mark a unit of work as in flight so the refresher keeps models resident."""
+        with self._lock:
+            self._active_work += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active_work -= 1
+
+    def is_busy(self) -> bool:
+        """Return True if work is in flight or the caller reports queued work."""
+        with self._lock:
+            if self._active_work > 0:
+                return True
+        if self.has_pending is not None:
+            try:
+                return bool(self.has_pending())
+            except Exception:
+                return False
+        return False
+
+    def _refresh_loop(self) -> None:
+        while not self._stop_event.wait(self.refresh_seconds):
+            if self.is_busy():
+                logger.debug("Refreshing Ollama keep_alive for queued work")
+                self.warm_all()
+
+    def start(self, preload: bool = True) -> None:
+        """
+        Preload models in the background and start the keep_alive refresher.
+
+        Args:
+            preload: Whether to load models immediately (default True).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def _run() -> None:
+            if preload:
+                self.warm_all()
+            self._refresh_loop()
+
+        self._thread = threading.Thread(target=_run, name="ollama-warmup", daemon=True)
+        self._thread.start()
+        logger.info(f"Ollama warm-up started for {', '.join(self.models)} (keep_alive={self.keep_alive})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the refresher thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return per-model cold/warm counts and average latencies.
+
+        Returns:
+            Dict mapping model name to stats (counts, avg latencies, reloads_after_warm).
+        """
+        with self._lock:
+            snapshot = {model: dict(entry) for model, entry in self._stats.items()}
+        result: Dict[str, Dict[str, Any]] = {}
+        for model, entry in snapshot.items():
+            cold, warm = entry["cold_count"], entry["warm_count"]
+            result[model] = {
+                "cold_count": cold,
+                "warm_count": warm,
+                "avg_cold_latency_ms": round(entry["cold_latency_ms"] / cold, 2) if cold else None,
+                "avg_warm_latency_ms": round(entry["warm_latency_ms"] / warm, 2) if warm else None,
+                "avg_load_ms": round(entry["load_ms_total"] / cold, 2) if cold else None,
+                "reloads_after_warm": entry["reloads_after_warm"],
+            }
+        return result
+
+
+_active_manager: Optional[OllamaWarmupManager] = None
+
+
+def get_active_manager() -> Optional[OllamaWarmupManager]:
+    """Return the manager started by start_warmup_from_config, if any."""
+    return _active_manager
+
+
+# PURPOSE: One-call startup hook for the workflow UI, web API and watcher.
+# DEPENDENCIES: OllamaWarmupManager.from_config.
+# MODIFICATION NOTES: Never raises; warm-up is best effort and must not block service startup.
+def start_warmup_from_config(
+    config: Dict[str, Any],
+    has_pending: Optional[Callable[[], bool]] = None,
+) -> Optional[OllamaWarmupManager]:
+    """
+    Create, register and start a warm-up manager from config.
+
+    Args:
+        config: Ingestion config dictionary.
+        has_pending: Optional callable reporting queued work.
+
+    Returns:
+        Started manager, or None if disabled/unconfigured.
+    """
+    global _active_manager
+    try:
+        manager = OllamaWarmupManager.from_config(config, has_pending=has_pending)
+    except Exception as e:
+        logger.warning(f"Ollama warm-up not started: {e}")
+        return None
+    if manager is None:
+        return None
+    if _active_manager is not None:
+        _active_manager.stop()
+    _active_manager = manager
+    manager.start()
+    return manager
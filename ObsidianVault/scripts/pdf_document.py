@@ -0,0 +1,244 @@
+# PURPOSE: Parsed-PDF handle opened once per PDF and shared by text, metadata and table extraction.
+# DEPENDENCIES: pypdf and/or pdfplumber (optional; each engine is opened lazily on first use).
+# MODIFICATION NOTES: Each engine parses the xref and page tree once per PDF instead of once per consumer.
+#   Page text is cached per (engine, page); pdfplumber page objects (chars/lines layout) are kept for the
+#   life of the handle so text and table detection share one layout pass. stats records the
+#   parse time avoided by reuse. Whole-document text of a PDF with at least page_parallel.min_pages pages
+#   is extracted in page ranges on a spawn-based process pool and joined in page order, giving the same
+#   text as the sequential walk.
+
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PdfReader = None
+    PYPDF_AVAILABLE = False
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    pdfplumber = None
+    PDFPLUMBER_AVAILABLE = False
+
+
+DEFAULT_PARALLEL_MIN_PAGES = 200
+DEFAULT_CHUNK_PAGES = 25
+
+
+def extract_page_range(pdf_path: str, engine: str, start: int, stop: int) -> List[Tuple[str, float]]:
+    """Worker job: open the PDF and return (text, seconds) for pages [start, stop)."""
+    with PDFDocument(Path(pdf_path)) as document:
+        return [(document.page_text(index, engine), document._page_seconds[(engine, index)])
+                for index in range(start, stop)]
+
+
+_page_pools: Dict[int, ProcessPoolExecutor] = {}
+_page_pools_lock = threading.Lock()
+
+
+def _page_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all documents with the same worker count (created on first use)."""
+    with _page_pools_lock:
+        pool = _page_pools.get(workers)
+        if pool is None:
+            # spawn: a forked child would inherit the parent's open handles and threads mid-flight
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _page_pools[workers] = pool
+        return pool
+
+
+def _discard_page_pool(workers: int) -> None:
+    with _page_pools_lock:
+        pool = _page_pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class PDFDocument:
+    """
+    One PDF, parsed at most once per engine.
+
+    Consumers take a handle with `reader` (pypdf) or `plumber` (pdfplumber) once per use; a second
+    consumer of the same engine counts as a reuse and adds that engine's open time to
+    stats["saved_seconds"]. page_text() is cached per engine and page, and cache hits add the
+    original extraction time. Use as a context manager, or call close().
+
+    With page_workers > 1, text()/page_texts() of a PDF with at least parallel_min_pages pages runs
+    range_extractor over chunks of chunk_pages pages in worker processes.
+    """
+
+    def __init__(
+        self,
+        pdf_path: Path,
+        page_workers: int = 1,
+        parallel_min_pages: int = DEFAULT_PARALLEL_MIN_PAGES,
+        chunk_pages: int = DEFAULT_CHUNK_PAGES,
+        range_extractor: Optional[Callable[[str, str, int, int], List[Tuple[str, float]]]] = None,
+    ):
+        self.path = Path(pdf_path)
+        self.page_workers = max(1, int(page_workers))
+        self.parallel_min_pages = max(1, int(parallel_min_pages))
+        self.chunk_pages = max(1, int(chunk_pages))
+        self.range_extractor = range_extractor or extract_page_range
+        self._handles: Dict[str, Any] = {}
+        self._open_seconds: Dict[str, float] = {}
+        self._page_text: Dict[Tuple[str, int], str] = {}
+        self._plumber_layout: set = set()  # pdfplumber pages laid out in this process
+        self._page_seconds: Dict[Tuple[str, int], float] = {}
+        self.stats: Dict[str, Any] = {
+            "opens": 0,
+            "reuses": 0,
+            "open_seconds": 0.0,
+            "page_text_hits": 0,
+            "saved_seconds": 0.0,
+            "parallel_pages": 0,
+        }
+
+    @classmethod
+    def from_config(cls, pdf_path: Path, config: Optional[Dict[str, Any]] = None) -> "PDFDocument":
+        """
+        Document with page-parallel settings from config["page_parallel"].
+
+        Keys: enabled (default true), min_pages (default 200), workers (default min(4, CPU count)),
+        chunk_pages (default 25).
+        """
+        settings = (config or {}).get("page_parallel") or {}
+        workers = 1
+        if settings.get("enabled", True):
+            workers = int(settings.get("workers") or min(4, os.cpu_count() or 1))
+        return cls(
+            pdf_path,
+            page_workers=workers,
+            parallel_min_pages=settings.get("min_pages", DEFAULT_PARALLEL_MIN_PAGES),
+            chunk_pages=settings.get("chunk_pages", DEFAULT_CHUNK_PAGES),
+        )
+
+    def __enter__(self) -> "PDFDocument":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def available(engine: str) -> bool:
+        return {"pypdf": PYPDF_AVAILABLE, "pdfplumber": PDFPLUMBER_AVAILABLE}.get(engine, False)
+
+    def _open(self, engine: str) -> Any:
+        """Parsed handle for engine, opening it on first use (no reuse accounting)."""
+        handle = self._handles.get(engine)
+        if handle is not None:
+            return handle
+        if not self.available(engine):
+            raise ImportError(f"{engine} not installed")
+        start = time.perf_counter()
+        handle = PdfReader(str(self.path)) if engine == "pypdf" else pdfplumber.open(str(self.path))
+        len(handle.pages)  # page tree is part of the parse cost
+        elapsed = time.perf_counter() - start
+        self._handles[engine] = handle
+        self._open_seconds[engine] = elapsed
+        self.stats["opens"] += 1
+        self.stats["open_seconds"] += elapsed
+        return handle
+
+    def handle(self, engine: str) -> Any:
+        """Shared parsed handle for engine ("pypdf" or "pdfplumber")."""
+        if engine in self._handles:
+            self.stats["reuses"] += 1
+            self.stats["saved_seconds"] += self._open_seconds[engine]
+        return self._open(engine)
+
+    @property
+    def reader(self) -> Any:
+        """Shared pypdf PdfReader."""
+        return self.handle("pypdf")
+
+    @property
+    def plumber(self) -> Any:
+        """Shared pdfplumber PDF; do not close it, the document owns it."""
+        return self.handle("pdfplumber")
+
+    def page_count(self, engine: str = "pypdf") -> int:
+        return len(self._open(engine).pages)
+
+    def page_text(self, index: int, engine: str = "pypdf") -> str:
+        """Text of one page (0-based), extracted once per engine."""
+        key = (engine, index)
+        if key in self._page_text:
+            self.stats["page_text_hits"] += 1
+            self.stats["saved_seconds"] += self._page_seconds[key]
+            return self._page_text[key]
+        page = self._open(engine).pages[index]
+        start = time.perf_counter()
+        text = page.extract_text() or ""
+        if engine == "pdfplumber":
+            self._plumber_layout.add(index)
+        self._page_seconds[key] = time.perf_counter() - start
+        self._page_text[key] = text
+        return text
+
+    def layout_parsed(self, index: int) -> bool:
+        """True if pdfplumber page index (0-based) was laid out here for text (not in a page-parallel worker)."""
+        return index in self._plumber_layout
+
+    def page_texts(self, engine: str = "pypdf") -> List[str]:
+        count = self.page_count(engine)
+        if (
+            self.page_workers > 1
+            and count >= self.parallel_min_pages
+            and not any((engine, index) in self._page_text for index in range(count))
+        ):
+            try:
+                return self._page_texts_parallel(engine, count)
+            except Exception as e:
+                logger.warning(f"Page-parallel extraction failed for {self.path.name}, extracting sequentially: {e}")
+                _discard_page_pool(self.page_workers)
+        return [self.page_text(index, engine) for index in range(count)]
+
+    def _page_texts_parallel(self, engine: str, count: int) -> List[str]:
+        """Extract all pages in ranges on the shared process pool; results are stitched in page order."""
+        # Enough chunks to balance the workers, but no smaller than chunk_pages (each chunk re-opens the PDF)
+        size = max(self.chunk_pages, math.ceil(count / (self.page_workers * 2)))
+        ranges = [(start, min(start + size, count)) for start in range(0, count, size)]
+        pool = _page_pool(self.page_workers)
+        futures = [pool.submit(self.range_extractor, str(self.path), engine, start, stop) for start, stop in ranges]
+        texts: List[str] = []
+        for (start, stop), future in zip(ranges, futures):
+            results = future.result()
+            if len(results) != stop - start:
+                raise ValueError(f"pages {start}-{stop} returned {len(results)} results")
+            for offset, (text, seconds) in enumerate(results):
+                self._page_text[(engine, start + offset)] = text
+                self._page_seconds[(engine, start + offset)] = seconds
+                texts.append(text)
+        self.stats["parallel_pages"] += count
+        logger.info(f"Extracted {count} pages of {self.path.name} in {len(ranges)} ranges on {self.page_workers} processes")
+        return texts
+
+    def text(self, engine: str = "pypdf") -> str:
+        """Whole-document text, pages joined with newlines (same as the per-extractor join)."""
+        return "\n".join(self.page_texts(engine))
+
+    def close(self) -> None:
+        for engine, handle in list(self._handles.items()):
+            close = getattr(handle, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Failed to close {engine} handle for {self.path.name}: {e}")
+        self._handles.clear()
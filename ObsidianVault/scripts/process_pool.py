@@ -0,0 +1,234 @@
+# PURPOSE: Process pool with a hard per-job timeout and worker recycling.
+# DEPENDENCIES: stdlib multiprocessing.
+# MODIFICATION NOTES: concurrent.futures / multiprocessing.Pool cannot stop a running task; here each worker
+#   runs one job at a time over its own pipe, so a job past its deadline is ended by terminating that worker,
+#   which is then replaced. Workers exit after max_jobs_per_worker jobs (leaked memory is returned to the OS).
+#   Results are yielded to the caller as they complete. A worker reports ready once its initializer has run;
+#   a job's timeout starts then, so a new worker's first job does not pay for the initializer.
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import signal
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sent by a worker once its initializer has finished
+_READY = "__ready__"
+
+
+def _exit_reason(exitcode: Optional[int]) -> str:
+    """Describe a dead worker's exit code ("code 3", or the signal that killed it)."""
+    if exitcode is not None and exitcode < 0:
+        try:
+            return f"signal {signal.Signals(-exitcode).name}"
+        except ValueError:
+            return f"signal {-exitcode}"
+    return f"code {exitcode}"
+
+
+class JobResult(NamedTuple):
+    """Outcome of one job: value when ok, error text otherwise (including "timed out")."""
+    key: Hashable
+    ok: bool
+    value: Any
+    error: Optional[str]
+    seconds: float
+
+
+def _worker_loop(
+    conn,
+    fn: Callable[..., Any],
+    initializer: Optional[Callable[..., None]],
+    initargs: Sequence[Any],
+    max_jobs: Optional[int],
+) -> None:
+    """Worker process: run jobs received on conn until told to stop or max_jobs is reached."""
+    if initializer is not None:
+        initializer(*initargs)
+    conn.send(_READY)
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        args = message
+        try:
+            reply = (True, fn(*args), None)
+        except Exception as exc:
+            reply = (False, None, f"{type(exc).__name__}: {exc}")
+        try:
+            conn.send(reply)
+        except Exception as exc:  # e.g. an unpicklable result
+            conn.send((False, None, f"Result could not be returned: {type(exc).__name__}: {exc}"))
+        done += 1
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, ctx, fn, initializer, initargs, max_jobs):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_loop,
+            args=(child_conn, fn, initializer, initargs, max_jobs),
+            # Not daemonic so a job may start its own pool (page-parallel extraction); an orphaned worker
+            # exits on EOF from the parent's pipe, and close() kills busy workers
+            daemon=False,
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.key: Optional[Hashable] = None
+        self.spawned = time.monotonic()
+        self.ready = False
+        self.started = 0.0
+
+    def clock_start(self) -> float:
+        """Start of the current job's timeout: dispatch, or the ready message for a starting worker."""
+        return self.started if self.ready else self.spawned
+
+    def stop(self, kill: bool = False) -> None:
+        if kill and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(2)
+            if self.process.is_alive():
+                self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(5)
+        self.conn.close()
+
+
+class RecyclingProcessPool:
+    """
+    Run fn(*args) for many jobs across worker processes.
+
+    Each job gets at most `timeout` seconds from dispatch, or from the worker's ready message when it
+    went to a new worker (the initializer is not charged to the job; it gets its own `timeout`). Past
+    that the worker is killed and the job is reported as failed. A worker is replaced after max_jobs_per_worker jobs. Use map() to iterate
+    results in completion order; call close() (or use as a context manager) when done.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        workers: int,
+        timeout: Optional[float] = None,
+        max_jobs_per_worker: Optional[int] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Sequence[Any] = (),
+        start_method: str = "spawn",
+    ):
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.max_jobs_per_worker = max_jobs_per_worker if max_jobs_per_worker and max_jobs_per_worker > 0 else None
+        self.initializer = initializer
+        self.initargs = tuple(initargs)
+        # spawn: forked children would inherit parent threads/locks (and OpenMP state) mid-flight
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle: deque = deque()
+        self._busy: Dict[Any, _Worker] = {}
+        self.stats: Dict[str, int] = {"started": 0, "recycled": 0, "killed": 0, "crashed": 0}
+
+    def _spawn(self) -> _Worker:
+        self.stats["started"] += 1
+        return _Worker(self._ctx, self.fn, self.initializer, self.initargs, self.max_jobs_per_worker)
+
+    def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        worker.stop(kill=kill)
+
+    def map(self, jobs: Iterable[Tuple[Hashable, Sequence[Any]]]) -> Iterator[JobResult]:
+        """
+        Run (key, args) jobs; yields a JobResult per job as soon as it finishes, fails or times out.
+        """
+        pending = iter(jobs)
+        exhausted = False
+        busy = self._busy
+
+        def dispatch() -> None:
+            nonlocal exhausted
+            while not exhausted and len(busy) < self.workers:
+                try:
+                    key, args = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    return
+                worker = self._idle.popleft() if self._idle else self._spawn()
+                worker.key, worker.started = key, time.monotonic()  # restarted on ready for a new worker
+                worker.conn.send(tuple(args))
+                busy[worker.conn] = worker
+
+        dispatch()
+        while busy:
+            deadline = None
+            if self.timeout is not None:
+                deadline = min(w.clock_start() for w in busy.values()) + self.timeout
+            wait_for = list(busy) + [w.process.sentinel for w in busy.values()]
+            ready = set(wait(wait_for, None if deadline is None else max(0.0, deadline - time.monotonic())))
+            now = time.monotonic()
+            for conn, worker in list(busy.items()):
+                elapsed = now - worker.clock_start()
+                message = None
+                if conn in ready or (worker.process.sentinel in ready and conn.poll()):
+                    try:
+                        message = conn.recv()
+                    except (EOFError, OSError):
+                        message = None  # pipe closed: the worker died (handled as a crash below)
+                if message is not None:
+                    if not worker.ready and message == _READY:
+                        # Initializer done: the job (already queued on the pipe) starts its clock now
+                        worker.ready, worker.started = True, now
+                        continue
+                    ok, value, error = message
+                    del busy[conn]
+                    worker.jobs += 1
+                    yield JobResult(worker.key, ok, value, error, elapsed)
+                    if self.max_jobs_per_worker is not None and worker.jobs >= self.max_jobs_per_worker:
+                        self.stats["recycled"] += 1
+                        self._retire(worker)
+                    else:
+                        self._idle.append(worker)
+                elif conn in ready or worker.process.sentinel in ready:
+                    del busy[conn]
+                    self.stats["crashed"] += 1
+                    self._retire(worker, kill=True)  # joins the process, so exitcode is set
+                    reason = _exit_reason(worker.process.exitcode)
+                    yield JobResult(worker.key, False, None, f"Worker exited with {reason}", elapsed)
+                elif self.timeout is not None and elapsed >= self.timeout:
+                    del busy[conn]
+                    self.stats["killed"] += 1
+                    self._retire(worker, kill=True)
+                    if not worker.ready:
+                        logger.warning(f"Worker for job {worker.key} did not start within {self.timeout:.0f}s; killed")
+                        yield JobResult(
+                            worker.key, False, None, f"Worker initializer timed out after {self.timeout:.0f}s", elapsed,
+                        )
+                        continue
+                    logger.warning(f"Job {worker.key} exceeded {self.timeout:.0f}s; worker killed")
+                    yield JobResult(worker.key, False, None, f"Timed out after {self.timeout:.0f}s", elapsed)
+            dispatch()
+
+    def close(self) -> None:
+        while self._busy:
+            _, worker = self._busy.popitem()
+            self._retire(worker, kill=True)
+        while self._idle:
+            self._retire(self._idle.popleft())
+
+    def __enter__(self) -> "RecyclingProcessPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
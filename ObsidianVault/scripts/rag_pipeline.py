@@ -11,8 +11,10 @@ import sys
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from entity_aggregate import EntityAggregateStore, count_mentions, document_hash
+from rate_limiter import get_provider_limiter, run_with_limiter
 from utils import load_config, validate_vault_path
 
 # #region agent log
@@ -45,6 +47,7 @@ except ImportError:
 
 try:
     from ai_summarizer import summarize_text, _call_openai_api, _call_anthropic_api, _call_ollama_api, chunk_text, chunk_by_sections
+    from ai_summarizer import get_prompt_cache_stats
     SUMMARIZATION_AVAILABLE = True
     CHUNKING_AVAILABLE = True
 except ImportError:
@@ -492,59 +495,6 @@ class EntityCache:
         except Exception as exc:
             logger.warning(f"Failed to cache entities for {doc_key}: {exc}")
 
-    def _get_composite_key(self, combined_text: str) -> str:
-        """Generate cache key for combined multi-doc extraction."""
-        combined_hash = hashlib.md5(combined_text.encode("utf-8")).hexdigest()[:12]
-        return f"combined_{combined_hash}.json"
-
-    def get_composite(self, doc_keys: List[str], combined_text: str) -> Optional[Dict[str, Any]]:
-        """
-        Get cached entities for a combined set of documents.
-        
-        Args:
-            doc_keys: Document keys that were combined (for verification).
-            combined_text: The combined text that was extracted.
-            
-        Returns:
-            Cached entities dict or None if not cached/invalid.
-        """
-        cache_file = self.cache_dir / self._get_composite_key(combined_text)
-        if not cache_file.exists():
-            return None
-        try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cached = json.load(f)
-            expected_hash = hashlib.md5(combined_text.encode("utf-8")).hexdigest()[:12]
-            if cached.get("combined_hash") != expected_hash:
-                return None
-            return cached.get("entities")
-        except Exception as exc:
-            logger.debug(f"Failed to load composite entity cache: {exc}")
-            return None
-
-    def set_composite(self, doc_keys: List[str], combined_text: str, entities: Dict[str, Any]):
-        """
-        Cache entity extraction results for a combined set of documents.
-        
-        Args:
-            doc_keys: Document keys that were combined.
-            combined_text: The combined text that was extracted.
-            entities: Extracted entities dictionary.
-        """
-        cache_file = self.cache_dir / self._get_composite_key(combined_text)
-        try:
-            combined_hash = hashlib.md5(combined_text.encode("utf-8")).hexdigest()[:12]
-            cached_data = {
-                "doc_keys": doc_keys,
-                "combined_hash": combined_hash,
-                "entities": entities,
-                "timestamp": time.time(),
-            }
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(cached_data, f, indent=2, ensure_ascii=False)
-        except Exception as exc:
-            logger.warning(f"Failed to cache composite entities: {exc}")
-
 
 # PURPOSE: Merge nested configuration dictionaries with defaults.
 # DEPENDENCIES: None.
@@ -605,6 +555,12 @@ def load_pipeline_config(config_path: Path) -> Dict[str, Any]:
             "temperature": 0.8,
             "ollama_endpoint": None,
             "parallel": True,
+            "rate_limit": {
+                "min_concurrency": 1,
+                "max_concurrency": 8,
+                "initial_concurrency": 3,
+                "tokens_per_minute": None,
+            },
         },
         "theme_keywords": [
             "faith",
@@ -671,6 +627,15 @@ def load_pipeline_config(config_path: Path) -> Dict[str, Any]:
             "chunk_size": 8000,
             "chunk_overlap": 200,
             "incremental": False,
+            "backend": "chroma",
+            "encode_workers": 1,
+            "batch_size": 64,
+            "sort_window": 512,
+            "embedding_cache": {
+                "enabled": True,
+                "path": None,
+                "max_entries": 200000,
+            },
         },
     }
 
@@ -711,13 +676,18 @@ def resolve_campaign_docs(campaign_kb_root: Path, doc_rel_paths: List[str]) -> L
 # DEPENDENCIES: filesystem access.
 # MODIFICATION NOTES: Skips unreadable files with warnings.
 def read_campaign_docs(doc_paths: List[Path]) -> Dict[str, str]:
-    text_map: Dict[str, str] = {}
+    return dict(iter_campaign_docs(doc_paths))
+
+
+def iter_campaign_docs(doc_paths: List[Path]) -> Iterator[Tuple[str, str]]:
+    """Yield (path, text) for each readable campaign doc, one file at a time."""
     for path in doc_paths:
         try:
-            text_map[str(path)] = path.read_text(encoding="utf-8")
+            text = path.read_text(encoding="utf-8")
         except Exception as exc:
             logger.warning(f"Failed to read {path}: {exc}")
-    return text_map
+            continue
+        yield str(path), text
 
 
 # PURPOSE: Read extracted PDF text files incrementally with chunking to avoid memory/performance issues.
@@ -744,10 +714,41 @@ def read_pdf_texts(
     Returns:
         Dictionary mapping PDF source keys to text chunks.
     """
-    text_map: Dict[str, str] = {}
+    return dict(iter_pdf_texts(
+        pdf_extraction_dir,
+        file_pattern=file_pattern,
+        max_chunk_size=max_chunk_size,
+        max_chunks_per_pdf=max_chunks_per_pdf,
+        max_total_text_chars=max_total_text_chars,
+        use_chunk_by_sections=use_chunk_by_sections,
+    ))
+
+
+def iter_pdf_texts(
+    pdf_extraction_dir: Path,
+    file_pattern: str = "*.txt",
+    max_chunk_size: int = 8000,
+    max_chunks_per_pdf: int = 50,
+    max_total_text_chars: int = 2000000,
+    use_chunk_by_sections: bool = False,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (source key, text) pairs for extracted PDF texts, one file at a time (same limits as read_pdf_texts).
+    
+    Args:
+        pdf_extraction_dir: Directory containing extracted PDF text files.
+        file_pattern: File pattern to match (default: "*.txt").
+        max_chunk_size: Maximum characters per chunk (default: 8000).
+        max_chunks_per_pdf: Maximum chunks per PDF file (default: 50).
+        max_total_text_chars: Maximum total characters across all PDFs (default: 2M).
+        
+    Yields:
+        (PDF source key, text chunk) pairs.
+    """
+    sources = 0
     if not pdf_extraction_dir.exists():
         logger.warning(f"PDF extraction directory not found: {pdf_extraction_dir}")
-        return text_map
+        return
     
     pdf_files = sorted(pdf_extraction_dir.glob(file_pattern))  # Sort for deterministic processing
     logger.info(f"Found {len(pdf_files)} PDF text files in {pdf_extraction_dir}")
@@ -808,7 +809,8 @@ def read_pdf_texts(
                         break
                     
                     chunk_key = f"[PDF] {pdf_path.name} [chunk {i+1}/{len(chunks)}]"
-                    text_map[chunk_key] = chunk
+                    yield chunk_key, chunk
+                    sources += 1
                     total_chars += len(chunk)
                     
                     # #region agent log
@@ -828,7 +830,8 @@ def read_pdf_texts(
                     skipped_pdfs += 1
                     continue
                 
-                text_map[f"[PDF] {pdf_path.name}"] = text
+                yield f"[PDF] {pdf_path.name}", text
+                sources += 1
                 total_chars += text_length
                 
                 # #region agent log
@@ -853,17 +856,35 @@ def read_pdf_texts(
         "total_pdfs": len(pdf_files),
         "processed": processed_pdfs,
         "skipped": skipped_pdfs,
-        "successful_sources": len(text_map),
+        "successful_sources": sources,
         "total_chars": total_chars
     }, "A")
     # #endregion
     
     logger.info(
         f"PDF ingestion complete: {processed_pdfs} processed, {skipped_pdfs} skipped, "
-        f"{len(text_map)} sources, {total_chars:,} total characters"
+        f"{sources} sources, {total_chars:,} total characters"
     )
-    
-    return text_map
+
+
+# PURPOSE: Stream the whole RAG corpus (campaign docs, then extracted PDF texts) from disk.
+# DEPENDENCIES: resolve_campaign_docs, iter_campaign_docs, iter_pdf_texts.
+# MODIFICATION NOTES: Used for ChromaDB builds so the corpus is never held in memory at once.
+def iter_corpus_docs(rag_config: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Yield (doc_key, text) for every campaign doc and extracted PDF text, one file at a time."""
+    campaign_kb_root = Path(rag_config["campaign_kb_root"])
+    yield from iter_campaign_docs(resolve_campaign_docs(campaign_kb_root, rag_config.get("campaign_docs", [])))
+    if rag_config.get("include_pdfs", True):
+        pdf_dir = Path(rag_config.get("pdf_extraction_dir", "Sources/_extracted_text"))
+        pdf_config = rag_config.get("pdf_ingestion", {})
+        yield from iter_pdf_texts(
+            pdf_dir,
+            file_pattern=rag_config.get("pdf_file_pattern", "*.txt"),
+            max_chunk_size=pdf_config.get("max_chunk_size", 8000),
+            max_chunks_per_pdf=pdf_config.get("max_chunks_per_pdf", 50),
+            max_total_text_chars=pdf_config.get("max_total_text_chars", 2000000),
+            use_chunk_by_sections=pdf_config.get("chunk_by_sections", False),
+        )
 
 
 # PURPOSE: Build a theme frequency map from text.
@@ -875,13 +896,15 @@ def build_theme_counts(text: str, keywords: List[str]) -> Dict[str, int]:
 
 
 # PURPOSE: Extract entities from a subset of documents (lazy evaluation).
-# DEPENDENCIES: entity_extractor, EntityCache.
-# MODIFICATION NOTES: Only processes provided document subset, uses cache to avoid re-extraction.
+# DEPENDENCIES: entity_extractor, EntityCache, EntityAggregateStore.
+# MODIFICATION NOTES: Each document is extracted on its own (per-document EntityCache). With an aggregate
+#   store the view is read from its per-document rows; only documents missing or changed there are extracted.
 def extract_entities_from_docs(
     doc_keys: List[str],
     text_map: Dict[str, str],
     rag_config: Dict[str, Any],
     entity_cache: Optional[EntityCache] = None,
+    aggregate_store: Optional[EntityAggregateStore] = None,
 ) -> Dict[str, List[str]]:
     """
     Extract entities only from specified documents (lazy evaluation for queries).
@@ -891,73 +914,30 @@ def extract_entities_from_docs(
         text_map: Full text map (will only use specified keys).
         rag_config: RAG configuration.
         entity_cache: Optional entity cache instance.
+        aggregate_store: Optional corpus entity aggregate; new or changed documents are stored in it.
         
     Returns:
-        Dictionary of entities by category.
+        Dictionary of entities by category; a name is listed once per document that mentions it.
     """
     entities: Dict[str, List[str]] = {"NPCs": [], "Factions": [], "Locations": [], "Items": []}
     
     if not doc_keys or not ENTITY_EXTRACTION_AVAILABLE:
         return entities
     
-    # Collect text from specified documents only
-    relevant_texts = []
-    for doc_key in doc_keys:
-        if doc_key in text_map:
-            text = text_map[doc_key]
-            # Check cache first
-            if entity_cache:
-                cached = entity_cache.get(doc_key, text)
-                if cached:
-                    # Merge cached entities
-                    for category in entities:
-                        entities[category].extend(cached.get(category, []))
-                    continue
-            relevant_texts.append((doc_key, text))
-    
-    if not relevant_texts:
+    relevant_keys = [doc_key for doc_key in dict.fromkeys(doc_keys) if doc_key in text_map]
+    if aggregate_store is not None:
+        for doc_key in relevant_keys:
+            _sync_aggregate_document(doc_key, text_map[doc_key], rag_config, aggregate_store, entity_cache)
+        counts = aggregate_store.counts_for_documents(relevant_keys)
+        for category in entities:
+            for name, documents in sorted(counts.get(category, {}).items()):
+                entities[category].extend([name] * documents)
         return entities
     
-    # Combine text from relevant docs
-    combined_text = "\n\n".join([text for _, text in relevant_texts])
-    
-    # Limit size for entity extraction
-    MAX_TEXT_FOR_ENTITY_EXTRACTION = 500000  # 500K chars for query mode (smaller than full analysis)
-    if len(combined_text) > MAX_TEXT_FOR_ENTITY_EXTRACTION:
-        logger.info(f"Truncating combined text for entity extraction: {len(combined_text):,} -> {MAX_TEXT_FOR_ENTITY_EXTRACTION:,} chars")
-        combined_text = combined_text[:MAX_TEXT_FOR_ENTITY_EXTRACTION]
-    
-    # Check composite cache when multiple docs (avoids cross-doc contamination)
-    relevant_doc_keys = [dk for dk, _ in relevant_texts]
-    if entity_cache and len(relevant_texts) > 1:
-        cached = entity_cache.get_composite(relevant_doc_keys, combined_text)
-        if cached:
-            for category in entities:
-                entities[category].extend(cached.get(category, []))
-            return entities
-    
-    # Extract entities (tool registry: AI security P6)
-    ensure_tool_allowed("entity_extractor.extract_entities_from_text")
-    extracted = extract_entities_from_text(
-        combined_text,
-        use_llm=rag_config.get("entity_extraction", {}).get("use_llm", False),
-        llm_provider=rag_config.get("entity_extraction", {}).get("llm_provider", "ollama"),
-        llm_model=rag_config.get("entity_extraction", {}).get("llm_model", "llama2"),
-        llm_api_key=rag_config.get("entity_extraction", {}).get("llm_api_key"),
-    )
-    
-    if extracted:
-        if entity_cache:
-            if len(relevant_texts) == 1:
-                # Single doc: cache per-doc (correct, no contamination)
-                doc_key, text = relevant_texts[0]
-                entity_cache.set(doc_key, text, extracted)
-            else:
-                # Multi doc: cache composite only (avoids per-doc contamination)
-                entity_cache.set_composite(relevant_doc_keys, combined_text, extracted)
-        
-        entities = extracted
-    
+    for doc_key in relevant_keys:
+        extracted = _extract_document_entities(doc_key, text_map[doc_key], rag_config, entity_cache) or {}
+        for category in entities:
+            entities[category].extend(dict.fromkeys(extracted.get(category, [])))
     return entities
 
 
@@ -994,13 +974,109 @@ def summarize_context_from_docs(
     return summarize_context(combined_text, rag_config)
 
 
+# PURPOSE: Extract one document's entities, consulting the per-document EntityCache first.
+# DEPENDENCIES: entity_extractor, EntityCache.
+# MODIFICATION NOTES: Text is capped per document, so one large document cannot crowd out the others.
+def _extract_document_entities(
+    doc_key: str,
+    text: str,
+    rag_config: Dict[str, Any],
+    entity_cache: Optional[EntityCache] = None,
+) -> Optional[Dict[str, Any]]:
+    MAX_TEXT_FOR_ENTITY_EXTRACTION = 1000000  # 1M chars per document
+    extracted = entity_cache.get(doc_key, text) if entity_cache else None
+    if extracted is None and text.strip():
+        entity_cfg = rag_config.get("entity_extraction", {})
+        ensure_tool_allowed("entity_extractor.extract_entities_from_text")
+        extracted = extract_entities_from_text(
+            text[:MAX_TEXT_FOR_ENTITY_EXTRACTION],
+            model_name=entity_cfg.get("spacy_model", "en_core_web_sm"),
+            use_llm=entity_cfg.get("use_llm", False),
+            llm_provider=entity_cfg.get("llm_provider", "ollama"),
+            llm_model=entity_cfg.get("llm_model", "llama2"),
+            llm_api_key=entity_cfg.get("llm_api_key"),
+        )
+        if extracted and entity_cache:
+            entity_cache.set(doc_key, text, extracted)
+    return extracted
+
+
+def _sync_aggregate_document(
+    doc_key: str,
+    text: str,
+    rag_config: Dict[str, Any],
+    aggregate_store: EntityAggregateStore,
+    entity_cache: Optional[EntityCache] = None,
+) -> bool:
+    """Store a document's entities unless the aggregate already has this text. Returns True if extracted."""
+    text_hash = document_hash(text)
+    if aggregate_store.document_hash(doc_key) == text_hash:
+        return False
+    extracted = _extract_document_entities(doc_key, text, rag_config, entity_cache)
+    aggregate_store.replace_document(doc_key, count_mentions(text, extracted or {}), text_hash)
+    return True
+
+
+# PURPOSE: Bring the corpus entity aggregate up to date with text_map.
+# DEPENDENCIES: entity_extractor, EntityAggregateStore, EntityCache.
+# MODIFICATION NOTES: Only new or changed documents are extracted; documents gone from text_map are removed.
+def update_entity_aggregate(
+    text_map: Dict[str, str],
+    rag_config: Dict[str, Any],
+    aggregate_store: EntityAggregateStore,
+    entity_cache: Optional[EntityCache] = None,
+) -> Dict[str, int]:
+    """
+    Apply per-document deltas so the aggregate matches text_map.
+    
+    Args:
+        text_map: Full corpus (doc_key -> text).
+        rag_config: RAG configuration.
+        aggregate_store: Corpus entity aggregate to update.
+        entity_cache: Optional per-document entity cache consulted before extraction.
+        
+    Returns:
+        Counts of documents extracted, unchanged and removed.
+    """
+    removed = aggregate_store.sync_documents(text_map.keys())
+    extracted_docs = 0
+    unchanged = 0
+    for doc_key, text in text_map.items():
+        if _sync_aggregate_document(doc_key, text, rag_config, aggregate_store, entity_cache):
+            extracted_docs += 1
+        else:
+            unchanged += 1
+    logger.info(
+        f"Entity aggregate: {extracted_docs} documents extracted, {unchanged} unchanged, {len(removed)} removed"
+    )
+    return {"extracted": extracted_docs, "unchanged": unchanged, "removed": len(removed)}
+
+
 # PURPOSE: Aggregate entity extraction across campaign docs.
-# DEPENDENCIES: entity_extractor.
-# MODIFICATION NOTES: Returns per-category entity counts and unique lists.
-def build_pattern_report(text_map: Dict[str, str], rag_config: Dict[str, Any]) -> Dict[str, Any]:
+# DEPENDENCIES: entity_extractor; EntityAggregateStore for incremental updates.
+# MODIFICATION NOTES: Returns per-category entity counts and unique lists. With an aggregate store,
+#   only new/changed documents are extracted and counts are documents mentioning each entity.
+def build_pattern_report(
+    text_map: Dict[str, str],
+    rag_config: Dict[str, Any],
+    entity_cache: Optional[EntityCache] = None,
+    aggregate_store: Optional[EntityAggregateStore] = None,
+) -> Dict[str, Any]:
     combined_text = "\n\n".join(text_map.values())
     entities: Dict[str, List[str]] = {"NPCs": [], "Factions": [], "Locations": [], "Items": []}
 
+    if aggregate_store is not None and ENTITY_EXTRACTION_AVAILABLE:
+        update_entity_aggregate(text_map, rag_config, aggregate_store, entity_cache)
+        entities = aggregate_store.entities(categories=list(entities))
+        all_counts = aggregate_store.counts()
+        counts = {key: all_counts.get(key, {}) for key in entities}
+        return {
+            "entities": entities,
+            "entity_counts": counts,
+            "themes": build_theme_counts(combined_text, rag_config.get("theme_keywords", [])),
+            "source_docs": list(text_map.keys()),
+        }
+
     # Limit entity extraction for very large texts to prevent performance issues
     MAX_TEXT_FOR_ENTITY_EXTRACTION = 1000000  # 1M chars
     text_for_extraction = combined_text
@@ -1022,6 +1098,7 @@ def build_pattern_report(text_map: Dict[str, str], rag_config: Dict[str, Any]) -
         ensure_tool_allowed("entity_extractor.extract_entities_from_text")
         extracted = extract_entities_from_text(
             text_for_extraction,
+            model_name=rag_config.get("entity_extraction", {}).get("spacy_model", "en_core_web_sm"),
             use_llm=rag_config.get("entity_extraction", {}).get("use_llm", False),
             llm_provider=rag_config.get("entity_extraction", {}).get("llm_provider", "ollama"),
             llm_model=rag_config.get("entity_extraction", {}).get("llm_model", "llama2"),
@@ -1080,7 +1157,7 @@ def summarize_context(text: str, rag_config: Dict[str, Any]) -> Optional[str]:
 # PURPOSE: Call LLM provider with a custom prompt for generation.
 # DEPENDENCIES: ai_summarizer internal API helpers.
 # MODIFICATION NOTES: Returns generated text or None if unavailable.
-def generate_text(prompt: str, rag_config: Dict[str, Any]) -> Optional[str]:
+def generate_text(prompt: str, rag_config: Dict[str, Any], cache_prefix: Optional[str] = None) -> Optional[str]:
     gen_cfg = rag_config.get("generation", {})
     provider = gen_cfg.get("provider", "ollama")
     model = gen_cfg.get("model", "llama2")
@@ -1093,20 +1170,25 @@ def generate_text(prompt: str, rag_config: Dict[str, Any]) -> Optional[str]:
         logger.error("LLM helpers not available; cannot generate content")
         return None
 
+    rate_limit = gen_cfg.get("rate_limit")
     if provider == "openai":
-        result, _ = _call_openai_api(prompt, model, api_key, max_tokens, temperature)
+        result, _ = _call_openai_api(
+            prompt, model, api_key, max_tokens, temperature, rate_limit=rate_limit, cache_prefix=cache_prefix
+        )
         return result
     if provider == "anthropic":
-        result, _ = _call_anthropic_api(prompt, model, api_key, max_tokens, temperature)
+        result, _ = _call_anthropic_api(
+            prompt, model, api_key, max_tokens, temperature, rate_limit=rate_limit, cache_prefix=cache_prefix
+        )
         return result
-    result, _ = _call_ollama_api(prompt, model, max_tokens, temperature, endpoint=endpoint)
+    result, _ = _call_ollama_api(prompt, model, max_tokens, temperature, endpoint=endpoint, cache_prefix=cache_prefix)
     return result
 
 
-# PURPOSE: Generate rules, adventure outline, and bios from context.
-# DEPENDENCIES: generate_text.
-# MODIFICATION NOTES: Returns a dict keyed by output type.
-def generate_content_pack(context_summary: str, pattern_report: Dict[str, Any], rag_config: Dict[str, Any]) -> Dict[str, str]:
+# PURPOSE: Shared, byte-stable prompt prefix for the content pack (grounding + context + canonical lists).
+# DEPENDENCIES: None.
+# MODIFICATION NOTES: Task-specific instructions go after this prefix so provider prompt caches can reuse it.
+def build_content_pack_prefix(context_summary: str, pattern_report: Dict[str, Any]) -> str:
     context = context_summary or ""
     entities = pattern_report.get("entities", {})
     top_npcs = ", ".join(entities.get("NPCs", [])[:6])
@@ -1124,36 +1206,36 @@ def generate_content_pack(context_summary: str, pattern_report: Dict[str, Any],
         "- Do not create fictional artifacts, weapons, or magical items unless they are explicitly mentioned.\n\n"
     )
 
-    rules_prompt = (
-        "Draft a concise rules module for Wrath & Glory based ONLY on the provided context.\n\n"
+    return (
+        "You are writing Wrath & Glory material based ONLY on the provided context.\n\n"
         + grounding_instructions +
         f"Context summary: {context}\n\n"
         f"Canonical NPCs from source: {top_npcs}\n"
         f"Canonical Factions from source: {top_factions}\n"
         f"Canonical Locations from source: {top_locations}\n"
         f"Canonical Items from source: {top_items}\n\n"
+        "TASK:\n"
+    )
+
+
+# PURPOSE: Generate rules, adventure outline, and bios from context.
+# DEPENDENCIES: generate_text, build_content_pack_prefix.
+# MODIFICATION NOTES: Returns a dict keyed by output type. All three prompts share one cached prefix.
+def generate_content_pack(context_summary: str, pattern_report: Dict[str, Any], rag_config: Dict[str, Any]) -> Dict[str, str]:
+    shared_prefix = build_content_pack_prefix(context_summary, pattern_report)
+
+    rules_prompt = (
+        "Draft a concise rules module for Wrath & Glory based ONLY on the provided context.\n"
         "Include: scope, mechanics, and example of play. Reference ONLY the entities listed above.\n"
         "Do not mention any items, weapons, or artifacts that are not in the canonical items list.\n"
     )
     adventure_prompt = (
-        "Generate a 3-act adventure outline for Wrath & Glory based ONLY on the provided context.\n\n"
-        + grounding_instructions +
-        f"Context summary: {context}\n\n"
-        f"Canonical NPCs from source: {top_npcs}\n"
-        f"Canonical Factions from source: {top_factions}\n"
-        f"Canonical Locations from source: {top_locations}\n"
-        f"Canonical Items from source: {top_items}\n\n"
+        "Generate a 3-act adventure outline for Wrath & Glory based ONLY on the provided context.\n"
         "Include: hook, key scenes, adversaries, and fallout. Reference ONLY the entities listed above.\n"
         "Do not invent new locations, factions, or NPCs. Use only what is provided in the canonical lists.\n"
     )
     bios_prompt = (
-        "Generate 3 NPC bios for Wrath & Glory based ONLY on the provided context.\n\n"
-        + grounding_instructions +
-        f"Context summary: {context}\n\n"
-        f"Canonical NPCs from source: {top_npcs}\n"
-        f"Canonical Factions from source: {top_factions}\n"
-        f"Canonical Locations from source: {top_locations}\n"
-        f"Canonical Items from source: {top_items}\n\n"
+        "Generate 3 NPC bios for Wrath & Glory based ONLY on the provided context.\n"
         "Each bio should include: role, motivation, secret, hook.\n"
         "Use ONLY NPCs, factions, and locations from the canonical lists above.\n"
         "Do not create new NPCs or reference entities not in the provided lists.\n"
@@ -1164,7 +1246,7 @@ def generate_content_pack(context_summary: str, pattern_report: Dict[str, Any],
 
     def _gen(key: str, prompt: str) -> Tuple[str, str]:
         try:
-            out = generate_text(prompt, rag_config) or ""
+            out = generate_text(prompt, rag_config, cache_prefix=shared_prefix) or ""
             return (key, out)
         except Exception as exc:
             logger.warning(f"generate_content_pack {key} failed: {exc}")
@@ -1172,6 +1254,24 @@ def generate_content_pack(context_summary: str, pattern_report: Dict[str, Any],
 
     if use_parallel:
         results: Dict[str, str] = {}
+        provider = gen_cfg.get("provider", "ollama")
+        if provider in ("openai", "anthropic"):
+            # The provider only caches the prefix once a request carrying it has been processed,
+            # so send one prompt first and fan out the rest against the warm cache.
+            key, out = _gen("rules", rules_prompt)
+            results[key] = out
+            # Hosted providers: pool is as wide as the adaptive limiter allows; the limiter
+            # inside _call_*_api sets the real in-flight width from rate-limit headers.
+            limiter = get_provider_limiter(provider, gen_cfg.get("rate_limit"))
+            outputs = run_with_limiter(
+                [
+                    lambda: _gen("adventure", adventure_prompt),
+                    lambda: _gen("bios", bios_prompt),
+                ],
+                limiter,
+            )
+            results.update(outputs)
+            return results
         with ThreadPoolExecutor(max_workers=3) as executor:
             futures = {
                 executor.submit(_gen, "rules", rules_prompt): "rules",
@@ -1184,9 +1284,9 @@ def generate_content_pack(context_summary: str, pattern_report: Dict[str, Any],
         return results
 
     return {
-        "rules": generate_text(rules_prompt, rag_config) or "",
-        "adventure": generate_text(adventure_prompt, rag_config) or "",
-        "bios": generate_text(bios_prompt, rag_config) or "",
+        "rules": generate_text(rules_prompt, rag_config, cache_prefix=shared_prefix) or "",
+        "adventure": generate_text(adventure_prompt, rag_config, cache_prefix=shared_prefix) or "",
+        "bios": generate_text(bios_prompt, rag_config, cache_prefix=shared_prefix) or "",
     }
 
 
@@ -1404,20 +1504,7 @@ def retrieve_context(
     search_cfg = rag_config.get("search", {})
 
     def _load_text_map() -> Dict[str, str]:
-        doc_paths = resolve_campaign_docs(campaign_kb_root, rag_config.get("campaign_docs", []))
-        tm = read_campaign_docs(doc_paths)
-        if rag_config.get("include_pdfs", True):
-            pdf_dir = Path(rag_config.get("pdf_extraction_dir", "Sources/_extracted_text"))
-            pdf_config = rag_config.get("pdf_ingestion", {})
-            tm.update(read_pdf_texts(
-                pdf_dir,
-                file_pattern=rag_config.get("pdf_file_pattern", "*.txt"),
-                max_chunk_size=pdf_config.get("max_chunk_size", 8000),
-                max_chunks_per_pdf=pdf_config.get("max_chunks_per_pdf", 50),
-                max_total_text_chars=pdf_config.get("max_total_text_chars", 2000000),
-                use_chunk_by_sections=pdf_config.get("chunk_by_sections", False),
-            ))
-        return tm
+        return dict(iter_corpus_docs(rag_config))
 
     limit = search_cfg.get("limit", 8)
     max_chunk_chars = search_cfg.get("max_chunk_chars", 2000)
@@ -1460,8 +1547,9 @@ def retrieve_context(
         except Exception as exc:
             logger.warning(f"Campaign KB search failed, falling back to text scan: {exc}")
 
-    if text_map is None:
-        text_map = _load_text_map()
+    def _chroma_corpus():
+        """Corpus for a ChromaDB build or sync: the caller's text_map, else streamed from disk."""
+        return text_map if text_map is not None else iter_corpus_docs(rag_config)
 
     retrieval_strategy = rag_config.get("retrieval", {}).get("strategy", "docindex")
     if rag_config.get("use_chroma") and not retrieval_strategy:
@@ -1474,25 +1562,23 @@ def retrieve_context(
         chroma_results: List[Dict[str, Any]] = []
         docindex_results: List[Dict[str, Any]] = []
         try:
-            from chroma_retriever import ChromaRetriever
+            from chroma_retriever import get_retriever
             chroma_cfg = rag_config.get("chroma", {})
             persist_dir = Path(chroma_cfg.get("persist_dir", "Campaigns/_rag_cache/chroma"))
             if not persist_dir.is_absolute():
                 vault_root = rag_config.get("vault_root", Path.cwd())
                 persist_dir = Path(vault_root) / persist_dir
-            retriever = ChromaRetriever(
-                persist_dir,
-                embedding_model=chroma_cfg.get("embedding_model", "all-MiniLM-L6-v2"),
-                collection_name=chroma_cfg.get("collection_name", "arc_forge_rag"),
-            )
-            if text_map and retriever.count() == 0:
-                retriever.build_index(text_map, rag_config, rag_config.get("chunk_tags", {}))
+            retriever = get_retriever(persist_dir, chroma_cfg)
+            if (text_map is None or text_map) and retriever.count() == 0:
+                retriever.build_index(_chroma_corpus(), rag_config, rag_config.get("chunk_tags", {}))
             chroma_results = retriever.retrieve(
                 query, top_k=limit * 2, retrieval_mode=retrieval_mode or "Strict Canon",
                 tag_filters=tag_filters, max_chunk_chars=max_chunk_chars,
             )
         except Exception as exc:
             logger.debug(f"Chroma in hybrid failed: {exc}")
+        if text_map is None:
+            text_map = _load_text_map()
         if doc_index and text_map:
             relevant_doc_keys = doc_index.retrieve(
                 query, top_k=limit * 2, retrieval_mode=retrieval_mode, tag_filters=tag_filters
@@ -1520,23 +1606,19 @@ def retrieve_context(
     # ChromaDB semantic retrieval (Option B)
     if rag_config.get("use_chroma") and retrieval_strategy != "docindex":
         try:
-            from chroma_retriever import ChromaRetriever
+            from chroma_retriever import get_retriever
             chroma_cfg = rag_config.get("chroma", {})
             persist_dir = Path(chroma_cfg.get("persist_dir", "Campaigns/_rag_cache/chroma"))
             if not persist_dir.is_absolute():
                 vault_root = rag_config.get("vault_root", Path.cwd())
                 persist_dir = Path(vault_root) / persist_dir
-            retriever = ChromaRetriever(
-                persist_dir,
-                embedding_model=chroma_cfg.get("embedding_model", "all-MiniLM-L6-v2"),
-                collection_name=chroma_cfg.get("collection_name", "arc_forge_rag"),
-            )
-            if text_map:
+            retriever = get_retriever(persist_dir, chroma_cfg)
+            if text_map is None or text_map:
                 use_incremental = chroma_cfg.get("incremental", False)
                 if retriever.count() == 0:
-                    retriever.build_index(text_map, rag_config, rag_config.get("chunk_tags", {}))
+                    retriever.build_index(_chroma_corpus(), rag_config, rag_config.get("chunk_tags", {}))
                 elif use_incremental:
-                    retriever.add_or_update_docs(text_map, rag_config, rag_config.get("chunk_tags", {}))
+                    retriever.add_or_update_docs(_chroma_corpus(), rag_config, rag_config.get("chunk_tags", {}))
             results = retriever.retrieve(query, top_k=limit, retrieval_mode=retrieval_mode or "Strict Canon", tag_filters=tag_filters, max_chunk_chars=max_chunk_chars)
             if results:
                 return results
@@ -1545,6 +1627,9 @@ def retrieve_context(
         except Exception as exc:
             logger.warning(f"ChromaDB retrieval failed: {exc}, falling back to legacy retrieval")
 
+    if text_map is None:
+        text_map = _load_text_map()
+
     # Fast path: Use DocumentIndex if available (no need to load full text)
     if doc_index and doc_index.index and retrieval_strategy != "chroma":
         relevant_doc_keys = doc_index.retrieve(
@@ -1570,7 +1655,7 @@ def retrieve_context(
                 for item in scored[:limit]
             ]
 
-    # Fallback: Full text scanning (text_map loaded once at start)
+    # Fallback: Full text scanning (text_map loaded once, after the ChromaDB paths)
     scored: List[Tuple[str, float, str]] = []
     
     # Extract query terms and phrases
@@ -1750,15 +1835,21 @@ def stage_analyze(
     rag_config: Dict[str, Any],
     entity_cache: Optional[EntityCache],
     full_corpus: bool = False,
+    aggregate_store: Optional[EntityAggregateStore] = None,
 ) -> Dict[str, Any]:
     """Build pattern report from documents."""
     if full_corpus:
-        return build_pattern_report(text_map, rag_config) if rag_config.get("pattern_analysis_enabled") else {}
+        if not rag_config.get("pattern_analysis_enabled"):
+            return {}
+        return build_pattern_report(text_map, rag_config, entity_cache=entity_cache, aggregate_store=aggregate_store)
     if not rag_config.get("pattern_analysis_enabled") or not rag_config.get("query_mode", {}).get("lazy_entity_extraction", True):
         return {}
-    entities = extract_entities_from_docs(relevant_doc_keys, text_map, rag_config, entity_cache=entity_cache)
+    mentions = extract_entities_from_docs(
+        relevant_doc_keys, text_map, rag_config, entity_cache=entity_cache, aggregate_store=aggregate_store,
+    )
     combined_relevant = "\n\n".join([text_map[k] for k in relevant_doc_keys if k in text_map])
-    counts = {key: {name: entities[key].count(name) for name in set(entities[key])} for key in entities}
+    entities = {key: sorted(set(names)) for key, names in mentions.items()}
+    counts = {key: {name: mentions[key].count(name) for name in entities[key]} for key in mentions}
     themes = build_theme_counts(combined_relevant, rag_config.get("theme_keywords", []))
     return {"entities": entities, "entity_counts": counts, "themes": themes, "source_docs": relevant_doc_keys}
 
@@ -1789,6 +1880,26 @@ def stage_generate(
     return generate_content_pack(context_summary or "", pattern_report, rag_config)
 
 
+# PURPOSE: Prompt-cache counters accumulated during one run_pipeline call.
+# DEPENDENCIES: ai_summarizer.get_prompt_cache_stats snapshots.
+# MODIFICATION NOTES: Providers without requests in the window are omitted; adds cached_ratio.
+def _prompt_cache_delta(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-provider prompt-cache counters accumulated between two get_prompt_cache_stats() snapshots."""
+    delta: Dict[str, Dict[str, Any]] = {}
+    for provider, entry in after.items():
+        prev = before.get(provider, {})
+        diff = {
+            key: entry[key] - prev.get(key, 0)
+            for key in ("requests", "prompt_tokens", "cached_tokens", "cache_write_tokens", "cache_hits")
+        }
+        if not diff["requests"]:
+            continue
+        total = diff["prompt_tokens"] + diff["cached_tokens"]
+        diff["cached_ratio"] = round(diff["cached_tokens"] / total, 4) if total else 0.0
+        delta[provider] = diff
+    return delta
+
+
 # PURPOSE: Run the full RAG pipeline end-to-end with query mode detection.
 # DEPENDENCIES: All helpers in this module, DocumentIndex, EntityCache.
 # MODIFICATION NOTES: B3: accepts retrieval_mode and tag_filters; passes to retrieve_context.
@@ -1799,7 +1910,11 @@ def run_pipeline(
     tag_filters: Optional[Dict[str, str]] = None,
 ) -> Dict[str, Any]:
     try:
-        return _run_pipeline_impl(config_path, query, retrieval_mode, tag_filters)
+        cache_before = get_prompt_cache_stats() if SUMMARIZATION_AVAILABLE else {}
+        result = _run_pipeline_impl(config_path, query, retrieval_mode, tag_filters)
+        if SUMMARIZATION_AVAILABLE and result.get("status") == "success":
+            result["prompt_cache"] = _prompt_cache_delta(cache_before, get_prompt_cache_stats())
+        return result
     except Exception as e:
         log_structured_error(
             type(e).__name__,
@@ -1829,6 +1944,8 @@ def _run_pipeline_impl(
     cache_config = rag_config.get("cache", {})
     doc_index = None
     entity_cache = None
+    aggregate_store = None
+    cache_dir = None
     
     if cache_config.get("enabled", True):
         cache_dir = Path(rag_config.get("vault_root", Path.cwd())) / cache_config.get("cache_dir", "Campaigns/_rag_cache")
@@ -1872,9 +1989,17 @@ def _run_pipeline_impl(
         
         logger.info(f"Retrieved {len(relevant_doc_keys)} relevant documents for query")
         
-        pattern_report = stage_analyze(
-            text_map, relevant_doc_keys, rag_config, entity_cache, full_corpus=False,
-        )
+        # Corpus entity aggregate: the relevant documents' entities are read from its per-document rows
+        if cache_dir is not None:
+            aggregate_store = EntityAggregateStore.from_config(cache_config.get("entity_aggregate"), cache_dir)
+        try:
+            pattern_report = stage_analyze(
+                text_map, relevant_doc_keys, rag_config, entity_cache, full_corpus=False,
+                aggregate_store=aggregate_store,
+            )
+        finally:
+            if aggregate_store is not None:
+                aggregate_store.close()
         context_summary = stage_summarize(
             text_map, relevant_doc_keys, rag_config, full_corpus=False,
         )
@@ -1908,9 +2033,17 @@ def _run_pipeline_impl(
         _debug_log("rag_pipeline.py:477", "Combined text created", {"total_sources": len(text_map), "combined_length": len(combined_text), "campaign_sources": len([k for k in text_map.keys() if not k.startswith("[PDF]")]), "pdf_sources": len([k for k in text_map.keys() if k.startswith("[PDF]")])}, "B")
         # #endregion
 
-        pattern_report = stage_analyze(
-            text_map, list(text_map.keys()), rag_config, entity_cache, full_corpus=True,
-        )
+        # Corpus entity aggregate: opened for the report only, closed right after
+        if cache_dir is not None:
+            aggregate_store = EntityAggregateStore.from_config(cache_config.get("entity_aggregate"), cache_dir)
+        try:
+            pattern_report = stage_analyze(
+                text_map, list(text_map.keys()), rag_config, entity_cache, full_corpus=True,
+                aggregate_store=aggregate_store,
+            )
+        finally:
+            if aggregate_store is not None:
+                aggregate_store.close()
         context_summary = stage_summarize(
             text_map, list(text_map.keys()), rag_config, full_corpus=True,
         )
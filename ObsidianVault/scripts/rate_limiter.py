@@ -0,0 +1,432 @@
+# PURPOSE: Rate-limit-aware adaptive concurrency for hosted LLM providers (OpenAI, Anthropic).
+# DEPENDENCIES: stdlib only; optional httpx response hook when the provider SDKs are installed.
+# MODIFICATION NOTES: Reads rate-limit headers and Retry-After, tracks a tokens-per-minute budget,
+#   and scales allowed in-flight requests (halve on 429, +1 after a run of clean responses).
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_INITIAL_CONCURRENCY = 3
+# Fallback cooldown when a 429 carries no Retry-After / reset header.
+DEFAULT_RATE_LIMIT_COOLDOWN = 2.0
+# Shrink concurrency when less than this fraction of the request/token budget remains.
+LOW_REMAINING_RATIO = 0.1
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse OpenAI-style reset durations ("1s", "6m0s", "20ms") or RFC 3339 timestamps into seconds."""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(num + unit for num, unit in parts) == value:
+        scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+        return sum(float(num) * scale[unit] for num, unit in parts)
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date)."""
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+# PURPOSE: Normalize OpenAI / Anthropic rate-limit headers into one dict.
+# DEPENDENCIES: None.
+# MODIFICATION NOTES: Missing headers map to None; header names are matched case-insensitively.
+def parse_rate_limit_headers(headers: Optional[Mapping[str, str]]) -> Dict[str, Optional[float]]:
+    """
+    Extract rate-limit state from provider response headers.
+
+    Args:
+        headers: Response headers (any mapping; httpx.Headers works).
+
+    Returns:
+        Dict with requests_limit, requests_remaining, requests_reset_s, tokens_limit,
+        tokens_remaining, tokens_reset_s and retry_after_s (None when absent).
+    """
+    info: Dict[str, Optional[float]] = {
+        "requests_limit": None,
+        "requests_remaining": None,
+        "requests_reset_s": None,
+        "tokens_limit": None,
+        "tokens_remaining": None,
+        "tokens_reset_s": None,
+        "retry_after_s": None,
+    }
+    if not headers:
+        return info
+    lowered = {str(k).lower(): str(v) for k, v in headers.items()}
+
+    for prefix in ("x-ratelimit-", "anthropic-ratelimit-"):
+        for kind in ("requests", "tokens"):
+            if prefix == "x-ratelimit-":
+                limit = lowered.get(f"{prefix}limit-{kind}")
+                remaining = lowered.get(f"{prefix}remaining-{kind}")
+                reset = lowered.get(f"{prefix}reset-{kind}")
+            else:
+                limit = lowered.get(f"{prefix}{kind}-limit")
+                remaining = lowered.get(f"{prefix}{kind}-remaining")
+                reset = lowered.get(f"{prefix}{kind}-reset")
+            if limit is not None and info[f"{kind}_limit"] is None:
+                info[f"{kind}_limit"] = _to_int(limit)
+            if remaining is not None and info[f"{kind}_remaining"] is None:
+                info[f"{kind}_remaining"] = _to_int(remaining)
+            if reset is not None and info[f"{kind}_reset_s"] is None:
+                info[f"{kind}_reset_s"] = _parse_duration(reset)
+
+    if "retry-after-ms" in lowered:
+        ms = _to_int(lowered["retry-after-ms"])
+        if ms is not None:
+            info["retry_after_s"] = ms / 1000.0
+    if info["retry_after_s"] is None and "retry-after" in lowered:
+        info["retry_after_s"] = _parse_retry_after(lowered["retry-after"])
+    return info
+
+
+class _Slot:
+    """One in-flight request; holds its token reservation in the limiter's window."""
+
+    __slots__ = ("entry", "waited")
+
+    def __init__(self, entry: List[float], waited: float):
+        self.entry = entry
+        self.waited = waited
+
+
+class AdaptiveConcurrencyLimiter:
+    """Gate for hosted-provider calls that adapts in-flight width to the provider's rate limits."""
+
+    def __init__(
+        self,
+        name: str = "default",
+        min_concurrency: int = DEFAULT_MIN_CONCURRENCY,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            name: Label used in logs and stats (usually the provider name).
+            min_concurrency: Floor for allowed in-flight requests.
+            max_concurrency: Ceiling for allowed in-flight requests.
+            initial_concurrency: Starting width.
+            tokens_per_minute: Optional TPM budget; learned from headers when not set.
+        """
+        self.name = name
+        self._cond = threading.Condition()
+        self.min_concurrency = max(1, int(min_concurrency))
+        self.max_concurrency = max(self.min_concurrency, int(max_concurrency))
+        self.limit = min(self.max_concurrency, max(self.min_concurrency, int(initial_concurrency)))
+        self.tokens_per_minute = tokens_per_minute
+        self._tpm_configured = tokens_per_minute is not None
+        self.in_flight = 0
+        self._blocked_until = 0.0
+        self._success_streak = 0
+        self._window: Deque[List[float]] = deque()  # [timestamp, tokens]
+        self._http_client: Optional[Any] = None
+        self._stats = {
+            "requests": 0,
+            "rate_limited": 0,
+            "wait_seconds": 0.0,
+            "peak_in_flight": 0,
+            "min_limit_seen": self.limit,
+            "max_limit_seen": self.limit,
+        }
+
+    def configure(
+        self,
+        min_concurrency: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ) -> None:
+        """Update bounds/budget in place (used when config is loaded after first use)."""
+        with self._cond:
+            if min_concurrency is not None:
+                self.min_concurrency = max(1, int(min_concurrency))
+            if max_concurrency is not None:
+                self.max_concurrency = max(self.min_concurrency, int(max_concurrency))
+            if tokens_per_minute is not None:
+                self.tokens_per_minute = int(tokens_per_minute)
+                self._tpm_configured = True
+            self.limit = min(self.max_concurrency, max(self.min_concurrency, self.limit))
+            self._cond.notify_all()
+
+    def _tokens_in_window(self, now: float) -> float:
+        while self._window and now - self._window[0][0] >= 60.0:
+            self._window.popleft()
+        return sum(entry[1] for entry in self._window)
+
+    def _set_limit(self, new_limit: int, reason: str) -> None:
+        new_limit = min(self.max_concurrency, max(self.min_concurrency, new_limit))
+        if new_limit != self.limit:
+            logger.debug(f"{self.name} concurrency {self.limit} -> {new_limit} ({reason})")
+            self.limit = new_limit
+            self._stats["min_limit_seen"] = min(self._stats["min_limit_seen"], new_limit)
+            self._stats["max_limit_seen"] = max(self._stats["max_limit_seen"], new_limit)
+
+    def acquire(self, estimated_tokens: int = 0, timeout: Optional[float] = None) -> _Slot:
+        """
+        Block until a request may be sent.
+
+        Args:
+            estimated_tokens: Expected prompt + completion tokens, reserved against the TPM budget.
+            timeout: Optional maximum wait in seconds.
+
+        Returns:
+            Slot to pass to release().
+
+        Raises:
+            TimeoutError: If no slot became available within timeout.
+        """
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait: Optional[float] = None
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self.in_flight < self.limit:
+                    used = self._tokens_in_window(now)
+                    # Always let a lone request through so an oversize prompt cannot deadlock.
+                    if (
+                        self.tokens_per_minute
+                        and self._window
+                        and used + estimated_tokens > self.tokens_per_minute
+                    ):
+                        wait = max(0.01, 60.0 - (now - self._window[0][0]))
+                    else:
+                        entry = [now, float(estimated_tokens)]
+                        self._window.append(entry)
+                        self.in_flight += 1
+                        waited = now - start
+                        self._stats["requests"] += 1
+                        self._stats["wait_seconds"] += waited
+                        self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self.in_flight)
+                        return _Slot(entry, waited)
+                if timeout is not None:
+                    remaining = timeout - (now - start)
+                    if remaining <= 0:
+                        raise TimeoutError(f"{self.name} rate limiter: no slot within {timeout}s")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait if wait is not None else 1.0)
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> Dict[str, Optional[float]]:
+        """
+        Apply provider rate-limit headers (any response, success or 429).
+
+        Returns:
+            Parsed header info.
+        """
+        info = parse_rate_limit_headers(headers)
+        with self._cond:
+            now = time.monotonic()
+            if info["tokens_limit"] and not self._tpm_configured:
+                self.tokens_per_minute = int(info["tokens_limit"])
+            for kind in ("requests", "tokens"):
+                remaining = info[f"{kind}_remaining"]
+                limit = info[f"{kind}_limit"]
+                reset = info[f"{kind}_reset_s"]
+                if remaining is None:
+                    continue
+                if remaining <= 0 and reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+                elif limit and remaining < limit * LOW_REMAINING_RATIO:
+                    self._set_limit(self.limit - 1, f"{kind} budget low")
+            self._cond.notify_all()
+        return info
+
+    def release(
+        self,
+        slot: _Slot,
+        tokens_used: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        rate_limited: bool = False,
+        fallback_delay: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Finish a request and adapt the concurrency limit.
+
+        Args:
+            slot: Slot returned by acquire().
+            tokens_used: Actual tokens reported by the provider (replaces the estimate).
+            headers: Response headers, if available.
+            rate_limited: True if the provider answered 429.
+            fallback_delay: Cooldown to use when a 429 carries no Retry-After or reset header.
+
+        Returns:
+            Seconds the caller should wait before retrying (only when rate_limited), else None.
+        """
+        info = self.observe_headers(headers) if headers else parse_rate_limit_headers(None)
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            if tokens_used is not None:
+                slot.entry[1] = float(tokens_used)
+            retry_after: Optional[float] = None
+            if rate_limited:
+                self._stats["rate_limited"] += 1
+                self._success_streak = 0
+                self._set_limit(self.limit // 2, "429")
+                retry_after = info["retry_after_s"]
+                if retry_after is None:
+                    retry_after = (
+                        info["tokens_reset_s"]
+                        or info["requests_reset_s"]
+                        or fallback_delay
+                        or DEFAULT_RATE_LIMIT_COOLDOWN
+                    )
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            else:
+                self._success_streak += 1
+                # Additive increase: one step per "limit" clean responses.
+                if self._success_streak >= self.limit:
+                    self._success_streak = 0
+                    self._set_limit(self.limit + 1, "clean responses")
+            self._cond.notify_all()
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters plus current limit and TPM budget."""
+        with self._cond:
+            result = dict(self._stats)
+            result["limit"] = self.limit
+            result["in_flight"] = self.in_flight
+            result["tokens_per_minute"] = self.tokens_per_minute
+            result["wait_seconds"] = round(result["wait_seconds"], 3)
+        return result
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+# PURPOSE: Shared per-provider limiter so every call path (summaries, generation) draws on one budget.
+# DEPENDENCIES: AdaptiveConcurrencyLimiter.
+# MODIFICATION NOTES: Config (min/max_concurrency, tokens_per_minute) is applied on every call that passes it.
+def get_provider_limiter(provider: str, config: Optional[Dict[str, Any]] = None) -> AdaptiveConcurrencyLimiter:
+    """
+    Return the process-wide limiter for a provider, creating it on first use.
+
+    Args:
+        provider: Provider name ("openai", "anthropic").
+        config: Optional rate_limit config dict (min_concurrency, max_concurrency,
+            initial_concurrency, tokens_per_minute).
+
+    Returns:
+        AdaptiveConcurrencyLimiter instance.
+    """
+    config = config or {}
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                name=provider,
+                min_concurrency=config.get("min_concurrency", DEFAULT_MIN_CONCURRENCY),
+                max_concurrency=config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+                initial_concurrency=config.get("initial_concurrency", DEFAULT_INITIAL_CONCURRENCY),
+                tokens_per_minute=config.get("tokens_per_minute"),
+            )
+            _limiters[provider] = limiter
+            return limiter
+    if config:
+        limiter.configure(
+            min_concurrency=config.get("min_concurrency"),
+            max_concurrency=config.get("max_concurrency"),
+            tokens_per_minute=config.get("tokens_per_minute"),
+        )
+    return limiter
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough request size for TPM accounting (~4 chars per token plus the completion budget)."""
+    return len(prompt) // 4 + int(max_tokens or 0)
+
+
+def make_http_client(limiter: AdaptiveConcurrencyLimiter) -> Optional[Any]:
+    """
+    Build an httpx client whose response hook feeds every response's headers to the limiter.
+
+    Returns:
+        httpx.Client (one per limiter, reused), or None when httpx is not installed.
+    """
+    if limiter._http_client is not None:
+        return limiter._http_client
+    try:
+        import httpx  # type: ignore
+    except ImportError:
+        return None
+
+    def _on_response(response: Any) -> None:
+        try:
+            limiter.observe_headers(response.headers)
+        except Exception as e:
+            logger.debug(f"Rate-limit header hook failed: {e}")
+
+    limiter._http_client = httpx.Client(event_hooks={"response": [_on_response]})
+    return limiter._http_client
+
+
+def run_with_limiter(
+    tasks: List[Callable[[], T]],
+    limiter: AdaptiveConcurrencyLimiter,
+) -> List[T]:
+    """
+    Run callables on a pool as wide as the limiter's ceiling; the limiter decides real in-flight width.
+
+    The callables are expected to acquire/release the limiter themselves (the provider
+    call helpers do). Results are returned in task order.
+    """
+    if not tasks:
+        return []
+    width = max(1, min(len(tasks), limiter.max_concurrency))
+    with ThreadPoolExecutor(max_workers=width) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        return [future.result() for future in futures]
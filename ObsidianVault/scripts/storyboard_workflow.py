@@ -240,12 +240,11 @@ def draft_encounter(
     npc_excerpt = _read_kb_sections(npcs_path)
     loc_excerpt = _read_kb_sections(locs_path)
 
-    prompt = (
+    # Storyboard, campaign_kb refs and output format are the same for every encounter in a run;
+    # they form a stable prefix so provider prompt caches reuse it. Per-encounter parts go last.
+    shared_prefix = _encounter_designer_prefix(system_prompt_path) + (
         "Write a short Wrath & Glory encounter draft in markdown.\n\n"
-        f"**Encounter:** {name} (id: {eid}, type: {etype})\n"
-        f"**Storyboard section:** {section}\n\n"
         f"**Storyboard excerpt:**\n{story_excerpt}\n\n"
-        f"**Mechanics context (use or adapt):**\n{context_summary[:rag_config.get('search', {}).get('max_chunk_chars', 2000)]}\n\n"
         f"**NPC reference (link or paraphrase):**\n{npc_excerpt[:1500]}\n\n"
         f"**Location reference:**\n{loc_excerpt[:1500]}\n\n"
         "Output format:\n"
@@ -253,10 +252,14 @@ def draft_encounter(
         "### Setup\n[1–2 sentences]\n"
         "### Mechanics\n- List skill tests with DN (e.g. Pilot (Agi) DN 3).\n"
         "### NPCs / Locations\n[Refs to 03_npcs, 02_locations or placeholders]\n"
-        "Keep it under 600 words."
+        "Keep it under 600 words.\n\n"
     )
-    full_prompt = _encounter_designer_prefix(system_prompt_path) + prompt
-    out = generate_text(full_prompt, rag_config)
+    prompt = (
+        f"**Encounter:** {name} (id: {eid}, type: {etype})\n"
+        f"**Storyboard section:** {section}\n\n"
+        f"**Mechanics context (use or adapt):**\n{context_summary[:rag_config.get('search', {}).get('max_chunk_chars', 2000)]}\n"
+    )
+    out = generate_text(prompt, rag_config, cache_prefix=shared_prefix)
     return out or f"## {name}\n\n*Draft placeholder: edit from storyboard section {section}.*"
 
 
@@ -1,13 +1,18 @@
 # PURPOSE: Table and figure extraction from PDFs (Phase 2).
 # DEPENDENCIES: pdfplumber, camelot-py, tabula-py.
-# MODIFICATION NOTES: Phase 2 - Complete table extraction implementation.
+# MODIFICATION NOTES: Phase 2 - Complete table extraction implementation. pdfplumber path accepts a shared
+#   PDFDocument so pages parsed for text extraction are not parsed again for tables. extract_tables runs
+#   table_prefilter first and hands every extractor only the candidate pages.
 
 from __future__ import annotations
 
 import logging
 import re
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import Any, Dict, Iterable, List, Optional
+
+from table_prefilter import find_candidate_pages
 
 logger = logging.getLogger(__name__)
 
@@ -31,25 +36,34 @@ except ImportError:
     TABULA_AVAILABLE = False
 
 
-def extract_tables_pdfplumber(pdf_path: Path) -> List[Dict[str, Any]]:
+def extract_tables_pdfplumber(
+    pdf_path: Path, document=None, pages: Optional[Iterable[int]] = None
+) -> List[Dict[str, Any]]:
     """
     Extract tables using pdfplumber.
     
     Args:
         pdf_path: Path to PDF file.
+        document: Optional pdf_document.PDFDocument; its pdfplumber pages (and their parsed
+            layout) are shared with text extraction instead of opening the file again.
+        pages: Optional 1-based page numbers to search (default: all pages).
         
     Returns:
         List of table dictionaries with page, data, markdown, caption.
     """
-    if not PDFPLUMBER_AVAILABLE:
+    if not PDFPLUMBER_AVAILABLE and document is None:
         logger.warning("pdfplumber not available")
         return []
     
     tables = []
+    wanted = set(pages) if pages is not None else None
     
     try:
-        with pdfplumber.open(str(pdf_path)) as pdf:
+        # The shared document owns its handle; only a handle opened here is closed here
+        with (nullcontext(document.plumber) if document is not None else pdfplumber.open(str(pdf_path))) as pdf:
             for page_num, page in enumerate(pdf.pages, 1):
+                if wanted is not None and page_num not in wanted:
+                    continue
                 page_tables = page.extract_tables()
                 
                 for table_index, table_data in enumerate(page_tables, 1):
@@ -89,13 +103,16 @@ def extract_tables_pdfplumber(pdf_path: Path) -> List[Dict[str, Any]]:
         return []
 
 
-def extract_tables_camelot(pdf_path: Path, flavor: str = "lattice") -> List[Dict[str, Any]]:
+def extract_tables_camelot(
+    pdf_path: Path, flavor: str = "lattice", pages: Optional[Iterable[int]] = None
+) -> List[Dict[str, Any]]:
     """
     Extract tables using camelot.
     
     Args:
         pdf_path: Path to PDF file.
         flavor: Extraction flavor ("lattice" or "stream").
+        pages: Optional 1-based page numbers to search (default: all pages).
         
     Returns:
         List of table dictionaries.
@@ -108,7 +125,7 @@ def extract_tables_camelot(pdf_path: Path, flavor: str = "lattice") -> List[Dict
     
     try:
         # Extract tables using camelot
-        camelot_tables = camelot.read_pdf(str(pdf_path), flavor=flavor, pages="all")
+        camelot_tables = camelot.read_pdf(str(pdf_path), flavor=flavor, pages=_page_spec(pages))
         
         for table_index, camelot_table in enumerate(camelot_tables, 1):
             # Convert camelot table to list of lists
@@ -145,10 +162,17 @@ def extract_tables_camelot(pdf_path: Path, flavor: str = "lattice") -> List[Dict
         return []
 
 
+def _page_spec(pages: Optional[Iterable[int]]) -> str:
+    """camelot/tabula page argument: "all" or a comma-separated list of 1-based pages."""
+    return "all" if pages is None else ",".join(str(page) for page in pages)
+
+
 def extract_tables(
     pdf_path: Path,
     method: str = "pdfplumber",
     fallback_method: str = "camelot",
+    document=None,
+    prefilter: Optional[Dict[str, Any]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Extract tables from PDF with fallback support.
@@ -157,6 +181,9 @@ def extract_tables(
         pdf_path: Path to PDF file.
         method: Primary extraction method ("pdfplumber", "camelot", "tabula").
         fallback_method: Fallback method if primary fails.
+        document: Optional shared pdf_document.PDFDocument used by the pdfplumber method.
+        prefilter: table_extraction.prefilter config ({"enabled": bool, plus table_prefilter thresholds}).
+            Enabled by default; extractors then only see pages the cheap detector flags.
         
     Returns:
         List of table dictionaries with structure:
@@ -171,9 +198,21 @@ def extract_tables(
     """
     tables = []
     
+    # Cheap per-page detector first; None means it could not run, so every page is searched
+    pages = None
+    prefilter = prefilter or {}
+    if prefilter.get("enabled", True):
+        thresholds = {key: value for key, value in prefilter.items() if key != "enabled"}
+        pages = find_candidate_pages(pdf_path, document=document, thresholds=thresholds)
+        if pages is not None:
+            logger.debug(f"Table prefilter kept {len(pages)} page(s) of {pdf_path.name}")
+            if not pages:
+                return []
+    page_spec = _page_spec(pages)
+    
     # Try primary method
     if method == "pdfplumber" and PDFPLUMBER_AVAILABLE:
-        tables = extract_tables_pdfplumber(pdf_path)
+        tables = extract_tables_pdfplumber(pdf_path, document=document, pages=pages)
         if tables:
             return tables
         else:
@@ -181,9 +220,9 @@ def extract_tables(
     
     elif method == "camelot" and CAMELOT_AVAILABLE:
         # Try lattice first, then stream
-        tables = extract_tables_camelot(pdf_path, flavor="lattice")
+        tables = extract_tables_camelot(pdf_path, flavor="lattice", pages=pages)
         if not tables:
-            tables = extract_tables_camelot(pdf_path, flavor="stream")
+            tables = extract_tables_camelot(pdf_path, flavor="stream", pages=pages)
         if tables:
             return tables
         else:
@@ -192,7 +231,7 @@ def extract_tables(
     elif method == "tabula" and TABULA_AVAILABLE:
         try:
             # Tabula extraction
-            tabula_tables = tabula.read_pdf(str(pdf_path), pages="all", multiple_tables=True)
+            tabula_tables = tabula.read_pdf(str(pdf_path), pages=page_spec, multiple_tables=True)
             for table_index, df in enumerate(tabula_tables, 1):
                 table_data = df.values.tolist()
                 cleaned_data = [[str(cell).strip() if cell is not None else "" for cell in row] for row in table_data]
@@ -214,14 +253,14 @@ def extract_tables(
     if fallback_method and fallback_method != method:
         logger.info(f"Trying fallback method: {fallback_method}")
         if fallback_method == "pdfplumber" and PDFPLUMBER_AVAILABLE:
-            tables = extract_tables_pdfplumber(pdf_path)
+            tables = extract_tables_pdfplumber(pdf_path, document=document, pages=pages)
         elif fallback_method == "camelot" and CAMELOT_AVAILABLE:
-            tables = extract_tables_camelot(pdf_path, flavor="lattice")
+            tables = extract_tables_camelot(pdf_path, flavor="lattice", pages=pages)
             if not tables:
-                tables = extract_tables_camelot(pdf_path, flavor="stream")
+                tables = extract_tables_camelot(pdf_path, flavor="stream", pages=pages)
         elif fallback_method == "tabula" and TABULA_AVAILABLE:
             try:
-                tabula_tables = tabula.read_pdf(str(pdf_path), pages="all", multiple_tables=True)
+                tabula_tables = tabula.read_pdf(str(pdf_path), pages=page_spec, multiple_tables=True)
                 for table_index, df in enumerate(tabula_tables, 1):
                     table_data = df.values.tolist()
                     cleaned_data = [[str(cell).strip() if cell is not None else "" for cell in row] for row in table_data]
@@ -0,0 +1,245 @@
+# PURPOSE: Cheap per-page table detector that picks the pages worth running table extractors on.
+# DEPENDENCIES: pdfplumber (optional; without it every page is a candidate), pdf_document.PDFDocument.
+# MODIFICATION NOTES: Uses the pdfplumber page layout (ruling lines, rects, chars), not its table finder.
+#   The layout is only free when text came from pdfplumber in this process; after pypdf or page-parallel
+#   text extraction the detector parses each page itself. A page is a candidate when it has a ruled grid,
+#   horizontal rules over aligned text, or enough text rows whose column starts line up. Errs towards
+#   candidates: a page that cannot be read is kept. prefilter_report() measures pages skipped and recall
+#   against a full pdfplumber scan.
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    pdfplumber = None
+    PDFPLUMBER_AVAILABLE = False
+
+DEFAULT_THRESHOLDS = {
+    "min_h_rules": 3,  # distinct horizontal rule positions
+    "min_v_rules": 3,  # distinct vertical rule positions
+    "min_grid_rows": 3,  # text rows sharing two or more aligned column starts
+}
+_POSITION_TOLERANCE = 2.0  # pt; rule positions closer than this count once
+_COLUMN_BIN = 4.0  # pt; column starts are aligned when they fall in the same or a neighbouring bin
+_COLUMN_GAP_WIDTHS = 2.0  # a gap wider than this many median char widths separates columns
+
+
+def _distinct(positions: Iterable[float]) -> int:
+    count, last = 0, None
+    for value in sorted(positions):
+        if last is None or value - last > _POSITION_TOLERANCE:
+            count += 1
+        last = value
+    return count
+
+
+def _ruling_positions(page: Any) -> tuple:
+    """(horizontal y positions, vertical x positions) of ruling lines and rect edges on the page."""
+    min_h_len = 0.1 * float(page.width)
+    min_v_len = 8.0
+    h_pos: List[float] = []
+    v_pos: List[float] = []
+    for line in page.lines:
+        width = line["x1"] - line["x0"]
+        height = line["bottom"] - line["top"]
+        if height <= 1 and width >= min_h_len:
+            h_pos.append(line["top"])
+        elif width <= 1 and height >= min_v_len:
+            v_pos.append(line["x0"])
+    for rect in page.rects:
+        width = rect["x1"] - rect["x0"]
+        height = rect["bottom"] - rect["top"]
+        if width >= 0.9 * float(page.width) and height >= 0.9 * float(page.height):
+            continue  # page background
+        if width >= min_h_len:
+            h_pos.append(rect["top"])
+            if height > 2:
+                h_pos.append(rect["bottom"])
+        if height >= min_v_len:
+            v_pos.append(rect["x0"])
+            if width > 2:
+                v_pos.append(rect["x1"])
+    return h_pos, v_pos
+
+
+def _aligned_grid_rows(chars: List[Dict[str, Any]]) -> int:
+    """Text rows with at least two interior column starts that recur (aligned) in other rows."""
+    rows: Dict[int, List[Dict[str, Any]]] = {}
+    for char in chars:
+        if char.get("text", "").strip():
+            rows.setdefault(int(round(char["top"])), []).append(char)
+
+    row_starts: List[set] = []
+    for row in rows.values():
+        if len(row) < 3:
+            continue
+        row.sort(key=lambda c: c["x0"])
+        widths = sorted(c["x1"] - c["x0"] for c in row)
+        gap = _COLUMN_GAP_WIDTHS * max(widths[len(widths) // 2], 1.0)
+        starts = {
+            int(row[i]["x0"] // _COLUMN_BIN)
+            for i in range(1, len(row))
+            if row[i]["x0"] - row[i - 1]["x1"] > gap
+        }
+        if len(starts) >= 2:
+            row_starts.append(starts)
+
+    counts: Counter = Counter(start for starts in row_starts for start in starts)
+
+    def recurring(start: int) -> bool:
+        return counts[start - 1] + counts[start] + counts[start + 1] >= 2
+
+    return sum(1 for starts in row_starts if sum(1 for start in starts if recurring(start)) >= 2)
+
+
+def page_table_signals(page: Any) -> Dict[str, int]:
+    """
+    Table evidence for one pdfplumber page.
+
+    Returns:
+        {"h_rules": distinct horizontal rule positions, "v_rules": distinct vertical rule positions,
+         "grid_rows": text rows with two or more aligned interior column starts}
+    """
+    h_pos, v_pos = _ruling_positions(page)
+    return {
+        "h_rules": _distinct(h_pos),
+        "v_rules": _distinct(v_pos),
+        "grid_rows": _aligned_grid_rows(page.chars),
+    }
+
+
+def is_table_candidate(signals: Dict[str, int], thresholds: Optional[Dict[str, int]] = None) -> bool:
+    """True if the page signals suggest a table (ruled grid, rules over aligned text, or a text grid)."""
+    limits = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    ruled_rows = signals["h_rules"] >= limits["min_h_rules"]
+    return (
+        (ruled_rows and signals["v_rules"] >= limits["min_v_rules"])
+        or (ruled_rows and signals["grid_rows"] >= 2)
+        or signals["grid_rows"] >= limits["min_grid_rows"]
+    )
+
+
+def _release_layout(page: Any) -> None:
+    """Drop a pdfplumber page's parsed objects (chars, lines, rects) so skipped pages do not pile up."""
+    release = getattr(page, "close", None) or getattr(page, "flush_cache", None)
+    if release is not None:
+        try:
+            release()
+        except Exception as e:
+            logger.debug(f"Failed to release page layout: {e}")
+
+
+# PURPOSE: Candidate table pages of one PDF.
+# DEPENDENCIES: pdfplumber directly or via a shared PDFDocument.
+# MODIFICATION NOTES: Returns None (no filtering) when the layout cannot be read at all. Non-candidate pages
+#   the detector laid out itself are released after scoring; candidates keep their layout for the extractors.
+def find_candidate_pages(
+    pdf_path: Path,
+    document=None,
+    thresholds: Optional[Dict[str, int]] = None,
+) -> Optional[List[int]]:
+    """
+    Pages (1-based) that may contain tables.
+
+    Args:
+        pdf_path: Path to PDF file.
+        document: Optional pdf_document.PDFDocument; its pdfplumber pages are shared with text and table
+            extraction. Pages already laid out for text are reused; the rest are parsed here.
+        thresholds: Overrides for DEFAULT_THRESHOLDS.
+
+    Returns:
+        Sorted candidate page numbers, or None if the PDF could not be read (callers then scan every page).
+    """
+    if document is None and not PDFPLUMBER_AVAILABLE:
+        return None
+    candidates: List[int] = []
+    try:
+        layout_parsed = getattr(document, "layout_parsed", None)
+        with (nullcontext(document.plumber) if document is not None else pdfplumber.open(str(pdf_path))) as pdf:
+            for page_num, page in enumerate(pdf.pages, 1):
+                try:
+                    candidate = is_table_candidate(page_table_signals(page), thresholds)
+                except Exception as e:
+                    logger.debug(f"Table prefilter kept page {page_num} of {pdf_path.name}: {e}")
+                    candidate = True
+                if candidate:
+                    candidates.append(page_num)
+                elif layout_parsed is None or not layout_parsed(page_num - 1):
+                    _release_layout(page)
+    except Exception as e:
+        logger.debug(f"Table prefilter unavailable for {pdf_path.name}: {e}")
+        return None
+    return candidates
+
+
+def prefilter_report(pdf_paths: Iterable[Path], thresholds: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Compare the prefilter against a full pdfplumber table scan over a corpus.
+
+    Every page is parsed, run through the detector, and then through pdfplumber's extract_tables; a page
+    with at least one non-empty table is a table page.
+
+    Returns:
+        Totals: pdfs, pages, candidate_pages, skipped_pages, table_pages, table_pages_found, recall,
+        parse_seconds, detector_seconds, extract_seconds_all, extract_seconds_candidates, and missed
+        ([pdf name, page] for table pages the detector skipped).
+    """
+    if not PDFPLUMBER_AVAILABLE:
+        raise RuntimeError("pdfplumber is required for the table prefilter report")
+    report: Dict[str, Any] = {
+        "pdfs": 0, "pages": 0, "candidate_pages": 0, "table_pages": 0, "table_pages_found": 0,
+        "parse_seconds": 0.0, "detector_seconds": 0.0, "extract_seconds_all": 0.0,
+        "extract_seconds_candidates": 0.0, "missed": [],
+    }
+    for pdf_path in pdf_paths:
+        pdf_path = Path(pdf_path)
+        try:
+            pdf = pdfplumber.open(str(pdf_path))
+        except Exception as e:
+            logger.warning(f"Skipping {pdf_path.name}: {e}")
+            continue
+        report["pdfs"] += 1
+        with pdf:
+            for page_num, page in enumerate(pdf.pages, 1):
+                start = time.perf_counter()
+                _ = (page.chars, page.lines, page.rects)  # layout parse, shared by detector and extractor
+                parsed = time.perf_counter()
+                candidate = is_table_candidate(page_table_signals(page), thresholds)
+                detected = time.perf_counter()
+                has_table = any(
+                    any(any(cell for cell in row if cell) for row in table)
+                    for table in page.extract_tables() or []
+                )
+                extracted = time.perf_counter()
+
+                report["pages"] += 1
+                report["parse_seconds"] += parsed - start
+                report["detector_seconds"] += detected - parsed
+                report["extract_seconds_all"] += extracted - detected
+                if candidate:
+                    report["candidate_pages"] += 1
+                    report["extract_seconds_candidates"] += extracted - detected
+                if has_table:
+                    report["table_pages"] += 1
+                    if candidate:
+                        report["table_pages_found"] += 1
+                    else:
+                        report["missed"].append([pdf_path.name, page_num])
+                if hasattr(page, "flush_cache"):
+                    page.flush_cache()  # keep memory flat across a large corpus
+    report["skipped_pages"] = report["pages"] - report["candidate_pages"]
+    report["recall"] = report["table_pages_found"] / report["table_pages"] if report["table_pages"] else 1.0
+    for key in ("parse_seconds", "detector_seconds", "extract_seconds_all", "extract_seconds_candidates"):
+        report[key] = round(report[key], 3)
+    return report
@@ -0,0 +1,90 @@
+# PURPOSE: Tests for the incremental PDF++ cache index (cache_index.CacheIndex, find_pdfplus_text).
+# DEPENDENCIES: pytest, cache_index.
+# MODIFICATION NOTES: rglob-equivalent precedence, mtime-based incremental refresh, persistence, watcher events.
+
+import os
+from pathlib import Path
+
+import pytest
+
+from cache_index import CacheIndex, find_pdfplus_text
+
+
+def _age(*dirs, seconds=60):
+    """Backdate directory mtimes so they count as settled."""
+    for directory in dirs:
+        st = directory.stat()
+        os.utime(directory, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 10**9))
+
+
+def _legacy_lookup(stem, roots, extensions):
+    for root in roots:
+        for ext in extensions:
+            candidates = sorted(root.rglob(f"{stem}{ext}"))
+            if candidates:
+                return candidates[0]
+    return None
+
+
+@pytest.fixture
+def cache_tree(tmp_path):
+    first = tmp_path / "vault" / ".obsidian" / "plugins" / "pdf-plus"
+    second = tmp_path / "vault" / "Sources" / "_text"
+    (first / "books").mkdir(parents=True)
+    second.mkdir(parents=True)
+    (first / "books" / "codex.md").write_text("md")
+    (first / "codex.txt").write_text("txt")
+    (first / "books" / "brass.txt").write_text("brass")
+    (second / "brass.txt").write_text("second root")
+    (second / "church.v2.txt").write_text("dotted stem")
+    (second / "notes.json").write_text("{}")
+    _age(first, first / "books", second)
+    return tmp_path / "vault", [first, second]
+
+
+@pytest.mark.unit
+def test_lookup_matches_rglob_precedence(cache_tree):
+    _vault, roots = cache_tree
+    extensions = [".txt", ".md"]
+    index = CacheIndex()
+    index.build(roots, extensions)
+    for stem in ("codex", "brass", "church.v2", "notes", "missing"):
+        assert index.find(stem) == _legacy_lookup(stem, roots, extensions), stem
+
+
+@pytest.mark.unit
+def test_incremental_refresh_lists_only_changed_dirs(cache_tree, tmp_path):
+    _vault, roots = cache_tree
+    path = tmp_path / "index.json"
+    index = CacheIndex(path)
+    assert index.update_incremental(roots, [".txt"])["listed"] == 3
+    assert index.update_incremental(roots, [".txt"]) == {"listed": 0, "reused": 3, "removed": 0}
+
+    (roots[0] / "books" / "ashes.txt").write_text("new")
+    _age(roots[0] / "books", seconds=30)
+    assert index.update_incremental(roots, [".txt"])["listed"] == 1
+    assert index.find("ashes") == roots[0] / "books" / "ashes.txt"
+
+    # Persisted: a new process reuses the directory records
+    reloaded = CacheIndex(path)
+    assert reloaded.find("ashes") == roots[0] / "books" / "ashes.txt"
+    assert reloaded.update_incremental(roots, [".txt"])["listed"] == 0
+
+    # Watcher events update the index without a scan
+    assert reloaded.apply_event(roots[1] / "dawn.txt")
+    assert reloaded.find("dawn") == roots[1] / "dawn.txt"
+    assert reloaded.apply_event(roots[1] / "brass.txt", deleted=True)
+    assert reloaded.find("brass") == roots[0] / "books" / "brass.txt"
+    assert not reloaded.apply_event(Path("/elsewhere/x.txt"))
+
+
+@pytest.mark.unit
+def test_find_pdfplus_text_refreshes_stale_entry(cache_tree):
+    vault, _roots = cache_tree
+    cache_dirs = [".obsidian/plugins/pdf-plus", "Sources/_text"]
+    pdf = vault / "pdf" / "codex.pdf"
+    found = find_pdfplus_text(pdf, vault, cache_dirs, [".txt", ".md"])
+    assert found.read_text() == "txt"
+
+    found.unlink()
+    assert find_pdfplus_text(pdf, vault, cache_dirs, [".txt", ".md"]).read_text() == "md"
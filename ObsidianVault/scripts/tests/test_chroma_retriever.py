@@ -1,6 +1,7 @@
 # PURPOSE: Tests for ChromaRetriever and retrieve_context ChromaDB path.
 # DEPENDENCIES: pytest, chromadb, sentence_transformers (optional - ChromaDB tests skip if not installed).
-# MODIFICATION NOTES: Option B ChromaDB integration tests.
+# MODIFICATION NOTES: Option B ChromaDB integration tests. Hash-aware sync tests use an in-memory
+#   collection/model so they run without chromadb.
 
 import uuid
 from pathlib import Path
@@ -8,6 +9,57 @@ from pathlib import Path
 import pytest
 
 
+class _FakeCollection:
+    """In-memory stand-in for a chromadb Collection (get/upsert/update/delete by id or doc_key)."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def count(self):
+        return len(self.rows)
+
+    def _match(self, meta, where):
+        if not where:
+            return True
+        (key, cond), = where.items()
+        return meta.get(key) in cond["$in"] if isinstance(cond, dict) else meta.get(key) == cond
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        keys = [k for k in sorted(self.rows) if (ids is None or k in ids) and self._match(self.rows[k]["meta"], where)]
+        keys = keys[offset:offset + limit] if limit else keys[offset:]
+        return {"ids": keys, "metadatas": [dict(self.rows[k]["meta"]) for k in keys]}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for i, chunk_id in enumerate(ids):
+            self.rows[chunk_id] = {"emb": embeddings[i], "doc": documents[i], "meta": dict(metadatas[i])}
+
+    def update(self, ids, metadatas):
+        for chunk_id, meta in zip(ids, metadatas):
+            self.rows[chunk_id]["meta"] = dict(meta)
+
+    def delete(self, ids=None, where=None):
+        for k in [k for k in self.rows if (ids is None or k in ids) and self._match(self.rows[k]["meta"], where)]:
+            del self.rows[k]
+
+
+class _FakeModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def _fake_retriever(tmp_path):
+    from chroma_retriever import ChromaRetriever
+
+    retriever = ChromaRetriever(tmp_path / "chroma", collection_name="fake")
+    retriever._collection = _FakeCollection()
+    retriever._model = _FakeModel()
+    return retriever
+
+
 def _has_chroma_deps():
     try:
         __import__("chromadb")
@@ -140,3 +192,167 @@ def test_retrieve_context_fallback_when_chroma_unavailable():
     assert len(results) >= 1
     assert results[0]["source"] == "doc1"
     assert "wrath" in results[0]["text"].lower() or "glory" in results[0]["text"].lower()
+
+
+@pytest.mark.unit
+def test_build_index_only_embeds_new_or_changed_chunks(tmp_path):
+    retriever = _fake_retriever(tmp_path)
+    rag_config = {"chroma": {"chunk_size": 5000}}
+    text_map = {"doc_a": "Wrath and Glory rules.", "doc_b": "Inquisition faction notes.", "doc_c": "Hive city."}
+
+    assert retriever.build_index(text_map, rag_config, {}) == 3
+    assert len(retriever._model.encoded) == 3
+
+    retriever._model.encoded.clear()
+    text_map = {"doc_a": "Wrath and Glory rules.", "doc_b": "Inquisition faction notes, revised.", "doc_d": "New"}
+    retriever.build_index(text_map, rag_config, {})
+    stats = retriever.last_sync_stats
+
+    assert retriever._model.encoded == ["Inquisition faction notes, revised.", "New"]
+    assert (stats["added"], stats["updated"], stats["unchanged"], stats["deleted"]) == (1, 1, 1, 1)
+    assert stats["estimated_seconds_saved"] is not None
+    assert set(retriever._collection.rows) == {"doc_a", "doc_b", "doc_d"}
+
+
+@pytest.mark.unit
+def test_add_or_update_docs_keeps_other_docs_and_drops_stale_chunks(tmp_path):
+    retriever = _fake_retriever(tmp_path)
+    rag_config = {"chroma": {"chunk_size": 5000}}
+    retriever.build_index({"doc_a": "alpha", "doc_b": "beta"}, rag_config, {})
+    # Simulate a previously chunked doc_a whose extra chunk must be removed.
+    retriever._collection.rows["doc_a__chunk_1"] = {"emb": [0.0], "doc": "old", "meta": {"doc_key": "doc_a"}}
+    retriever._model.encoded.clear()
+
+    embedded = retriever.add_or_update_docs({"doc_a": "alpha"}, rag_config, {})
+
+    assert embedded == 0
+    assert retriever._model.encoded == []
+    assert set(retriever._collection.rows) == {"doc_a", "doc_b"}
+    assert retriever.last_sync_stats["deleted"] == 1
+
+
+@pytest.mark.unit
+def test_tag_change_updates_metadata_without_reembedding(tmp_path):
+    retriever = _fake_retriever(tmp_path)
+    rag_config = {"chroma": {"chunk_size": 5000}}
+    retriever.build_index({"notes": "plain text"}, rag_config, {})
+    retriever._model.encoded.clear()
+
+    retriever.build_index({"notes": "plain text"}, rag_config, {"defaults": {"tone": "grimdark"}})
+
+    assert retriever._model.encoded == []
+    assert retriever.last_sync_stats["metadata_updated"] == 1
+    assert retriever._collection.rows["notes"]["meta"]["tone"] == "grimdark"
+
+
+@pytest.mark.unit
+def test_build_index_streams_length_sorted_batches(tmp_path):
+    retriever = _fake_retriever(tmp_path)
+    batches = []
+    encode = retriever._model.encode
+
+    def recording_encode(texts, show_progress_bar=False):
+        batches.append(list(texts))
+        return encode(texts)
+
+    retriever._model.encode = recording_encode
+    rag_config = {"chroma": {"chunk_size": 5000, "batch_size": 2, "sort_window": 4}}
+    docs = ((f"doc_{i}", "x" * (i + 1)) for i in range(6))  # generator: never materialized as a dict
+
+    assert retriever.build_index(docs, rag_config, {}) == 6
+
+    assert [len(b) for b in batches] == [2, 2, 2]
+    # First window of 4 is embedded longest-first, then the remaining 2.
+    assert [len(t) for t in batches[0] + batches[1]] == [4, 3, 2, 1]
+    assert retriever.last_sync_stats["batches"] == 3
+    assert retriever.last_sync_stats["docs"] == 6
+
+
+@pytest.mark.unit
+def test_interrupted_build_resumes_without_reembedding(tmp_path):
+    retriever = _fake_retriever(tmp_path)
+    rag_config = {"chroma": {"chunk_size": 5000, "batch_size": 2, "sort_window": 2}}
+    text_map = {f"doc_{i}": f"text {i}" for i in range(6)}
+    calls = {"n": 0}
+    encode = retriever._model.encode
+
+    def flaky_encode(texts, show_progress_bar=False):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("interrupted")
+        return encode(texts)
+
+    retriever._model.encode = flaky_encode
+    with pytest.raises(RuntimeError):
+        retriever.build_index(text_map, rag_config, {})
+    assert retriever._collection.count() == 2
+
+    retriever._model.encode = encode
+    retriever._model.encoded.clear()
+    retriever.build_index(text_map, rag_config, {})
+
+    stats = retriever.last_sync_stats
+    assert stats["resumed"] is True
+    assert stats["unchanged"] == 2 and stats["added"] == 4
+    assert len(retriever._model.encoded) == 4
+    assert retriever._collection.count() == 6
+
+
+@pytest.mark.unit
+def test_checkpoint_records_last_batch_and_noop_sync_leaves_it(tmp_path):
+    import json
+    import os
+
+    retriever = _fake_retriever(tmp_path)
+    rag_config = {"chroma": {"chunk_size": 5000, "batch_size": 2, "sort_window": 2}}
+    retriever.build_index(((f"doc_{i}", f"text {i}") for i in range(3)), rag_config, {})
+    checkpoint = retriever._checkpoint_path()
+    state = json.loads(checkpoint.read_text(encoding="utf-8"))
+    assert state["status"] == "complete" and state["embedded"] == 3 and state["batches"] == 2
+
+    # Interrupt after the first batch: the checkpoint names the batch that made it in.
+    encode = retriever._model.encode
+    calls = {"n": 0}
+
+    def flaky_encode(texts, show_progress_bar=False):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("interrupted")
+        return encode(texts)
+
+    retriever._model.encode = flaky_encode
+    with pytest.raises(RuntimeError):
+        retriever.build_index({f"doc_{i}": f"new {i}" for i in range(3)}, rag_config, {})
+    state = json.loads(checkpoint.read_text(encoding="utf-8"))
+    assert state["status"] == "running" and state["batches"] == 1
+    assert state["last_batch"]["index"] == 1 and len(state["last_batch"]["ids"]) == 2
+    assert state["last_batch"]["doc_keys"] == sorted(state["last_batch"]["ids"])
+
+    retriever._model.encode = encode
+    retriever.build_index({f"doc_{i}": f"new {i}" for i in range(3)}, rag_config, {})
+    assert json.loads(checkpoint.read_text(encoding="utf-8"))["status"] == "complete"
+
+    # An incremental sync with nothing to embed does not rewrite the checkpoint.
+    os.utime(checkpoint, ns=(0, 10**9))
+    assert retriever.add_or_update_docs(iter([("doc_0", "new 0")]), rag_config, {}) == 0
+    assert checkpoint.stat().st_mtime_ns == 10**9
+
+
+@pytest.mark.unit
+def test_get_retriever_shares_one_retriever_per_store(tmp_path):
+    from chroma_retriever import close_retrievers, get_retriever
+
+    cfg = {"collection_name": "shared", "backend": "flat", "embedding_cache": {"enabled": True}}
+    first = get_retriever(tmp_path / "chroma", cfg)
+    try:
+        assert get_retriever(tmp_path / "chroma", dict(cfg)) is first
+        assert get_retriever(tmp_path / "chroma", {**cfg, "collection_name": "other"}) is not first
+        cache = first.embedding_cache
+        assert cache is not None
+    finally:
+        close_retrievers()
+    assert first.embedding_cache is None
+    with pytest.raises(Exception):
+        len(cache)  # connection closed
+    assert get_retriever(tmp_path / "chroma", cfg) is not first
+    close_retrievers()
@@ -0,0 +1,155 @@
+# PURPOSE: Tests for crossref_resolver (DOI cache, batched lookups, offline mode, backfill).
+# DEPENDENCIES: pytest, crossref_resolver, metadata_extractor; a local fake Crossref HTTP server.
+# MODIFICATION NOTES: The fake server answers filter=doi:... and /works/{doi}; a slow mode exercises timeouts.
+
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from crossref_resolver import CrossrefResolver, DOICache, get_resolver, normalize_doi, start_backfill_thread
+
+WORKS = {
+    "10.1000/brass.1": {"DOI": "10.1000/BRASS.1", "title": ["The Brass Codex"], "author": [{"given": "Ana", "family": "Vell"}],
+                        "published-print": {"date-parts": [[1999, 4]]}, "container-title": ["Journal of Dusk"]},
+    "10.1000/choir.2": {"DOI": "10.1000/choir.2", "title": ["Choir at Dusk"]},
+}
+
+
+class _FakeCrossref:
+    def __init__(self):
+        self.requests = []
+        self.delay = 0.0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.requests.append(self.path)
+                time.sleep(fake.delay)
+                parsed = urllib.parse.urlparse(self.path)
+                if parsed.path == "/works":
+                    query = urllib.parse.parse_qs(parsed.query)
+                    dois = [part[len("doi:"):] for part in query["filter"][0].split(",")]
+                    body = {"message": {"items": [WORKS[d] for d in dois if d in WORKS]}}
+                else:
+                    doi = urllib.parse.unquote(parsed.path[len("/works/"):])
+                    if doi not in WORKS:
+                        self.send_error(404)
+                        return
+                    body = {"message": WORKS[doi]}
+                payload = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass  # client gave up (timeout test)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def crossref():
+    fake = _FakeCrossref()
+    yield fake
+    fake.close()
+
+
+def _resolver(tmp_path, fake, **kwargs):
+    return CrossrefResolver(cache=DOICache(tmp_path / "doi.sqlite"), base_url=fake.url, **kwargs)
+
+
+@pytest.mark.unit
+def test_batched_lookup_is_cached_across_runs(tmp_path, crossref):
+    resolver = _resolver(tmp_path, crossref, batch_size=10)
+    results = resolver.resolve_many(["doi:10.1000/Brass.1", "10.1000/choir.2", "10.1000/missing.3"])
+    assert results["10.1000/brass.1"] == {
+        "title": "The Brass Codex", "authors": "Ana Vell", "publication_year": "1999", "journal": "Journal of Dusk",
+    }
+    assert results["10.1000/choir.2"] == {"title": "Choir at Dusk"}
+    assert results["10.1000/missing.3"] is None
+    assert len(crossref.requests) == 1  # one filter=doi:... request for all three
+
+    # A new resolver on the same cache (re-ingest) answers everything, including "not found", offline
+    again = _resolver(tmp_path, crossref)
+    assert again.resolve("https://doi.org/10.1000/CHOIR.2") == {"title": "Choir at Dusk"}
+    assert again.resolve("10.1000/missing.3") is None
+    assert len(crossref.requests) == 1
+    assert again.stats["hits"] == 2
+
+
+@pytest.mark.unit
+def test_timeout_queues_doi_without_caching_it(tmp_path, crossref):
+    crossref.delay = 1.0
+    resolver = _resolver(tmp_path, crossref, timeout=0.2)
+    start = time.perf_counter()
+    assert resolver.resolve("10.1000/brass.1", source="/vault/Sources/brass.pdf") is None
+    assert time.perf_counter() - start < 0.9
+    assert resolver.stats["failed"] == 1
+    assert resolver.cache.get_many(["10.1000/brass.1"]) == {}
+    assert resolver.cache.pending() == [("10.1000/brass.1", ["/vault/Sources/brass.pdf"])]
+
+
+@pytest.mark.unit
+def test_offline_mode_never_requests_and_backfill_resolves_queue(tmp_path, crossref):
+    offline = _resolver(tmp_path, crossref, offline=True)
+    assert offline.resolve("10.1000/brass.1", source="a.pdf") is None
+    assert offline.resolve("10.1000/brass.1", source="b.pdf") is None
+    assert offline.resolve("10.1000/missing.3", source="c.pdf") is None
+    assert crossref.requests == []
+    assert offline.stats["queued"] == 3
+
+    summary = offline.backfill()
+    assert summary == {"resolved": 1, "not_found": 1, "failed": 0, "sources": ["a.pdf", "b.pdf"]}
+    assert offline.cache.pending() == []
+    assert offline.resolve("10.1000/brass.1")["title"] == "The Brass Codex"
+
+
+@pytest.mark.unit
+def test_deferred_ingest_lookups_are_resolved_in_one_run_wide_batch(tmp_path, crossref):
+    config = {"crossref": {"mode": "online", "base_url": crossref.url}}
+    resolver = get_resolver(config, tmp_path, defer=True)
+    assert resolver is get_resolver(config, tmp_path, defer=True) and not get_resolver(config, tmp_path).defer
+    for doi, pdf in (("10.1000/brass.1", "a.pdf"), ("10.1000/choir.2", "b.pdf"), ("10.1000/missing.3", "c.pdf")):
+        assert resolver.resolve(doi, source=pdf) is None  # one PDF at a time, none waits on the network
+    assert crossref.requests == []
+
+    summaries = []
+    thread = start_backfill_thread(resolver, interval_seconds=0.05, on_backfill=summaries.append)
+    deadline = time.time() + 5
+    while not summaries and time.time() < deadline:
+        time.sleep(0.02)
+    thread.stop_event.set()
+    thread.join()
+    assert summaries == [{"resolved": 2, "not_found": 1, "failed": 0, "sources": ["a.pdf", "b.pdf"]}]
+    assert len(crossref.requests) == 1  # the three PDFs' DOIs went out together
+    assert resolver.resolve("10.1000/choir.2") == {"title": "Choir at Dusk"}
+
+
+@pytest.mark.unit
+def test_from_config_and_enrichment(tmp_path, crossref):
+    from metadata_extractor import enrich_metadata_with_citations
+
+    assert CrossrefResolver.from_config({"crossref": {"enabled": False}}, tmp_path) is None
+    resolver = CrossrefResolver.from_config({"crossref": {"mode": "online", "base_url": crossref.url}}, tmp_path)
+    assert not (tmp_path / "Sources").exists()  # cache database is created on first lookup
+
+    enriched = enrich_metadata_with_citations({"title": "Scan 04"}, "See doi:10.1000/brass.1 for the codex.", resolver=resolver)
+    assert enriched["doi"] == "10.1000/brass.1"
+    assert enriched["title"] == "Scan 04" and enriched["authors"] == "Ana Vell"
+    assert (tmp_path / "Sources" / "_crossref_cache.sqlite").exists()
+    assert normalize_doi(" DOI:10.1000/Brass.1 ") == "10.1000/brass.1"
@@ -0,0 +1,90 @@
+# PURPOSE: Tests for the persistent embedding cache and its use by ChromaRetriever.
+# DEPENDENCIES: pytest, embedding_cache, chroma_retriever (in-memory collection/model; no chromadb needed).
+# MODIFICATION NOTES: Covers normalized keys, per-model isolation, LRU cap, miss-only encoding and collection warm-up.
+
+import pytest
+
+from embedding_cache import EmbeddingCache, normalize_text
+from tests.test_chroma_retriever import _FakeCollection, _fake_retriever
+
+
+class _CountingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 0.5] for t in texts]
+
+
+@pytest.mark.unit
+def test_roundtrip_normalized_keys_and_model_isolation(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    cache.put_many("mini", ["Wrath  and\nGlory "], [[0.25, -1.0]])
+
+    assert normalize_text(" Wrath  and\nGlory ") == "Wrath and Glory"
+    assert cache.get_many("mini", ["Wrath and Glory", "other"]) == [[0.25, -1.0], None]
+    assert cache.get_many("mpnet", ["Wrath and Glory"]) == [None]
+    cache.close()
+    # Persisted across instances.
+    reopened = EmbeddingCache(tmp_path / "cache.sqlite")
+    assert reopened.get_many("mini", ["Wrath and Glory"]) == [[0.25, -1.0]]
+
+
+@pytest.mark.unit
+def test_encode_only_calls_model_for_misses(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    encoder = _CountingEncoder()
+    cache.encode("mini", encoder, ["a", "bb"])
+    vectors, encoded_chars, _ = cache.encode("mini", encoder, ["bb", "ccc", "a"])
+
+    assert encoder.calls == [["a", "bb"], ["ccc"]]
+    assert vectors == [[2.0, 0.5], [3.0, 0.5], [1.0, 0.5]]
+    assert encoded_chars == 3
+    assert cache.stats()["hits"] == 2
+
+
+@pytest.mark.unit
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.put_many("mini", ["old"], [[1.0]])
+    cache.put_many("mini", ["mid"], [[2.0]])
+    cache.get_many("mini", ["old"])  # touch: "mid" becomes least recently used
+    cache.put_many("mini", ["new"], [[3.0]])
+
+    assert len(cache) == 2
+    assert cache.get_many("mini", ["old", "mid", "new"]) == [[1.0], None, [3.0]]
+    assert cache.stats()["evicted"] == 1
+
+
+@pytest.mark.unit
+def test_warm_from_collection_avoids_reencoding_on_rebuild(tmp_path):
+    source = _FakeCollection()
+    source.upsert(ids=["doc_a"], embeddings=[[9.0, 9.0]], documents=["alpha text"], metadatas=[{"doc_key": "doc_a"}])
+    source.get = _with_documents(source)
+
+    retriever = _fake_retriever(tmp_path)
+    retriever.embedding_cache = EmbeddingCache(tmp_path / "cache.sqlite")
+    retriever._collection = source
+    assert retriever.warm_embedding_cache() == 1
+
+    # Rebuild into an empty collection: the cached vector is reused, only the new doc is encoded.
+    retriever._collection = _FakeCollection()
+    retriever.build_index({"doc_a": "alpha text", "doc_b": "beta"}, {"chroma": {}}, {})
+
+    assert retriever._model.encoded == ["beta"]
+    assert retriever._collection.rows["doc_a"]["emb"] == [9.0, 9.0]
+    assert retriever.last_sync_stats["cache_hit_chars"] == len("alpha text")
+
+
+def _with_documents(collection):
+    """Extend the fake collection's get() with documents/embeddings like chromadb's include=[...]."""
+    plain_get = collection.get
+
+    def get(ids=None, where=None, include=None, limit=None, offset=0):
+        page = plain_get(ids=ids, where=where, include=include, limit=limit, offset=offset)
+        page["documents"] = [collection.rows[k]["doc"] for k in page["ids"]]
+        page["embeddings"] = [collection.rows[k]["emb"] for k in page["ids"]]
+        return page
+
+    return get
@@ -0,0 +1,53 @@
+# PURPOSE: Tests for the multi-process embedding pool and ChromaRetriever encode_workers.
+# DEPENDENCIES: pytest, embedding_pool (spawned workers use a stub loader; no sentence_transformers needed).
+# MODIFICATION NOTES: Checks order-preserving merge, identical output across worker counts and one model load per worker.
+
+import os
+
+import pytest
+
+from embedding_pool import EmbeddingWorkerPool, benchmark
+
+
+class _StubModel:
+    def __init__(self, name, with_pid=True):
+        self.name = name
+        self.pid = os.getpid() if with_pid else 0
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        return [[float(len(t)), float(sum(map(ord, t)) % 997), float(self.pid)] for t in texts]
+
+
+_loads = []
+
+
+def stub_loader(name):
+    _loads.append(name)
+    return _StubModel(name)
+
+
+def deterministic_loader(name):
+    return _StubModel(name, with_pid=False)
+
+
+@pytest.mark.integration
+def test_pool_preserves_order_and_loads_model_once_per_worker():
+    texts = [f"chunk {i} " + "x" * (i % 7) for i in range(50)]
+    with EmbeddingWorkerPool("stub", workers=2, sub_batch=4, loader=stub_loader) as pool:
+        first = pool.encode(texts)
+        second = pool.encode(texts[::-1])
+
+    assert [v[:2] for v in first] == [[float(len(t)), float(sum(map(ord, t)) % 997)] for t in texts]
+    assert [v[:2] for v in second] == [v[:2] for v in first[::-1]]
+    # Vectors came from at most two worker processes, none of them the parent.
+    pids = {v[2] for v in first + second}
+    assert 1 <= len(pids) <= 2 and float(os.getpid()) not in pids
+    assert _loads == []  # models are loaded in the workers, not here
+
+
+@pytest.mark.integration
+def test_benchmark_reports_docs_per_sec_and_identical_output():
+    rows = benchmark("stub", [1, 3], docs=40, words=10, sub_batch=8, loader=deterministic_loader)
+    assert [r["workers"] for r in rows] == [1, 3]
+    assert all(r["docs_per_sec"] for r in rows)
+    assert rows[1]["max_abs_diff_vs_first"] == 0.0
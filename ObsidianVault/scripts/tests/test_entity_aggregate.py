@@ -0,0 +1,146 @@
+# PURPOSE: Tests for the incremental corpus entity aggregate (entity_aggregate.EntityAggregateStore).
+# DEPENDENCIES: pytest, entity_aggregate, rag_pipeline.
+# MODIFICATION NOTES: Add/replace/remove deltas vs a full rebuild; pattern report only extracts changed docs;
+#   query-mode view read from per-document rows; mention counting; ingest keys by vault-relative PDF path and lists aggregate sources on entity notes.
+
+from unittest.mock import patch
+
+import pytest
+
+from entity_aggregate import EntityAggregateStore, document_hash
+
+
+@pytest.mark.unit
+def test_deltas_match_full_rebuild(tmp_path):
+    store = EntityAggregateStore(tmp_path / "agg.sqlite")
+    store.add_document("a", {"NPCs": ["Kael", "Thule"], "Factions": ["Iron Hands"]})
+    store.add_document("b", {"NPCs": ["Kael", "Kael"], "Items": ["Power Sword"]})
+    assert store.counts()["NPCs"] == {"Kael": 2, "Thule": 1}
+    assert store.counts("mentions")["NPCs"] == {"Kael": 3, "Thule": 1}
+
+    delta = store.replace_document("a", {"NPCs": ["Kael", "Serana"]})
+    assert delta == {"added": 1, "removed": 2, "changed": 0}
+    assert store.entities(categories=["NPCs", "Factions"]) == {"NPCs": ["Kael", "Serana"], "Factions": []}
+    assert store.documents_for("NPCs", "Kael") == ["a", "b"]
+
+    store.remove_document("b")
+    assert store.counts("mentions") == {"NPCs": {"Kael": 1, "Serana": 1}}
+    assert store.document_keys() == ["a"]
+
+    # Totals maintained by deltas equal totals recomputed from the per-document rows
+    before = store.counts("mentions"), store.counts()
+    store.rebuild_totals()
+    assert (store.counts("mentions"), store.counts()) == before
+
+    store.close()
+    reopened = EntityAggregateStore(tmp_path / "agg.sqlite")
+    assert reopened.entities() == {"NPCs": ["Kael", "Serana"]}
+
+
+@pytest.mark.unit
+def test_pattern_report_extracts_only_changed_documents(tmp_path):
+    from rag_pipeline import build_pattern_report
+
+    store = EntityAggregateStore(tmp_path / "agg.sqlite")
+    calls = []
+
+    def fake_extract(text, **kwargs):
+        calls.append(text)
+        return {"NPCs": [w for w in text.split() if w.istitle()], "Factions": [], "Locations": [], "Items": []}
+
+    rag_config = {"entity_extraction": {}, "theme_keywords": []}
+    text_map = {"doc_a": "Kael met Thule", "doc_b": "Serana waited"}
+    with patch("rag_pipeline.ENTITY_EXTRACTION_AVAILABLE", True), \
+            patch("rag_pipeline.extract_entities_from_text", side_effect=fake_extract):
+        report = build_pattern_report(text_map, rag_config, aggregate_store=store)
+        assert report["entities"]["NPCs"] == ["Kael", "Serana", "Thule"]
+        assert len(calls) == 2
+
+        text_map = {"doc_a": "Kael met Thule", "doc_c": "Kael returned"}
+        report = build_pattern_report(text_map, rag_config, aggregate_store=store)
+
+    assert calls[2:] == ["Kael returned"]
+    assert report["entities"]["NPCs"] == ["Kael", "Thule"]
+    assert report["entity_counts"]["NPCs"] == {"Kael": 2, "Thule": 1}
+    assert store.document_hash("doc_c") == document_hash("Kael returned")
+
+
+@pytest.mark.unit
+def test_query_view_reads_aggregate_rows_and_extracts_only_missing_documents(tmp_path):
+    from rag_pipeline import stage_analyze
+
+    store = EntityAggregateStore(tmp_path / "agg.sqlite")
+    calls = []
+
+    def fake_extract(text, **kwargs):
+        calls.append(text)
+        return {"NPCs": [w for w in text.split() if w.istitle()], "Factions": [], "Locations": [], "Items": []}
+
+    rag_config = {"entity_extraction": {}, "theme_keywords": [], "pattern_analysis_enabled": True}
+    text_map = {"doc_a": "Kael met Thule", "doc_b": "Serana waited", "doc_c": "Kael returned"}
+    store.replace_document("doc_a", {"NPCs": ["Kael", "Thule"]}, document_hash(text_map["doc_a"]))
+    store.replace_document("doc_b", {"NPCs": ["Serana"]}, document_hash("stale text"))
+    with patch("rag_pipeline.ENTITY_EXTRACTION_AVAILABLE", True), \
+            patch("rag_pipeline.extract_entities_from_text", side_effect=fake_extract):
+        report = stage_analyze(text_map, ["doc_a", "doc_c"], rag_config, None, aggregate_store=store)
+        assert calls == ["Kael returned"]
+        assert report["entities"]["NPCs"] == ["Kael", "Thule"]
+        assert report["entity_counts"]["NPCs"] == {"Kael": 2, "Thule": 1}
+
+        # doc_b's stored hash is stale, so it is re-extracted; doc_a is read from the aggregate
+        report = stage_analyze(text_map, ["doc_a", "doc_b"], rag_config, None, aggregate_store=store)
+    assert calls[1:] == ["Serana waited"]
+    assert report["entity_counts"]["NPCs"] == {"Kael": 1, "Serana": 1, "Thule": 1}
+    assert store.counts_for_documents(["doc_a", "doc_c"], "mentions")["NPCs"] == {"Kael": 2, "Thule": 1}
+    assert store.document_keys() == ["doc_a", "doc_b", "doc_c"]
+
+
+@pytest.mark.unit
+def test_count_mentions_counts_whole_word_occurrences():
+    from entity_aggregate import count_mentions
+
+    text = "Ana Vell met Ana. ana vell left the Dusk Choir; Anavell did not."
+    mentions = count_mentions(text, {"NPCs": ["Ana Vell", "Ana"], "Locations": ["Dusk Choir", "Nowhere"], "Items": []})
+    assert mentions == {"NPCs": ["Ana Vell", "Ana Vell", "Ana"], "Locations": ["Dusk Choir", "Nowhere"], "Items": []}
+
+
+@pytest.mark.unit
+def test_ingest_aggregate_keys_by_vault_path_and_feeds_entity_notes(tmp_path):
+    from ingest_pdfs import write_pdf_notes
+    from note_writer import NoteWriter
+
+    templates = tmp_path / "Templates"
+    templates.mkdir()
+    (templates / "source.md").write_text("---\ntitle: \"{{title}}\"\n---\n", encoding="utf-8")
+    (templates / "entity.md").write_text("---\ntitle: \"{{title}}\"\nsource_refs: []\n---\n", encoding="utf-8")
+    dirs = {name: tmp_path / name for name in ("Sources", "Rules", "NPCs", "Factions", "Locations", "Items", "Text")}
+    for folder in dirs.values():
+        folder.mkdir()
+    store = EntityAggregateStore(tmp_path / "agg.sqlite")
+
+    def ingest(pdf_path, text):
+        analysis = {"text": text, "extracted_entities": {"NPCs": ["Ana Vell"], "Factions": [], "Locations": [], "Items": []}}
+        writer = NoteWriter(max_pending=0)
+        ok, error = write_pdf_notes(
+            pdf_path, analysis, tmp_path, dirs["Sources"], dirs["Rules"], dirs["NPCs"],
+            dirs["Factions"], dirs["Locations"], dirs["Items"], dirs["Text"],
+            templates / "source.md", templates / "entity.md",
+            created="2026-01-01", overwrite=True, entity_aggregate=store, note_writer=writer,
+        )
+        assert ok, error
+        writer.flush()
+
+    ingest(tmp_path / "PDFs" / "core" / "codex.pdf", "Ana Vell opens the codex. Ana Vell closes it.")
+    ingest(tmp_path / "PDFs" / "supplement" / "codex.pdf", "Ana Vell returns.")
+    ingest(tmp_path / "PDFs" / "atlas.pdf", "The atlas names Ana Vell.")
+
+    # Same stem in two folders: two documents, not one overwritten entry
+    assert store.documents_for("NPCs", "Ana Vell") == ["PDFs/atlas.pdf", "PDFs/core/codex.pdf", "PDFs/supplement/codex.pdf"]
+    assert store.counts()["NPCs"]["Ana Vell"] == 3
+    assert store.counts("mentions")["NPCs"]["Ana Vell"] == 4
+    note = (dirs["NPCs"] / "Ana Vell.md").read_text(encoding="utf-8")
+    assert 'source_refs: ["[[atlas]]", "[[codex]]"]' in note
+
+    assert store.sync_documents(["PDFs/atlas.pdf"]) == ["PDFs/core/codex.pdf", "PDFs/supplement/codex.pdf"]
+    assert store.counts("mentions")["NPCs"]["Ana Vell"] == 1
+    store.close()
@@ -215,5 +215,189 @@ class TestExtractEntitiesFromText:
         assert all(isinstance(v, list) for v in result.values())
 
 
+class _FakeEnt:
+    def __init__(self, text, label_, start_char):
+        self.text = text
+        self.label_ = label_
+        self.start_char = start_char
+        self.end_char = start_char + len(text)
+
+
+class _FakeNLP:
+    """Stand-in spaCy pipeline: tags every known name it finds in a segment."""
+
+    pipe_names = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+    labels = {"Vex": "PERSON", "Ordo Hereticus": "ORG", "Hive Sibellus": "GPE"}
+
+    def __init__(self):
+        self.calls = []
+        self.segments = []
+
+    def pipe(self, items, as_tuples=False, batch_size=1000, n_process=1, disable=()):
+        self.calls.append({"batch_size": batch_size, "n_process": n_process, "disable": list(disable)})
+        for text, context in items:
+            self.segments.append(text)
+            doc = type("Doc", (), {})()
+            doc.ents = [
+                _FakeEnt(name, label, match)
+                for name, label in self.labels.items()
+                for match in _find_all(text, name)
+            ]
+            yield doc, context
+
+
+def _find_all(text, name):
+    start = text.find(name)
+    while start != -1:
+        yield start
+        start = text.find(name, start + 1)
+
+
+def _batch_extractor(**kwargs):
+    from entity_extractor import ExtractorRegistry
+
+    extractor = EntityExtractor(registry=ExtractorRegistry(loader=lambda name: None), **kwargs)
+    extractor.nlp = _FakeNLP()
+    return extractor
+
+
+class TestBatchExtraction:
+    """nlp.pipe segmentation, offsets and per-document aggregation."""
+
+    @pytest.mark.unit
+    def test_segment_text_offsets_and_boundaries(self):
+        from entity_extractor import segment_text
+
+        text = ("Vex walked the hive. " * 40) + "\n\n" + ("The Ordo Hereticus watched. " * 40)
+        segments = segment_text(text, max_chars=300)
+
+        assert all(len(segment) <= 300 for _, segment in segments)
+        for offset, segment in segments:
+            assert text[offset:offset + len(segment)] == segment
+        # Every cut lands after a sentence end, never mid-word
+        for offset, _ in segments[1:]:
+            assert text[:offset].rstrip()[-1] == "."
+
+    @pytest.mark.unit
+    def test_entity_spans_map_to_document_offsets(self):
+        extractor = _batch_extractor(segment_chars=200, batch_size=8, n_process=1)
+        doc_a = ("Filler sentence here. " * 20) + "Vex arrived at Hive Sibellus."
+        doc_b = "The Ordo Hereticus hunts Vex."
+
+        spans = extractor.extract_entity_spans([doc_a, doc_b])
+
+        assert len(extractor.nlp.calls) == 1
+        call = extractor.nlp.calls[0]
+        assert call["batch_size"] == 8
+        assert "parser" in call["disable"] and "ner" not in call["disable"]
+        assert len(extractor.nlp.segments) > 2
+        for doc, doc_spans in ((doc_a, spans[0]), (doc_b, spans[1])):
+            assert doc_spans
+            for span in doc_spans:
+                assert doc[span.start:span.end] == span.text
+        assert {s.label for s in spans[1]} == {"ORG", "PERSON"}
+
+    @pytest.mark.unit
+    def test_extract_entities_runs_segments_through_pipe(self):
+        extractor = _batch_extractor(batch_size=4)
+        results = [
+            extractor.extract_entities(text)
+            for text in ("Vex arrived at Hive Sibellus.", "", "The Ordo Hereticus hunts.")
+        ]
+
+        assert "Vex" in results[0]["NPCs"]
+        assert "Hive Sibellus" in results[0]["Locations"]
+        assert all(len(v) == 0 for v in results[1].values())
+        assert "Ordo Hereticus" in results[2]["Factions"]
+        assert "Vex" not in results[2]["NPCs"]
+        assert [call["batch_size"] for call in extractor.nlp.calls] == [4, 4]
+
+
+class TestExtractorRegistry:
+    """Keyed, thread-safe extractor registry."""
+
+    @pytest.mark.unit
+    def test_concurrent_requests_load_model_once(self):
+        import threading
+        import time
+        from entity_extractor import ExtractorRegistry
+
+        loads = []
+
+        def slow_loader(name):
+            loads.append(name)
+            time.sleep(0.05)
+            return _FakeNLP()
+
+        registry = ExtractorRegistry(loader=slow_loader)
+        got = []
+        threads = [threading.Thread(target=lambda: got.append(registry.get_extractor())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert loads == ["en_core_web_sm"]
+        assert len({id(e) for e in got}) == 1
+        stats = registry.stats()
+        assert stats["models"]["en_core_web_sm"]["available"] is True
+        assert stats["models"]["en_core_web_sm"]["load_seconds"] >= 0.05
+        assert stats["extractors"] == 1
+
+    @pytest.mark.unit
+    def test_keyed_by_configuration_and_eviction(self):
+        from entity_extractor import ExtractorRegistry
+
+        loads = []
+        registry = ExtractorRegistry(loader=lambda name: loads.append(name) or _FakeNLP())
+        small = registry.get_extractor(model_name="sm", batch_size=16)
+        small_again = registry.get_extractor(model_name="sm", batch_size=16)
+        small_batch = registry.get_extractor(model_name="sm", batch_size=64)
+        large = registry.get_extractor(model_name="lg")
+
+        assert small is small_again
+        assert small is not small_batch and small_batch.batch_size == 64
+        # Both "sm" configurations share one loaded model
+        assert small.nlp is small_batch.nlp
+        assert loads == ["sm", "lg"]
+
+        assert registry.evict("sm") == 1
+        assert set(registry.stats()["models"]) == {"lg"}
+        assert registry.get_extractor(model_name="lg") is large
+        reloaded = registry.get_extractor(model_name="sm", batch_size=16)
+        assert reloaded is not small
+        assert loads == ["sm", "lg", "sm"]
+
+
+class TestRPGPatternScanner:
+    """Single-pass RPG pattern scanner."""
+
+    @pytest.mark.unit
+    def test_scanner_matches_findall_per_pattern(self):
+        from benchmark_entity_patterns import synthetic_text
+
+        extractor = EntityExtractor.__new__(EntityExtractor)
+        extractor.rpg_patterns = extractor._init_rpg_patterns()
+        text = synthetic_text(20000) + (
+            " Lord Inquisitor Kael met the Iron Hands Chapter, 3Ancient Helm_ and Tech-Priest Voss."
+            " Kael the Elder2 left the Void Realm with an Ork Axe."
+        )
+        expected = {c: [p.findall(text) for p in plist] for c, plist in extractor.rpg_patterns.items()}
+
+        assert extractor._rpg_scanner.scan(text) == expected
+        assert "Voss" in extractor._extract_with_patterns(text)["NPCs"]
+
+    @pytest.mark.unit
+    def test_replaced_patterns_fall_back_to_findall(self):
+        import re
+
+        extractor = EntityExtractor.__new__(EntityExtractor)
+        extractor.rpg_patterns = extractor._init_rpg_patterns()
+        extractor.rpg_patterns = {"Items": [re.compile(r"\b(Bolter)\b")]}
+
+        result = extractor._extract_with_patterns("A Bolter and a bolter.")
+        assert result["Items"] == ["Bolter"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,89 @@
+# PURPOSE: Tests for the vault entity gazetteer (entity_gazetteer.EntityGazetteer).
+# DEPENDENCIES: pytest, entity_gazetteer, entity_extractor.
+# MODIFICATION NOTES: Frontmatter titles/aliases, incremental refresh, masking ahead of NER.
+
+import os
+
+import pytest
+
+from entity_gazetteer import EntityGazetteer, get_vault_gazetteer, read_frontmatter
+
+
+def _note(path, title, aliases=(), entity_type="npc", comment=True):
+    head = "<!--\n# PURPOSE: Entity note.\n-->\n\n" if comment else ""
+    alias_list = ", ".join(f'"{a}"' for a in aliases)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        f'{head}---\ntitle: "{title}"\nentity_type: "{entity_type}"\naliases: [{alias_list}]\n---\n\n## Summary\n',
+        encoding="utf-8",
+    )
+
+
+@pytest.mark.unit
+def test_frontmatter_after_template_comment_and_block_aliases():
+    content = "<!--\n# PURPOSE: x\n-->\n\n---\ntitle: \"Kael Voss\"\naliases:\n  - The Red Hand\n  - 'Voss'\n---\nBody"
+    fields = read_frontmatter(content)
+    assert fields["title"] == "Kael Voss"
+    assert fields["aliases"] == ["The Red Hand", "Voss"]
+    assert read_frontmatter("# No frontmatter") == {}
+
+
+@pytest.mark.unit
+def test_refresh_is_incremental(tmp_path):
+    npcs = tmp_path / "NPCs"
+    _note(npcs / "Kael Voss.md", "Kael Voss", aliases=["The Red Hand"])
+    _note(npcs / "Serana.md", "Serana")
+    wiki = tmp_path / "LLM-Wiki" / "Entities"
+    _note(wiki / "Iron Hands.md", "Iron Hands", entity_type="faction")
+    _note(wiki / "Glossary.md", "Glossary", entity_type="concept")
+    gazetteer = EntityGazetteer([(npcs, "NPCs"), (wiki, None)])
+
+    stats = gazetteer.refresh()
+    assert stats["notes"] == 4 and stats["read"] == 4 and stats["rebuilt"] == 1
+    assert len(gazetteer) == 4  # Glossary has no entity category
+
+    # Nothing changed: no reads, no recompilation
+    stats = gazetteer.refresh()
+    assert stats["read"] == 0 and stats["rebuilt"] == 0
+
+    # A new alias is picked up by re-reading only that note
+    _note(npcs / "Serana.md", "Serana", aliases=["Serana the Grey"])
+    st = (npcs / "Serana.md").stat()
+    os.utime(npcs / "Serana.md", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    (wiki / "Iron Hands.md").unlink()
+    stats = gazetteer.refresh()
+    assert stats["read"] == 1 and stats["removed"] == 1 and stats["rebuilt"] == 1
+
+    matches = gazetteer.match("The Red Hand met Serana  the\nGrey near the Iron Hands keep.")
+    assert [(m.title, m.category) for m in matches] == [("Kael Voss", "NPCs"), ("Serana", "NPCs")]
+    assert gazetteer.extract("Kael Voss and Kael Vossian") == {
+        "NPCs": ["Kael Voss"], "Factions": [], "Locations": [], "Items": []
+    }
+
+
+@pytest.mark.unit
+def test_known_entities_are_masked_before_ner(tmp_path):
+    from entity_extractor import EntityExtractor
+
+    _note(tmp_path / "NPCs" / "Kael Voss.md", "Kael Voss", aliases=["Lord Kael"])
+    config = {"npcs_dir": "NPCs", "entity_extraction": {"gazetteer_dirs": []}}
+    gazetteer = get_vault_gazetteer(tmp_path, config)
+
+    text = "Lord Kael spoke with Inquisitor Thule."
+    matches = gazetteer.match(text)
+    masked = gazetteer.mask(text, matches)
+    assert len(masked) == len(text) and "Kael" not in masked
+
+    extractor = EntityExtractor.__new__(EntityExtractor)
+    extractor.nlp = None
+    extractor.use_llm = False
+    extractor.rpg_patterns = extractor._init_rpg_patterns()
+    seen = []
+    extractor._extract_with_spacy = lambda t: seen.append(t) or extractor._empty_entities()
+
+    result = extractor.extract_entities(text, gazetteer=gazetteer)
+    assert "Kael" not in seen[0]
+    # Alias resolved to the note title; NER/patterns still find the unknown remainder
+    assert "Kael Voss" in result["NPCs"]
+    assert "Thule" in result["NPCs"]
+    assert get_vault_gazetteer(tmp_path, config) is gazetteer
@@ -164,6 +164,68 @@ class TestDeduplicateEntities:
         assert len(result["NPCs"]) == 1
 
 
+class TestBlockedFuzzyDeduplicate:
+    """Tests for blocking-based fuzzy deduplication of large entity lists."""
+    
+    @pytest.mark.unit
+    def test_phonetic_key(self):
+        """Names that sound alike share a key."""
+        from entity_validator import phonetic_key
+        
+        assert phonetic_key("Robert") == phonetic_key("Rupert")
+        assert phonetic_key("Kael") != phonetic_key("Vex")
+        assert phonetic_key("") == ""
+    
+    @pytest.mark.unit
+    def test_matches_pairwise_scan(self):
+        """Blocked candidates reach nearly the same keep/merge decisions as the exact scan."""
+        from benchmark_entity_dedup import exact_deduplicate, synthetic_names
+        from entity_validator import blocked_fuzzy_deduplicate
+        
+        names = synthetic_names(300)
+        exact = exact_deduplicate(names)
+        blocked = blocked_fuzzy_deduplicate(names)
+        
+        assert len(exact) < len(names)
+        assert len(set(exact) ^ set(blocked)) <= 3
+    
+    @pytest.mark.unit
+    def test_pinned_merge_output(self):
+        """Pins blocked merges on a fixture list, including the pairs it is known to miss."""
+        from benchmark_entity_dedup import exact_deduplicate
+        from entity_validator import blocked_fuzzy_deduplicate
+        
+        names = [
+            "Inquisitor Vex", "Inquisitor Vax", "Hive Sibellus", "Hive Sibelus", "Ordo Hereticus",
+            "Ordo Hereticos", "Brass Codex", "Brass Codec", "Dusk Choir", "Ana Vell", "Anna Vell",
+            "Visa", "Via", "Quorre Chapter", "Raquor Chapter", "Lord Castellan Ursarkar",
+            "Lord Castelan Ursarkar", "Gallowglass", "Sister Amberley", "Sister Amberly",
+        ]
+        
+        blocked = blocked_fuzzy_deduplicate(names)
+        
+        assert blocked == [
+            "Inquisitor Vex", "Hive Sibellus", "Ordo Hereticus", "Brass Codex", "Dusk Choir", "Ana Vell",
+            "Visa", "Via", "Quorre Chapter", "Raquor Chapter", "Lord Castellan Ursarkar", "Gallowglass",
+            "Sister Amberley",
+        ]
+        # Approximate: "Via" / "Raquor Chapter" score >= 0.85 against a kept name but share no block with it
+        assert set(blocked) - set(exact_deduplicate(names)) == {"Via", "Raquor Chapter"}
+    
+    @pytest.mark.unit
+    def test_large_list_is_fuzzy_deduplicated(self):
+        """Lists above the exact-scan limit still merge near-duplicates."""
+        from entity_validator import EXACT_FUZZY_LIMIT
+        
+        base = [f"Hive Tertius Sector {i:04d} Outpost" for i in range(EXACT_FUZZY_LIMIT + 100)]
+        entities = {"Locations": base + ["Inquisitor Kaelith Vorne", "Inquisitor Kaelith Vorn"]}
+        
+        result = deduplicate_entities(entities)
+        
+        kaelith = [name for name in result["Locations"] if "Kaelith" in name]
+        assert kaelith == ["Inquisitor Kaelith Vorne"]
+
+
 class TestFilterCommonFalsePositives:
     """Tests for false positive filtering."""
     
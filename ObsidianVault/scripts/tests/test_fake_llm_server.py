@@ -0,0 +1,113 @@
+# PURPOSE: Tests for the fake LLM server and pipeline benchmark helpers.
+# DEPENDENCIES: pytest, fake_llm_server, benchmark_pipeline (stdlib HTTP only).
+# MODIFICATION NOTES: Verifies Ollama/OpenAI/Anthropic response shapes, latency, failure injection, busy-time math.
+
+import json
+import time
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from benchmark_pipeline import check_llm_reached, summarize_stages
+from fake_llm_server import FakeLLMServer, FakeLLMSettings
+
+
+def _post(url, payload):
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return resp.status, json.loads(resp.read().decode())
+
+
+@pytest.mark.unit
+def test_ollama_chat_and_generate_shapes():
+    settings = FakeLLMSettings(latency_ms=1, tokens_per_sec=0, response_tokens=5)
+    with FakeLLMServer(settings=settings) as server:
+        status, chat = _post(server.url + "/api/chat", {
+            "model": "llama2",
+            "messages": [{"role": "user", "content": "hello"}],
+            "options": {"num_predict": 3},
+        })
+        assert status == 200
+        assert len(chat["message"]["content"].split()) == 3
+        assert chat["eval_count"] == 3
+        _, gen = _post(server.url + "/api/generate", {"model": "llama2", "prompt": "hi"})
+        assert gen["done"] is True and gen["response"]
+        _, load = _post(server.url + "/api/generate", {"model": "llama2", "keep_alive": "5m"})
+        assert load["done_reason"] == "load"
+        with urllib.request.urlopen(server.url + "/api/tags", timeout=5) as resp:
+            assert json.loads(resp.read())["models"][0]["name"] == "llama2:latest"
+        assert server.stats()["requests"] == 2
+
+
+@pytest.mark.unit
+def test_openai_and_anthropic_shapes():
+    settings = FakeLLMSettings(latency_ms=1, tokens_per_sec=0, response_tokens=4)
+    with FakeLLMServer(settings=settings) as server:
+        _, oai = _post(server.url + "/v1/chat/completions", {
+            "model": "gpt-4",
+            "messages": [{"role": "user", "content": "x" * 40}],
+        })
+        assert oai["choices"][0]["message"]["content"]
+        assert oai["usage"] == {"prompt_tokens": 10, "completion_tokens": 4, "total_tokens": 14}
+        _, msg = _post(server.url + "/v1/messages", {
+            "model": "claude-3-sonnet",
+            "max_tokens": 2,
+            "messages": [{"role": "user", "content": [{"type": "text", "text": "hello"}]}],
+        })
+        assert msg["content"][0]["type"] == "text"
+        assert msg["usage"]["output_tokens"] == 2
+
+
+@pytest.mark.unit
+def test_failure_injection_returns_429_with_retry_after():
+    settings = FakeLLMSettings(latency_ms=1, failure_rate=1.0, failure_status=429, retry_after=0.5)
+    with FakeLLMServer(settings=settings) as server:
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            _post(server.url + "/v1/chat/completions", {"model": "gpt-4", "messages": []})
+        assert excinfo.value.code == 429
+        assert excinfo.value.headers["Retry-After"] == "0.5"
+        assert server.stats()["failures"] == 1
+
+
+@pytest.mark.unit
+def test_latency_and_busy_seconds_split_llm_wait_from_overhead():
+    settings = FakeLLMSettings(latency_ms=50, tokens_per_sec=0)
+    with FakeLLMServer(settings=settings) as server:
+        start = time.perf_counter()
+        _post(server.url + "/api/generate", {"model": "llama2", "prompt": "hi"})
+        time.sleep(0.05)
+        end = time.perf_counter()
+        rows = summarize_stages([("stage", start, end)], server)
+    row = rows[0]
+    assert row["llm_wait_seconds"] >= 0.045
+    assert row["overhead_seconds"] >= 0.045
+    assert row["wall_seconds"] == pytest.approx(row["llm_wait_seconds"] + row["overhead_seconds"], abs=0.002)
+
+
+@pytest.mark.unit
+def test_busy_seconds_counts_overlap_once():
+    server = FakeLLMServer()
+    try:
+        server._intervals.extend([(0.0, 1.0), (0.5, 1.5), (3.0, 4.0)])
+        assert server.busy_seconds() == pytest.approx(2.5)
+        assert server.busy_seconds(1.0, 3.5) == pytest.approx(1.0)
+    finally:
+        server._httpd.server_close()
+
+
+@pytest.mark.unit
+def test_scenario_without_llm_traffic_is_not_reported_as_success():
+    quiet = {"scenario": "run_pipeline (query)", "status": "success", "llm": {"requests": 0}}
+    with patch("benchmark_pipeline.importlib.util.find_spec", return_value=None):
+        assert check_llm_reached(quiet, "ollama")["status"] == "skipped"
+    with patch("benchmark_pipeline.importlib.util.find_spec", return_value=object()):
+        assert check_llm_reached(quiet, "ollama")["status"] == "failed"
+    busy = {**quiet, "llm": {"requests": 3}}
+    assert check_llm_reached(busy, "ollama") is busy
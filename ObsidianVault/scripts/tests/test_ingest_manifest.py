@@ -0,0 +1,159 @@
+# PURPOSE: Tests for the ingest manifest (ingest_manifest.IngestManifest) and its use in ingest_pdfs.
+# DEPENDENCIES: pytest, ingest_manifest, ingest_pdfs.
+# MODIFICATION NOTES: Skip on unchanged stat, sampled then full hash on mtime-only change, version/options/note
+#   staleness, invalidation, --force; PDFs without extracted text or with a failed note write are not recorded.
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from ingest_manifest import IngestManifest, options_fingerprint
+
+
+def _touch(path, delta_ns=10**9):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + delta_ns))
+
+
+@pytest.mark.unit
+def test_manifest_skips_unchanged_and_detects_changes(tmp_path):
+    pdf = tmp_path / "pdf" / "codex.pdf"
+    pdf.parent.mkdir()
+    pdf.write_bytes(b"%PDF-1.4 " + b"x" * 1000)
+    note = tmp_path / "Sources" / "codex.md"
+    note.parent.mkdir()
+    note.write_text("note")
+    path = tmp_path / "manifest.json"
+
+    manifest = IngestManifest(path, tmp_path, "1", "opts")
+    assert manifest.needs_processing(pdf)
+    manifest.record(pdf, note)
+    assert manifest.save() and not manifest.save()
+
+    manifest = IngestManifest(path, tmp_path, "1", "opts")
+    assert "pdf/codex.pdf" in manifest._entries
+    with patch("ingest_manifest.sampled_file_hash") as hasher:
+        assert not manifest.needs_processing(pdf)
+    hasher.assert_not_called()  # size + mtime match: no read
+
+    _touch(pdf)  # same content, new mtime
+    assert not manifest.needs_processing(pdf)
+    assert manifest.stats["hashed"] == 1
+
+    # Sampled hashes agree but the whole file differs: the full hash catches it
+    entry = manifest._entries["pdf/codex.pdf"]
+    _touch(pdf)
+    with patch("ingest_manifest.full_file_hash", return_value="0" * 32):
+        assert manifest.needs_processing(pdf)
+    _touch(pdf)
+    entry.pop("full")  # entry from before full hashes were recorded: cannot confirm, re-process
+    assert manifest.needs_processing(pdf)
+    manifest.record(pdf, note)
+
+    pdf.write_bytes(b"%PDF-1.4 " + b"y" * 1000)  # same size, new content
+    _touch(pdf, 2 * 10**9)
+    assert manifest.needs_processing(pdf)
+
+    assert IngestManifest(path, tmp_path, "2", "opts").needs_processing(pdf)
+    assert options_fingerprint({"max_excerpt_chars": 10}) != options_fingerprint({"max_excerpt_chars": 20})
+
+    manifest.record(pdf, note)
+    note.unlink()
+    assert manifest.needs_processing(pdf)  # source note deleted
+    assert manifest.invalidate(["*.pdf"]) == ["pdf/codex.pdf"] and len(manifest) == 0
+
+
+@pytest.mark.unit
+def test_invalidate_matches_bracketed_names_literally(tmp_path):
+    sources = tmp_path / "Sources"
+    sources.mkdir()
+    pdfs = [sources / name for name in ("Rulebook [2nd Ed].pdf", "Rulebook 2.pdf", "Bestiary.pdf")]
+    manifest = IngestManifest(tmp_path / "manifest.json", tmp_path, "1", "opts")
+    for pdf in pdfs:
+        pdf.write_bytes(b"%PDF-1.4 " + pdf.name.encode())
+        manifest.record(pdf)
+
+    assert manifest.invalidate([pdfs[0].resolve().as_posix()]) == ["Sources/Rulebook [2nd Ed].pdf"]
+    manifest.record(pdfs[0])
+    assert manifest.invalidate(["Rulebook [2nd Ed].pdf"]) == ["Sources/Rulebook [2nd Ed].pdf"]
+    manifest.record(pdfs[0])
+    assert manifest.invalidate(["Sources/Rulebook [2nd Ed].pdf"]) == ["Sources/Rulebook [2nd Ed].pdf"]
+    # Without an exact match a pattern is still a glob
+    assert manifest.invalidate(["Rulebook [0-9].pdf"]) == ["Sources/Rulebook 2.pdf"]
+    assert manifest.invalidate(["*.pdf"]) == ["Sources/Bestiary.pdf"]
+
+
+@pytest.mark.unit
+def test_ingest_skips_unchanged_pdfs(tmp_path):
+    from ingest_pdfs import ingest_pdfs
+
+    vault = tmp_path / "vault"
+    (vault / "Templates").mkdir(parents=True)
+    (vault / "Templates" / "source_note.md").write_text(
+        "---\ntitle: \"{{title}}\"\nsource_file: \"{{source_file}}\"\nsource_pages: \"{{source_pages}}\"\n"
+        "doc_type: \"{{doc_type}}\"\ndate: \"{{date}}\"\n---\n"
+    )
+    (vault / "Templates" / "entity_note.md").write_text(
+        "---\ntitle: \"{{title}}\"\nentity_type: \"{{entity_type}}\"\ndate: \"{{date}}\"\n---\n"
+    )
+    cache = vault / ".obsidian" / "plugins" / "pdf-plus"
+    cache.mkdir(parents=True)
+    (vault / "PDFs").mkdir()
+    for name in ("alpha", "beta"):
+        (vault / "PDFs" / f"{name}.pdf").write_bytes(b"%PDF-1.4 stub " + name.encode())
+        (cache / f"{name}.txt").write_text(f"Text of {name}.")
+    (cache / "delta.txt").write_text("Text of delta.")  # delta.pdf is added later
+    config = {
+        "vault_root": str(vault),
+        "pdf_root": "PDFs",
+        "source_notes_dir": "Sources",
+        "rules_dir": "Rules",
+        "npcs_dir": "NPCs",
+        "factions_dir": "Factions",
+        "locations_dir": "Locations",
+        "items_dir": "Items",
+        "extracted_text_dir": "Sources/_extracted_text",
+        "templates": {"source_note": "Templates/source_note.md", "entity_note": "Templates/entity_note.md"},
+        "pdf_text_cache_dirs": [".obsidian/plugins/pdf-plus"],
+        "pdf_text_cache_extensions": [".txt"],
+    }
+
+    def processed(**kwargs):
+        with patch("ingest_pdfs.process_single_pdf", return_value=(True, None)) as process:
+            ingest_pdfs(config, overwrite=False, **kwargs)
+        return sorted(Path(call.args[0]).name for call in process.call_args_list)
+
+    ingest_pdfs(config, overwrite=False)
+    assert (vault / "Sources" / "_ingest_manifest.json").exists()
+    assert processed() == []
+
+    # A PDF whose text could not be extracted gets notes but stays out of the manifest (retried next run)
+    (vault / "PDFs" / "gamma.pdf").write_bytes(b"%PDF-1.4 stub gamma")
+    ingest_pdfs(config, overwrite=False)
+    assert (vault / "Sources" / "gamma.md").exists()
+    assert processed() == ["gamma.pdf"]
+    (vault / "PDFs" / "gamma.pdf").unlink()
+
+    # A failed note write fails the PDF and keeps it out of the manifest
+    import note_writer
+
+    (vault / "PDFs" / "delta.pdf").write_bytes(b"%PDF-1.4 stub delta")
+    real_write = note_writer.write_atomic
+
+    def flaky_write(path, data):
+        if path.name == "delta.txt":
+            raise OSError("disk full")
+        real_write(path, data)
+
+    with patch("note_writer.write_atomic", side_effect=flaky_write):
+        ingest_pdfs(config, overwrite=False)
+    assert (vault / "Sources" / "delta.md").exists()
+    assert processed() == ["delta.pdf"]
+
+    # Every note recorded for a PDF is checked, not only its source note
+    (vault / "Sources" / "_extracted_text" / "alpha.txt").unlink()
+    assert processed() == ["alpha.pdf"]
+    assert processed(invalidate=["beta.pdf"]) == ["beta.pdf"]
+    assert processed(force=True) == ["alpha.pdf", "beta.pdf", "delta.pdf"]
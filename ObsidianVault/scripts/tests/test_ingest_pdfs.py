@@ -298,3 +298,40 @@ class TestToFileUrl:
         
         assert url.startswith("file:///")
         assert "test%20file.pdf" in url  # URL-encoded space
+
+
+class TestProcessWorkerMode:
+    """Tests for ingest_pdfs with worker_mode "process"."""
+
+    def test_notes_written_by_parent_from_worker_results(self, sample_config):
+        """Test that PDFs parsed in worker processes produce the same source notes."""
+        vault_root = Path(sample_config["vault_root"])
+        (vault_root / "Templates" / "source_note.md").write_text(
+            "---\ntitle: \"{{title}}\"\nsource_file: \"{{source_file}}\"\nsource_pages: \"{{source_pages}}\"\n"
+            "doc_type: \"{{doc_type}}\"\ndate: \"{{date}}\"\n---\n\n## Summary\n\n- \n"
+        )
+        cache_dir = vault_root / ".obsidian" / "plugins" / "pdf-plus"
+        cache_dir.mkdir(parents=True)
+        pdf_root = vault_root / "PDFs"
+        pdf_root.mkdir()
+        for name in ("alpha", "beta", "gamma"):
+            (pdf_root / f"{name}.pdf").write_bytes(b"%PDF-1.4 stub")
+            (cache_dir / f"{name}.txt").write_text(f"Text of {name}.")
+        sample_config.update(pdf_root="PDFs", worker_mode="process", max_workers=2, worker_max_jobs=1, pdf_timeout_seconds=120)
+
+        ingest_pdfs(sample_config, overwrite=False)
+
+        for name in ("alpha", "beta", "gamma"):
+            assert (vault_root / "Sources" / f"{name}.md").exists()
+            assert (vault_root / "Sources" / "_extracted_text" / f"{name}.txt").read_text() == f"Text of {name}."
+
+    def test_worker_page_pools_share_the_cpus(self, monkeypatch):
+        """Test that each process-mode worker gets CPU count // workers page-parallel processes."""
+        from ingest_pdfs import split_page_parallel
+
+        monkeypatch.setattr("os.cpu_count", lambda: 8)
+        config = {"max_workers": 8, "page_parallel": {"workers": 4, "min_pages": 100}}
+        assert split_page_parallel(config, 8)["page_parallel"] == {"workers": 1, "min_pages": 100}
+        assert split_page_parallel(config, 2)["page_parallel"]["workers"] == 4
+        assert split_page_parallel({}, 4)["page_parallel"]["workers"] == 2
+        assert config["page_parallel"]["workers"] == 4  # parent config untouched
@@ -0,0 +1,107 @@
+# PURPOSE: Tests for note_writer.NoteWriter and its use in ingest_pdfs.write_pdf_notes.
+# DEPENDENCIES: pytest, note_writer, ingest_pdfs.
+# MODIFICATION NOTES: Unchanged notes are not rewritten (mtime kept), changed notes are replaced atomically,
+#   overwrite off keeps existing notes, a second identical ingest writes nothing, and failed writes are
+#   reported per owner.
+
+import os
+
+import pytest
+
+from note_writer import NoteWriter
+
+
+def _age(path):
+    """Push the file mtime into the past so a rewrite is detectable."""
+    os.utime(path, ns=(0, 10**9))
+
+
+@pytest.mark.unit
+def test_flush_skips_identical_and_replaces_changed(tmp_path):
+    same, changed, kept = tmp_path / "same.md", tmp_path / "changed.md", tmp_path / "kept.md"
+    for path in (same, changed, kept):
+        path.write_text("old body\n", encoding="utf-8")
+        _age(path)
+    os.chmod(changed, 0o640)
+
+    written = []
+    writer = NoteWriter(max_pending=0, on_write=lambda path, size: written.append((path.name, size)))
+    writer.write(same, "old body\n")
+    writer.write(changed, "new body\n")
+    writer.write(kept, "new body\n", overwrite=False)
+    writer.write(tmp_path / "NPCs" / "Vell.md", "first\n", overwrite=False)
+    writer.write(tmp_path / "NPCs" / "Vell.md", "second\n", overwrite=False)  # first staged wins
+    assert len(writer) == 4 and not (tmp_path / "NPCs").exists()  # nothing written before flush
+
+    assert writer.flush() == [] and writer.stats == {"written": 2, "unchanged": 1, "kept": 1, "failed": 0}
+    assert same.stat().st_mtime_ns == 10**9 and kept.read_text() == "old body\n"
+    assert changed.read_text() == "new body\n" and (changed.stat().st_mode & 0o777) == 0o640
+    assert (tmp_path / "NPCs" / "Vell.md").read_text() == "first\n"
+    assert sorted(written) == [("Vell.md", 6), ("changed.md", 9)]
+    assert not [p for p in tmp_path.rglob("*.tmp")]
+    assert writer.flush() == [] and writer.stats["written"] == 2
+
+    auto = NoteWriter(max_pending=2)
+    auto.write(tmp_path / "a.md", "a")
+    assert not (tmp_path / "a.md").exists()
+    auto.write(tmp_path / "b.md", "b")
+    assert (tmp_path / "a.md").exists() and len(auto) == 0
+
+
+@pytest.mark.unit
+def test_reingest_writes_no_unchanged_notes(tmp_path):
+    from ingest_pdfs import write_pdf_notes
+
+    templates = tmp_path / "Templates"
+    templates.mkdir()
+    (templates / "source.md").write_text("---\ntitle: \"{{title}}\"\ndate: \"{{date}}\"\n---\n", encoding="utf-8")
+    (templates / "entity.md").write_text("---\ntitle: \"{{title}}\"\nentity_type: \"{{entity_type}}\"\n---\n", encoding="utf-8")
+    dirs = {name: tmp_path / name for name in ("Sources", "Rules", "NPCs", "Factions", "Locations", "Items", "Text")}
+    for folder in dirs.values():
+        folder.mkdir()
+    analysis = {
+        "text": "The brass codex opens at dusk.",
+        "extracted_entities": {"NPCs": ["Ana Vell"], "Factions": [], "Locations": ["Dusk Choir"], "Items": []},
+    }
+
+    def ingest(writer):
+        ok, error = write_pdf_notes(
+            tmp_path / "codex.pdf", analysis, tmp_path, dirs["Sources"], dirs["Rules"], dirs["NPCs"],
+            dirs["Factions"], dirs["Locations"], dirs["Items"], dirs["Text"],
+            templates / "source.md", templates / "entity.md",
+            created="2026-01-01", overwrite=True, note_writer=writer,
+        )
+        assert ok, error
+        assert writer.flush() == []
+        return writer.stats
+
+    first = ingest(NoteWriter(max_pending=0))
+    assert first["written"] == 4 and first["unchanged"] == 0  # source, extracted text, NPC, location
+    notes = sorted(p for p in tmp_path.rglob("*") if p.is_file() and p.parent.name != "Templates")
+    for path in notes:
+        _age(path)
+
+    second = ingest(NoteWriter(max_pending=0))
+    assert second == {"written": 0, "unchanged": 4, "kept": 0, "failed": 0}
+    assert all(path.stat().st_mtime_ns == 10**9 for path in notes)
+    assert (dirs["NPCs"] / "Ana Vell.md").exists()
+
+
+@pytest.mark.unit
+def test_failed_writes_are_reported_per_owner(tmp_path):
+    blocker = tmp_path / "NPCs"
+    blocker.write_text("a file where the folder should be", encoding="utf-8")
+    vell = blocker / "Vell.md"
+
+    writer = NoteWriter(max_pending=0)
+    writer.write(tmp_path / "a.md", "a", owner="a.pdf")
+    writer.write(vell, "vell", owner="a.pdf", overwrite=False)
+    writer.write(vell, "vell", owner="b.pdf", overwrite=False)  # shared entity note
+    writer.write(tmp_path / "c.md", "c", owner="c.pdf")
+    assert writer.flush() == [vell]
+    assert writer.stats["failed"] == 1
+
+    assert writer.take_owner("a.pdf") == ([vell, tmp_path / "a.md"], [vell])
+    assert writer.take_owner("b.pdf") == ([vell], [vell])
+    assert writer.take_owner("c.pdf") == ([tmp_path / "c.md"], [])
+    assert writer.take_owner("a.pdf") == ([], [])
@@ -1,6 +1,13 @@
 # PURPOSE: Unit tests for OCR processor functionality.
 # DEPENDENCIES: pytest, ocr_processor module.
 # MODIFICATION NOTES: Tests OCR extraction, scanned PDF detection, and image preprocessing.
+#   Streaming pipeline: bounded in-flight page windows, page-cache resume. Sampled cache fingerprint and
+#   sampled scanned detection.
+
+import os
+import sys
+import threading
+import time
 
 import pytest
 from pathlib import Path
@@ -10,7 +17,11 @@ from ocr_processor import (
     extract_text_with_ocr,
     is_scanned_pdf,
     preprocess_image,
+    ocr_pdf_pages,
+    OCRPageCache,
     OCR_AVAILABLE,
+    _get_ocr_cache_path,
+    _save_ocr_cache,
 )
 
 
@@ -243,6 +254,165 @@ class TestExtractTextWithOcr:
             assert path is None
 
 
+class _FakeRasterizer:
+    """convert_from_path stand-in for a PDF of `pages` pages that tracks page images still in flight."""
+
+    def __init__(self, pages, fail_from=None):
+        self.pages = pages
+        self.fail_from = fail_from
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, path, dpi, first_page, last_page):
+        if self.fail_from is not None and first_page >= self.fail_from:
+            raise RuntimeError("interrupted")
+        self.calls.append((first_page, last_page))
+        images = [f"image-{n}" for n in range(first_page, min(last_page, self.pages) + 1)]
+        with self.lock:
+            self.in_flight += len(images)
+            self.peak = max(self.peak, self.in_flight)
+        return images
+
+    def recognize(self, image, page_num):
+        time.sleep(0.002)
+        with self.lock:
+            self.in_flight -= 1
+        return {"text": f"text of {image}"}
+
+
+class TestStreamingOcr:
+    """Tests for the windowed OCR pipeline (ocr_pdf_pages)."""
+
+    @pytest.mark.unit
+    def test_windows_bound_page_images_in_flight(self, tmp_path):
+        raster = _FakeRasterizer(pages=23)
+        pages = ocr_pdf_pages(
+            tmp_path / "book.pdf", raster.recognize, workers=3, window_pages=4, max_in_flight=6,
+            convert=raster, page_count=23,
+        )
+        assert list(pages) == list(range(1, 24))
+        assert pages[23] == {"text": "text of image-23"}
+        assert raster.calls[0] == (1, 4) and raster.calls[-1] == (21, 23)
+        assert raster.peak <= 6
+
+    @pytest.mark.unit
+    def test_interrupted_ocr_resumes_from_page_cache(self, tmp_path):
+        pdf = tmp_path / "book.pdf"
+        cache = lambda: OCRPageCache(tmp_path / "book.pages.jsonl", {"dpi": 300})
+
+        first = _FakeRasterizer(pages=10, fail_from=5)
+        pages = ocr_pdf_pages(pdf, first.recognize, workers=2, window_pages=2, convert=first, page_cache=cache())
+        assert list(pages) == [1, 2, 3, 4]
+
+        second = _FakeRasterizer(pages=10)
+        recognized = []
+
+        def recognize(image, page_num):
+            recognized.append(page_num)
+            return second.recognize(image, page_num)
+
+        pages = ocr_pdf_pages(pdf, recognize, workers=2, window_pages=2, convert=second, page_cache=cache())
+        assert list(pages) == list(range(1, 11)) and pages[1] == {"text": "text of image-1"}
+        assert sorted(recognized) == [5, 6, 7, 8, 9, 10]
+        assert second.calls[0] == (5, 6)
+
+        # Complete: nothing is rasterized again; other settings start over
+        third = _FakeRasterizer(pages=10)
+        assert len(ocr_pdf_pages(pdf, third.recognize, convert=third, page_cache=cache())) == 10
+        assert third.calls == []
+        assert OCRPageCache(tmp_path / "book.pages.jsonl", {"dpi": 400}).load() == {}
+
+    @pytest.mark.unit
+    def test_torn_last_line_is_cut_before_appending(self, tmp_path):
+        path = tmp_path / "book.pages.jsonl"
+        cache = OCRPageCache(path, {"dpi": 300})
+        cache.add(1, {"text": "one"})
+        cache.add(2, {"text": "two"})
+        cache.close()
+        intact = path.read_bytes()
+        with path.open("ab") as handle:
+            handle.write(b'{"page": 3, "te')  # killed mid-write
+
+        resumed = OCRPageCache(path, {"dpi": 300})
+        assert list(resumed.load()) == [1, 2]
+        assert path.read_bytes() == intact
+        resumed.add(3, {"text": "three"})
+        resumed.mark_complete(3)
+        resumed.close()
+
+        again = OCRPageCache(path, {"dpi": 300})
+        assert again.load() == {1: {"text": "one"}, 2: {"text": "two"}, 3: {"text": "three"}}
+        assert again.complete == 3 and len(path.read_text().splitlines()) == 5
+
+
+class TestOcrCacheFingerprint:
+    """Tests for the sampled OCR cache key."""
+
+    @pytest.mark.unit
+    def test_lookup_reads_full_file_only_on_suspected_collision(self, tmp_path):
+        pdf = tmp_path / "book.pdf"
+        pdf.write_bytes(b"%PDF-1.4 " + os.urandom(1 << 20))
+        out = tmp_path / "ocr"
+        cache_path = _save_ocr_cache(pdf, "page text", out)
+        assert cache_path.exists()
+
+        with patch("ocr_processor.full_file_hash") as full:
+            assert _get_ocr_cache_path(pdf, out) == cache_path
+        full.assert_not_called()
+
+        st = pdf.stat()
+        os.utime(pdf, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # touched, same content
+        assert _get_ocr_cache_path(pdf, out) == cache_path
+        with patch("ocr_processor.full_file_hash") as full:
+            assert _get_ocr_cache_path(pdf, out) == cache_path
+        full.assert_not_called()  # new mtime remembered
+
+        other = tmp_path / "other" / "book.pdf"
+        other.parent.mkdir()
+        other.write_bytes(b"%PDF-1.4 " + os.urandom(1 << 20))
+        with patch("ocr_processor.sampled_file_hash", return_value="0" * 32):
+            first = _save_ocr_cache(pdf, "first", out)
+            assert _get_ocr_cache_path(other, out) != first
+
+
+def _counting_reader(lengths):
+    """pypdf stand-in whose pages return len-n texts and count extract_text calls."""
+    reads = []
+    pages = []
+    for index, length in enumerate(lengths):
+        page = Mock()
+        page.extract_text.side_effect = lambda index=index, length=length: reads.append(index) or "x" * length
+        pages.append(page)
+    mock_pypdf = MagicMock()
+    mock_pypdf.PdfReader = Mock(return_value=Mock(pages=pages))
+    return mock_pypdf, reads
+
+
+class TestSampledScannedDetection:
+    """Tests for page-sampled is_scanned_pdf."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "lengths, scanned, max_reads",
+        [
+            ([2500] * 20, False, 1),  # text book: stops once the text rules out "scanned"
+            ([2500] * 200, False, 8),
+            ([0] * 200, True, 8),  # scanned book: uniform sample
+            ([3000] * 100 + [0] * 100, False, 200),  # mixed sample: every page checked
+            ([0] * 150 + [3000] * 50, False, 200),
+        ],
+    )
+    def test_sample_with_early_exit_and_mixed_fallback(self, tmp_path, lengths, scanned, max_reads):
+        pdf_path = tmp_path / "book.pdf"
+        pdf_path.write_bytes(b"dummy pdf content")
+        mock_pypdf, reads = _counting_reader(lengths)
+        with patch.dict(sys.modules, {"pypdf": mock_pypdf}):
+            assert is_scanned_pdf(pdf_path) is scanned
+        assert len(reads) <= max_reads
+
+
 class TestOcrIntegration:
     """Integration tests for OCR functionality."""
     
@@ -0,0 +1,115 @@
+# PURPOSE: Tests for Ollama warm-up / keep-alive manager.
+# DEPENDENCIES: pytest, ollama_warmup module (stdlib HTTP stub stands in for Ollama).
+# MODIFICATION NOTES: Covers config model discovery, preload requests, cold/warm classification.
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from ollama_warmup import OllamaWarmupManager, models_from_config
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    requests = []
+    load_durations = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        type(self).requests.append((self.path, payload))
+        load_ns = type(self).load_durations.pop(0) if type(self).load_durations else 0
+        body = json.dumps({"model": payload.get("model"), "done": True, "load_duration": load_ns}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_ollama():
+    _StubOllama.requests = []
+    _StubOllama.load_durations = []
+    server = HTTPServer(("127.0.0.1", 0), _StubOllama)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", _StubOllama
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_models_from_config_uses_ollama_sections():
+    config = {
+        "ai_summarization": {"provider": "ollama", "model": "llama2"},
+        "rag_pipeline": {
+            "summarization": {"provider": "openai", "model": "gpt-4"},
+            "generation": {"provider": "ollama", "model": "mistral"},
+        },
+        "entity_extraction": {"use_llm": True, "llm_provider": "ollama", "llm_model": "llama2"},
+    }
+    assert models_from_config(config) == ["llama2", "mistral"]
+    config["ollama_warmup"] = {"models": ["phi3"]}
+    assert models_from_config(config) == ["phi3"]
+
+
+@pytest.mark.unit
+def test_from_config_disabled_returns_none():
+    config = {"ollama_warmup": {"enabled": False}, "ai_summarization": {"provider": "ollama", "model": "llama2"}}
+    assert OllamaWarmupManager.from_config(config) is None
+    assert OllamaWarmupManager.from_config({}) is None
+
+
+@pytest.mark.unit
+def test_warm_all_sends_keep_alive_and_classifies_cold_then_warm(stub_ollama):
+    endpoint, handler = stub_ollama
+    # First load takes 2s (cold), second is already resident (warm).
+    handler.load_durations = [2_000_000_000, 1_000_000]
+    manager = OllamaWarmupManager(["llama2"], endpoint=endpoint, keep_alive="10m")
+
+    first = manager.warm_all()
+    second = manager.warm_all()
+
+    assert handler.requests[0] == ("/api/generate", {"model": "llama2", "keep_alive": "10m"})
+    assert first[0]["cold"] is True
+    assert second[0]["cold"] is False
+    stats = manager.stats()["llama2"]
+    assert stats["cold_count"] == 1
+    assert stats["warm_count"] == 1
+    assert stats["reloads_after_warm"] == 0
+
+
+@pytest.mark.unit
+def test_reload_after_warm_counts_as_thrash():
+    manager = OllamaWarmupManager(["llama2"], endpoint="http://127.0.0.1:9")
+    manager.record_call("llama2", 2500.0, 2_000_000_000)
+    manager.record_call("llama2", 40.0, 0)
+    manager.record_call("llama2", 2600.0, 2_100_000_000)
+    stats = manager.stats()["llama2"]
+    assert stats["cold_count"] == 2
+    assert stats["reloads_after_warm"] == 1
+    assert stats["avg_warm_latency_ms"] == 40.0
+
+
+@pytest.mark.unit
+def test_warm_model_unreachable_returns_none():
+    manager = OllamaWarmupManager(["llama2"], endpoint="http://127.0.0.1:9", timeout=0.5)
+    assert manager.warm_model("llama2") is None
+    assert manager.stats() == {}
+
+
+@pytest.mark.unit
+def test_is_busy_tracks_work_and_pending_callback():
+    pending = {"value": False}
+    manager = OllamaWarmupManager(["llama2"], has_pending=lambda: pending["value"])
+    assert manager.is_busy() is False
+    with manager.work():
+        assert manager.is_busy() is True
+    assert manager.is_busy() is False
+    pending["value"] = True
+    assert manager.is_busy() is True
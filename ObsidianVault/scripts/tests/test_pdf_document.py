@@ -0,0 +1,140 @@
+# PURPOSE: Tests for the shared parsed-PDF handle (pdf_document.PDFDocument).
+# DEPENDENCIES: pytest, pdf_document, ingest_pdfs, table_extractor (pypdf/pdfplumber replaced by fakes).
+# MODIFICATION NOTES: One parse per engine across text, metadata and tables; page text cache; saved-time stats.
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pdf_document import PDFDocument
+
+
+class _FakePage:
+    def __init__(self, text):
+        self.text = text
+        self.extract_calls = 0
+
+    def extract_text(self):
+        self.extract_calls += 1
+        return self.text
+
+    def extract_tables(self):
+        return [[["Roll", "Result"], ["1", "Ambush"]]] if "table" in self.text else []
+
+
+class _FakePDF:
+    opened = []
+
+    def __init__(self, path):
+        _FakePDF.opened.append(path)
+        self.pages = [_FakePage("Page one"), _FakePage("Page two with table")]
+        self.metadata = {"/Title": "Codex", "/Author": "Scribe"}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_engines():
+    _FakePDF.opened = []
+    with patch("pdf_document.PYPDF_AVAILABLE", True), \
+            patch("pdf_document.PDFPLUMBER_AVAILABLE", True), \
+            patch("pdf_document.PdfReader", _FakePDF), \
+            patch("pdf_document.pdfplumber") as plumber:
+        plumber.open.side_effect = _FakePDF
+        yield
+
+
+@pytest.mark.unit
+def test_page_text_cache_and_reuse_stats(tmp_path, fake_engines):
+    with PDFDocument(tmp_path / "codex.pdf") as document:
+        assert document.text() == "Page one\nPage two with table"
+        assert document.text() == "Page one\nPage two with table"
+        reader = document.reader
+        assert reader.pages[0].extract_calls == 1
+        assert document.stats["opens"] == 1
+        assert document.stats["reuses"] == 1
+        assert document.stats["page_text_hits"] == 2
+    assert reader.closed
+
+
+@pytest.mark.unit
+def test_text_metadata_and_tables_share_one_parse(tmp_path, fake_engines):
+    from ingest_pdfs import _extract_pdf_metadata_basic, extract_text
+    from table_extractor import extract_tables_pdfplumber
+
+    pdf_path = tmp_path / "codex.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 stub")
+    with PDFDocument(pdf_path) as document:
+        text, _, info = extract_text(pdf_path, tmp_path, cache_dirs=[], extensions=[".txt"], document=document)
+        metadata = _extract_pdf_metadata_basic(pdf_path, document=document)
+        with patch("table_extractor.PDFPLUMBER_AVAILABLE", True):
+            tables = extract_tables_pdfplumber(pdf_path, document=document)
+            tables_again = extract_tables_pdfplumber(pdf_path, document=document)
+        plumber_pdf = document.plumber
+
+    assert info["method"] == "pypdf" and text == "Page one\nPage two with table"
+    assert metadata["title"] == "Codex" and metadata["page_count"] == "2"
+    assert [t["page"] for t in tables] == [2] and tables_again == tables
+    # One pypdf parse (text + metadata) and one pdfplumber parse (both table passes)
+    assert len(_FakePDF.opened) == 2
+    assert document.stats["reuses"] == 3
+    assert plumber_pdf.closed
+
+
+class _BookPDF(_FakePDF):
+    def __init__(self, path):
+        super().__init__(path)
+        self.pages = [_FakePage(f"Page {i} of {Path(path).stem}\nline two") for i in range(57)]
+
+
+def _book_engines():
+    return patch.multiple("pdf_document", PYPDF_AVAILABLE=True, PdfReader=_BookPDF)
+
+
+def book_range_extractor(pdf_path, engine, start, stop):
+    """Runs in the spawned worker: the real extract_page_range over the fake engine."""
+    from pdf_document import extract_page_range
+
+    with _book_engines():
+        return extract_page_range(pdf_path, engine, start, stop)
+
+
+@pytest.mark.integration
+def test_page_parallel_text_matches_sequential(tmp_path):
+    pdf_path = tmp_path / "core_rulebook.pdf"
+    with _book_engines():
+        with PDFDocument(pdf_path) as document:
+            sequential = document.text()
+        with PDFDocument(pdf_path, page_workers=2, parallel_min_pages=50, chunk_pages=8,
+                         range_extractor=book_range_extractor) as document:
+            parallel = document.text()
+            assert document.stats["parallel_pages"] == 57
+            assert document.page_text(56) == "Page 56 of core_rulebook\nline two"
+        with PDFDocument(pdf_path, page_workers=2, parallel_min_pages=100) as document:
+            document.text()
+            assert document.stats["parallel_pages"] == 0  # below the threshold
+    assert parallel == sequential
+
+
+@pytest.mark.unit
+def test_analyze_pdf_without_config_extracts_entities(tmp_path, fake_engines):
+    from types import SimpleNamespace
+
+    from ingest_pdfs import analyze_pdf
+
+    pdf_path = tmp_path / "codex.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 stub")
+    extractor = SimpleNamespace(
+        is_available=lambda: True,
+        extract_entities=lambda text, gazetteer=None: {"NPCs": ["Scribe"], "Factions": [], "Locations": [], "Items": []},
+    )
+    with patch("ingest_pdfs.ENTITY_EXTRACTION_AVAILABLE", True), \
+            patch("ingest_pdfs.get_extractor", return_value=extractor, create=True) as get_extractor:
+        analysis = analyze_pdf(pdf_path, tmp_path, cache_dirs=[], extensions=[".txt"], config=None)
+
+    assert analysis["text"] == "Page one\nPage two with table"
+    assert analysis["extracted_entities"]["NPCs"] == ["Scribe"]
+    assert get_extractor.call_args.kwargs["model_name"] == "en_core_web_sm"
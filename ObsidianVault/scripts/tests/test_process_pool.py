@@ -0,0 +1,80 @@
+# PURPOSE: Tests for the recycling process pool used by process-mode PDF ingestion.
+# DEPENDENCIES: pytest, process_pool (spawned workers run the module-level job functions below).
+# MODIFICATION NOTES: Checks kill-on-timeout of a stuck job, recycling after N jobs, streamed results and that
+#   initializer time is not charged to a job; a crashed worker's result names its exit code or signal.
+
+import os
+import signal
+import time
+
+import pytest
+
+from process_pool import RecyclingProcessPool
+
+
+def pid_job(value):
+    if value == "stuck":
+        time.sleep(60)
+    if value == "boom":
+        raise ValueError("bad pdf")
+    if value == "exit":
+        os._exit(3)
+    if value == "segv":
+        os.kill(os.getpid(), signal.SIGKILL)
+    return value, os.getpid()
+
+
+@pytest.mark.integration
+def test_stuck_job_is_killed_and_others_complete():
+    jobs = [(name, (name,)) for name in ("a", "stuck", "boom", "b", "c")]
+    start = time.monotonic()
+    with RecyclingProcessPool(pid_job, workers=1, timeout=3) as pool:
+        results = {r.key: r for r in pool.map(jobs)}
+    assert time.monotonic() - start < 30
+
+    assert not results["stuck"].ok and "Timed out" in results["stuck"].error
+    assert not results["boom"].ok and "ValueError: bad pdf" in results["boom"].error
+    assert [results[k].value[0] for k in ("a", "b", "c")] == ["a", "b", "c"]
+    assert pool.stats["killed"] == 1
+    assert pool.stats["started"] == 2  # the killed worker was replaced
+
+
+@pytest.mark.integration
+def test_workers_are_recycled_after_max_jobs():
+    jobs = [(i, (i,)) for i in range(6)]
+    with RecyclingProcessPool(pid_job, workers=1, max_jobs_per_worker=2) as pool:
+        results = list(pool.map(jobs))
+    assert sorted(r.key for r in results) == list(range(6))
+    pids = [r.value[1] for r in sorted(results, key=lambda r: r.key)]
+    assert len(set(pids)) == 3 and pids[0] == pids[1] != pids[2]
+    assert pool.stats["recycled"] == 3
+
+
+def slow_init(seconds):
+    time.sleep(seconds)
+
+
+def sleep_job(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.mark.integration
+def test_initializer_time_is_not_charged_to_the_first_job():
+    # Initializer 2.5s + job 1s would exceed a 3s timeout measured from dispatch
+    jobs = [("first", (1.0,))]
+    with RecyclingProcessPool(sleep_job, workers=1, timeout=3, initializer=slow_init, initargs=(2.5,)) as pool:
+        results = list(pool.map(jobs))
+    assert results[0].ok and results[0].value == 1.0
+    assert 1.0 <= results[0].seconds < 2.5
+    assert pool.stats["killed"] == 0
+
+
+@pytest.mark.integration
+def test_crashed_worker_reports_its_exit_code_or_signal():
+    jobs = [(name, (name,)) for name in ("exit", "segv", "a")]
+    with RecyclingProcessPool(pid_job, workers=1, timeout=30) as pool:
+        results = {r.key: r for r in pool.map(jobs)}
+    assert results["exit"].error == "Worker exited with code 3"
+    assert results["segv"].error == "Worker exited with signal SIGKILL"
+    assert results["a"].ok and pool.stats["crashed"] == 2
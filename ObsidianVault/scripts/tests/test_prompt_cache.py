@@ -0,0 +1,92 @@
+# PURPOSE: Tests for shared-prefix prompt layout and provider prompt-cache statistics.
+# DEPENDENCIES: pytest, rag_pipeline, ai_summarizer, fake_llm_server (stdlib HTTP only).
+# MODIFICATION NOTES: Content pack prompts must share one byte-identical prefix; cache stats aggregate per provider.
+
+import json
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from ai_summarizer import _record_prompt_cache, get_prompt_cache_stats, reset_prompt_cache_stats
+from fake_llm_server import FakeLLMServer, FakeLLMSettings
+from rag_pipeline import _prompt_cache_delta, generate_content_pack
+
+
+@pytest.fixture(autouse=True)
+def _clean_stats():
+    reset_prompt_cache_stats()
+    yield
+    reset_prompt_cache_stats()
+
+
+@pytest.mark.unit
+def test_content_pack_prompts_share_prefix():
+    calls = []
+
+    def fake_generate(prompt, rag_config, cache_prefix=None):
+        calls.append((prompt, cache_prefix))
+        return "out"
+
+    pattern_report = {"entities": {"NPCs": ["Vex"], "Factions": ["Orks"], "Locations": ["Hive Sibellus"]}}
+    rag_config = {"generation": {"parallel": False}}
+    with patch("rag_pipeline.generate_text", side_effect=fake_generate):
+        pack = generate_content_pack("The hive burns.", pattern_report, rag_config)
+
+    assert set(pack) == {"rules", "adventure", "bios"}
+    prefixes = {prefix for _, prefix in calls}
+    assert len(prefixes) == 1
+    prefix = prefixes.pop()
+    assert "Context summary: The hive burns." in prefix
+    assert "Canonical NPCs from source: Vex" in prefix
+    # Task instructions live only in the suffix.
+    assert all("The hive burns." not in prompt for prompt, _ in calls)
+    assert len({prompt for prompt, _ in calls}) == 3
+
+
+@pytest.mark.unit
+def test_prompt_cache_stats_and_delta():
+    _record_prompt_cache("anthropic", 100, cached_tokens=0, cache_write_tokens=900)
+    before = get_prompt_cache_stats()
+    _record_prompt_cache("anthropic", 100, cached_tokens=900)
+    _record_prompt_cache("ollama", 40)
+    after = get_prompt_cache_stats()
+
+    assert after["anthropic"]["requests"] == 2
+    assert after["anthropic"]["cache_hits"] == 1
+    assert after["anthropic"]["cached_ratio"] == pytest.approx(900 / 1100, abs=1e-4)
+    delta = _prompt_cache_delta(before, after)
+    assert delta["anthropic"]["requests"] == 1
+    assert delta["anthropic"]["cached_ratio"] == pytest.approx(0.9)
+    assert delta["ollama"]["cached_tokens"] == 0
+
+
+@pytest.mark.unit
+def test_fake_server_reports_anthropic_cache_reads():
+    settings = FakeLLMSettings(latency_ms=1, tokens_per_sec=0, response_tokens=2)
+    prefix = "shared context " * 40
+
+    def call(suffix):
+        payload = {
+            "model": "claude-3-sonnet",
+            "max_tokens": 2,
+            "messages": [{"role": "user", "content": [
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": suffix},
+            ]}],
+        }
+        req = urllib.request.Request(
+            server.url + "/v1/messages",
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return json.loads(resp.read())["usage"]
+
+    with FakeLLMServer(settings=settings) as server:
+        first = call("rules")
+        second = call("bios")
+    assert first["cache_creation_input_tokens"] > 0
+    assert first["cache_read_input_tokens"] == 0
+    assert second["cache_read_input_tokens"] == first["cache_creation_input_tokens"]
@@ -298,11 +298,11 @@ def test_run_pipeline_handles_unified_schema(tmp_path):
 # CONTINUE TESTING: add end-to-end pipeline run with mocked LLM calls.
 
 
-# PURPOSE: T0.9 – test entity cache composite key: hit when same docs, miss when one doc changes.
+# PURPOSE: T0.9 – test per-document entity cache: hit when same docs, only the changed doc re-extracted.
 # DEPENDENCIES: EntityCache, extract_entities_from_docs, extract_entities_from_text.
 # MODIFICATION NOTES: Mocks extract_entities_from_text to avoid real extraction.
-def test_entity_cache_composite_hit_same_docs(tmp_path):
-    """Composite cache hit when same docs queried again."""
+def test_entity_cache_hit_same_docs(tmp_path):
+    """Per-document cache hit when same docs queried again."""
     from rag_pipeline import EntityCache, extract_entities_from_docs
 
     with patch("rag_pipeline.ENTITY_EXTRACTION_AVAILABLE", True):
@@ -316,19 +316,19 @@ def test_entity_cache_composite_hit_same_docs(tmp_path):
             result1 = extract_entities_from_docs(
                 ["doc_a", "doc_b"], text_map, rag_config, entity_cache=entity_cache
             )
-            assert mock_extract.call_count == 1
-            assert "Warboss" in result1.get("NPCs", [])
+            assert mock_extract.call_count == 2
+            assert result1["NPCs"] == ["Warboss", "Warboss"]
 
-            # Same docs: should hit composite cache, no new extraction
+            # Same docs: both hit the per-document cache, no new extraction
             result2 = extract_entities_from_docs(
                 ["doc_a", "doc_b"], text_map, rag_config, entity_cache=entity_cache
             )
-            assert mock_extract.call_count == 1, "Cache hit should not call extract again"
+            assert mock_extract.call_count == 2, "Cache hit should not call extract again"
             assert result1 == result2
 
 
-def test_entity_cache_composite_miss_when_doc_changes(tmp_path):
-    """Composite cache miss when one doc changes."""
+def test_entity_cache_miss_only_for_changed_doc(tmp_path):
+    """Changing one doc re-extracts that doc only."""
     from rag_pipeline import EntityCache, extract_entities_from_docs
 
     with patch("rag_pipeline.ENTITY_EXTRACTION_AVAILABLE", True):
@@ -340,16 +340,17 @@ def test_entity_cache_composite_miss_when_doc_changes(tmp_path):
         with patch("rag_pipeline.extract_entities_from_text") as mock_extract:
             mock_extract.return_value = {"NPCs": ["Warboss"], "Factions": ["Orks"], "Locations": [], "Items": []}
             extract_entities_from_docs(["doc_a", "doc_b"], text_map, rag_config, entity_cache=entity_cache)
-            assert mock_extract.call_count == 1
+            assert mock_extract.call_count == 2
 
-            # Change doc_b content: cache miss, new extraction
+            # Change doc_b content: only doc_b misses the cache
             text_map_changed = {"doc_a": "Orks are green.", "doc_b": "Eldar are crafty. NEW CONTENT."}
             mock_extract.return_value = {"NPCs": ["Farseer"], "Factions": ["Eldar"], "Locations": [], "Items": []}
             result = extract_entities_from_docs(
                 ["doc_a", "doc_b"], text_map_changed, rag_config, entity_cache=entity_cache
             )
-            assert mock_extract.call_count == 2, "Doc change should cause cache miss"
-            assert "Farseer" in result.get("NPCs", [])
+            assert mock_extract.call_count == 3, "Only the changed doc should be re-extracted"
+            assert mock_extract.call_args[0][0] == text_map_changed["doc_b"]
+            assert result["NPCs"] == ["Warboss", "Farseer"]
 
 
 # PURPOSE: Verify real spaCy entity extraction in RAG pipeline (no mock).
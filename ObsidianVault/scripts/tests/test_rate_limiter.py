@@ -0,0 +1,156 @@
+# PURPOSE: Tests for rate-limit-aware adaptive concurrency (hosted LLM providers).
+# DEPENDENCIES: pytest, rate_limiter module; stdlib HTTP stub emulates a rate-limited provider.
+# MODIFICATION NOTES: Covers header parsing, TPM budget, AIMD width changes and a 429-emitting stub server.
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from rate_limiter import AdaptiveConcurrencyLimiter, parse_rate_limit_headers, run_with_limiter
+
+
+@pytest.mark.unit
+def test_parse_openai_headers():
+    info = parse_rate_limit_headers({
+        "x-ratelimit-limit-requests": "500",
+        "x-ratelimit-remaining-requests": "499",
+        "x-ratelimit-reset-requests": "120ms",
+        "x-ratelimit-limit-tokens": "30000",
+        "x-ratelimit-remaining-tokens": "29000",
+        "x-ratelimit-reset-tokens": "6m0s",
+    })
+    assert info["requests_limit"] == 500
+    assert info["requests_remaining"] == 499
+    assert info["requests_reset_s"] == pytest.approx(0.12)
+    assert info["tokens_limit"] == 30000
+    assert info["tokens_reset_s"] == pytest.approx(360.0)
+    assert info["retry_after_s"] is None
+
+
+@pytest.mark.unit
+def test_parse_anthropic_headers_and_retry_after():
+    info = parse_rate_limit_headers({
+        "Anthropic-RateLimit-Tokens-Limit": "40000",
+        "anthropic-ratelimit-tokens-remaining": "0",
+        "retry-after": "3",
+    })
+    assert info["tokens_limit"] == 40000
+    assert info["tokens_remaining"] == 0
+    assert info["retry_after_s"] == 3.0
+    assert parse_rate_limit_headers({"retry-after-ms": "250"})["retry_after_s"] == 0.25
+
+
+@pytest.mark.unit
+def test_rate_limited_halves_width_and_clean_responses_grow_it():
+    limiter = AdaptiveConcurrencyLimiter(min_concurrency=1, max_concurrency=8, initial_concurrency=4)
+    slot = limiter.acquire()
+    wait = limiter.release(slot, headers={"retry-after": "0"}, rate_limited=True)
+    assert wait == 0.0
+    assert limiter.limit == 2
+    for _ in range(2):
+        limiter.release(limiter.acquire())
+    assert limiter.limit == 3
+    assert limiter.stats()["rate_limited"] == 1
+
+
+@pytest.mark.unit
+def test_tokens_per_minute_budget_blocks():
+    limiter = AdaptiveConcurrencyLimiter(tokens_per_minute=1000)
+    limiter.release(limiter.acquire(estimated_tokens=100), tokens_used=900)
+    with pytest.raises(TimeoutError):
+        limiter.acquire(estimated_tokens=200, timeout=0.1)
+    # A request that fits in the remaining budget goes through immediately.
+    limiter.release(limiter.acquire(estimated_tokens=50, timeout=0.1))
+
+
+@pytest.mark.unit
+def test_tokens_per_minute_learned_from_headers():
+    limiter = AdaptiveConcurrencyLimiter()
+    limiter.observe_headers({"x-ratelimit-limit-tokens": "5000", "x-ratelimit-remaining-tokens": "4000"})
+    assert limiter.tokens_per_minute == 5000
+
+
+class _RateLimitedStub(BaseHTTPRequestHandler):
+    """Accepts at most `capacity` concurrent requests; extra ones get 429 + Retry-After."""
+
+    capacity = 2
+    lock = threading.Lock()
+    active = 0
+    served = 0
+    rejected = 0
+
+    def do_POST(self):
+        cls = type(self)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with cls.lock:
+            if cls.active >= cls.capacity:
+                cls.rejected += 1
+                over = True
+            else:
+                cls.active += 1
+                over = False
+        if over:
+            self.send_response(429)
+            self.send_header("Retry-After", "0.05")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        try:
+            time.sleep(0.03)
+            body = json.dumps({"usage": {"total_tokens": 10}}).encode()
+            self.send_response(200)
+            self.send_header("x-ratelimit-limit-requests", "1000")
+            self.send_header("x-ratelimit-remaining-requests", "900")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+                cls.served += 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def rate_limited_stub():
+    _RateLimitedStub.active = 0
+    _RateLimitedStub.served = 0
+    _RateLimitedStub.rejected = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RateLimitedStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.integration
+def test_limiter_adapts_against_rate_limited_stub(rate_limited_stub):
+    limiter = AdaptiveConcurrencyLimiter(min_concurrency=1, max_concurrency=6, initial_concurrency=6)
+
+    def call() -> int:
+        for _ in range(20):
+            slot = limiter.acquire(estimated_tokens=10)
+            req = urllib.request.Request(rate_limited_stub, data=b"{}", method="POST")
+            try:
+                with urllib.request.urlopen(req, timeout=5) as resp:
+                    limiter.release(slot, tokens_used=10, headers=dict(resp.headers))
+                    return resp.status
+            except urllib.error.HTTPError as e:
+                wait = limiter.release(slot, headers=dict(e.headers), rate_limited=e.code == 429)
+                time.sleep(wait or 0)
+        return 0
+
+    statuses = run_with_limiter([call] * 24, limiter)
+
+    assert statuses == [200] * 24
+    stats = limiter.stats()
+    assert stats["rate_limited"] == _RateLimitedStub.rejected > 0
+    assert stats["min_limit_seen"] < 6
@@ -0,0 +1,132 @@
+# PURPOSE: Tests for the cheap table page detector (table_prefilter) and its use in table_extractor.
+# DEPENDENCIES: pytest, table_prefilter, table_extractor (pdfplumber replaced by layout fakes).
+# MODIFICATION NOTES: Ruled grids, aligned text grids, narrative and two-column pages, sidebar boxes;
+#   extractors only see candidate pages; corpus report counts skipped pages and recall.
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from table_prefilter import find_candidate_pages, is_table_candidate, page_table_signals, prefilter_report
+
+CHAR_W = 5.0
+
+
+def _row(top, segments):
+    """Chars for one text row; segments are (x, text) pairs, words separated by normal spacing."""
+    chars = []
+    for x, text in segments:
+        for ch in text:
+            chars.append({"text": ch, "x0": x, "x1": x + CHAR_W, "top": top})
+            x += CHAR_W + (1.0 if ch != " " else 0.0)
+    return chars
+
+
+def _narrative(rows=30, x=50):
+    return [c for i in range(rows) for c in _row(80 + 14 * i, [(x, "the brass codex opens at dusk and the choir")])]
+
+
+class _FakeLayoutPage:
+    def __init__(self, chars=(), lines=(), rects=(), table=False):
+        self.width, self.height = 612.0, 792.0
+        self.chars, self.lines, self.rects = list(chars), list(lines), list(rects)
+        self.table = table
+        self.extract_calls = 0
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def extract_tables(self):
+        self.extract_calls += 1
+        return [[["Roll", "Result"], ["1", "Ambush"]]] if self.table else []
+
+
+def _hline(y, x0=60, x1=400):
+    return {"x0": x0, "x1": x1, "top": y, "bottom": y}
+
+
+def _vline(x, top=100, bottom=200):
+    return {"x0": x, "x1": x, "top": top, "bottom": bottom}
+
+
+def _ruled_grid():
+    lines = [_hline(100 + 20 * i) for i in range(5)] + [_vline(60 + 85 * i, 100, 180) for i in range(5)]
+    return _FakeLayoutPage(chars=_narrative(5), lines=lines, table=True)
+
+
+def _text_grid():
+    chars = [c for i in range(6) for c in _row(100 + 14 * i, [(60, "d6"), (140, f"Result {i}"), (300, "12 gp")])]
+    return _FakeLayoutPage(chars=_narrative(10) + chars, table=True)
+
+
+def _two_column():
+    chars = [c for i in range(40) for c in _row(80 + 14 * i, [(50, "the brass codex opens"), (320, "at dusk the choir sings")])]
+    return _FakeLayoutPage(chars=chars)
+
+
+def _sidebar():
+    rects = [{"x0": 300, "x1": 560, "top": 100, "bottom": 400}]
+    return _FakeLayoutPage(chars=_narrative(), rects=rects)
+
+
+@pytest.mark.unit
+def test_detector_flags_grids_and_skips_prose():
+    assert is_table_candidate(page_table_signals(_ruled_grid()))
+    assert is_table_candidate(page_table_signals(_text_grid()))
+    for page in (_FakeLayoutPage(chars=_narrative()), _two_column(), _sidebar()):
+        assert not is_table_candidate(page_table_signals(page)), page_table_signals(page)
+
+
+@pytest.mark.unit
+def test_extractors_only_see_candidate_pages(tmp_path):
+    from table_extractor import extract_tables
+
+    pdf_path = tmp_path / "book.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 stub")
+    pages = [_FakeLayoutPage(chars=_narrative()), _ruled_grid(), _two_column(), _text_grid()]
+    document = SimpleNamespace(plumber=SimpleNamespace(pages=pages))
+
+    assert find_candidate_pages(pdf_path, document=document) == [2, 4]
+    with patch("table_extractor.PDFPLUMBER_AVAILABLE", True):
+        tables = extract_tables(pdf_path, method="pdfplumber", fallback_method=None, document=document)
+    assert [table["page"] for table in tables] == [2, 4]
+    assert [page.extract_calls for page in pages] == [0, 1, 0, 1]
+
+    with patch("table_extractor.PDFPLUMBER_AVAILABLE", True), \
+            patch("table_extractor.CAMELOT_AVAILABLE", True), \
+            patch("table_extractor.extract_tables_camelot", return_value=[]) as camelot:
+        extract_tables(pdf_path, method="camelot", fallback_method=None, document=document)
+    assert camelot.call_args.kwargs["pages"] == [2, 4]
+
+
+@pytest.mark.unit
+def test_skipped_pages_laid_out_by_the_detector_are_released(tmp_path):
+    pages = [_FakeLayoutPage(chars=_narrative()), _ruled_grid(), _two_column(), _sidebar()]
+    document = SimpleNamespace(plumber=SimpleNamespace(pages=pages), layout_parsed=lambda index: index == 2)
+
+    assert find_candidate_pages(tmp_path / "book.pdf", document=document) == [2]
+    # Page 2 keeps its layout for the extractors; page 3 was laid out for text and stays with the document
+    assert [page.closed for page in pages] == [True, False, False, True]
+
+
+@pytest.mark.unit
+def test_prefilter_report_counts_skipped_pages_and_recall(tmp_path):
+    missed = _FakeLayoutPage(chars=_narrative(), table=True)  # table the detector cannot see
+    pages = [_FakeLayoutPage(chars=_narrative()) for _ in range(6)] + [_ruled_grid(), _text_grid(), missed]
+
+    class _FakePDF(SimpleNamespace):
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return None
+
+    with patch("table_prefilter.PDFPLUMBER_AVAILABLE", True), \
+            patch("table_prefilter.pdfplumber", SimpleNamespace(open=lambda path: _FakePDF(pages=pages))):
+        report = prefilter_report([tmp_path / "book.pdf"])
+    assert report["pages"] == 9 and report["candidate_pages"] == 2 and report["skipped_pages"] == 7
+    assert report["table_pages"] == 3 and report["table_pages_found"] == 2
+    assert report["recall"] == pytest.approx(2 / 3)
+    assert report["missed"] == [["book.pdf", 9]]
@@ -0,0 +1,98 @@
+# PURPOSE: Tests for the flat memmap vector backend (vector_store.FlatVectorStore) and ChromaRetriever backend switch.
+# DEPENDENCIES: pytest, numpy (tests skip if not installed), vector_store, chroma_retriever.
+# MODIFICATION NOTES: Exact top-k vs brute force, tag prefilter, delete/row reuse, persistence across reopen.
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vector_store import FlatVectorStore  # noqa: E402
+
+
+def _unit(rng, n, dim=8):
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+@pytest.mark.unit
+def test_query_matches_brute_force_with_prefilter(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = _unit(rng, 200)
+    ids = [f"c{i}" for i in range(200)]
+    metas = [{"doc_key": ids[i], "system": "W&G" if i % 3 else "D&D"} for i in range(200)]
+    store = FlatVectorStore(tmp_path / "flat")
+    for start in range(0, 200, 64):  # several upserts force memmap growth past the first allocation
+        store.upsert(ids[start:start + 64], vectors[start:start + 64].tolist(), ids[start:start + 64], metas[start:start + 64])
+
+    q = _unit(rng, 1)[0]
+    res = store.query(query_embeddings=[q.tolist()], n_results=5, where={"system": "D&D"})
+
+    candidates = [i for i in range(200) if metas[i]["system"] == "D&D"]
+    expected = sorted(candidates, key=lambda i: -float(vectors[i] @ q))[:5]
+    assert res["ids"][0] == [ids[i] for i in expected]
+    assert all(m["system"] == "D&D" for m in res["metadatas"][0])
+    assert res["distances"][0] == sorted(res["distances"][0])
+    assert res["distances"][0][0] == pytest.approx(1.0 - float(vectors[expected[0]] @ q), abs=1e-5)
+
+
+@pytest.mark.unit
+def test_delete_reuses_rows_and_persists(tmp_path):
+    store = FlatVectorStore(tmp_path / "flat")
+    store.upsert(["a", "b", "c"], [[1, 0], [0, 1], [1, 1]], ["A", "B", "C"], [{"doc_key": "x"}, {"doc_key": "y"}, {"doc_key": "x"}])
+    store.delete(where={"doc_key": {"$in": ["x"]}})
+    assert store.count() == 1
+    store.upsert(["d"], [[1, 0.1]], ["D"], [{"doc_key": "z"}])
+    store.update(["b"], [{"doc_key": "y", "tone": "grim"}])
+    store.close()
+
+    reopened = FlatVectorStore(tmp_path / "flat")
+    got = reopened.get(include=["metadatas", "documents", "embeddings"])
+    assert sorted(got["ids"]) == ["b", "d"]
+    assert reopened._next_row == 3  # "d" took a freed row instead of growing
+    assert reopened.query([[1, 0]], n_results=1)["ids"][0] == ["d"]
+    assert reopened.get(ids=["b"])["metadatas"][0]["tone"] == "grim"
+
+
+@pytest.mark.unit
+def test_chroma_retriever_flat_backend(tmp_path):
+    from chroma_retriever import ChromaRetriever
+    from tests.test_chroma_retriever import _FakeModel
+
+    retriever = ChromaRetriever(tmp_path / "persist", collection_name="flat_test", backend="flat")
+    retriever._model = _FakeModel()
+    retriever.build_index(
+        {"doc_wg_1": "Wrath and Glory rules.", "[PDF] dragon_rules": "Dragon rules for D&D."},
+        {"chroma": {"chunk_size": 5000}},
+        {},
+    )
+    assert retriever.count() == 2
+    strict = retriever.retrieve("wrath", top_k=5, retrieval_mode="Strict Canon", tag_filters={"system": "W&G"})
+    assert [r["source"] for r in strict] == ["doc_wg_1"]
+    # A second sync is a no-op thanks to stored content hashes.
+    retriever._model.encoded.clear()
+    retriever.build_index({"doc_wg_1": "Wrath and Glory rules.", "[PDF] dragon_rules": "Dragon rules for D&D."}, {"chroma": {}}, {})
+    assert retriever._model.encoded == []
+
+
+@pytest.mark.unit
+def test_blockwise_scoring_matches_brute_force(tmp_path, monkeypatch):
+    import vector_store
+
+    monkeypatch.setattr(vector_store, "_QUERY_BLOCK_ROWS", 7)  # many blocks, a ragged last one
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((50, 8)).astype(np.float32) * rng.uniform(0.5, 3.0, (50, 1)).astype(np.float32)
+    ids = [f"c{i}" for i in range(50)]
+    store = FlatVectorStore(tmp_path / "flat")
+    systems = ["W&G" if n % 2 else ("GURPS" if n % 10 == 0 else "D&D") for n in range(50)]
+    store.upsert(ids, vectors.tolist(), ids, [{"doc_key": i, "system": systems[n]} for n, i in enumerate(ids)])
+
+    queries = rng.standard_normal((3, 8)).astype(np.float32)
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    for system in ("W&G", "GURPS"):  # dense candidates (memmap slice) and sparse ones (row gather)
+        res = store.query(query_embeddings=queries.tolist(), n_results=4, where={"system": system})
+        candidates = [i for i in range(50) if systems[i] == system]
+        for qi, q in enumerate(queries):
+            sims = unit @ (q / np.linalg.norm(q))
+            expected = sorted(candidates, key=lambda i: -float(sims[i]))[:4]
+            assert res["ids"][qi] == [ids[i] for i in expected]
+            assert res["distances"][qi] == pytest.approx([1.0 - float(sims[i]) for i in expected], abs=1e-5)
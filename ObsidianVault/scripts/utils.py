@@ -4,9 +4,10 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 from urllib.parse import unquote
 
 
@@ -275,6 +276,47 @@ def validate_file_size(file_path: Path, max_size_mb: int = 100) -> None:
         )
 
 
+# PURPOSE: Cheap content fingerprint of a large file.
+# DEPENDENCIES: hashlib.
+# MODIFICATION NOTES: Hashes the size plus fixed-size samples (head, tail, evenly spaced middle blocks), so cost
+#   is constant in file size. Not collision-proof: callers that must be exact confirm with a full hash.
+def sampled_file_hash(file_path: Path, sample_bytes: int = 65536, middle_samples: int = 4,
+                      size: Optional[int] = None) -> str:
+    """
+    Hash the file size and a few sampled blocks of a file.
+
+    Args:
+        file_path: File to fingerprint.
+        sample_bytes: Bytes read per sample.
+        middle_samples: Evenly spaced samples between head and tail.
+        size: File size if already known (saves a stat).
+
+    Returns:
+        Hex digest (blake2b, 128-bit). Files up to (middle_samples + 2) * sample_bytes are hashed whole.
+    """
+    if size is None:
+        size = file_path.stat().st_size
+    digest = hashlib.blake2b(str(size).encode("ascii"), digest_size=16)
+    with open(file_path, "rb") as handle:
+        if size <= (middle_samples + 2) * sample_bytes:
+            digest.update(handle.read())
+        else:
+            step = (size - sample_bytes) / (middle_samples + 1)
+            for index in range(middle_samples + 2):
+                handle.seek(int(index * step))
+                digest.update(handle.read(sample_bytes))
+    return digest.hexdigest()
+
+
+def full_file_hash(file_path: Path, chunk_bytes: int = 1 << 20) -> str:
+    """Hash the whole file (blake2b, 128-bit), read in chunks; the exact check behind sampled_file_hash."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 # PURPOSE: Sanitize directory name from config to prevent path traversal.
 # DEPENDENCIES: pathlib.Path.
 # MODIFICATION NOTES: Removes dangerous path components.
@@ -0,0 +1,359 @@
+# PURPOSE: Flat (exact) vector backend for ChromaRetriever: NumPy memmap vectors + SQLite metadata side table.
+# DEPENDENCIES: numpy (optional; FLAT_STORE_AVAILABLE), stdlib sqlite3/json.
+# MODIFICATION NOTES: Implements the subset of the chromadb Collection API that ChromaRetriever uses
+#   (count/get/upsert/update/delete/query) so backends are swappable via chroma.backend.
+#   Exact cosine top-k over rows pre-filtered by metadata (where) in SQL. Only the candidate rows are
+#   scored, block by block straight from the memmap; just the per-row inverse norms are kept in memory.
+#   No approximate (IVF) index: every query is an exact scan of its candidate rows.
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    FLAT_STORE_AVAILABLE = True
+except ImportError:
+    np = None
+    FLAT_STORE_AVAILABLE = False
+
+# Rows allocated when the memmap is first created / grown (doubles after this)
+_INITIAL_CAPACITY = 1024
+# Rows per SQL IN (...) lookup
+_SQL_BATCH = 500
+# Distinct where filters whose matching rows are kept in memory between writes
+_FILTER_CACHE_SIZE = 32
+# Candidate rows read from the memmap and scored per block during query
+_QUERY_BLOCK_ROWS = 16384
+
+
+def _where_sql(where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """
+    Translate a Chroma-style where filter into SQL over the metadata JSON column.
+    Supports {key: value}, {key: {"$eq"|"$ne"|"$in"|"$nin": ...}}, {"$and": [...]}, {"$or": [...]}.
+    """
+    if not where:
+        return "", []
+    clauses: List[str] = []
+    params: List[Any] = []
+    for key, cond in where.items():
+        if key in ("$and", "$or"):
+            parts = [_where_sql(sub) for sub in cond]
+            parts = [(sql, p) for sql, p in parts if sql]
+            if parts:
+                joiner = " AND " if key == "$and" else " OR "
+                clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")")
+                for _, p in parts:
+                    params.extend(p)
+            continue
+        column = "json_extract(metadata, ?)"
+        path = f'$."{key}"'
+        if isinstance(cond, dict):
+            (op, value), = cond.items()
+            if op in ("$in", "$nin"):
+                values = list(value)
+                if not values:
+                    clauses.append("0" if op == "$in" else "1")
+                    continue
+                neg = "NOT " if op == "$nin" else ""
+                clauses.append(f"{column} {neg}IN ({','.join('?' * len(values))})")
+                params.extend([path, *values])
+            elif op in ("$eq", "$ne"):
+                clauses.append(f"{column} {'=' if op == '$eq' else '!='} ?")
+                params.extend([path, value])
+            else:
+                raise ValueError(f"Unsupported where operator: {op}")
+        else:
+            clauses.append(f"{column} = ?")
+            params.extend([path, cond])
+    return " AND ".join(clauses), params
+
+
+class FlatVectorStore:
+    """
+    Exact-search vector store: float32 vectors in a growable memmap, ids/documents/metadata in SQLite.
+    Chroma-compatible method names and return shapes; distances are cosine distances (1 - cosine).
+    """
+
+    def __init__(self, path: Path):
+        if not FLAT_STORE_AVAILABLE:
+            raise ImportError("numpy is required for the flat vector backend")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path / "metadata.sqlite"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " id TEXT PRIMARY KEY, row INTEGER NOT NULL UNIQUE, document TEXT, metadata TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS free_rows (row INTEGER PRIMARY KEY)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.commit()
+        state = dict(self._conn.execute("SELECT key, value FROM state").fetchall())
+        self._dim: Optional[int] = state.get("dim")
+        self._capacity: int = state.get("capacity", 0)
+        self._next_row: int = state.get("next_row", 0)
+        self._vectors = None
+        self._active_rows = None
+        self._inv_norms = None
+        self._filter_rows: Dict[str, Any] = {}
+        if self._dim:
+            self._open_memmap()
+
+    # ---- storage ----------------------------------------------------------
+
+    def _vectors_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    def _open_memmap(self) -> None:
+        self._vectors = np.memmap(self._vectors_path(), dtype=np.float32, mode="r+", shape=(self._capacity, self._dim))
+
+    def _save_state(self) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            [("dim", self._dim), ("capacity", self._capacity), ("next_row", self._next_row)],
+        )
+
+    def _ensure_capacity(self, rows_needed: int, dim: int) -> None:
+        if self._dim is None:
+            self._dim = dim
+        elif dim != self._dim:
+            raise ValueError(f"Embedding dimension {dim} does not match store dimension {self._dim}")
+        if rows_needed <= self._capacity:
+            return
+        new_capacity = max(_INITIAL_CAPACITY, self._capacity)
+        while new_capacity < rows_needed:
+            new_capacity *= 2
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path(), "ab") as handle:
+            handle.truncate(new_capacity * self._dim * 4)
+        self._capacity = new_capacity
+        self._open_memmap()
+
+    def _allocate_rows(self, count: int) -> List[int]:
+        free = [r for (r,) in self._conn.execute("SELECT row FROM free_rows ORDER BY row LIMIT ?", (count,))]
+        if free:
+            self._conn.executemany("DELETE FROM free_rows WHERE row = ?", [(r,) for r in free])
+        rows = free + list(range(self._next_row, self._next_row + count - len(free)))
+        self._next_row += count - len(free)
+        return rows
+
+    def _rows_for_ids(self, ids: Sequence[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        for start in range(0, len(ids), _SQL_BATCH):
+            part = list(ids[start:start + _SQL_BATCH])
+            placeholders = ",".join("?" * len(part))
+            for item_id, row in self._conn.execute(f"SELECT id, row FROM items WHERE id IN ({placeholders})", part):
+                found[item_id] = row
+        return found
+
+    # ---- Chroma Collection API subset -----------------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Optional[Sequence[str]] = None,
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> None:
+        if not ids:
+            return
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [{}] * len(ids)
+        with self._lock:
+            existing = self._rows_for_ids(ids)
+            new_ids = [i for i in dict.fromkeys(ids) if i not in existing]
+            new_rows = dict(zip(new_ids, self._allocate_rows(len(new_ids))))
+            rows = [existing.get(i, new_rows.get(i)) for i in ids]
+            self._ensure_capacity(max(rows) + 1, matrix.shape[1])
+            self._vectors[rows] = matrix
+            self._vectors.flush()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO items (id, row, document, metadata) VALUES (?, ?, ?, ?)",
+                [(i, r, d, json.dumps(m or {})) for i, r, d, m in zip(ids, rows, documents, metadatas)],
+            )
+            self._save_state()
+            self._conn.commit()
+            self._invalidate()
+
+    add = upsert
+
+    def update(self, ids: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE items SET metadata = ? WHERE id = ?",
+                [(json.dumps(m or {}), i) for i, m in zip(ids, metadatas)],
+            )
+            self._conn.commit()
+            self._filter_rows.clear()
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            sql, params = _where_sql(where)
+            if ids is not None:
+                rows_by_id = self._rows_for_ids(list(ids))
+                if sql:
+                    keep = {r for (r,) in self._conn.execute(f"SELECT row FROM items WHERE {sql}", params)}
+                    rows_by_id = {i: r for i, r in rows_by_id.items() if r in keep}
+                rows = list(rows_by_id.values())
+            elif sql:
+                rows = [r for (r,) in self._conn.execute(f"SELECT row FROM items WHERE {sql}", params)]
+            else:
+                rows = [r for (r,) in self._conn.execute("SELECT row FROM items")]
+            if not rows:
+                return
+            self._conn.executemany("DELETE FROM items WHERE row = ?", [(r,) for r in rows])
+            self._conn.executemany("INSERT OR IGNORE INTO free_rows (row) VALUES (?)", [(r,) for r in rows])
+            self._conn.commit()
+            self._vectors[rows] = 0.0
+            self._invalidate()
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        include = include or ["metadatas", "documents"]
+        sql, params = _where_sql(where)
+        conditions = [sql] if sql else []
+        if ids is not None:
+            ids = list(ids)
+            if not ids:
+                return {"ids": [], "metadatas": [], "documents": [], "embeddings": None}
+            conditions.append(f"id IN ({','.join('?' * len(ids))})")
+            params = params + ids
+        query = "SELECT id, row, document, metadata FROM items"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY row"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params = params + [int(limit), int(offset)]
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            embeddings = None
+            if "embeddings" in include:
+                embeddings = self._vectors[[r for _, r, _, _ in rows]].tolist() if rows else []
+        return {
+            "ids": [r[0] for r in rows],
+            "metadatas": [json.loads(r[3]) for r in rows] if "metadatas" in include else None,
+            "documents": [r[2] for r in rows] if "documents" in include else None,
+            "embeddings": embeddings,
+        }
+
+    def _invalidate(self) -> None:
+        self._active_rows = None
+        self._inv_norms = None
+        self._filter_rows.clear()
+
+    def _candidate_rows(self, where: Optional[Dict[str, Any]]):
+        """Rows matching where (cached per filter until the next write)."""
+        sql, params = _where_sql(where)
+        if not sql:
+            if self._active_rows is None:
+                self._active_rows = np.fromiter(
+                    (r for (r,) in self._conn.execute("SELECT row FROM items ORDER BY row")), dtype=np.int64
+                )
+            return self._active_rows
+        key = json.dumps(where, sort_keys=True)
+        rows = self._filter_rows.get(key)
+        if rows is None:
+            rows = np.fromiter(
+                (r for (r,) in self._conn.execute(f"SELECT row FROM items WHERE {sql} ORDER BY row", params)),
+                dtype=np.int64,
+            )
+            if len(self._filter_rows) >= _FILTER_CACHE_SIZE:
+                self._filter_rows.pop(next(iter(self._filter_rows)))
+            self._filter_rows[key] = rows
+        return rows
+
+    def _inverse_norms(self):
+        """1 / L2 norm of rows [0, next_row), computed block by block (free rows map to 1.0)."""
+        if self._inv_norms is None:
+            inv = np.empty(self._next_row, dtype=np.float32)
+            for start in range(0, self._next_row, _QUERY_BLOCK_ROWS):
+                stop = min(start + _QUERY_BLOCK_ROWS, self._next_row)
+                block = np.asarray(self._vectors[start:stop], dtype=np.float32)
+                norms = np.linalg.norm(block, axis=1)
+                norms[norms == 0] = 1.0
+                inv[start:stop] = 1.0 / norms
+            self._inv_norms = inv
+        return self._inv_norms
+
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """Exact cosine top-k for each query vector over rows matching `where` (Chroma result shape)."""
+        include = include or ["documents", "metadatas", "distances"]
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        out: Dict[str, List[List[Any]]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        with self._lock:
+            rows = self._candidate_rows(where)
+            if self._vectors is None or rows.size == 0:
+                for key in out:
+                    out[key] = [[] for _ in range(len(queries))]
+                return out
+            inv_norms = self._inverse_norms()
+            q_norms = np.linalg.norm(queries, axis=1)
+            q_norms[q_norms == 0] = 1.0
+            # Score only the prefiltered candidates, one block of memmap rows at a time.
+            all_sims = np.empty((rows.size, len(queries)), dtype=np.float32)
+            for start in range(0, rows.size, _QUERY_BLOCK_ROWS):
+                block_rows = rows[start:start + _QUERY_BLOCK_ROWS]
+                first, last = int(block_rows[0]), int(block_rows[-1])
+                if last - first + 1 <= 2 * block_rows.size:
+                    # Dense candidates (rows are sorted): score the memmap slice and pick them out; a slice
+                    # needs no gather copy, and at most as many extra rows as candidates are scored.
+                    span_sims = self._vectors[first:last + 1] @ queries.T
+                    block_sims = span_sims[block_rows - first]
+                else:
+                    block_sims = np.asarray(self._vectors[block_rows], dtype=np.float32) @ queries.T
+                all_sims[start:start + block_rows.size] = block_sims * inv_norms[block_rows, None]
+            all_sims /= q_norms
+            k = min(n_results, rows.size)
+            for qi in range(len(queries)):
+                sims = all_sims[:, qi]
+                top = np.argpartition(-sims, k - 1)[:k] if k < sims.size else np.arange(sims.size)
+                top = top[np.argsort(-sims[top], kind="stable")]
+                top_rows = rows[top].tolist()
+                placeholders = ",".join("?" * len(top_rows))
+                by_row = {
+                    r: (i, d, m)
+                    for i, r, d, m in self._conn.execute(
+                        f"SELECT id, row, document, metadata FROM items WHERE row IN ({placeholders})", top_rows
+                    )
+                }
+                out["ids"].append([by_row[r][0] for r in top_rows])
+                out["documents"].append([by_row[r][1] for r in top_rows])
+                out["metadatas"].append([json.loads(by_row[r][2]) for r in top_rows])
+                out["distances"].append([float(1.0 - s) for s in sims[top]])
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._conn.close()
@@ -12,8 +12,8 @@ import sys
 import time
 from pathlib import Path
 from queue import Queue
-from threading import Event, Thread
-from typing import Dict, Optional
+from threading import Event, Lock, Thread
+from typing import Dict, Iterable, Optional
 
 try:
     from watchdog.events import FileSystemEventHandler
@@ -40,8 +40,14 @@ except ImportError:
         print("ERROR: watchdog library not installed. Install with: pip install watchdog", file=sys.stderr)
         sys.exit(1)
 
+from crossref_resolver import DEFAULT_BACKFILL_INTERVAL_SECONDS, CrossrefResolver, start_backfill_thread
 from utils import get_config_path, load_config, validate_vault_path
 
+try:
+    from ollama_warmup import start_warmup_from_config
+except ImportError:
+    start_warmup_from_config = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -129,7 +135,8 @@ class PdfEventHandler(FileSystemEventHandler):
 
 # PURPOSE: Process queued PDFs by calling ingestion script.
 # DEPENDENCIES: ingest_pdfs.py script, config.
-# MODIFICATION NOTES: Runs ingestion for queued PDFs with rate limiting.
+# MODIFICATION NOTES: Runs ingestion for queued PDFs with rate limiting. PDFs passed to request_reingest
+#   are dropped from the ingest manifest (--invalidate) on the next run so their notes are rewritten.
 class PdfProcessor(Thread):
     def __init__(
         self,
@@ -138,6 +145,7 @@ class PdfProcessor(Thread):
         config_path: Path,
         process_interval: float = 5.0,
         stop_event: Optional[Event] = None,
+        warmup_manager=None,
     ):
         super().__init__(daemon=True)
         self.pdf_queue = pdf_queue
@@ -146,6 +154,17 @@ class PdfProcessor(Thread):
         self.process_interval = process_interval
         self.stop_event = stop_event or Event()
         self.processing = False
+        self.warmup_manager = warmup_manager
+        self._reingest: set = set()
+        self._reingest_lock = Lock()
+
+    def request_reingest(self, pdf_paths: Iterable[str]) -> None:
+        """Re-ingest PDFs whose notes are out of date (e.g. Crossref metadata arrived) on the next cycle."""
+        pdf_paths = list(pdf_paths)
+        with self._reingest_lock:
+            self._reingest.update(pdf_paths)
+        for pdf_path in pdf_paths:
+            self.pdf_queue.put(Path(pdf_path))
 
     def run(self):
         """Process queued PDFs periodically."""
@@ -164,7 +183,11 @@ class PdfProcessor(Thread):
                 
                 if queued_pdfs:
                     logger.info(f"Processing {len(queued_pdfs)} queued PDF(s)")
-                    self._process_pdfs(queued_pdfs)
+                    if self.warmup_manager is not None:
+                        with self.warmup_manager.work():
+                            self._process_pdfs(queued_pdfs)
+                    else:
+                        self._process_pdfs(queued_pdfs)
                 
                 # Wait for next processing cycle
                 self.stop_event.wait(self.process_interval)
@@ -182,6 +205,8 @@ class PdfProcessor(Thread):
             return
         
         self.processing = True
+        with self._reingest_lock:
+            reingest, self._reingest = sorted(self._reingest), set()
         try:
             # Run ingestion script (it will process all PDFs in directory)
             # For now, we trigger full ingestion; could be optimized to process specific PDFs
@@ -191,6 +216,8 @@ class PdfProcessor(Thread):
                 "--config",
                 str(self.config_path),
             ]
+            for pdf_path in reingest:
+                cmd += ["--invalidate", pdf_path]
             
             logger.info(f"Executing ingestion: {' '.join(cmd)}")
             result = subprocess.run(
@@ -202,6 +229,7 @@ class PdfProcessor(Thread):
             
             if result.returncode == 0:
                 logger.info(f"Successfully processed {len(pdf_paths)} PDF(s)")
+                reingest = []
             else:
                 logger.error(
                     f"Ingestion failed (exit code {result.returncode}): "
@@ -213,6 +241,9 @@ class PdfProcessor(Thread):
         except Exception as e:
             logger.error(f"Error running ingestion: {e}", exc_info=True)
         finally:
+            if reingest:
+                with self._reingest_lock:
+                    self._reingest.update(reingest)  # retried with the next batch
             self.processing = False
 
 
@@ -256,6 +287,14 @@ def run_watcher(config: Dict[str, object], debounce_seconds: float = 2.0, proces
     observer = Observer()
     observer.schedule(event_handler, str(pdf_root), recursive=True)
     
+    # Preload Ollama models; keep_alive is refreshed while PDFs are queued or processing
+    warmup_manager = None
+    if start_warmup_from_config is not None:
+        warmup_manager = start_warmup_from_config(
+            config,
+            has_pending=lambda: not pdf_queue.empty() or bool(event_handler.pending_pdfs),
+        )
+    
     # Create processor thread
     stop_event = Event()
     processor = PdfProcessor(
@@ -264,8 +303,22 @@ def run_watcher(config: Dict[str, object], debounce_seconds: float = 2.0, proces
         config_path,
         process_interval=process_interval,
         stop_event=stop_event,
+        warmup_manager=warmup_manager,
     )
     
+    # Crossref lookups that failed or timed out during ingest are retried in the background; PDFs that
+    # gain metadata are re-ingested so their notes pick it up
+    crossref_resolver = CrossrefResolver.from_config(config, vault_root)
+    if crossref_resolver is not None and not crossref_resolver.offline:
+        start_backfill_thread(
+            crossref_resolver,
+            interval_seconds=float(
+                (config.get("crossref") or {}).get("backfill_interval_seconds", DEFAULT_BACKFILL_INTERVAL_SECONDS)
+            ),
+            stop_event=stop_event,
+            on_backfill=lambda summary: processor.request_reingest(summary["sources"]),
+        )
+
     # Start observer and processor
     observer.start()
     processor.start()
@@ -283,6 +336,9 @@ def run_watcher(config: Dict[str, object], debounce_seconds: float = 2.0, proces
         observer.stop()
         observer.join(timeout=5)
         processor.join(timeout=10)
+        if warmup_manager is not None:
+            logger.info(f"Ollama cold/warm stats: {warmup_manager.stats()}")
+            warmup_manager.stop()
         logger.info("PDF watcher stopped")
 
 
@@ -29,6 +29,10 @@ except ImportError:
 if WEB_API_AVAILABLE:
     from utils import load_config, get_config_path, validate_vault_path
     from ingest_pdfs import ingest_pdfs
+    try:
+        from ollama_warmup import start_warmup_from_config
+    except ImportError:
+        start_warmup_from_config = None
     try:
         from rag_pipeline import run_pipeline, answer_query, analyze_patterns
         RAG_PIPELINE_AVAILABLE = True
@@ -92,6 +96,7 @@ class HealthResponse(BaseModel):
     """Response model for health check."""
     status: str = Field(..., description="Service status")
     version: str = Field(..., description="API version")
+    ollama_warmup: Optional[Dict[str, Any]] = Field(None, description="Per-model Ollama cold/warm latency stats")
 
 
 # PURPOSE: Request model for RAG query endpoint.
@@ -164,6 +169,15 @@ class JobQueue:
     def __init__(self):
         self.jobs: Dict[str, Job] = {}
         self.lock = threading.Lock()
+        self.warmup_manager = None
+    
+    def has_pending(self) -> bool:
+        """Return True if any job is queued or processing (used to keep Ollama models warm)."""
+        with self.lock:
+            return any(
+                job.status in (JobStatus.PENDING, JobStatus.PROCESSING)
+                for job in self.jobs.values()
+            )
     
     def create_job(self, pdf_path: str, overwrite: bool, config: dict) -> str:
         """Create a new job and return job ID."""
@@ -373,11 +387,20 @@ def create_app(config_path: Optional[Path] = None) -> Optional[FastAPI]:
         logger.warning(f"Failed to load config for CORS setup: {e}")
         config = {}
     
+    # Preload Ollama models so the first RAG request does not pay the model load
+    if config and start_warmup_from_config is not None:
+        job_queue.warmup_manager = start_warmup_from_config(config, has_pending=job_queue.has_pending)
+    
     # Health check endpoint
     @app.get("/api/health", response_model=HealthResponse, tags=["System"])
     async def health_check():
         """Health check endpoint."""
-        return HealthResponse(status="healthy", version="1.0.0")
+        warmup = job_queue.warmup_manager
+        return HealthResponse(
+            status="healthy",
+            version="1.0.0",
+            ollama_warmup=warmup.stats() if warmup is not None else None,
+        )
     
     # Configuration endpoints
     @app.get("/api/config", response_model=ConfigResponse, tags=["Configuration"])
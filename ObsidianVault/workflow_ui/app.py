@@ -8,12 +8,15 @@ import json
 import os
 import re
 import sys
+import threading
+import time
 import traceback
 import urllib.error
 import urllib.request
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import yaml
 from flask import Flask, jsonify, redirect, render_template, request, send_from_directory
@@ -633,7 +636,8 @@ def api_run_stage1():
             yaml.dump(td_data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
         return jsonify({"status": "success", "path": str(td_path), "fake": True})
     try:
-        res = run_stage_1(storyboard_path.resolve(), arc_id, output_dir.resolve(), body.get("storyboard_ref"))
+        with _ollama_work():
+            res = run_stage_1(storyboard_path.resolve(), arc_id, output_dir.resolve(), body.get("storyboard_ref"))
         return jsonify(res)
     except Exception as e:
         _log_workflow_error("api_run_stage1", e, {"arc_id": arc_id})
@@ -666,7 +670,8 @@ def api_run_stage2():
         draft_path.write_text("# Test Encounter\n\n## Setup\nFake S2 output.\n", encoding="utf-8")
         return jsonify({"status": "success", "written": 1, "encounters": 1, "opportunities": 0, "fake": True})
     try:
-        res = run_stage_2(td_path.resolve(), storyboard_path.resolve(), arc_id, config_path.resolve(), output_dir)
+        with _ollama_work():
+            res = run_stage_2(td_path.resolve(), storyboard_path.resolve(), arc_id, config_path.resolve(), output_dir)
         return jsonify(res)
     except Exception as e:
         _log_workflow_error("api_run_stage2", e, {"arc_id": arc_id})
@@ -705,7 +710,8 @@ def api_run_stage4():
         from scripts.rag_pipeline import load_pipeline_config
         cfg = load_pipeline_config(Path(body.get("config_path") or str(CONFIG_PATH)))
         rag_config = cfg["rag"]
-        res = refine_encounter(draft_path.resolve(), feedback_path.resolve(), rag_config)
+        with _ollama_work():
+            res = refine_encounter(draft_path.resolve(), feedback_path.resolve(), rag_config)
         return jsonify(res)
     except Exception as e:
         _log_workflow_error("api_refine_encounter", e)
@@ -992,6 +998,89 @@ def api_workbench_create_module():
 
 OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434").rstrip("/")
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama2")
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# Models stay resident while the UI was used within this many seconds (keep_alive refresh keeps firing)
+OLLAMA_ACTIVE_SECONDS = float(os.environ.get("OLLAMA_ACTIVE_SECONDS", "900"))
+_ollama_warmup = None
+_ollama_last_activity = 0.0
+_ollama_activity_lock = threading.Lock()
+
+
+def _ollama_recently_active() -> bool:
+    """has_pending hook for the warm-up manager: an LLM-backed request ran within OLLAMA_ACTIVE_SECONDS."""
+    with _ollama_activity_lock:
+        last = _ollama_last_activity
+    return bool(last) and time.monotonic() - last < OLLAMA_ACTIVE_SECONDS
+
+
+def _touch_ollama_activity() -> None:
+    global _ollama_last_activity
+    with _ollama_activity_lock:
+        _ollama_last_activity = time.monotonic()
+
+
+@contextmanager
+def _ollama_work() -> Iterator[None]:
+    """Wrap an LLM-backed request: marks UI activity and keeps models warm while it runs."""
+    _touch_ollama_activity()
+    try:
+        if _ollama_warmup is not None:
+            with _ollama_warmup.work():
+                yield
+        else:
+            yield
+    finally:
+        _touch_ollama_activity()
+
+
+def _start_ollama_warmup() -> None:
+    """
+    Preload the workbench chat model and the Ollama models in CONFIG_PATH (RAG generation/summarization, used by
+    the storyboard stages). keep_alive is refreshed while requests run and for OLLAMA_ACTIVE_SECONDS after the last
+    one. Opt out with OLLAMA_WARMUP=0 or ollama_warmup.enabled=false.
+
+    The manager is registered as the active one in the top-level ollama_warmup module (the one ai_summarizer
+    imports), so storyboard and RAG calls record cold/warm latency too.
+    """
+    global _ollama_warmup
+    if os.environ.get("OLLAMA_WARMUP", "1").strip().lower() in ("0", "false", "no"):
+        return
+    try:
+        from ollama_warmup import models_from_config, start_warmup_from_config
+    except ImportError:
+        return
+    config: Dict[str, Any] = {}
+    try:
+        config = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    warm_cfg = dict(config.get("ollama_warmup") or {})
+    if not warm_cfg.get("enabled", True):
+        return
+    # The chat model plus the config's Ollama models, on the UI's Ollama endpoint
+    warm_cfg.update(
+        models=[OLLAMA_MODEL] + models_from_config(config), endpoint=OLLAMA_URL, keep_alive=OLLAMA_KEEP_ALIVE
+    )
+    _ollama_warmup = start_warmup_from_config(
+        {**config, "ollama_warmup": warm_cfg}, has_pending=_ollama_recently_active
+    )
+
+
+_ollama_warmup_started = False
+_ollama_warmup_lock = threading.Lock()
+
+
+@app.before_request
+def _start_ollama_warmup_once() -> None:
+    """Start warm-up on the first request of each serving process (flask run, WSGI, the debug reloader's child)."""
+    global _ollama_warmup_started
+    if _ollama_warmup_started or app.testing:
+        return
+    with _ollama_warmup_lock:
+        if _ollama_warmup_started:
+            return
+        _ollama_warmup_started = True
+    _start_ollama_warmup()
 
 
 @app.route("/api/workbench/chat", methods=["POST"])
@@ -1036,12 +1125,22 @@ def api_workbench_chat():
             pass
         req = urllib.request.Request(
             OLLAMA_URL + "/api/generate",
-            data=json.dumps({"model": OLLAMA_MODEL, "prompt": prompt, "stream": False}).encode(),
+            data=json.dumps({
+                "model": OLLAMA_MODEL,
+                "prompt": prompt,
+                "stream": False,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+            }).encode(),
             headers={"Content-Type": "application/json"},
             method="POST",
         )
-        with urllib.request.urlopen(req, timeout=60) as r:
-            data = json.loads(r.read().decode())
+        with _ollama_work():
+            started = time.perf_counter()
+            with urllib.request.urlopen(req, timeout=60) as r:
+                data = json.loads(r.read().decode())
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if _ollama_warmup is not None:
+            _ollama_warmup.record_response(OLLAMA_MODEL, data, elapsed_ms)
         reply = (data.get("response") or "").strip()
         return jsonify({"reply": reply, "status": "ok"})
     except urllib.error.URLError as e:
@@ -1099,7 +1198,8 @@ def api_session_archivist():
     output_path = body.get("output_path")
     output_path = _resolve_session_path(str(output_path)) if output_path else None
     try:
-        res = run_archivist(session_path, CONFIG_PATH, output_path=output_path, system_prompt_path=None)
+        with _ollama_work():
+            res = run_archivist(session_path, CONFIG_PATH, output_path=output_path, system_prompt_path=None)
         return jsonify(res)
     except Exception as e:
         _log_workflow_error("api_session_archivist", e)
@@ -1122,7 +1222,8 @@ def api_session_foreshadow():
     output_path = body.get("output_path")
     output_path = _resolve_session_path(str(output_path)) if output_path else None
     try:
-        res = run_foreshadowing(context_path, CONFIG_PATH, output_path=output_path, system_prompt_path=None)
+        with _ollama_work():
+            res = run_foreshadowing(context_path, CONFIG_PATH, output_path=output_path, system_prompt_path=None)
         return jsonify(res)
     except Exception as e:
         _log_workflow_error("api_session_foreshadow", e)
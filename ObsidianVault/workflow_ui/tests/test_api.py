@@ -695,6 +695,44 @@ def test_workbench_chat_ollama_down(client, tmp_campaigns):
     assert "error" in data or "LLM" in str(data).lower() or "Ollama" in str(data)
 
 
+def test_ollama_warmup_covers_configured_models_and_ui_activity(tmp_path):
+    """Warm-up preloads the chat model plus the config's Ollama models; chat activity keeps the refresh busy."""
+    config_path = tmp_path / "ingest_config.json"
+    config_path.write_text(json.dumps({
+        "rag_pipeline": {"generation": {"provider": "ollama", "model": "storyboard-model"}},
+        "ai_summarization": {"provider": "ollama", "model": "summary-model"},
+    }), encoding="utf-8")
+    started = []
+    with patch.object(app_module, "CONFIG_PATH", config_path), \
+            patch.object(app_module, "_ollama_last_activity", 0.0), \
+            patch("ollama_warmup.OllamaWarmupManager.start", lambda self, preload=True: started.append(self)), \
+            patch("ollama_warmup._active_manager", None):
+        import ollama_warmup
+
+        app_module._start_ollama_warmup()
+        manager = started[0]
+        assert manager.models == [app_module.OLLAMA_MODEL, "summary-model", "storyboard-model"]
+        assert manager.endpoint == app_module.OLLAMA_URL
+        assert ollama_warmup.get_active_manager() is manager  # ai_summarizer records latency through it
+        assert not manager.is_busy()
+        with app_module._ollama_work():
+            assert manager.is_busy()
+        assert manager.is_busy()  # recent UI activity keeps keep_alive refreshing
+    app_module._ollama_warmup = None
+
+
+def test_ollama_warmup_starts_once_per_serving_process():
+    """The first request of a process starts warm-up (flask run, WSGI, reloader child); later ones do not."""
+    from types import SimpleNamespace
+
+    with patch.object(app_module, "app", SimpleNamespace(testing=False)), \
+            patch.object(app_module, "_ollama_warmup_started", False), \
+            patch.object(app_module, "_start_ollama_warmup") as start:
+        app_module._start_ollama_warmup_once()
+        app_module._start_ollama_warmup_once()
+    assert start.call_count == 1
+
+
 def test_workbench_chat_missing_message(client, tmp_campaigns):
     """POST /api/workbench/chat without message returns 400."""
     with patch.object(app_module, "CAMPAIGNS", tmp_campaigns):